@@ -0,0 +1 @@
+"""Benchmarks of enforce_notebook_run_order against synthetic notebook corpora"""
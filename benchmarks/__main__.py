@@ -0,0 +1,5 @@
+"""Runs the benchmarks, see ``benchmarks.run``"""
+
+from .run import main
+
+main()  # pylint: disable=no-value-for-parameter
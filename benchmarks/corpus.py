@@ -0,0 +1,191 @@
+"""Generates synthetic notebook corpora for the benchmarks.
+
+Every notebook generated is valid, so checking it always reads it to the end.
+Sizes are multiplied by ``scale``: at ``scale=1`` the corpora are
+
+- ``tiny``: 1,000 notebooks of a few cells each.
+- ``many_cells``: a single notebook with 10,000 code cells.
+- ``large_outputs``: a single notebook holding 100 MB of base64 image outputs.
+- ``deep_tree``: a directory tree 8 levels deep holding 100,000 files, one in
+  a hundred of them a notebook.
+
+Generation is deterministic, and a corpus already generated at the same scale
+is reused.
+"""
+
+import base64
+import json
+import os
+import random
+from typing import Dict, List
+
+CORPORA = ("tiny", "many_cells", "large_outputs", "deep_tree")
+
+TINY_NOTEBOOKS = 1_000
+MANY_CELLS = 10_000
+LARGE_OUTPUT_BYTES = 100 * 1024 * 1024
+DEEP_TREE_FILES = 100_000
+DEEP_TREE_DEPTH = 8
+
+# Outputs of the large_outputs notebook are split into images of this size.
+_IMAGE_BYTES = 1024 * 1024
+_SEED = 20240501
+
+
+def make_notebook(cell_count: int, output_bytes: int = 0) -> Dict:
+    """Builds a valid notebook in the nbformat 4 layout.
+
+    Code cells are interleaved with markdown cells, as in a real notebook.
+
+    Args:
+        cell_count (int): Number of code cells.
+        output_bytes (int): Total size of the base64-encoded PNG outputs, spread
+            over the code cells.
+
+    Returns:
+        Dict: The notebook.
+    """
+    rng = random.Random(_SEED)
+    image_count = -(-output_bytes // _IMAGE_BYTES) if output_bytes else 0
+    images_per_cell = -(-image_count // max(cell_count, 1)) if image_count else 0
+    cells: List[Dict] = []
+    remaining = output_bytes
+    for number in range(1, cell_count + 1):
+        if number % 3 == 0:
+            cells.append(
+                {
+                    "cell_type": "markdown",
+                    "metadata": {},
+                    "source": [f"## Step {number}\n", "Some notes on the analysis."],
+                }
+            )
+        outputs = [
+            {
+                "name": "stdout",
+                "output_type": "stream",
+                "text": [f"result {number}\n"],
+            }
+        ]
+        for _ in range(images_per_cell):
+            if remaining <= 0:
+                break
+            size = min(remaining, _IMAGE_BYTES)
+            remaining -= size
+            outputs.append(
+                {
+                    "data": {
+                        "image/png": base64.b64encode(
+                            rng.randbytes(size * 3 // 4)
+                        ).decode(),
+                        "text/plain": ["<Figure size 640x480 with 1 Axes>"],
+                    },
+                    "metadata": {},
+                    "output_type": "display_data",
+                }
+            )
+        cells.append(
+            {
+                "cell_type": "code",
+                "execution_count": number,
+                "id": f"cell-{number}",
+                "metadata": {},
+                "outputs": outputs,
+                "source": [
+                    f"x_{number} = compute({number})\n",
+                    f"print('result', x_{number})",
+                ],
+            }
+        )
+    return {
+        "cells": cells,
+        "metadata": {
+            "kernelspec": {
+                "display_name": "Python 3",
+                "language": "python",
+                "name": "python3",
+            },
+            "language_info": {"name": "python"},
+        },
+        "nbformat": 4,
+        "nbformat_minor": 5,
+    }
+
+
+def write_notebook(path: str, notebook: Dict) -> None:
+    """Writes a notebook the way Jupyter does, indented by one space.
+
+    Args:
+        path (str): Path to write to.
+        notebook (Dict): The notebook.
+    """
+    with open(path, "w", encoding="utf-8") as notebook_file:
+        json.dump(notebook, notebook_file, indent=1)
+
+
+def _write_tiny(root: str, scale: float) -> None:
+    notebook = make_notebook(3)
+    for index in range(max(1, int(TINY_NOTEBOOKS * scale))):
+        write_notebook(os.path.join(root, f"notebook_{index:05d}.ipynb"), notebook)
+
+
+def _write_many_cells(root: str, scale: float) -> None:
+    notebook = make_notebook(max(1, int(MANY_CELLS * scale)))
+    write_notebook(os.path.join(root, "many_cells.ipynb"), notebook)
+
+
+def _write_large_outputs(root: str, scale: float) -> None:
+    notebook = make_notebook(20, output_bytes=int(LARGE_OUTPUT_BYTES * scale))
+    write_notebook(os.path.join(root, "large_outputs.ipynb"), notebook)
+
+
+def _write_deep_tree(root: str, scale: float) -> None:
+    notebook = make_notebook(3)
+    file_count = max(1, int(DEEP_TREE_FILES * scale))
+    # Spread the files over a tree with 3 subdirectories per directory.
+    leaves = 3 ** (DEEP_TREE_DEPTH - 1)
+    for index in range(file_count):
+        leaf = index % leaves
+        parts = []
+        for _ in range(DEEP_TREE_DEPTH - 1):
+            leaf, branch = divmod(leaf, 3)
+            parts.append(f"dir_{branch}")
+        directory = os.path.join(root, *parts)
+        os.makedirs(directory, exist_ok=True)
+        if index % 100 == 0:
+            write_notebook(os.path.join(directory, f"nb_{index}.ipynb"), notebook)
+        else:
+            with open(
+                os.path.join(directory, f"data_{index}.csv"), "w", encoding="utf-8"
+            ) as data_file:
+                data_file.write("a,b\n1,2\n")
+
+
+_WRITERS = {
+    "tiny": _write_tiny,
+    "many_cells": _write_many_cells,
+    "large_outputs": _write_large_outputs,
+    "deep_tree": _write_deep_tree,
+}
+
+
+def generate_corpus(corpus_dir: str, scale: float = 1.0) -> Dict[str, str]:
+    """Generates every corpus under a directory, reusing ones already there.
+
+    Args:
+        corpus_dir (str): Directory to generate the corpora in.
+        scale (float): Multiplier for the number and size of files.
+
+    Returns:
+        Dict[str, str]: The directory of each corpus, by name.
+    """
+    paths = {}
+    for name in CORPORA:
+        path = os.path.join(corpus_dir, f"{name}-{scale:g}")
+        marker = os.path.join(path, ".complete")
+        if not os.path.exists(marker):
+            os.makedirs(path, exist_ok=True)
+            _WRITERS[name](path, scale)
+            with open(marker, "w", encoding="utf-8"):
+                pass
+        paths[name] = path
+    return paths
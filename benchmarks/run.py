@@ -0,0 +1,316 @@
+"""Times the checker against the synthetic corpora and compares with a baseline.
+
+Each benchmark is timed as the best of several runs, then run once more under
+``tracemalloc`` to record its peak memory. Results can be saved as the new
+baseline, and are compared with the stored one; anything slower or hungrier
+than the baseline by more than the allowed factor is reported as a regression
+and fails the run.
+
+Times are compared relative to the ``reference`` benchmark, a fixed workload
+that doesn't touch the checker and is timed in the same run, so a baseline
+recorded on one machine still applies on a faster or slower one.
+
+Run from the repository root::
+
+    python -m benchmarks --scale 0.1
+"""
+
+import io
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import click
+
+from enforce_notebook_run_order import json_backends, utils
+from enforce_notebook_run_order.enforce_notebook_run_order import (
+    check_notebook_file,
+    check_notebook_run_order,
+    process_path,
+)
+from enforce_notebook_run_order.execution_profile import ExecutionProfile
+from enforce_notebook_run_order.reporters import Reporter, use_reporter
+from .corpus import generate_corpus
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Timings below this are dominated by noise and are never flagged.
+MIN_SECONDS = 0.005
+
+# Benchmark that measures the speed of the machine rather than the checker.
+REFERENCE = "reference"
+
+
+class Measurement(NamedTuple):
+    """Best wall time and peak traced memory of a benchmark."""
+
+    seconds: float
+    peak_bytes: int
+
+
+def measure(func: Callable[[], object], repeat: int = 3) -> Measurement:
+    """Times a function and records its peak memory.
+
+    Args:
+        func (Callable[[], object]): The code to benchmark.
+        repeat (int): Number of timed runs; the fastest one is kept.
+
+    Returns:
+        Measurement: Best wall time, and peak memory of a separate traced run.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return Measurement(best, peak)
+
+
+def _process_path_quietly(path: str) -> Callable[[], object]:
+    # The base Reporter writes nothing, so only the check itself is measured.
+    def run():
+        with use_reporter(Reporter(io.StringIO())):
+            return process_path(path)
+
+    return run
+
+
+def _check_notebook_file_with(path: str, backend: str) -> Callable[[], object]:
+    def run():
+        with json_backends.using(backend):
+            return check_notebook_file(path)
+
+    return run
+
+
+def _reference_workload() -> object:
+    # Decoding, walking and sorting plain Python objects, much like a check,
+    # but fixed across versions of the checker.
+    payload = json.dumps(
+        [{"execution_count": index, "source": ["x = 1"] * 8} for index in range(20_000)]
+    )
+    cells = json.loads(payload)
+    return sorted(cell["execution_count"] for cell in cells if cell["source"])
+
+
+def make_benchmarks(corpora: Dict[str, str]) -> Dict[str, Callable[[], object]]:
+    """Builds the benchmarks for a set of generated corpora.
+
+    The first benchmark is always ``REFERENCE``.
+
+    Args:
+        corpora (Dict[str, str]): Corpus directories by name, from
+            ``corpus.generate_corpus``.
+
+    Returns:
+        Dict[str, Callable[[], object]]: The code to time, by benchmark name.
+    """
+    benchmarks = {REFERENCE: _reference_workload}
+    for name in ("many_cells", "large_outputs"):
+        notebook_path = os.path.join(corpora[name], f"{name}.ipynb")
+        notebook_data = utils.load_notebook_data(notebook_path)
+        benchmarks[f"load_notebook_data[{name}]"] = (
+            lambda path=notebook_path: utils.load_notebook_data(path)
+        )
+        benchmarks[f"get_code_cells[{name}]"] = (
+            lambda data=notebook_data: utils.get_code_cells(data)
+        )
+        benchmarks[f"ExecutionProfile.from_notebook[{name}]"] = (
+            lambda data=notebook_data: ExecutionProfile.from_notebook(data)
+        )
+        benchmarks[f"check_notebook_run_order[{name}]"] = (
+            lambda data=notebook_data: check_notebook_run_order(data)
+        )
+        benchmarks[f"check_notebook_file[{name}]"] = (
+            lambda path=notebook_path: check_notebook_file(path)
+        )
+        # Compares the streaming reader and the installed JSON backends with
+        # the default above.
+        for backend in [json_backends.STREAM, *json_backends.available_backends()]:
+            benchmarks[f"check_notebook_file[{name}, json_backend={backend}]"] = (
+                _check_notebook_file_with(notebook_path, backend)
+            )
+    for name, path in corpora.items():
+        benchmarks[f"process_path[{name}]"] = _process_path_quietly(path)
+    return benchmarks
+
+
+def compare(
+    results: Dict[str, Measurement],
+    baseline: Dict[str, Measurement],
+    max_slowdown: float,
+) -> List[str]:
+    """Lists the benchmarks that regressed against the baseline.
+
+    When both have a ``REFERENCE`` measurement, baseline times are scaled by
+    how much faster or slower it ran this time, so only changes relative to
+    the speed of the machine count.
+
+    Args:
+        results (Dict[str, Measurement]): Measurements of this run.
+        baseline (Dict[str, Measurement]): Measurements to compare with.
+        max_slowdown (float): Allowed ratio of new to baseline time and memory.
+
+    Returns:
+        List[str]: A description of each regression.
+    """
+    speed = 1.0
+    if REFERENCE in results and REFERENCE in baseline:
+        speed = results[REFERENCE].seconds / baseline[REFERENCE].seconds
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline or name == REFERENCE:
+            continue
+        base = baseline[name]
+        expected = base.seconds * speed
+        seconds_ratio = max(result.seconds, MIN_SECONDS) / max(expected, MIN_SECONDS)
+        if seconds_ratio > max_slowdown:
+            regressions.append(
+                f"{name}: {result.seconds:.3f}s vs {expected:.3f}s "
+                f"({seconds_ratio:.2f}x)"
+            )
+        memory_ratio = max(result.peak_bytes, 1) / max(base.peak_bytes, 1)
+        if memory_ratio > max_slowdown:
+            regressions.append(
+                f"{name}: peak {_format_bytes(result.peak_bytes)} vs "
+                f"{_format_bytes(base.peak_bytes)} ({memory_ratio:.2f}x)"
+            )
+    return regressions
+
+
+def load_baseline(path: str) -> Tuple[Optional[float], Dict[str, Measurement]]:
+    """Reads a stored baseline.
+
+    Args:
+        path (str): Path to the baseline JSON file.
+
+    Returns:
+        Tuple[Optional[float], Dict[str, Measurement]]: The scale the baseline was
+        recorded at, and its measurements, empty if there is no baseline.
+    """
+    if not os.path.exists(path):
+        return None, {}
+    with open(path, encoding="utf-8") as baseline_file:
+        stored = json.load(baseline_file)
+    return stored["scale"], {
+        name: Measurement(**measurement)
+        for name, measurement in stored["results"].items()
+    }
+
+
+def save_baseline(path: str, scale: float, results: Dict[str, Measurement]) -> None:
+    """Stores measurements as the new baseline.
+
+    Args:
+        path (str): Path to the baseline JSON file.
+        scale (float): Scale the corpora were generated at.
+        results (Dict[str, Measurement]): Measurements to store.
+    """
+    stored = {
+        "scale": scale,
+        "results": {name: result._asdict() for name, result in results.items()},
+    }
+    with open(path, "w", encoding="utf-8") as baseline_file:
+        json.dump(stored, baseline_file, indent=2)
+        baseline_file.write("\n")
+
+
+def _format_bytes(size: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+@click.command()
+@click.option(
+    "--scale",
+    type=float,
+    default=1.0,
+    show_default=True,
+    help="Multiplier for the number and size of generated files.",
+)
+@click.option(
+    "--corpus-dir",
+    type=click.Path(file_okay=False),
+    help="Directory to generate the corpora in, and reuse them from. "
+    "Defaults to a temporary directory.",
+)
+@click.option(
+    "--repeat", default=3, show_default=True, help="Timed runs per benchmark."
+)
+@click.option(
+    "--baseline",
+    "baseline_path",
+    type=click.Path(dir_okay=False),
+    default=DEFAULT_BASELINE,
+    show_default=True,
+    help="Baseline to compare with.",
+)
+@click.option(
+    "--save-baseline",
+    "save",
+    is_flag=True,
+    help="Store the results as the new baseline.",
+)
+@click.option(
+    "--max-slowdown",
+    type=float,
+    default=1.25,
+    show_default=True,
+    help="Ratio to the baseline time or memory above which a benchmark fails.",
+)
+def main(
+    scale: float,
+    corpus_dir: Optional[str],
+    repeat: int,
+    baseline_path: str,
+    save: bool,
+    max_slowdown: float,
+):  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    """Runs the benchmarks and compares them with the stored baseline."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        click.echo(f"Generating corpora at scale {scale:g}...")
+        corpora = generate_corpus(corpus_dir or temp_dir, scale)
+        results = {}
+        for name, func in make_benchmarks(corpora).items():
+            results[name] = measure(func, repeat)
+            click.echo(
+                f"{name:56} {results[name].seconds:9.4f}s "
+                f"{_format_bytes(results[name].peak_bytes):>12}"
+            )
+    if save:
+        save_baseline(baseline_path, scale, results)
+        click.echo(f"Saved baseline to {baseline_path}.")
+        return
+    baseline_scale, baseline = load_baseline(baseline_path)
+    if not baseline:
+        click.echo("No baseline to compare with.")
+        return
+    if baseline_scale != scale:
+        raise click.ClickException(
+            f"The baseline was recorded at scale {baseline_scale:g}, " f"not {scale:g}."
+        )
+    if REFERENCE not in baseline:
+        click.echo(
+            "The baseline has no reference timing, so times are compared as "
+            "measured. Record it again with --save-baseline.",
+            err=True,
+        )
+    regressions = compare(results, baseline, max_slowdown)
+    if regressions:
+        click.echo(f"\nRegressions against {baseline_path}:", err=True)
+        for regression in regressions:
+            click.echo(f"  {regression}", err=True)
+        raise SystemExit(1)
+    click.echo(f"\nNo regressions against {baseline_path}.")
@@ -1,3 +1,5 @@
 """Ensures that jupyter notebooks are run in order"""
 
 from .enforce_notebook_run_order import check_single_notebook, process_path
+from .api import check_notebook, iter_check
+from .results import CheckResult
@@ -0,0 +1,140 @@
+"""Library API that checks notebooks without printing or raising.
+
+``iter_check`` lazily yields a ``results.CheckResult`` per notebook, with the
+offending cell and its execution counts, and captures unreadable files as
+results too. Nothing is reported, so it can be used from several threads at
+once. Checks follow the ``json_backends`` and ``limits`` settings of the calling
+thread, or asyncio task, and are only timed if it is collecting ``stats``. Any reporter
+can consume the results; see ``reporters.Reporter.report``::
+
+    from enforce_notebook_run_order import iter_check
+    from enforce_notebook_run_order.reporters import PlainReporter
+
+    reporter = PlainReporter()
+    summary = reporter.report(iter_check(["notebooks/"]))
+    reporter.close()
+"""
+
+import os
+from contextlib import closing
+from typing import Dict, Iterable, Iterator, Optional, Union
+
+from . import archives, limits, pipeline, stats
+from .enforce_notebook_run_order import (
+    READ_ERRORS,
+    find_violation,
+    iter_notebook_results,
+    stream_code_cells,
+    violation_result,
+)
+
+# Part of the library API; it lives with the rest of the checks.
+from .enforce_notebook_run_order import (  # pylint: disable=unused-import
+    check_notebook,
+)
+from .execution_profile import ExecutionProfile
+from .results import UNREADABLE, CheckResult, read_error
+from .walk import NotebookWalker
+
+
+def check_notebook_data(
+    notebook_path: str, notebook_data: Union[Dict, ExecutionProfile]
+) -> CheckResult:
+    """Checks a notebook that is already in memory, such as a Jupyter model.
+
+    Args:
+        notebook_path (str): Path to report the notebook under.
+        notebook_data (Union[Dict, ExecutionProfile]): Notebook data in
+            dictionary format, or its execution profile.
+
+    Returns:
+        CheckResult: The verdict, ``UNREADABLE`` if the data is not a notebook.
+    """
+    try:
+        violation = find_violation(notebook_data)
+    except (KeyError, TypeError, AttributeError) as error:
+        return CheckResult(
+            notebook_path, UNREADABLE, error=f"Not a notebook: {error!r}"
+        )
+    return violation_result(notebook_path, violation)
+
+
+def check_archive(archive_path: str) -> Iterator[CheckResult]:
+    """Checks the notebooks in an archive or compressed notebook file.
+
+    Notebooks are decompressed as they are read, without extracting anything
+    to disk; see ``archives``.
+
+    Args:
+        archive_path (str): Path to the archive, see ``archives.is_archive``.
+
+    Yields:
+        CheckResult: The verdict for each notebook, named ``archive!/member``.
+        An unreadable or corrupt archive, or member, ends the results with an
+        ``UNREADABLE`` one.
+    """
+    member_path = archive_path
+    unreadable_errors = READ_ERRORS + archives.corrupt_data_errors()
+    try:
+        with closing(archives.iter_notebook_streams(archive_path)) as members:
+            for member_path, stream in members:
+                # pylint: disable-next=contextmanager-generator-missing-cleanup
+                with stream_code_cells(member_path, stream) as code_cells:
+                    violation = find_violation(code_cells)
+                yield violation_result(member_path, violation)
+    except limits.ResourceLimitError as error:
+        yield CheckResult(member_path, UNREADABLE, error=str(error))
+    except unreadable_errors as error:
+        yield CheckResult(member_path, UNREADABLE, error=read_error(error))
+
+
+def iter_check(
+    paths: Iterable[str],
+    walker: Optional[NotebookWalker] = None,
+    cache=None,
+    prefetch: int = 0,
+    prefetch_bytes: int = pipeline.DEFAULT_MAX_BYTES,
+) -> Iterator[CheckResult]:
+    """Checks the notebooks at the given paths, yielding each verdict as it is ready.
+
+    Paths are consumed lazily and results are not kept. The walker does
+    remember the device and inode of every notebook found in directories, so
+    that each is checked once. Directories are walked, and notebook files and
+    archives checked as given, unless ``walker`` excludes them or they are
+    outside its shard. Notebooks over the size limit are left out if
+    ``limits`` says to skip them. Paths that don't exist are reported as
+    unreadable notebooks.
+
+    Args:
+        paths (Iterable[str]): Paths to notebook files, archives or directories.
+        walker (Optional[NotebookWalker]): Walker holding the exclude patterns
+            and shard; a default one if not given.
+        cache (Optional[cache.ResultCache]): Cache of verdicts from previous
+            runs, for notebooks outside archives.
+        prefetch (int): Number of notebooks to read ahead in background
+            threads, see ``enforce_notebook_run_order.check_notebooks``.
+        prefetch_bytes (int): Limit on read-ahead, see ``pipeline``.
+
+    Yields:
+        CheckResult: The verdict for each notebook, in order.
+    """
+    walker = walker or NotebookWalker()
+    for path in paths:
+        if archives.is_archive(path) and not os.path.isdir(path):
+            if walker.in_shard(path):
+                yield from check_archive(path)
+            continue
+        if os.path.isdir(path):
+            notebook_paths = stats.timed_iter("walk", walker.find(path))
+        elif path.endswith(".ipynb") or not os.path.exists(path):
+            notebook_paths = walker.find_named(path)
+        else:
+            yield CheckResult(
+                path,
+                UNREADABLE,
+                error=f"{path} is neither a notebook file nor a directory.",
+            )
+            continue
+        yield from iter_notebook_results(
+            notebook_paths, cache, prefetch, prefetch_bytes
+        )
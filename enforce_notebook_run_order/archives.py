@@ -0,0 +1,143 @@
+"""Reads notebooks straight out of archives and compressed files.
+
+Zip and tar archives, optionally compressed, and single compressed notebooks
+(``.ipynb.gz``, ``.ipynb.bz2``, ``.ipynb.xz``) are read without extracting
+anything to disk. Members are decompressed on the fly as the notebook reader
+pulls bytes, and tar archives are read as a single forward pass, so even
+multi-GB bundles are checked in bounded memory.
+
+Notebooks inside an archive are named ``archive.zip!/path/inside.ipynb``.
+"""
+
+from typing import BinaryIO, Iterator, Tuple, Type
+
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+ZIP_SUFFIXES = (".zip",)
+COMPRESSED_NOTEBOOK_SUFFIXES = (".ipynb.gz", ".ipynb.bz2", ".ipynb.xz")
+
+# Separates the archive's path from the member's in reported paths.
+MEMBER_SEPARATOR = "!/"
+
+
+def is_archive(path: str) -> bool:
+    """Returns True if the path names an archive or a compressed notebook.
+
+    Args:
+        path (str): Path to a file.
+
+    Returns:
+        bool: Whether the file is read with ``iter_notebook_streams``.
+    """
+    return path.lower().endswith(
+        TAR_SUFFIXES + ZIP_SUFFIXES + COMPRESSED_NOTEBOOK_SUFFIXES
+    )
+
+
+def corrupt_data_errors() -> Tuple[Type[Exception], ...]:
+    """Returns the errors the decompressors raise on corrupt data.
+
+    They are raised by the streams ``iter_notebook_streams`` yields, as they
+    are read, so they reach the reader rather than being turned into an
+    ``OSError`` here.
+
+    Returns:
+        Tuple[Type[Exception], ...]: The error types, none of which are
+        ``OSError`` or ``ValueError``.
+    """
+    # pylint: disable=import-outside-toplevel
+    import lzma
+    import tarfile
+    import zipfile
+    import zlib
+
+    return (lzma.LZMAError, zlib.error, zipfile.BadZipFile, tarfile.TarError)
+
+
+def _is_notebook_member(name: str) -> bool:
+    return name.lower().endswith((".ipynb",) + COMPRESSED_NOTEBOOK_SUFFIXES)
+
+
+def _decompressed(name: str, stream: BinaryIO) -> BinaryIO:
+    """Wraps the stream of a compressed notebook in a decompressor."""
+    # Codecs are imported when first needed, to keep them out of the startup
+    # of normal runs.
+    # pylint: disable=import-outside-toplevel
+    lower = name.lower()
+    if lower.endswith(".ipynb.gz"):
+        import gzip
+
+        return gzip.open(stream, "rb")
+    if lower.endswith(".ipynb.bz2"):
+        import bz2
+
+        return bz2.open(stream, "rb")
+    if lower.endswith(".ipynb.xz"):
+        import lzma
+
+        return lzma.open(stream, "rb")
+    return stream
+
+
+def iter_notebook_streams(path: str) -> Iterator[Tuple[str, BinaryIO]]:
+    """Yields a readable stream for each notebook in an archive or compressed file.
+
+    Each stream is only valid until the next one is requested. Members that
+    are not notebooks are skipped without being decompressed; compressed
+    notebooks inside archives are decompressed too.
+
+    Args:
+        path (str): Path to the archive or compressed notebook, see ``is_archive``.
+
+    Yields:
+        Tuple[str, BinaryIO]: Name of each notebook, as
+        ``archive!/member``, and its decompressed content.
+
+    Raises:
+        ValueError: If the path is not an archive or compressed notebook.
+        OSError: If the file can't be read or is not an archive.
+
+    Reading a yielded stream raises ``OSError``, or one of
+    ``corrupt_data_errors``, if the member is corrupt.
+    """
+    lower = path.lower()
+    if lower.endswith(COMPRESSED_NOTEBOOK_SUFFIXES):
+        with open(path, "rb") as compressed, _decompressed(path, compressed) as stream:
+            yield path, stream
+    elif lower.endswith(ZIP_SUFFIXES):
+        yield from _iter_zip(path)
+    elif lower.endswith(TAR_SUFFIXES):
+        yield from _iter_tar(path)
+    else:
+        raise ValueError(f"{path} is not an archive or compressed notebook.")
+
+
+def _iter_zip(path: str) -> Iterator[Tuple[str, BinaryIO]]:
+    import zipfile  # pylint: disable=import-outside-toplevel
+
+    try:
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or not _is_notebook_member(info.filename):
+                    continue
+                with archive.open(info) as member:
+                    with _decompressed(info.filename, member) as stream:
+                        yield f"{path}{MEMBER_SEPARATOR}{info.filename}", stream
+    except zipfile.BadZipFile as error:
+        raise OSError(f"{path} is not a valid zip archive: {error}") from error
+
+
+def _iter_tar(path: str) -> Iterator[Tuple[str, BinaryIO]]:
+    import tarfile  # pylint: disable=import-outside-toplevel
+
+    try:
+        # "r|*" reads the archive front to back, without seeking, so members
+        # are decompressed as they are checked.
+        with tarfile.open(path, "r|*") as archive:
+            for info in archive:
+                if not info.isfile() or not _is_notebook_member(info.name):
+                    continue
+                member = archive.extractfile(info)
+                with _decompressed(info.name, member) as stream:
+                    yield f"{path}{MEMBER_SEPARATOR}{info.name}", stream
+    except tarfile.TarError as error:
+        raise OSError(f"{path} is not a valid tar archive: {error}") from error
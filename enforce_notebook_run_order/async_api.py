@@ -0,0 +1,172 @@
+"""Asyncio version of ``api``, for checking notebooks inside async services.
+
+Reading a notebook and scanning it both happen on an executor, never on the
+event loop: the loop's default thread pool unless another executor is given. A
+``concurrent.futures.ProcessPoolExecutor`` spreads the parsing of large
+notebooks over several cores; checks in it use the caller's JSON backend and
+``limits``. ``check_paths`` yields verdicts as they finish, so they can be
+streamed to clients straight away::
+
+    from enforce_notebook_run_order import async_api
+
+    async for result in async_api.check_paths(["notebooks/"], concurrency=8):
+        await send(result._asdict())
+
+Cancelling the task iterating ``check_paths``, or closing the iterator early
+with ``aclose``, cancels the checks that haven't started; those already running
+on the executor run to completion, but their results are dropped.
+"""
+
+import asyncio
+import itertools
+import os
+from contextlib import ExitStack
+from typing import AsyncIterator, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from . import api, archives, json_backends, limits
+from .results import UNREADABLE, CheckResult
+from .walk import NotebookWalker
+
+DEFAULT_CONCURRENCY = 16
+
+
+def _check_file(notebook_path: str, data: Optional[bytes] = None) -> List[CheckResult]:
+    return [api.check_notebook(notebook_path, data)]
+
+
+def _check_archive(archive_path: str) -> List[CheckResult]:
+    return list(api.check_archive(archive_path))
+
+
+def _not_a_notebook(path: str) -> List[CheckResult]:
+    return [
+        CheckResult(
+            path,
+            UNREADABLE,
+            error=f"{path} is neither a notebook file nor a directory.",
+        )
+    ]
+
+
+def _run(
+    check: Callable[..., List[CheckResult]],
+    args: Tuple,
+    json_backend: str,
+    resource_limits: limits.Limits,
+) -> List[CheckResult]:
+    """Executor entry point: runs a check with the caller's settings.
+
+    Neither executor threads nor worker processes see the caller's settings,
+    so they are set for the duration of the check unless they are the defaults.
+    """
+    with ExitStack() as stack:
+        if json_backends.current() != json_backend:
+            stack.enter_context(json_backends.using(json_backend))
+        if limits.current() != resource_limits:
+            stack.enter_context(limits.using(resource_limits))
+        return check(*args)
+
+
+async def _submit(
+    executor, check: Callable[..., List[CheckResult]], *args
+) -> List[CheckResult]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor, _run, check, args, json_backends.current(), limits.current()
+    )
+
+
+async def check_notebook_bytes(
+    notebook_path: str, data: bytes, executor=None
+) -> CheckResult:
+    """Checks a notebook that is already in memory, such as an upload.
+
+    Args:
+        notebook_path (str): Path to report the notebook under.
+        data (bytes): Content of the notebook file.
+        executor (Optional[concurrent.futures.Executor]): Where the notebook is
+            parsed; the event loop's default executor if not given.
+
+    Returns:
+        CheckResult: The verdict, ``UNREADABLE`` if the data can't be parsed as a
+        notebook.
+    """
+    results = await _submit(executor, _check_file, notebook_path, data)
+    return results[0]
+
+
+def _checks(
+    paths: Iterable[str], walker: NotebookWalker
+) -> Iterator[Tuple[Callable[..., List[CheckResult]], str]]:
+    """Yields each check ``api.iter_check`` would run, with its path."""
+    for path in paths:
+        if archives.is_archive(path) and not os.path.isdir(path):
+            if walker.in_shard(path):
+                yield _check_archive, path
+            continue
+        if os.path.isdir(path):
+            notebook_paths = walker.find(path)
+        elif path.endswith(".ipynb") or not os.path.exists(path):
+            notebook_paths = walker.find_named(path)
+        else:
+            yield _not_a_notebook, path
+            continue
+        for notebook_path in limits.skip_oversized(notebook_paths):
+            yield _check_file, notebook_path
+
+
+async def check_paths(
+    paths: Iterable[str],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    walker: Optional[NotebookWalker] = None,
+    executor=None,
+) -> AsyncIterator[CheckResult]:
+    """Checks the notebooks at the given paths, yielding verdicts as they finish.
+
+    Directories are walked on the default executor, a few paths ahead of the
+    checks, so neither the walk nor the checks block the event loop.
+
+    Args:
+        paths (Iterable[str]): Paths to notebook files, archives or directories.
+        concurrency (int): Maximum number of checks in flight at once.
+        walker (Optional[NotebookWalker]): Walker holding the exclude patterns
+            for directories; a default one if not given.
+        executor (Optional[concurrent.futures.Executor]): Where notebooks are
+            read and parsed; the event loop's default executor if not given.
+
+    Yields:
+        CheckResult: The verdict for each notebook, in the order the checks
+        finish. The notebooks of an archive are yielded together, in order.
+
+    Raises:
+        ValueError: If ``concurrency`` is less than 1.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    loop = asyncio.get_running_loop()
+    checks = _checks(paths, walker or NotebookWalker())
+    running = set()
+    exhausted = False
+    try:
+        while True:
+            if not exhausted and len(running) < concurrency:
+                batch = await loop.run_in_executor(
+                    None, list, itertools.islice(checks, concurrency - len(running))
+                )
+                exhausted = not batch
+                running.update(
+                    asyncio.ensure_future(_submit(executor, check, path))
+                    for check, path in batch
+                )
+            if not running:
+                return
+            done, running = await asyncio.wait(
+                running, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                for result in task.result():
+                    yield result
+    finally:
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
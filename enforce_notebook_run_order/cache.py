@@ -0,0 +1,278 @@
+"""Persistent cache of notebook verdicts, so unchanged notebooks are never re-read.
+
+Entries are keyed on the notebook's absolute path, size and modification time.
+When those don't match (for example after a fresh clone or ``git checkout``
+touched the file), the notebook's content hash is looked up instead, so only
+notebooks whose content actually changed are checked again. The hash is taken
+of the content read for the check where possible, so a changed notebook is
+read once, not once to hash it and again to check it.
+
+The cache is a SQLite database, which keeps it safe to share between several
+hook processes running at once. Writes are buffered and committed in a single
+transaction when the cache is closed, and the oldest entries are evicted once
+the cache grows past ``max_entries``.
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from . import stats
+
+DEFAULT_MAX_ENTRIES = 200_000
+CACHE_FILENAME = "verdicts.sqlite3"
+
+# Bump whenever the check or the stored verdicts change meaning, so stale
+# caches from older versions are discarded instead of trusted.
+CACHE_FORMAT_VERSION = 1
+
+_HASH_CHUNK_SIZE = 1 << 20
+
+
+class CachedVerdict(NamedTuple):
+    """Verdict stored for a notebook."""
+
+    error: Optional[str]
+
+
+def default_cache_dir() -> str:
+    """Returns the per-user cache directory, honoring ``XDG_CACHE_HOME``."""
+    base_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base_dir, "enforce-notebook-run-order")
+
+
+def data_digest(data: bytes) -> str:
+    """Returns the SHA-256 hex digest of a notebook's content, as ``file_digest``.
+
+    Args:
+        data (bytes): The file content.
+
+    Returns:
+        str: Hex digest of the content.
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_digest(notebook_path: str) -> str:
+    """Returns the SHA-256 hex digest of a file's content.
+
+    Args:
+        notebook_path (str): Path to the notebook file.
+
+    Returns:
+        str: Hex digest of the file content.
+    """
+    digest = hashlib.sha256()
+    with open(notebook_path, "rb") as notebook_file:
+        for chunk in iter(lambda: notebook_file.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """On-disk cache of notebook verdicts.
+
+    Args:
+        cache_dir (str): Directory holding the cache database. Created if missing.
+        max_entries (int): Number of entries kept before the least recently used
+            ones are evicted.
+    """
+
+    def __init__(self, cache_dir: str, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._connection = None
+        self._disabled = False
+        # path -> (size, mtime_ns, digest) captured before the notebook was read
+        self._keys: Dict[str, Tuple[int, int, Optional[str]]] = {}
+        self._writes: List[Tuple[str, int, int, str, Optional[str], float]] = []
+        self._hits: List[str] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Opens the database on first use; returns None if it is unusable."""
+        if self._connection is not None or self._disabled:
+            return self._connection
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            connection = sqlite3.connect(
+                os.path.join(self.cache_dir, CACHE_FILENAME), timeout=30
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            with connection:
+                (version,) = connection.execute("PRAGMA user_version").fetchone()
+                if version != CACHE_FORMAT_VERSION:
+                    connection.execute("DROP TABLE IF EXISTS entries")
+                    connection.execute(f"PRAGMA user_version={CACHE_FORMAT_VERSION}")
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS entries ("
+                    "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, "
+                    "digest TEXT, error TEXT, last_used REAL)"
+                )
+                connection.execute(
+                    "CREATE INDEX IF NOT EXISTS entries_digest ON entries (digest)"
+                )
+        except (OSError, sqlite3.Error):
+            # A broken or read-only cache must never fail the check itself.
+            self._disabled = True
+            return None
+        self._connection = connection
+        return connection
+
+    @stats.timed("cache")
+    def get(
+        self, notebook_path: str, data: Optional[bytes] = None
+    ) -> Optional[CachedVerdict]:
+        """Looks up the verdict for a notebook.
+
+        Args:
+            notebook_path (str): Path to the notebook file.
+            data (Optional[bytes]): Content of the notebook, if it was already
+                read. It is hashed instead of the file on a size or mtime miss.
+
+        Returns:
+            Optional[CachedVerdict]: The stored verdict, or None on a miss.
+        """
+        connection = self._connect()
+        if connection is None:
+            return None
+        path = os.path.abspath(notebook_path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        try:
+            cached = self._get_unchanged(connection, path, stat)
+            if cached is not None:
+                return cached
+            digest = file_digest(path) if data is None else data_digest(data)
+            self._keys[path] = (stat.st_size, stat.st_mtime_ns, digest)
+            row = connection.execute(
+                "SELECT error FROM entries WHERE digest = ? LIMIT 1", (digest,)
+            ).fetchone()
+        except (OSError, sqlite3.Error):
+            return None
+        if row is None:
+            return None
+        # Same content under a new mtime or path: remember the new key.
+        self._writes.append(
+            (path, stat.st_size, stat.st_mtime_ns, digest, row[0], time.time())
+        )
+        return CachedVerdict(row[0])
+
+    @stats.timed("cache")
+    def get_unchanged(self, notebook_path: str) -> Optional[CachedVerdict]:
+        """Looks up the verdict for a notebook whose size and mtime are unchanged.
+
+        Unlike ``get``, never reads the notebook: a notebook whose size or mtime
+        changed is a miss, even if its content is in the cache.
+
+        Args:
+            notebook_path (str): Path to the notebook file.
+
+        Returns:
+            Optional[CachedVerdict]: The stored verdict, or None on a miss.
+        """
+        connection = self._connect()
+        if connection is None:
+            return None
+        path = os.path.abspath(notebook_path)
+        try:
+            stat = os.stat(path)
+            cached = self._get_unchanged(connection, path, stat)
+        except (OSError, sqlite3.Error):
+            return None
+        if cached is None:
+            self._keys[path] = (stat.st_size, stat.st_mtime_ns, None)
+        return cached
+
+    def _get_unchanged(
+        self, connection: sqlite3.Connection, path: str, stat: os.stat_result
+    ) -> Optional[CachedVerdict]:
+        row = connection.execute(
+            "SELECT size, mtime_ns, error FROM entries WHERE path = ?", (path,)
+        ).fetchone()
+        if row is None or row[0] != stat.st_size or row[1] != stat.st_mtime_ns:
+            return None
+        self._hits.append(path)
+        return CachedVerdict(row[2])
+
+    @stats.timed("cache")
+    def put(
+        self, notebook_path: str, error: Optional[str], digest: Optional[str] = None
+    ) -> None:
+        """Stores the verdict for a notebook.
+
+        The verdict is keyed on the size, mtime and hash captured by the preceding
+        ``get``, so a notebook modified while it was being checked is checked again
+        next time.
+
+        Args:
+            notebook_path (str): Path to the notebook file.
+            error (Optional[str]): Description of the run order problem, or None
+                if the notebook is valid.
+            digest (Optional[str]): ``data_digest`` of the content that was
+                checked, if the lookup didn't hash it. The file is hashed if
+                neither has.
+        """
+        path = os.path.abspath(notebook_path)
+        key = self._keys.pop(path, None)
+        try:
+            if key is None:
+                stat = os.stat(path)
+                key = (stat.st_size, stat.st_mtime_ns, None)
+            if key[2] is None:
+                key = (key[0], key[1], digest or file_digest(path))
+        except OSError:
+            return
+        self._writes.append((path, *key, error, time.time()))
+
+    @stats.timed("cache")
+    def flush(self) -> None:
+        """Commits buffered writes and evicts the oldest entries if over the limit."""
+        connection = self._connect()
+        if connection is None:
+            return
+        writes, self._writes = self._writes, []
+        hits, self._hits = self._hits, []
+        now = time.time()
+        try:
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO entries "
+                    "(path, size, mtime_ns, digest, error, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    writes,
+                )
+                connection.executemany(
+                    "UPDATE entries SET last_used = ? WHERE path = ?",
+                    ((now, path) for path in hits),
+                )
+                (count,) = connection.execute("SELECT COUNT(*) FROM entries").fetchone()
+                if count > self.max_entries:
+                    # Evict down to 90% so eviction doesn't run on every flush.
+                    connection.execute(
+                        "DELETE FROM entries WHERE path IN ("
+                        "SELECT path FROM entries ORDER BY last_used LIMIT ?)",
+                        (count - self.max_entries * 9 // 10,),
+                    )
+        except sqlite3.Error:
+            pass
+
+    def close(self) -> None:
+        """Flushes buffered writes and closes the database."""
+        if self._connection is None and not (self._writes or self._hits):
+            return
+        self.flush()
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
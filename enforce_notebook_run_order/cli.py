@@ -4,30 +4,804 @@ Checks run order of notebooks by inspecting existing execution counts.
 Does not execute notebooks or validate outputs.
 """
 
+import itertools
+import os
 import sys
-from typing import Tuple
+from contextlib import ExitStack, contextmanager
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
 import click
-from .enforce_notebook_run_order import process_path, InvalidNotebookRunError
+from . import events, json_backends, limits, stats
+from .api import iter_check
+from .archives import is_archive
+from .cache import ResultCache, default_cache_dir
+from .client import DaemonClient, DaemonError, connect, default_socket_path
+from .config import ConfigError, load_config
+from .enforce_notebook_run_order import find_notebooks, until_invalid
+from .exporters import ChromeTraceExporter, OpenMetricsExporter
+from .git import (
+    GitError,
+    changed_notebooks,
+    iter_changed_notebooks,
+    iter_revisions,
+    notebook_revisions,
+)
+from .merge import merge_results
+from .parallel import iter_notebooks_parallel, resolve_jobs
+from .pipeline import DEFAULT_MAX_BYTES
+from .reporters import REPORTERS, make_reporter, use_reporter
+from .results import CheckResult
+from .shard import Shard
+from .snapshot import DirectorySnapshot, snapshot_path
+from .walk import NotebookWalker
+from .watch import watch as watch_paths
 
+# Accepted instead of a size to turn a size limit off.
+NO_LIMIT = "none"
 
-@click.command()
+
+def _validate_jobs(_ctx, _param, value: str) -> int:
+    try:
+        return resolve_jobs(value)
+    except ValueError as error:
+        raise click.BadParameter("must be a positive integer or 'auto'") from error
+
+
+def _validate_json_backend(_ctx, _param, value: str) -> str:
+    try:
+        return json_backends.resolve_backend(value)
+    except ValueError as error:
+        raise click.BadParameter(str(error)) from error
+
+
+def _validate_size(_ctx, _param, value: Optional[str]) -> Optional[int]:
+    if value is None or value.lower() == NO_LIMIT:
+        return None
+    try:
+        return limits.parse_size(value)
+    except ValueError as error:
+        raise click.BadParameter("must be a size such as 500M or 2G") from error
+
+
+def _validate_shard(_ctx, _param, value: Optional[str]) -> Optional[Shard]:
+    if value is None:
+        return None
+    try:
+        return Shard.parse(value)
+    except ValueError as error:
+        raise click.BadParameter(str(error)) from error
+
+
+def _make_walker(
+    exclude: Tuple[str, ...],
+    respect_gitignore: Optional[bool],
+    default_excludes: Optional[bool],
+    shard: Optional[Shard] = None,
+) -> NotebookWalker:
+    """Builds the walker from command-line options, falling back to pyproject.toml."""
+    try:
+        settings = load_config()
+    except ConfigError as error:
+        raise click.ClickException(str(error)) from error
+    configured_excludes = settings.get("exclude", [])
+    if not isinstance(configured_excludes, list) or not all(
+        isinstance(pattern, str) for pattern in configured_excludes
+    ):
+        raise click.ClickException(
+            "'exclude' in [tool.enforce-notebook-run-order] must be a list of strings."
+        )
+    if respect_gitignore is None:
+        respect_gitignore = bool(settings.get("respect-gitignore", False))
+    if default_excludes is None:
+        default_excludes = bool(settings.get("default-excludes", True))
+    return NotebookWalker(
+        exclude=[*configured_excludes, *exclude],
+        use_default_excludes=default_excludes,
+        respect_gitignore=respect_gitignore,
+        shard=shard,
+        on_excluded=_warn_excluded,
+    )
+
+
+def _warn_excluded(path: str) -> None:
+    click.echo(f"Warning: {path} is excluded and was not checked.", err=True)
+
+
+def _is_archive_file(path: str) -> bool:
+    """Returns True if the path is an archive or compressed notebook file."""
+    return is_archive(path) and not os.path.isdir(path)
+
+
+def _read_paths(stream: BinaryIO, separator: bytes) -> Iterator[str]:
+    """Lazily yields the paths in a list read from a file or stdin, as in ``--files-from``."""
+    pending = b""
+    for chunk in iter(lambda: stream.read(1 << 16), b""):
+        *complete, pending = (pending + chunk).split(separator)
+        yield from _listed_paths(complete, separator)
+    yield from _listed_paths([pending], separator)
+
+
+def _listed_paths(entries: List[bytes], separator: bytes) -> Iterator[str]:
+    for entry in entries:
+        if separator == b"\n" and entry.endswith(b"\r"):
+            # Written on Windows.
+            entry = entry[:-1]
+        if not entry:
+            continue
+        # Paths that don't exist are still yielded, to be reported as unreadable.
+        yield os.fsdecode(entry)
+
+
+def _check_changed(
+    paths: Tuple[str, ...],
+    staged: bool,
+    since: Optional[str],
+    walker: NotebookWalker,
+) -> Iterator[CheckResult]:
+    """Checks the notebooks changed in git, as in ``--staged`` and ``--since``.
+
+    Raises:
+        GitError: If git fails.
+    """
+    if staged and since is not None:
+        raise click.UsageError("--staged and --since cannot be used together.")
+    notebooks = []
+    for notebook in changed_notebooks(paths, staged=staged, since=since):
+        # Changed notebooks are named by git, as pre-commit would name them.
+        if walker.is_excluded_explicitly(notebook.path):
+            walker.on_excluded(notebook.path)
+        elif walker.in_shard(notebook.path):
+            notebooks.append(notebook)
+    return iter_changed_notebooks(notebooks)
+
+
+def _notebooks_at(path: str, walker: NotebookWalker) -> Iterable[str]:
+    """Finds the notebooks at a path, or a missing one, to be reported as unreadable."""
+    if not os.path.exists(path):
+        # Only possible for paths from --files-from.
+        return [path]
+    return stats.timed_iter("walk", find_notebooks(path, walker))
+
+
+def _check_paths_together(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    paths: Iterable[str],
+    walker: NotebookWalker,
+    cache: Optional[ResultCache],
+    jobs: int,
+    fail_fast: bool,
+    client: Optional[DaemonClient],
+) -> Iterator[CheckResult]:
+    """Walks all the paths, then checks the notebooks in parallel or through the daemon."""
+    # Archives are always read in-process, after the other paths.
+    archive_paths = []
+    notebook_paths = []
+    for path in paths:
+        if _is_archive_file(path) and os.path.exists(path):
+            archive_paths.append(path)
+        else:
+            notebook_paths.extend(_notebooks_at(path, walker))
+    if client is not None:
+        results = client.iter_results(notebook_paths, fail_fast)
+    else:
+        results = iter_notebooks_parallel(notebook_paths, jobs, fail_fast, cache)
+    stopped = False
+    for result in results:
+        stopped = stopped or (fail_fast and not result.valid)
+        yield result
+    if archive_paths and not stopped:
+        yield from _check_paths(archive_paths, walker, cache, 1, fail_fast)
+
+
+def _check_paths(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    paths: Iterable[str],
+    walker: NotebookWalker,
+    cache: Optional[ResultCache],
+    jobs: int,
+    fail_fast: bool,
+    client: Optional[DaemonClient] = None,
+    prefetch: int = 0,
+    prefetch_bytes: int = DEFAULT_MAX_BYTES,
+) -> Iterator[CheckResult]:
+    """Checks the notebooks at the given paths, one by one, in parallel or
+    through the daemon."""
+    if client is not None or jobs > 1:
+        return _check_paths_together(paths, walker, cache, jobs, fail_fast, client)
+    results = iter_check(
+        paths,
+        walker=walker,
+        cache=cache,
+        prefetch=prefetch,
+        prefetch_bytes=prefetch_bytes,
+    )
+    return until_invalid(results) if fail_fast else results
+
+
+def _serve(socket_path: str) -> None:
+    """Runs the daemon in the foreground."""
+    # Imported here to keep the server out of the startup of normal runs.
+    from .daemon import serve  # pylint: disable=import-outside-toplevel
+
+    click.echo(f"Serving notebook checks on {socket_path}", err=True)
+    try:
+        serve(socket_path)
+    except DaemonError as error:
+        raise click.ClickException(str(error)) from error
+
+
+def _watch(paths: Tuple[str, ...], walker: NotebookWalker) -> None:
+    """Reports changes in validity as notebooks are saved, until interrupted."""
+    click.echo("Watching for changes, press Ctrl+C to stop.", err=True)
+    try:
+        watch_paths(paths, walker)
+    except ValueError as error:
+        raise click.ClickException(str(error)) from error
+    except KeyboardInterrupt:
+        pass
+
+
+def _open_caches(
+    stack: ExitStack,
+    cache_dir: str,
+    walker: NotebookWalker,
+    client: Optional[DaemonClient],
+) -> Optional[ResultCache]:
+    """Gives the walker its directory snapshot and opens the verdict cache.
+
+    Returns:
+        Optional[ResultCache]: The verdict cache, or None when checks go to the
+        daemon, which keeps its own verdicts.
+    """
+    walker.snapshot = stack.enter_context(DirectorySnapshot(snapshot_path(cache_dir)))
+    if client is not None:
+        return None
+    return stack.enter_context(ResultCache(cache_dir))
+
+
+def _make_collector(
+    show_stats: bool, metrics_file: Optional[str], trace_file: Optional[str]
+) -> Optional[stats.StatsCollector]:
+    listeners: List[events.Listener] = []
+    if metrics_file is not None:
+        listeners.append(OpenMetricsExporter(metrics_file))
+    if trace_file is not None:
+        listeners.append(ChromeTraceExporter(trace_file))
+    if not show_stats and not listeners:
+        return None
+    return stats.StatsCollector(listeners=listeners)
+
+
+@contextmanager
+def _profiling(output_path: str) -> Iterator[None]:
+    """Profiles the block with cProfile and dumps the stats to a file."""
+    # Imported here to keep cProfile out of the startup of normal runs.
+    import cProfile  # pylint: disable=import-outside-toplevel
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(output_path)
+
+
+@click.command("merge")
+@click.argument(
+    "result_files",
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True, dir_okay=False),
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["auto", *REPORTERS]),
+    default="auto",
+    show_default=True,
+    help="Output format of the combined report, as for checks.",
+)
+@click.option(
+    "-q",
+    "--quiet",
+    is_flag=True,
+    help="Only report invalid notebooks.",
+)
+def merge(
+    result_files: Tuple[str, ...], output_format: str = "auto", quiet: bool = False
+):
+    """
+    Combines the results of several runs, such as the --shard runs of a CI job,
+    into one report. Each run must have been written with --format jsonl.
+
+    Exits with status 1 if any notebook is invalid.
+
+    Args:
+        result_files (Tuple[str, ...]): JSON Lines output of each run.
+        output_format (str): Output format, one of ``reporters.REPORTERS`` or
+            ``auto``.
+        quiet (bool): Only report invalid notebooks, and the summary if there
+            are any.
+    """
+    try:
+        results = merge_results(result_files)
+    except (OSError, ValueError) as error:
+        raise click.ClickException(str(error)) from error
+    with use_reporter(make_reporter(output_format, quiet=quiet)) as reporter:
+        summary = reporter.report(results)
+    if summary.invalid:
+        sys.exit(1)
+
+
+@click.command("audit")
+@click.argument("rev_range")
+@click.argument("paths", nargs=-1)
+@click.option(
+    "--fail-fast",
+    is_flag=True,
+    help="Stop after the first invalid notebook.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["auto", *REPORTERS]),
+    default="auto",
+    show_default=True,
+    help="Output format, as for checks.",
+)
+@click.option(
+    "-q",
+    "--quiet",
+    is_flag=True,
+    help="Only report invalid notebooks.",
+)
+def audit(
+    rev_range: str,
+    paths: Tuple[str, ...] = (),
+    fail_fast: bool = False,
+    output_format: str = "auto",
+    quiet: bool = False,
+):
+    """
+    Checks every notebook committed in REV_RANGE, such as v1.0..v2.0, as each
+    commit left it, without checking anything out. Notebooks are reported as
+    COMMIT:PATH, and content committed more than once is only checked once.
+
+    Exits with status 1 if any notebook is invalid.
+
+    Args:
+        rev_range (str): Commits to audit, in any form ``git rev-list`` accepts.
+        paths (Tuple[str, ...]): Only audit notebooks in these files or
+            directories, which need not exist any more.
+        fail_fast (bool): Stop after the first invalid notebook.
+        output_format (str): Output format, one of ``reporters.REPORTERS`` or
+            ``auto``.
+        quiet (bool): Only report invalid notebooks, and the summary if there
+            are any.
+    """
+    with use_reporter(make_reporter(output_format, quiet=quiet)) as reporter:
+        try:
+            results = iter_revisions(notebook_revisions(rev_range, paths))
+            summary = reporter.report(until_invalid(results) if fail_fast else results)
+        except GitError as error:
+            raise click.ClickException(str(error)) from error
+    if summary.invalid:
+        sys.exit(1)
+
+
+SUBCOMMANDS: Dict[str, click.Command] = {"merge": merge, "audit": audit}
+
+
+class _CommandWithSubcommands(click.Command):
+    """The main command, which hands its arguments to a subcommand named first.
+
+    A path that happens to be named like a subcommand can be checked as
+    ``./merge`` or ``./audit``.
+    """
+
+    def main(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        args=None,
+        prog_name=None,
+        complete_var=None,
+        standalone_mode=True,
+        windows_expand_args=True,
+        **extra,
+    ):
+        args = list(sys.argv[1:] if args is None else args)
+        main = super().main
+        if args and args[0] in SUBCOMMANDS:
+            name = args.pop(0)
+            if prog_name is None:
+                prog_name = os.path.basename(sys.argv[0])
+            prog_name = f"{prog_name} {name}"
+            main = SUBCOMMANDS[name].main
+        return main(
+            args, prog_name, complete_var, standalone_mode, windows_expand_args, **extra
+        )
+
+
+@click.command(cls=_CommandWithSubcommands)
 @click.argument("paths", nargs=-1, type=click.Path(exists=True), required=False)
-def cli(paths: Tuple[str, ...] = None):
+@click.option(
+    "-j",
+    "--jobs",
+    default="1",
+    callback=_validate_jobs,
+    help="Number of worker processes to check notebooks with, or 'auto' for one "
+    "per CPU core.",
+)
+@click.option(
+    "--files-from",
+    type=click.File("rb"),
+    metavar="FILE",
+    help="Also check the paths listed in FILE, one per line, or '-' to read them "
+    "from stdin. Paths are checked as they are read.",
+)
+@click.option(
+    "-0",
+    "--null",
+    is_flag=True,
+    help="Paths in --files-from are separated by NUL characters, as written by "
+    "'find -print0', instead of newlines.",
+)
+@click.option(
+    "--shard",
+    metavar="I/N",
+    callback=_validate_shard,
+    help="Only check the notebooks in part I of N, split by a hash of their "
+    "path in the repository, to spread a run across N CI nodes. Combine their "
+    "--format jsonl output with 'nbcheck merge'.",
+)
+@click.option(
+    "--fail-fast",
+    is_flag=True,
+    help="Stop checking after the first invalid notebook instead of reporting "
+    "them all.",
+)
+@click.option(
+    "--prefetch",
+    type=click.IntRange(min=0),
+    default=0,
+    metavar="N",
+    help="Read up to N notebooks ahead in background threads while checking, "
+    "for slow or network filesystems. Ignored with more than one job.",
+)
+@click.option(
+    "--prefetch-bytes",
+    type=click.IntRange(min=1),
+    default=DEFAULT_MAX_BYTES,
+    show_default=True,
+    metavar="BYTES",
+    help="Stop reading ahead while this many bytes of notebooks are being read "
+    "or waiting to be checked.",
+)
+@click.option(
+    "--json-backend",
+    type=click.Choice(
+        [json_backends.STREAM, json_backends.AUTO, *json_backends.BACKENDS]
+    ),
+    default=json_backends.DEFAULT,
+    show_default=True,
+    callback=_validate_json_backend,
+    help="How notebooks up to --max-file-size are read: 'stream' scans them in "
+    "bounded memory, the others decode them whole, which is faster. 'auto' uses "
+    "msgspec or orjson when installed, else the standard library.",
+)
+@click.option(
+    "--max-file-size",
+    metavar="SIZE",
+    callback=_validate_size,
+    help="Handle notebook files larger than SIZE, such as 500M or 2G, as "
+    "set by --oversized; 'none' for no limit, the default. Notebooks over "
+    "20M are streamed either way.",
+)
+@click.option(
+    "--oversized",
+    type=click.Choice(limits.OVERSIZED_ACTIONS),
+    default=limits.STREAM,
+    show_default=True,
+    help="What to do with notebooks over --max-file-size: check them in bounded "
+    "memory with the streaming reader, skip them, or report them as not checked.",
+)
+@click.option(
+    "--timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    metavar="SECONDS",
+    help="Report notebooks still being read after SECONDS as not checked. Only "
+    "interrupts streamed checks, so notebooks decoded whole have no deadline.",
+)
+@click.option(
+    "--max-worker-memory",
+    metavar="SIZE",
+    callback=_validate_size,
+    help="With --jobs, replace the worker processes once one of them has used "
+    "more than SIZE of memory.",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    default=default_cache_dir,
+    envvar="NBCHECK_CACHE_DIR",
+    help="Directory of the caches of verdicts for unchanged notebooks and of "
+    "listings of unchanged directories.",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Check every notebook and list every directory, ignoring and not "
+    "updating the caches.",
+)
+@click.option(
+    "--staged",
+    is_flag=True,
+    help="Check only staged notebooks, as they will be committed.",
+)
+@click.option(
+    "--since",
+    metavar="REF",
+    help="Check only notebooks changed between REF and HEAD, as committed at HEAD.",
+)
+@click.option(
+    "--exclude",
+    multiple=True,
+    metavar="GLOB",
+    help="Skip files and directories matching GLOB. May be repeated; added to "
+    "'exclude' in pyproject.toml.",
+)
+@click.option(
+    "--respect-gitignore/--no-respect-gitignore",
+    default=None,
+    help="Skip files and directories ignored by git.",
+)
+@click.option(
+    "--default-excludes/--no-default-excludes",
+    default=None,
+    help="Skip .git, .ipynb_checkpoints, virtualenvs, build output and similar "
+    "directories (default: on).",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["auto", *REPORTERS]),
+    default="auto",
+    show_default=True,
+    help="Output format: styled text, plain text, JSON Lines, JUnit XML or SARIF. "
+    "'auto' uses styled text on a terminal and plain text otherwise.",
+)
+@click.option(
+    "-q",
+    "--quiet",
+    is_flag=True,
+    help="Only report invalid notebooks.",
+)
+@click.option(
+    "--stats",
+    "show_stats",
+    is_flag=True,
+    help="Print time spent walking, reading, parsing, checking and reporting, "
+    "throughput, and the slowest and largest notebooks to stderr.",
+)
+@click.option(
+    "--profile",
+    "profile_path",
+    type=click.Path(dir_okay=False, writable=True),
+    metavar="FILE",
+    help="Profile the run with cProfile and write the stats to FILE, for use "
+    "with pstats or snakeviz.",
+)
+@click.option(
+    "--metrics-file",
+    type=click.Path(dir_okay=False, writable=True),
+    metavar="FILE",
+    help="Write throughput, notebook sizes, failures and time per phase to FILE "
+    "in the Prometheus text format when the run finishes, for node-exporter's "
+    "textfile collector.",
+)
+@click.option(
+    "--trace-file",
+    type=click.Path(dir_okay=False, writable=True),
+    metavar="FILE",
+    help="Write a trace of the run to FILE in the Chrome trace event format, "
+    "with a span per notebook and per phase, for chrome://tracing or Perfetto.",
+)
+@click.option(
+    "--daemon",
+    "run_daemon",
+    is_flag=True,
+    help="Run as a daemon that keeps verdicts in memory and answers other "
+    "nbcheck runs over a Unix socket, until interrupted.",
+)
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False),
+    default=default_socket_path,
+    envvar="NBCHECK_SOCKET",
+    help="Socket of the daemon to run, or to forward checks to.",
+)
+@click.option(
+    "--no-daemon",
+    is_flag=True,
+    help="Check notebooks in-process even if a daemon is running.",
+)
+@click.option(
+    "--watch",
+    is_flag=True,
+    help="Keep running, re-checking notebooks as they are saved and reporting "
+    "only those that become valid or invalid, until interrupted.",
+)
+def cli(
+    paths: Tuple[str, ...] = None,
+    files_from: Optional[BinaryIO] = None,
+    null: bool = False,
+    jobs: int = 1,
+    shard: Optional[Shard] = None,
+    fail_fast: bool = False,
+    prefetch: int = 0,
+    prefetch_bytes: int = DEFAULT_MAX_BYTES,
+    json_backend: str = json_backends.DEFAULT,
+    max_file_size: Optional[int] = None,
+    oversized: str = limits.STREAM,
+    timeout: Optional[float] = None,
+    max_worker_memory: Optional[int] = None,
+    cache_dir: str = None,
+    no_cache: bool = False,
+    staged: bool = False,
+    since: str = None,
+    exclude: Tuple[str, ...] = (),
+    respect_gitignore: Optional[bool] = None,
+    default_excludes: Optional[bool] = None,
+    output_format: str = "auto",
+    quiet: bool = False,
+    show_stats: bool = False,
+    profile_path: Optional[str] = None,
+    metrics_file: Optional[str] = None,
+    trace_file: Optional[str] = None,
+    run_daemon: bool = False,
+    socket_path: str = None,
+    no_daemon: bool = False,
+    watch: bool = False,
+):  # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals,too-many-branches
     """
     Checks the run order of notebooks in the specified paths,
     or recursively in the current directory if no paths are specified.
 
+    Zip and tar archives and compressed notebooks (``.ipynb.gz``, ``.ipynb.bz2``,
+    ``.ipynb.xz``) are checked without extracting them; their notebooks are
+    reported as ``archive.zip!/path/inside.ipynb``.
+
+    Every notebook is checked and reported, followed by a summary of the
+    invalid ones. Exits with status 1 if any notebook is invalid.
+
+    Run ``nbcheck merge --help`` for combining the results of ``--shard`` runs,
+    and ``nbcheck audit --help`` for checking every notebook committed in a range
+    of history.
+
     Args:
-        paths (Tuple[str, ...]): Zero or more paths to notebook files or directories.
-            Directories are traversed recursively. If omitted, ``.`` is used.
+        paths (Tuple[str, ...]): Zero or more paths to notebook files, archives or
+            directories. Directories are traversed recursively. If omitted, ``.``
+            is used.
+        files_from (Optional[BinaryIO]): List of further paths to check, read and
+            checked one at a time, so any number of paths can be passed. With
+            more than one job, or through a daemon, the whole list is read
+            and walked before checking starts. Listed paths that don't exist
+            are reported as unreadable notebooks. When given, ``.`` is not
+            checked by default.
+        null (bool): Paths in ``files_from`` are separated by NUL characters
+            rather than newlines.
+        jobs (int): Number of worker processes. With more than one, notebooks
+            from all paths are checked in parallel and reported in walk order.
+        shard (Optional[shard.Shard]): Only check the notebooks in this shard.
+            Every notebook belongs to exactly one of the shards, so runs of all
+            of them check each notebook once.
+        fail_fast (bool): Stop after the first invalid notebook, cancelling
+            outstanding work when running in parallel.
+        prefetch (int): Number of notebooks to read ahead in background threads
+            while checking. Only applies to checks running in this process.
+        prefetch_bytes (int): Bytes of read-ahead notebooks being read or
+            waiting to be checked above which no further reads are started.
+        json_backend (str): ``stream`` to scan notebooks incrementally, or a
+            backend to decode them whole with; see ``json_backends``. Does not
+            apply to checks forwarded to a daemon.
+        max_file_size (Optional[int]): Size in bytes above which notebook files
+            are handled according to ``oversized``; None for no limit.
+        oversized (str): One of ``limits.OVERSIZED_ACTIONS``.
+        timeout (Optional[float]): Seconds a streamed notebook may take to read.
+        max_worker_memory (Optional[int]): Peak memory use in bytes above which
+            worker processes are replaced. See ``limits`` for all four limits,
+            which don't apply to checks forwarded to a daemon.
+        cache_dir (str): Directory of the verdict cache and directory snapshots.
+        no_cache (bool): Disable the verdict cache and directory snapshots.
+        staged (bool): Check the staged blobs of staged notebooks only. Paths,
+            if given, restrict which notebooks are considered.
+        since (str): Check notebooks changed since this git ref, as they are
+            at ``HEAD``. Paths, if given, restrict which notebooks are considered.
+        exclude (Tuple[str, ...]): Glob patterns of files and directories to skip,
+            in addition to ``exclude`` in ``pyproject.toml``.
+        respect_gitignore (Optional[bool]): Skip files ignored by git. Defaults to
+            ``respect-gitignore`` in ``pyproject.toml``, or False.
+        default_excludes (Optional[bool]): Skip ``walk.DEFAULT_EXCLUDES``. Defaults
+            to ``default-excludes`` in ``pyproject.toml``, or True.
+        output_format (str): Output format, one of ``reporters.REPORTERS`` or
+            ``auto``.
+        quiet (bool): Only report invalid notebooks, and the summary if there
+            are any.
+        show_stats (bool): Print a breakdown of where the time went to stderr.
+            With more than one job, the time spent in workers is summed.
+        profile_path (Optional[str]): Write a cProfile dump of the run here.
+            Only the main process is profiled.
+        metrics_file (Optional[str]): Write the run's metrics here; see
+            ``exporters.OpenMetricsExporter``.
+        trace_file (Optional[str]): Write a trace of the run here; see
+            ``exporters.ChromeTraceExporter``. With more than one job, only the
+            time spent in this process is traced per notebook.
+        run_daemon (bool): Serve checks on ``socket_path`` instead of checking
+            ``paths``. Other runs forward their notebooks to the daemon, except
+            with ``--staged`` and ``--since``.
+        socket_path (str): Path to the daemon's Unix socket.
+        no_daemon (bool): Never forward checks to a daemon.
+        watch (bool): Report invalid notebooks, then poll ``paths`` and report
+            notebooks as they become valid or invalid, until interrupted.
     """
-    try:
-        if paths:
-            for path in paths:
-                process_path(path)
-        else:
-            # If no paths are provided, check the current directory
-            process_path(".")
-    except InvalidNotebookRunError:
-        # Error message already printed by check_single_notebook
+    if run_daemon:
+        _serve(socket_path)
+        return
+    walker = _make_walker(exclude, respect_gitignore, default_excludes, shard)
+    # If no paths are provided, check the current directory
+    default_paths = (".",)
+    if files_from is not None:
+        # Listed paths are read and checked one at a time, after the arguments.
+        paths = itertools.chain(
+            paths, _read_paths(files_from, b"\0" if null else b"\n")
+        )
+        default_paths = ()
+    resource_limits = limits.Limits(
+        max_file_size, oversized, timeout, max_worker_memory
+    )
+    if watch:
+        if staged or since is not None:
+            raise click.UsageError("--watch cannot be used with --staged or --since.")
+        with use_reporter(
+            make_reporter(output_format, quiet=quiet)
+        ), json_backends.using(json_backend), limits.using(resource_limits):
+            _watch(tuple(paths) or default_paths, walker)
+        return
+    collector = _make_collector(show_stats, metrics_file, trace_file)
+    with ExitStack() as stack:
+        if collector is not None:
+            stack.enter_context(stats.collecting(collector))
+        if profile_path is not None:
+            stack.enter_context(_profiling(profile_path))
+        reporter = stack.enter_context(
+            use_reporter(make_reporter(output_format, quiet=quiet))
+        )
+        stack.enter_context(json_backends.using(json_backend))
+        stack.enter_context(limits.using(resource_limits))
+        try:
+            if staged or since is not None:
+                results = _check_changed(tuple(paths), staged, since, walker)
+                if fail_fast:
+                    results = until_invalid(results)
+            else:
+                client = None if no_daemon else connect(socket_path)
+                if client is not None:
+                    stack.enter_context(client)
+                cache = None
+                if not no_cache:
+                    cache = _open_caches(stack, cache_dir, walker, client)
+                results = _check_paths(
+                    paths or default_paths,
+                    walker,
+                    cache,
+                    jobs,
+                    fail_fast,
+                    client,
+                    prefetch,
+                    prefetch_bytes,
+                )
+            summary = reporter.report(results)
+        except GitError as error:
+            raise click.ClickException(str(error)) from error
+    if show_stats:
+        click.echo(collector.report(summary.checked), err=True)
+    if summary.invalid:
         sys.exit(1)
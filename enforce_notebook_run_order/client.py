@@ -0,0 +1,199 @@
+"""Client for the checker daemon, see ``daemon``.
+
+The CLI walks the paths it was given as usual, then asks a running daemon for
+the verdicts instead of checking the notebooks itself. When no daemon is
+running, or it fails part way through, the remaining notebooks are checked
+in-process, with the same results and errors as without a daemon.
+
+The protocol is one JSON request line from the client, answered by one JSON
+line per notebook, in request order, and a final ``{"done": true}``.
+
+The client only talks to a socket owned by the current user that nobody else
+can write to, so another user can't stand in for the daemon and hand out
+verdicts.
+"""
+
+import json
+import os
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from .enforce_notebook_run_order import (
+    iter_notebook_results,
+    report_notebook,
+    until_invalid,
+    verdict_result,
+)
+from .results import CheckResult, NotebookResult
+
+# Bump whenever requests, responses or the meaning of a verdict change, so a
+# daemon left running across an upgrade is bypassed rather than trusted.
+PROTOCOL_VERSION = 1
+
+# How long the client waits on a daemon that accepted the connection.
+CLIENT_TIMEOUT = 30.0
+
+
+class DaemonError(Exception):
+    """Raised when the daemon fails or sends an unexpected response"""
+
+
+def default_socket_path() -> str:
+    """Returns the per-user socket path, in ``$XDG_RUNTIME_DIR`` if it is set.
+
+    Otherwise the socket goes in a per-user directory under the temporary
+    directory, which the daemon creates readable by the current user only.
+
+    Returns:
+        str: Path to the daemon's Unix socket.
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "enforce-notebook-run-order.sock")
+    temporary_dir = os.environ.get("TMPDIR") or "/tmp"
+    user = os.getuid() if hasattr(os, "getuid") else os.environ.get("USERNAME", "")
+    return os.path.join(
+        temporary_dir, f"enforce-notebook-run-order-{user}", "daemon.sock"
+    )
+
+
+def is_private(path: str) -> bool:
+    """Tells whether a file is owned by the current user and only they can write it.
+
+    Args:
+        path (str): Path to the file.
+
+    Returns:
+        bool: True if nobody else owns or can write to the file.
+    """
+    try:
+        status = os.stat(path)
+    except OSError:
+        return False
+    if not hasattr(os, "getuid"):
+        return True
+    return status.st_uid == os.getuid() and not status.st_mode & 0o022
+
+
+class DaemonClient:
+    """Connection to a running daemon; get one from ``connect``."""
+
+    def __init__(self, sock):
+        self._socket = sock
+
+    def __enter__(self) -> "DaemonClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes the connection."""
+        self._socket.close()
+
+    def verdicts(
+        self, notebook_paths: Sequence[str], fail_fast: bool = False
+    ) -> Iterator[Tuple[int, Optional[str]]]:
+        """Asks the daemon for the verdicts of notebooks.
+
+        Args:
+            notebook_paths (Sequence[str]): Paths to the notebook files.
+            fail_fast (bool): Stop after the first invalid notebook.
+
+        Yields:
+            Tuple[int, Optional[str]]: Index into ``notebook_paths`` and verdict
+            of each notebook, in order, as the daemon answers.
+
+        Raises:
+            DaemonError: If the daemon fails or answers unexpectedly.
+        """
+        absolute_paths = [os.path.abspath(path) for path in notebook_paths]
+        request = {
+            "version": PROTOCOL_VERSION,
+            "paths": absolute_paths,
+            "fail_fast": fail_fast,
+        }
+        try:
+            self._socket.sendall(json.dumps(request).encode() + b"\n")
+            with self._socket.makefile("rb") as responses:
+                for index, line in enumerate(responses):
+                    response = json.loads(line)
+                    if response.get("done"):
+                        return
+                    if "failure" in response:
+                        raise DaemonError(response["failure"])
+                    if response.get("path") != absolute_paths[index]:
+                        raise DaemonError("The daemon answered out of order.")
+                    yield index, response["error"]
+        except (OSError, ValueError, IndexError) as error:
+            raise DaemonError(f"Lost the daemon: {error}") from error
+        raise DaemonError("The daemon closed the connection early.")
+
+    def check_notebooks(
+        self, notebook_paths: Sequence[str], fail_fast: bool = False
+    ) -> List[NotebookResult]:
+        """Checks and reports notebooks through the daemon.
+
+        Args:
+            notebook_paths (Sequence[str]): Paths to the notebook files.
+            fail_fast (bool): Stop after the first invalid notebook.
+
+        Returns:
+            List[NotebookResult]: The verdict for every checked notebook, in order.
+        """
+        results = []
+        for result in self.iter_results(notebook_paths, fail_fast):
+            results.append(NotebookResult(result.path, result.error))
+            report_notebook(*results[-1])
+        return results
+
+    def iter_results(
+        self, notebook_paths: Sequence[str], fail_fast: bool = False
+    ) -> Iterator[CheckResult]:
+        """Checks notebooks through the daemon, yielding each verdict in order.
+
+        Notebooks the daemon didn't answer for, because it failed or couldn't
+        read them, are checked in-process instead.
+
+        Args:
+            notebook_paths (Sequence[str]): Paths to the notebook files.
+            fail_fast (bool): Stop after the first invalid notebook.
+
+        Yields:
+            CheckResult: The verdict for every checked notebook. The offending
+            cell is left out, as the daemon only sends the error.
+        """
+        answered = 0
+        try:
+            for index, error in self.verdicts(notebook_paths, fail_fast):
+                answered += 1
+                yield verdict_result(notebook_paths[index], error)
+        except DaemonError:
+            results = iter_notebook_results(notebook_paths[answered:])
+            yield from until_invalid(results) if fail_fast else results
+
+
+def connect(socket_path: str) -> Optional[DaemonClient]:
+    """Connects to a running daemon.
+
+    Args:
+        socket_path (str): Path to the daemon's socket.
+
+    Returns:
+        Optional[DaemonClient]: The connection, or None if no daemon is
+        listening, or the socket belongs to another user or others can write to it.
+    """
+    if not is_private(socket_path):
+        return None
+    # Imported here since most runs find no socket and never connect.
+    import socket  # pylint: disable=import-outside-toplevel
+
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CLIENT_TIMEOUT)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return None
+    return DaemonClient(sock)
@@ -0,0 +1,97 @@
+"""Reads settings from the ``[tool.enforce-notebook-run-order]`` table of ``pyproject.toml``.
+
+On Python versions before 3.11, reading settings requires ``tomli`` to be installed.
+Without it, a ``pyproject.toml`` with settings for this tool is an error rather
+than silently ignored, so the tool never behaves differently per interpreter.
+"""
+
+import os
+import re
+from typing import Any, Dict, Optional
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+CONFIG_SECTION = "enforce-notebook-run-order"
+
+# Finds the settings table, or one nested in it, without parsing the TOML.
+_SECTION_HEADER = re.compile(
+    r'^\s*\[\s*tool\s*\.\s*(["\']?)' + re.escape(CONFIG_SECTION) + r"\1\s*[\].]",
+    re.MULTILINE,
+)
+
+
+class ConfigError(Exception):
+    """Raised when ``pyproject.toml`` can't be parsed or has invalid settings"""
+
+
+def find_pyproject(start_dir: str = ".") -> Optional[str]:
+    """Finds the nearest ``pyproject.toml`` in ``start_dir`` or its parents.
+
+    Args:
+        start_dir (str): Directory to start searching from.
+
+    Returns:
+        Optional[str]: Path to ``pyproject.toml``, or None if there is none.
+    """
+    directory = os.path.abspath(start_dir)
+    while True:
+        candidate = os.path.join(directory, "pyproject.toml")
+        if os.path.isfile(candidate):
+            return candidate
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def load_config(start_dir: str = ".") -> Dict[str, Any]:
+    """Loads this tool's settings from the nearest ``pyproject.toml``.
+
+    Args:
+        start_dir (str): Directory to start searching for ``pyproject.toml`` from.
+
+    Returns:
+        Dict[str, Any]: The settings table, empty if there is no ``pyproject.toml``
+        or it has no settings for this tool.
+
+    Raises:
+        ConfigError: If ``pyproject.toml`` is not valid TOML, or has settings
+            for this tool but no TOML parser is installed.
+    """
+    pyproject_path = find_pyproject(start_dir)
+    if pyproject_path is None:
+        return {}
+    if tomllib is None:
+        _require_no_settings(pyproject_path)
+        return {}
+    try:
+        with open(pyproject_path, "rb") as pyproject_file:
+            pyproject = tomllib.load(pyproject_file)
+    except tomllib.TOMLDecodeError as error:
+        raise ConfigError(f"Could not parse {pyproject_path}: {error}") from error
+    settings = pyproject.get("tool", {}).get(CONFIG_SECTION, {})
+    if not isinstance(settings, dict):
+        raise ConfigError(
+            f"[tool.{CONFIG_SECTION}] in {pyproject_path} must be a table."
+        )
+    return settings
+
+
+def _require_no_settings(pyproject_path: str) -> None:
+    """Fails if ``pyproject.toml`` has settings that can't be read without tomli."""
+    try:
+        with open(pyproject_path, encoding="utf-8") as pyproject_file:
+            text = pyproject_file.read()
+    except (OSError, ValueError):
+        return
+    if _SECTION_HEADER.search(text):
+        raise ConfigError(
+            f"{pyproject_path} has [tool.{CONFIG_SECTION}] settings, but reading "
+            "them needs Python 3.11 or tomli: pip install tomli"
+        )
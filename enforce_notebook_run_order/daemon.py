@@ -0,0 +1,184 @@
+"""A long-running checker that answers the CLI over a local Unix socket.
+
+``nbcheck --daemon`` keeps the verdicts of the notebooks it has checked in
+memory, up to ``CACHE_SIZE`` of them, keyed on the notebook's size and
+modification time, so asking again about an unchanged notebook costs a ``stat``
+rather than a read. Any ``nbcheck``
+run, whether from a terminal, pre-commit or an editor, forwards its notebooks
+to the daemon when one is listening; see ``client``.
+
+The socket is created readable and writable by the current user only, and a
+missing directory for it is created accessible by the current user only.
+"""
+
+import json
+import os
+import signal
+import socketserver
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from .client import PROTOCOL_VERSION, DaemonError, connect
+from .enforce_notebook_run_order import (
+    READ_ERRORS,
+    VERDICT_ERRORS,
+    check_notebook_file,
+    is_cacheable,
+)
+
+# Notebooks whose verdicts are kept; those asked about least recently go first.
+CACHE_SIZE = 65536
+
+
+class VerdictStore:
+    """In-memory verdicts, invalidated when a notebook's size or mtime changes.
+
+    Args:
+        cache_size (int): Number of notebooks whose verdicts are kept.
+    """
+
+    def __init__(self, cache_size: int = CACHE_SIZE):
+        self.cache_size = cache_size
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int], Optional[str]]]" = (
+            OrderedDict()
+        )
+        # Requests are served from several threads at once.
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def check(self, notebook_path: str) -> Optional[str]:
+        """Returns a notebook's verdict, checking it only if it changed.
+
+        Args:
+            notebook_path (str): Absolute path to the notebook file.
+
+        Returns:
+            Optional[str]: Description of the run order problem, or None if the
+            notebook is valid. A notebook that breaks one of the ``limits`` is
+            not checked, and the verdict says so.
+
+        Raises:
+            OSError: If the notebook can't be read.
+            ValueError: If the notebook is not valid JSON.
+            KeyError: If the notebook has no cells.
+            TypeError: If the JSON doesn't have the shape of a notebook.
+        """
+        stat = os.stat(notebook_path)
+        key = (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            entry = self._entries.get(notebook_path)
+            if entry is not None and entry[0] == key:
+                self._entries.move_to_end(notebook_path)
+                return entry[1]
+        try:
+            check_notebook_file(notebook_path)
+        except VERDICT_ERRORS as error:
+            verdict = str(error)
+        else:
+            verdict = None
+        if is_cacheable(verdict):
+            with self._lock:
+                self._entries[notebook_path] = (key, verdict)
+                self._entries.move_to_end(notebook_path)
+                if len(self._entries) > self.cache_size:
+                    self._entries.popitem(last=False)
+        return verdict
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Answers one request: a verdict line per notebook, then ``done``."""
+
+    def _send(self, message: Dict) -> None:
+        self.wfile.write(json.dumps(message).encode() + b"\n")
+
+    def handle(self) -> None:
+        try:
+            request = json.loads(self.rfile.readline())
+        except ValueError:
+            return
+        if request.get("version") != PROTOCOL_VERSION:
+            self._send({"failure": f"The daemon speaks protocol {PROTOCOL_VERSION}."})
+            return
+        for path in request["paths"]:
+            try:
+                verdict = self.server.verdicts.check(path)
+            except READ_ERRORS as error:
+                # The client rechecks in-process, so it fails the same way it
+                # would without a daemon.
+                self._send({"failure": f"{path}: {error!r}"})
+                return
+            self._send({"path": path, "error": verdict})
+            if verdict is not None and request.get("fail_fast"):
+                break
+        self._send({"done": True})
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serves verdicts from a shared ``VerdictStore`` on a Unix socket.
+
+    Args:
+        socket_path (str): Path to create the socket at. A stale socket left
+            behind by a daemon that died is replaced.
+
+    Raises:
+        DaemonError: If another daemon is already listening on the socket, or
+            the directory for it belongs to another user.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str):
+        _make_socket_directory(os.path.dirname(os.path.abspath(socket_path)))
+        if os.path.exists(socket_path):
+            client = connect(socket_path)
+            if client is not None:
+                client.close()
+                raise DaemonError(f"A daemon is already running on {socket_path}.")
+            os.unlink(socket_path)
+        self.verdicts = VerdictStore()
+        previous_umask = os.umask(0o177)
+        try:
+            super().__init__(socket_path, _RequestHandler)
+        finally:
+            os.umask(previous_umask)
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+
+def _make_socket_directory(directory: str) -> None:
+    if not os.path.isdir(directory):
+        os.makedirs(directory, mode=0o700)
+        return
+    if hasattr(os, "getuid") and os.stat(directory).st_uid not in (0, os.getuid()):
+        raise DaemonError(f"{directory} belongs to another user.")
+
+
+def serve(socket_path: str) -> None:
+    """Runs the daemon until it is interrupted or receives SIGTERM.
+
+    Args:
+        socket_path (str): Path to create the socket at.
+
+    Raises:
+        DaemonError: If another daemon is already listening on the socket.
+    """
+    with DaemonServer(socket_path) as server:
+        if threading.current_thread() is threading.main_thread():
+            # shutdown() blocks until serve_forever() returns, so it can't be
+            # called from the handler, which runs on the serving thread.
+            signal.signal(
+                signal.SIGTERM,
+                lambda *_: threading.Thread(target=server.shutdown).start(),
+            )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -10,12 +10,32 @@ raises an error if:
 It does not execute notebooks or inspect outputs.
 """
 
+import io
 import os
-from typing import Dict
-from rich.console import Console
-from . import utils
-
-console = Console()
+import time
+from contextlib import closing, contextmanager
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from . import (
+    archives,
+    json_backends,
+    limits,
+    pipeline,
+    reporters,
+    stats,
+    streaming,
+    utils,
+)
+from .execution_profile import ExecutionProfile, Violation
+from .results import (
+    NOT_RUN,
+    OUT_OF_ORDER,
+    UNREADABLE,
+    CheckResult,
+    NotebookResult,
+    is_read_error,
+    read_error,
+)
+from .walk import NotebookWalker
 
 
 class NotebookCodeCellNotRunError(Exception):
@@ -26,11 +46,47 @@ class NotebookRunOrderError(Exception):
     """Raised when a notebook is run out of order"""
 
 
+# Start of the error of a notebook with a code cell that was not run.
+NOT_RUN_MESSAGE = "Code cell was not run."
+
+# Errors that make a notebook invalid, as opposed to failing the run.
+VERDICT_ERRORS = (
+    NotebookCodeCellNotRunError,
+    NotebookRunOrderError,
+    limits.ResourceLimitError,
+)
+
+# Errors that mean a file could not be read as a notebook: missing or unreadable
+# files, invalid JSON or encodings, nesting too deep to decode, and JSON that
+# doesn't have the shape of a notebook. They are reported as the notebook's
+# verdict rather than ending the run.
+READ_ERRORS = (
+    OSError,
+    EOFError,
+    ValueError,
+    KeyError,
+    TypeError,
+    AttributeError,
+    RecursionError,
+)
+
+
 class InvalidNotebookRunError(Exception):
-    """Raised when any problems were identified with a notebook's run order"""
+    """Raised when any problems were identified with a notebook's run order
 
+    Attributes:
+        results (List[NotebookResult]): Results of every notebook checked before
+            the error was raised, invalid ones included.
+    """
 
-def check_notebook_run_order(notebook_data: Dict) -> None:
+    def __init__(self, *args, results: Optional[List[NotebookResult]] = None):
+        super().__init__(*args)
+        self.results = results if results is not None else []
+
+
+def check_notebook_run_order(
+    notebook_data: Union[Dict, ExecutionProfile, Iterable[utils.CodeCell]],
+) -> None:
     """Checks that the notebook cells were run sequentially and fails if not.
 
     Enforces that all non-empty code cells must have been executed (execution_count
@@ -38,86 +94,626 @@ def check_notebook_run_order(notebook_data: Dict) -> None:
     execution_count=1), and execution must be strictly sequential without gaps
     (1, 2, 3, ... with no skipped numbers).
 
+    The check stops at the first problem, so when ``notebook_data`` is a lazy
+    stream of cells (see ``streaming.iter_code_cells``) nothing after the
+    offending cell is read. Parsed notebooks are reduced to an
+    ``ExecutionProfile`` and checked in one pass; see ``ExecutionProfile.violations``
+    for every problem rather than the first.
+
     Args:
-        notebook_data (Dict): Notebook data in dictionary format.
+        notebook_data (Union[Dict, ExecutionProfile, Iterable[utils.CodeCell]]):
+            Notebook data in dictionary format, its execution profile, or an
+            iterable of its code cells.
 
     Raises:
         NotebookCodeCellNotRunError: If a code cell in the notebook was not run.
         NotebookRunOrderError: If the cells in the notebook were not run sequentially,
             including if they don't start from 1 or have gaps in the sequence.
     """
+    violation = find_violation(notebook_data)
+    if violation is not None:
+        raise violation_error(violation)
 
-    help_msg = (
-        "To fix this, restart the notebook kernel and run all cells sequentially."
-    )
+
+@stats.timed("check")
+def find_violation(
+    notebook_data: Union[Dict, ExecutionProfile, Iterable[utils.CodeCell]],
+) -> Optional[Violation]:
+    """Finds the first non-empty code cell that breaks the run order.
+
+    Like ``check_notebook_run_order``, but returns the offending cell instead
+    of raising.
+
+    Args:
+        notebook_data (Union[Dict, ExecutionProfile, Iterable[utils.CodeCell]]):
+            Notebook data in dictionary format, its execution profile, or an
+            iterable of its code cells.
+
+    Returns:
+        Optional[Violation]: The first offending cell, or None if the notebook
+        was run in order.
+    """
+    if isinstance(notebook_data, dict):
+        notebook_data = ExecutionProfile.from_notebook(notebook_data)
+    if isinstance(notebook_data, ExecutionProfile):
+        violations = notebook_data.violations()
+        return violations[0] if violations else None
 
     previous_cell_number = 0
-    code_cells = utils.get_code_cells(notebook_data)
-    for cell in code_cells:
-        current_cell_number = cell["execution_count"]
-        current_cell_source = cell["source"]
+    for index, (current_cell_number, has_source) in enumerate(notebook_data):
         # ignore empty cells
-        if len(current_cell_source) > 0:
-            if current_cell_number is None:
-                raise NotebookCodeCellNotRunError(
-                    f"Code cell was not run. The previous cell was #{previous_cell_number}.\n\n"
-                    + help_msg
-                )
-            if current_cell_number != previous_cell_number + 1:
-                raise NotebookRunOrderError(
-                    "Cells were not run sequentially. "
-                    f"The cell that caused this error is #{current_cell_number} "
-                    f"and the previous cell was #{previous_cell_number}.\n\n" + help_msg
-                )
+        if has_source and (
+            current_cell_number is None
+            or previous_cell_number is None
+            or current_cell_number != previous_cell_number + 1
+        ):
+            return Violation(index, current_cell_number, previous_cell_number)
         previous_cell_number = current_cell_number
+    return None
+
+
+def violation_error(
+    violation: Violation,
+) -> Union[NotebookCodeCellNotRunError, NotebookRunOrderError]:
+    """Builds the error describing a code cell that breaks the run order.
+
+    Args:
+        violation (Violation): The offending cell.
+
+    Returns:
+        Union[NotebookCodeCellNotRunError, NotebookRunOrderError]: The error
+        ``check_notebook_run_order`` raises for the cell.
+    """
+    help_msg = (
+        "To fix this, restart the notebook kernel and run all cells sequentially."
+    )
+    if violation.not_run:
+        return NotebookCodeCellNotRunError(
+            f"{NOT_RUN_MESSAGE} "
+            f"The previous cell was #{violation.previous_count}.\n\n" + help_msg
+        )
+    return NotebookRunOrderError(
+        "Cells were not run sequentially. "
+        f"The cell that caused this error is #{violation.execution_count} "
+        f"and the previous cell was #{violation.previous_count}.\n\n" + help_msg
+    )
+
+
+def violation_result(notebook_path: str, violation: Optional[Violation]) -> CheckResult:
+    """Builds the verdict for a notebook from its first offending cell.
+
+    Args:
+        notebook_path (str): Path to report the notebook under.
+        violation (Optional[Violation]): The offending cell, or None if the
+            notebook was run in order.
+
+    Returns:
+        CheckResult: The verdict.
+    """
+    if violation is None:
+        return CheckResult(notebook_path)
+    return CheckResult(
+        notebook_path,
+        NOT_RUN if violation.not_run else OUT_OF_ORDER,
+        violation.index,
+        violation.execution_count,
+        violation.previous_count,
+        str(violation_error(violation)),
+    )
+
+
+def verdict_result(notebook_path: str, error: Optional[str]) -> CheckResult:
+    """Builds the verdict for a notebook from its error alone.
+
+    For verdicts that only kept the error, such as cached ones or those of
+    worker processes, so the offending cell is left out.
+
+    Args:
+        notebook_path (str): Path to report the notebook under.
+        error (Optional[str]): The error of the verdict, or None if the
+            notebook is valid.
+
+    Returns:
+        CheckResult: The verdict.
+    """
+    if error is None:
+        return CheckResult(notebook_path)
+    if is_read_error(error) or limits.is_limit_error(error):
+        status = UNREADABLE
+    elif error.startswith(NOT_RUN_MESSAGE):
+        status = NOT_RUN
+    else:
+        status = OUT_OF_ORDER
+    return CheckResult(notebook_path, status, error=error)
+
+
+def check_notebook(notebook_path: str, data: Optional[bytes] = None) -> CheckResult:
+    """Checks a single notebook file without reporting it.
+
+    Args:
+        notebook_path (str): Path to the notebook file.
+        data (Optional[bytes]): Content of the notebook, if it was already read.
+
+    Returns:
+        CheckResult: The verdict, ``UNREADABLE`` if the file can't be read or
+        parsed as a notebook, or breaks one of the ``limits``.
+    """
+    try:
+        violation = find_notebook_violation(notebook_path, data)
+    except limits.ResourceLimitError as error:
+        return CheckResult(notebook_path, UNREADABLE, error=str(error))
+    except READ_ERRORS as error:
+        return CheckResult(notebook_path, UNREADABLE, error=read_error(error))
+    return violation_result(notebook_path, violation)
+
+
+def check_notebook_file(notebook_path: str, data: Optional[bytes] = None) -> None:
+    """Check a single notebook file without printing anything.
+
+    Args:
+        notebook_path (str): Path to the notebook file.
+        data (Optional[bytes]): Content of the notebook, if it was already read.
+
+    Raises:
+        NotebookCodeCellNotRunError: If a code cell in the notebook was not run.
+        NotebookRunOrderError: If the cells in the notebook were not run sequentially.
+        limits.ResourceLimitError: If the notebook breaks a limit; see ``limits``.
+    """
+    with _read_code_cells(notebook_path, data) as code_cells:
+        check_notebook_run_order(code_cells)
+
+
+def find_notebook_violation(
+    notebook_path: str, data: Optional[bytes] = None
+) -> Optional[Violation]:
+    """Finds the first code cell of a notebook file that breaks the run order.
+
+    Args:
+        notebook_path (str): Path to the notebook file.
+        data (Optional[bytes]): Content of the notebook, if it was already read.
+
+    Returns:
+        Optional[Violation]: The first offending cell, or None if the notebook
+        was run in order.
+
+    Raises:
+        OSError: If the notebook can't be read.
+        ValueError: If the notebook is not valid JSON.
+        KeyError: If the notebook has no cells.
+        limits.ResourceLimitError: If the notebook breaks a limit.
+    """
+    with _read_code_cells(notebook_path, data) as code_cells:
+        return find_violation(code_cells)
+
+
+def _streamed_above() -> Optional[int]:
+    """Returns the size above which notebooks are streamed from disk."""
+    max_file_size = limits.current().max_file_size
+    if json_backends.current() == json_backends.STREAM:
+        return max_file_size
+    if max_file_size is None:
+        return json_backends.STREAM_MIN_SIZE
+    return min(max_file_size, json_backends.STREAM_MIN_SIZE)
+
+
+@contextmanager
+def _read_code_cells(
+    notebook_path: str, data: Optional[bytes]
+) -> Iterator[Iterable[utils.CodeCell]]:
+    """Streams the code cells of a notebook file, or of its content if given."""
+    backend = json_backends.current()
+    resource_limits = limits.current()
+    if backend != json_backends.STREAM or resource_limits.max_file_size is not None:
+        size = limits.file_size(notebook_path) if data is None else len(data)
+        if resource_limits.is_oversized(size):
+            if resource_limits.oversized != limits.STREAM:
+                raise resource_limits.too_large_error(size)
+            backend = json_backends.STREAM
+        elif size > json_backends.STREAM_MIN_SIZE:
+            backend = json_backends.STREAM
+    if backend != json_backends.STREAM:
+        yield _decode_code_cells(notebook_path, data, backend)
+        return
+    if data is None and stats.current() is None and resource_limits.timeout is None:
+        with closing(streaming.iter_code_cells(notebook_path)) as code_cells:
+            yield code_cells
+        return
+    if data is not None:
+        notebook_file = io.BytesIO(data)
+    else:
+        notebook_file = open(notebook_path, "rb")  # pylint: disable=consider-using-with
+    with notebook_file:
+        # pylint: disable-next=contextmanager-generator-missing-cleanup
+        with stream_code_cells(notebook_path, notebook_file) as code_cells:
+            yield code_cells
+
+
+def _decode_code_cells(
+    notebook_path: str, data: Optional[bytes], backend: str
+) -> ExecutionProfile:
+    """Decodes a whole notebook with a JSON backend, recording stats if they are on."""
+    started = time.perf_counter()
+    if data is None:
+        with json_backends.read_notebook(notebook_path, backend) as buffer:
+            size = len(buffer)
+            profile = ExecutionProfile.from_cells(
+                json_backends.decode_code_cells(buffer, backend)
+            )
+    else:
+        size = len(data)
+        profile = ExecutionProfile.from_cells(
+            json_backends.decode_code_cells(data, backend)
+        )
+    collector = stats.current()
+    if collector is not None:
+        collector.add_bytes(size)
+        collector.add_notebook(notebook_path, time.perf_counter() - started, size)
+    return profile
+
+
+@contextmanager
+def stream_code_cells(
+    notebook_path: str, stream: BinaryIO
+) -> Iterator[Iterable[utils.CodeCell]]:
+    """Streams the code cells of a notebook, recording stats if they are on.
+
+    Reading is cut short if it runs past the ``limits`` timeout.
+
+    Args:
+        notebook_path (str): Path to report the notebook under in stats.
+        stream (BinaryIO): Content of the notebook.
+
+    Yields:
+        Iterable[utils.CodeCell]: The code cells, read lazily.
+    """
+    # Cell outputs are skipped rather than parsed, and reading stops at the
+    # first offending cell.
+    stream = limits.with_deadline(stream)
+    collector = stats.current()
+    if collector is None:
+        with closing(streaming.read_code_cells(stream)) as code_cells:
+            yield code_cells
+        return
+    with stats.measure_notebook(notebook_path, stream, collector) as reader:
+        with closing(streaming.read_code_cells(reader)) as code_cells:
+            yield stats.timed_iter("parse", code_cells)
 
 
-def check_single_notebook(notebook_path: str) -> None:
+def check_archive(archive_path: str, fail_fast: bool = False) -> List[NotebookResult]:
+    """Check and report the notebooks in an archive or compressed notebook file.
+
+    The notebooks are checked by ``api.check_archive`` and reported as
+    ``archive!/member``. An archive that can't be read or is corrupt is
+    reported as an invalid notebook.
+
+    Args:
+        archive_path (str): Path to the archive or compressed notebook.
+        fail_fast (bool): Stop at the first invalid notebook.
+
+    Returns:
+        List[NotebookResult]: The verdict for every notebook, in archive order.
+
+    Raises:
+        InvalidNotebookRunError: If any problems were identified with a notebook's
+            run order. Raised once every notebook has been checked, with all
+            results attached.
+    """
+    # Imported here since api builds on this module.
+    # pylint: disable-next=import-outside-toplevel,cyclic-import
+    from .api import check_archive as check_members
+
+    results = []
+    with closing(check_members(archive_path)) as checked:
+        for result in checked:
+            results.append(NotebookResult(result.path, result.error))
+            report_notebook(*results[-1])
+            if fail_fast and not result.valid:
+                break
+    if not all(result.valid for result in results):
+        raise _invalid_notebook_error(*results)
+    return results
+
+
+def report_notebook(notebook_path: str, error: Optional[str] = None) -> None:
+    """Report the verdict for a single notebook, in the current output format.
+
+    Also ends the notebook's ``events``, if stats are being collected.
+
+    Args:
+        notebook_path (str): Path to the notebook file.
+        error (Optional[str]): Description of the run order problem, or None if
+            the notebook is valid.
+    """
+    _write_notebook(notebook_path, error)
+    collector = stats.current()
+    if collector is not None:
+        collector.notebook_done(notebook_path, error is None)
+
+
+@stats.timed("report")
+def _write_notebook(notebook_path: str, error: Optional[str]) -> None:
+    reporters.get_reporter().notebook(NotebookResult(notebook_path, error))
+
+
+@stats.timed("report")
+def report_summary(results: Iterable[NotebookResult]) -> None:
+    """Report the number of valid and invalid notebooks, and list the invalid ones.
+
+    Args:
+        results (Iterable[NotebookResult]): Results of every notebook checked.
+    """
+    reporters.get_reporter().summary(results)
+
+
+def check_single_notebook(
+    notebook_path: str, data: Optional[bytes] = None
+) -> NotebookResult:
     """Check a single notebook for sequential execution.
 
     Args:
         notebook_path (str): Path to the notebook file.
+        data (Optional[bytes]): Content of the notebook, if it was already read.
+
+    Returns:
+        NotebookResult: The verdict for the notebook, which is always valid.
 
     Raises:
-        InvalidNotebookRunError: If any problems were identified with the notebook's run order.
+        InvalidNotebookRunError: If any problems were identified with the notebook's run order,
+            or it was not checked because it breaks a limit, see ``limits``, or
+            could not be read as a notebook.
     """
-    notebook_data = utils.load_notebook_data(notebook_path)
+    result = NotebookResult(notebook_path, check_notebook(notebook_path, data).error)
+    report_notebook(*result)
+    if not result.valid:
+        raise _invalid_notebook_error(result)
+    return result
+
+
+def _invalid_notebook_error(*results: NotebookResult) -> InvalidNotebookRunError:
+    invalid = [result for result in results if not result.valid]
+    message = "".join(
+        f"Notebook {result.path} was not run in order.\n\n{result.error}\n\n"
+        for result in invalid
+    )
+    return InvalidNotebookRunError(message, results=list(results))
+
+
+def is_cacheable(error: Optional[str]) -> bool:
+    """Whether a verdict depends only on the notebook, so it can be cached.
+
+    Verdicts of notebooks that break a limit or could not be read depend on the
+    limits or on the state of the filesystem, and are checked again next time.
+
+    Args:
+        error (Optional[str]): The error of a ``NotebookResult``.
+
+    Returns:
+        bool: True if the verdict can be cached.
+    """
+    return not (limits.is_limit_error(error) or is_read_error(error))
+
+
+def _check_cached_notebook(
+    notebook_path: str, cache, data: Optional[bytes] = None
+) -> CheckResult:
+    """Like ``check_notebook``, but answers from the cache when possible."""
+    cached = cache.get_unchanged(notebook_path)
+    if cached is None:
+        # Read the notebook once, both to look up its content and to check it.
+        if data is None:
+            data = read_unless_oversized(notebook_path)
+        cached = cache.get(notebook_path, data)
+    if cached is not None:
+        return verdict_result(notebook_path, cached.error)
+    result = check_notebook(notebook_path, data)
+    if is_cacheable(result.error):
+        cache.put(notebook_path, result.error)
+    return result
+
+
+def read_unless_oversized(notebook_path: str) -> Optional[bytes]:
+    """Reads a notebook whole, so it can be hashed and checked from one read.
+
+    Args:
+        notebook_path (str): Path to the notebook file.
+
+    Returns:
+        Optional[bytes]: The content, or None if the notebook is large enough
+        to be streamed instead, see ``json_backends.STREAM_MIN_SIZE``, or can't
+        be read, which checking it will report.
+    """
+    streamed_above = _streamed_above()
+    if streamed_above is not None and limits.file_size(notebook_path) > streamed_above:
+        return None
     try:
-        check_notebook_run_order(notebook_data)
-    except (
-        NotebookCodeCellNotRunError,
-        NotebookRunOrderError,
-    ) as error:
-        # Print error with styling
-        console.print(f"\n❌ [bold red]INVALID:[/bold red] {notebook_path}")
-        console.print(f"[yellow]Error:[/yellow] {error}\n", style="dim")
-        raise InvalidNotebookRunError(
-            f"Notebook {notebook_path} was not run in order.\n\n{error}\n\n"
-        ) from error
-    # Print success with styling
-    console.print(f"✅ [bold green]VALID:[/bold green] {notebook_path}")
-
-
-def process_path(path: str) -> None:
-    """Process a path to a notebook file or directory recursively.
+        return stats.timed("read")(pipeline.read_notebook_bytes)(notebook_path)
+    except OSError:
+        # Reported when the notebook is checked.
+        return None
+
+
+def find_notebooks(path: str, walker=None) -> Iterator[str]:
+    """Yield the notebook files at a path, recursing into directories.
+
+    Directories such as ``.git``, ``.ipynb_checkpoints`` and virtualenvs are
+    skipped; see ``walk.DEFAULT_EXCLUDES``.
 
     Args:
         path (str): Path to a single ``.ipynb`` file or a directory containing notebooks.
+        walker (Optional[walk.NotebookWalker]): Walker holding the exclude patterns.
+            Passing the same walker for several paths yields each notebook once.
+
+    Yields:
+        str: Path to each notebook file.
 
     Raises:
         ValueError: If the path is neither a directory nor a ``.ipynb`` file.
     """
-    if os.path.isdir(path):
-        # Get all .ipynb files in the directory and its subdirectories
-        for dirpath, _, filenames in os.walk(path):
-            for filename in filenames:
-                notebook_path = os.path.join(dirpath, filename)
-                if filename.endswith(".ipynb"):
-                    check_single_notebook(notebook_path)
-    elif path.endswith(".ipynb"):
-        check_single_notebook(path)
-    else:
-        raise ValueError(
-            f"Cannot check file {path}. "
-            "Must be a path to a notebook file with the .ipynb extension, or a directory."
+    if walker is None:
+        walker = NotebookWalker()
+    return walker.find(path)
+
+
+def process_path(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    path: str,
+    cache=None,
+    walker=None,
+    fail_fast: bool = False,
+    prefetch: int = 0,
+    prefetch_bytes: int = pipeline.DEFAULT_MAX_BYTES,
+) -> List[NotebookResult]:
+    """Process a path to a notebook file or directory recursively.
+
+    Archives and compressed notebooks are read without extracting them, see
+    ``check_archive``.
+
+    Every notebook is checked, even after an invalid one is found, unless
+    ``fail_fast`` is set.
+
+    Args:
+        path (str): Path to a single ``.ipynb`` file or a directory containing notebooks.
+        cache (Optional[cache.ResultCache]): Cache of verdicts from previous runs.
+            Notebooks that haven't changed since are reported without being read.
+        walker (Optional[walk.NotebookWalker]): Walker holding the exclude patterns,
+            see ``find_notebooks``.
+        fail_fast (bool): Stop at the first invalid notebook.
+        prefetch (int): Number of notebooks to read ahead in background threads,
+            see ``check_notebooks``.
+        prefetch_bytes (int): Limit on read-ahead, see ``check_notebooks``.
+
+    Returns:
+        List[NotebookResult]: The verdict for every notebook, in walk order.
+
+    Raises:
+        ValueError: If the path is neither a directory, a ``.ipynb`` file nor an
+            archive.
+        InvalidNotebookRunError: If any problems were identified with a notebook's
+            run order. Raised once every notebook has been checked, with all
+            results attached.
+    """
+    if archives.is_archive(path) and not os.path.isdir(path):
+        return check_archive(path, fail_fast)
+    return check_notebooks(
+        stats.timed_iter("walk", find_notebooks(path, walker)),
+        cache,
+        fail_fast,
+        prefetch,
+        prefetch_bytes,
+    )
+
+
+def check_notebooks(
+    notebook_paths: Iterable[str],
+    cache=None,
+    fail_fast: bool = False,
+    prefetch: int = 0,
+    prefetch_bytes: int = pipeline.DEFAULT_MAX_BYTES,
+) -> List[NotebookResult]:
+    """Check and report notebooks one by one.
+
+    Args:
+        notebook_paths (Iterable[str]): Paths to the notebook files. Those over
+            the size limit are left out if ``limits`` says to skip them.
+        cache (Optional[cache.ResultCache]): Cache of verdicts from previous runs.
+        fail_fast (bool): Stop at the first invalid notebook.
+        prefetch (int): Number of notebooks to read ahead in background threads
+            while earlier ones are checked, which hides the latency of slow or
+            network filesystems. With 0, each notebook is read as it is checked,
+            stopping at the first offending cell.
+        prefetch_bytes (int): Read-ahead notebooks being read or waiting to be
+            checked above which no further reads are started, see ``pipeline``.
+
+    Returns:
+        List[NotebookResult]: The verdict for every notebook, in the given order.
+
+    Raises:
+        InvalidNotebookRunError: If any problems were identified with a notebook's
+            run order. Raised once every notebook has been checked, with all
+            results attached.
+    """
+    results = []
+    with closing(
+        _notebooks_to_check(notebook_paths, prefetch, prefetch_bytes)
+    ) as notebooks:
+        for notebook_path, data in notebooks:
+            if cache is not None:
+                result = _check_cached_notebook(notebook_path, cache, data)
+                results.append(NotebookResult(result.path, result.error))
+                report_notebook(*results[-1])
+            else:
+                try:
+                    if data is not None:
+                        results.append(check_single_notebook(notebook_path, data))
+                    else:
+                        results.append(check_single_notebook(notebook_path))
+                except InvalidNotebookRunError as error:
+                    results.extend(error.results)
+            if fail_fast and not results[-1].valid:
+                break
+    if not all(result.valid for result in results):
+        raise _invalid_notebook_error(*results)
+    return results
+
+
+def iter_notebook_results(
+    notebook_paths: Iterable[str],
+    cache=None,
+    prefetch: int = 0,
+    prefetch_bytes: int = pipeline.DEFAULT_MAX_BYTES,
+) -> Iterator[CheckResult]:
+    """Checks notebooks one by one, yielding each verdict without reporting it.
+
+    Args:
+        notebook_paths (Iterable[str]): Paths to the notebook files. Those over
+            the size limit are left out if ``limits`` says to skip them.
+        cache (Optional[cache.ResultCache]): Cache of verdicts from previous runs.
+        prefetch (int): Number of notebooks to read ahead, see ``check_notebooks``.
+        prefetch_bytes (int): Limit on read-ahead, see ``check_notebooks``.
+
+    Yields:
+        CheckResult: The verdict for each notebook, in the given order. Verdicts
+        from the cache don't say which cell is at fault.
+    """
+    with closing(
+        _notebooks_to_check(notebook_paths, prefetch, prefetch_bytes)
+    ) as notebooks:
+        for notebook_path, data in notebooks:
+            if cache is not None:
+                yield _check_cached_notebook(notebook_path, cache, data)
+            else:
+                yield check_notebook(notebook_path, data)
+
+
+def _notebooks_to_check(
+    notebook_paths: Iterable[str], prefetch: int, prefetch_bytes: int
+) -> Iterator[Tuple[str, Optional[bytes]]]:
+    """Yields each notebook to check, with its content if it was read ahead."""
+    notebook_paths = limits.skip_oversized(notebook_paths)
+    if prefetch <= 0:
+        for notebook_path in notebook_paths:
+            yield notebook_path, None
+        return
+    # Closing stops the reads still in flight if the caller stops early.
+    with closing(
+        pipeline.prefetch_notebooks(
+            notebook_paths, prefetch, prefetch_bytes, _streamed_above()
         )
+    ) as notebooks:
+        yield from stats.timed_iter("read", notebooks)
+
+
+def until_invalid(results: Iterator[CheckResult]) -> Iterator[CheckResult]:
+    """Yields verdicts up to and including the first invalid one, as in fail-fast mode.
+
+    Args:
+        results (Iterator[CheckResult]): Verdicts from a generator, which is
+            closed once an invalid one is found, so its outstanding checks stop.
+
+    Yields:
+        CheckResult: The verdicts, in order.
+    """
+    with closing(results):
+        for result in results:
+            yield result
+            if not result.valid:
+                return
@@ -0,0 +1,78 @@
+"""Events describing a run, for exporting metrics and traces.
+
+A ``stats.StatsCollector`` created with listeners calls each of them with an
+event as the run progresses:
+
+- a ``PhaseEvent`` per phase (walk, cache, read, parse, check, load, report)
+  spent on each notebook, once the notebook has been reported;
+- a ``NotebookEvent`` per notebook, right after its phases;
+- ``PhaseEvent`` objects without a path for time spent after the last notebook,
+  such as writing the summary, then a final ``RunEvent``.
+
+Time spent on a notebook in the same phase is added up into one event, so even
+a notebook streamed in thousands of chunks yields a handful of events. Times
+are in seconds since the collector was created. Built-in listeners that write
+OpenMetrics and Chrome trace files are in ``exporters``.
+"""
+
+from typing import Callable, Dict, NamedTuple, Optional, Union
+
+
+class PhaseEvent(NamedTuple):
+    """Time spent in one phase on one notebook.
+
+    Attributes:
+        phase (str): Name of the phase, see ``stats.PHASES``.
+        path (Optional[str]): The notebook, or None for time spent after the
+            last one.
+        start (float): When the phase was first entered for the notebook.
+        seconds (float): Time spent in the phase, excluding nested phases.
+        bytes (int): Bytes read from the notebook in the phase.
+    """
+
+    phase: str
+    path: Optional[str]
+    start: float
+    seconds: float
+    bytes: int = 0
+
+
+class NotebookEvent(NamedTuple):
+    """A notebook was checked and reported.
+
+    Attributes:
+        path (str): Path to the notebook.
+        start (float): When work on the notebook began, finding it included.
+        seconds (float): Time from ``start`` until it was reported.
+        bytes (int): Bytes read from the notebook; 0 for cache hits.
+        valid (bool): Whether the notebook was run in order.
+    """
+
+    path: str
+    start: float
+    seconds: float
+    bytes: int
+    valid: bool
+
+
+class RunEvent(NamedTuple):
+    """The run finished.
+
+    Attributes:
+        seconds (float): Wall time of the run.
+        checked (int): Number of notebooks reported.
+        invalid (int): Number of invalid notebooks.
+        bytes (int): Bytes read from all notebooks.
+        phase_seconds (Dict[str, float]): Time spent in each phase, including
+            time spent in worker processes, which has no ``PhaseEvent``.
+    """
+
+    seconds: float
+    checked: int
+    invalid: int
+    bytes: int
+    phase_seconds: Dict[str, float]
+
+
+Event = Union[PhaseEvent, NotebookEvent, RunEvent]
+Listener = Callable[[Event], None]
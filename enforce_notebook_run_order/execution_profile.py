@@ -0,0 +1,185 @@
+"""Compact record of a notebook's code cells, for checking very large notebooks.
+
+An ``ExecutionProfile`` holds only the execution count of each code cell and
+whether it has any source, in two flat arrays rather than a dictionary or tuple
+per cell. It is built in one pass over parsed or streamed cells, and the run
+order check runs over the whole profile at once, with NumPy when it is
+installed, returning every violation rather than stopping at the first.
+
+Profiles pickle as the two arrays, so they are also cheap to store or to send
+between processes.
+"""
+
+import functools
+from array import array
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from .utils import CodeCell
+
+# Stands in for an execution count of None, which real counts never are.
+NOT_RUN = -1
+
+# Below this many cells, setting up NumPy arrays costs more than it saves.
+NUMPY_MIN_CELLS = 2048
+
+
+class Violation(NamedTuple):
+    """A code cell that breaks the run order.
+
+    Attributes:
+        index (int): Position of the cell among the notebook's code cells.
+        execution_count (Optional[int]): The cell's execution count, or None if
+            it was not run.
+        previous_count (Optional[int]): Execution count of the code cell before
+            it, or 0 for the first code cell.
+    """
+
+    index: int
+    execution_count: Optional[int]
+    previous_count: Optional[int]
+
+    @property
+    def not_run(self) -> bool:
+        """Whether the cell was not run at all, rather than run out of order."""
+        return self.execution_count is None
+
+
+class ExecutionProfile:
+    """Execution counts and non-empty flags of a notebook's code cells.
+
+    Args:
+        counts (array): Execution count of each code cell, ``NOT_RUN`` for None.
+        has_source (bytearray): 1 for each code cell with source, 0 otherwise.
+    """
+
+    __slots__ = ("counts", "has_source")
+
+    def __init__(self, counts: array, has_source: bytearray):
+        if len(counts) != len(has_source):
+            raise ValueError("counts and has_source must be the same length")
+        self.counts = counts
+        self.has_source = has_source
+
+    @classmethod
+    def from_cells(cls, code_cells: Iterable[CodeCell]) -> "ExecutionProfile":
+        """Builds a profile from code cell records, such as streamed ones.
+
+        Args:
+            code_cells (Iterable[CodeCell]): The code cells, in order.
+
+        Returns:
+            ExecutionProfile: The profile.
+        """
+        counts = array("q")
+        has_source = bytearray()
+        for execution_count, cell_has_source in code_cells:
+            counts.append(NOT_RUN if execution_count is None else execution_count)
+            has_source.append(1 if cell_has_source else 0)
+        return cls(counts, has_source)
+
+    @classmethod
+    def from_notebook(cls, notebook_data: Dict) -> "ExecutionProfile":
+        """Builds a profile from parsed notebook data without copying cells.
+
+        Args:
+            notebook_data (Dict): Notebook data in dictionary format.
+
+        Returns:
+            ExecutionProfile: The profile of the notebook's code cells.
+
+        Raises:
+            KeyError: If the notebook has no ``cells`` list.
+        """
+        cells = notebook_data.get("cells")
+        if cells is None:
+            raise KeyError("cells")
+        counts = array("q")
+        has_source = bytearray()
+        for cell in cells:
+            # Missing fields are read as streaming.read_code_cells reads them.
+            if cell.get("cell_type") == "code":
+                execution_count = cell.get("execution_count")
+                counts.append(NOT_RUN if execution_count is None else execution_count)
+                has_source.append(1 if cell.get("source") else 0)
+        return cls(counts, has_source)
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def __iter__(self) -> Iterator[CodeCell]:
+        for count, cell_has_source in zip(self.counts, self.has_source):
+            yield CodeCell(None if count == NOT_RUN else count, bool(cell_has_source))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ExecutionProfile):
+            return NotImplemented
+        return self.counts == other.counts and self.has_source == other.has_source
+
+    def __repr__(self) -> str:
+        return f"ExecutionProfile({len(self)} code cells)"
+
+    def __getstate__(self):
+        return (self.counts, self.has_source)
+
+    def __setstate__(self, state) -> None:
+        self.counts, self.has_source = state
+
+    def violations(self) -> List[Violation]:
+        """Finds every non-empty code cell that was not run, or not run in order.
+
+        A non-empty cell must have been run, with an execution count one more
+        than the code cell before it, empty or not; the first code cell counts
+        from 0.
+
+        Returns:
+            List[Violation]: Every offending cell, in notebook order.
+        """
+        numpy = _numpy() if len(self) >= NUMPY_MIN_CELLS else None
+        if numpy is not None:
+            positions = _violations_numpy(numpy, self.counts, self.has_source)
+        else:
+            positions = _violations_python(self.counts, self.has_source)
+        return [self._violation(index) for index in positions]
+
+    def _violation(self, index: int) -> Violation:
+        previous = self.counts[index - 1] if index else 0
+        count = self.counts[index]
+        return Violation(
+            index,
+            None if count == NOT_RUN else count,
+            None if previous == NOT_RUN else previous,
+        )
+
+
+def _violations_python(counts: array, has_source: bytearray) -> List[int]:
+    positions = []
+    previous = 0
+    for index, count in enumerate(counts):
+        if has_source[index] and (
+            count == NOT_RUN or previous == NOT_RUN or count != previous + 1
+        ):
+            positions.append(index)
+        previous = count
+    return positions
+
+
+def _violations_numpy(numpy, counts: array, has_source: bytearray) -> List[int]:
+    current = numpy.frombuffer(counts, dtype=numpy.int64)
+    previous = numpy.empty_like(current)
+    previous[0] = 0
+    previous[1:] = current[:-1]
+    offending = (
+        (current == NOT_RUN) | (previous == NOT_RUN) | (current != previous + 1)
+    ) & numpy.frombuffer(has_source, dtype=numpy.uint8).astype(bool)
+    return numpy.flatnonzero(offending).tolist()
+
+
+@functools.lru_cache(maxsize=None)
+def _numpy():
+    """Returns the numpy module, or None if it is not installed."""
+    # Imported on first use, since most notebooks are too small to need it.
+    try:
+        import numpy  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    return numpy
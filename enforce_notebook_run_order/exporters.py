@@ -0,0 +1,322 @@
+"""Listeners that write a run's ``events`` to files for dashboards and tracing.
+
+- ``OpenMetricsExporter`` writes the run's totals in the Prometheus text format,
+  for node-exporter's textfile collector to pick up.
+- ``ChromeTraceExporter`` writes a trace in the Chrome trace event format, with
+  one span per notebook and one lane per phase, viewable in ``chrome://tracing``
+  or Perfetto.
+
+Both replace their file in one step when the run finishes, so a collector never
+reads a half-written file. The trace is streamed to a temporary file next to it
+as the run goes, so its memory use doesn't grow with the number of notebooks.
+Files get the permissions a newly created file would, and a temporary file is
+removed if it can't be moved into place.
+"""
+
+import json
+import os
+import tempfile
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, TextIO, Tuple
+
+from .events import Event, NotebookEvent, PhaseEvent, RunEvent
+
+# Upper bounds of the histogram buckets.
+SIZE_BUCKETS = (1e4, 1e5, 1e6, 1e7, 1e8, 1e9)
+SECONDS_BUCKETS = (0.001, 0.01, 0.1, 1.0, 10.0, 100.0)
+
+METRIC_PREFIX = "nbcheck"
+
+
+class _Histogram:
+    """Cumulative histogram in the Prometheus style."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        """Adds a value to its bucket."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        """Returns the name suffix, labels and value of each sample."""
+        samples = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            samples.append(("_bucket", {"le": _format_number(bound)}, cumulative))
+        samples.append(("_sum", {}, self.total))
+        samples.append(("_count", {}, cumulative))
+        return samples
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(value)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _read_umask() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# Setting the umask is the portable way to read it, and it is process-wide, so
+# it is only done once, on import, rather than while other threads create files.
+_IMPORT_UMASK = _read_umask()
+
+
+def _umask() -> int:
+    """Returns the process umask, as Linux reports it, or as it was on import."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError):
+        pass
+    return _IMPORT_UMASK
+
+
+def _temporary_file(path: str) -> TextIO:
+    directory = os.path.dirname(os.path.abspath(path))
+    # pylint: disable-next=consider-using-with
+    return tempfile.NamedTemporaryFile(
+        "w", dir=directory, delete=False, encoding="utf-8", suffix=".tmp"
+    )
+
+
+def _publish(temporary: TextIO, path: str, text: str) -> None:
+    """Ends a temporary file with text and moves it to path, or removes it on failure."""
+    try:
+        temporary.write(text)
+        temporary.flush()
+        # Temporary files are private; give the file the usual permissions.
+        mode = 0o666 & ~_umask()
+        if hasattr(os, "fchmod"):
+            os.fchmod(temporary.fileno(), mode)
+        else:
+            os.chmod(temporary.name, mode)
+        temporary.close()
+        os.replace(temporary.name, path)
+    except BaseException:
+        _discard(temporary)
+        raise
+
+
+def _discard(temporary: TextIO) -> None:
+    try:
+        temporary.close()
+        os.unlink(temporary.name)
+    except OSError:
+        pass
+
+
+def _write_atomically(path: str, text: str) -> None:
+    _publish(_temporary_file(path), path, text)
+
+
+class OpenMetricsExporter:
+    """Writes a run's totals to a Prometheus textfile when it finishes.
+
+    Args:
+        path (str): File to write, conventionally ending in ``.prom``.
+        labels (Optional[Dict[str, str]]): Labels added to every sample, such
+            as the name of the CI job.
+    """
+
+    def __init__(self, path: str, labels: Optional[Dict[str, str]] = None):
+        self.path = path
+        self.labels = dict(labels or {})
+        self.notebook_bytes = _Histogram(SIZE_BUCKETS)
+        self.notebook_seconds = _Histogram(SECONDS_BUCKETS)
+
+    def __call__(self, event: Event) -> None:
+        if isinstance(event, NotebookEvent):
+            if event.bytes:
+                self.notebook_bytes.observe(event.bytes)
+            self.notebook_seconds.observe(event.seconds)
+        elif isinstance(event, RunEvent):
+            _write_atomically(self.path, self.render(event))
+
+    def render(self, run: RunEvent) -> str:
+        """Formats the metrics of a finished run.
+
+        Args:
+            run (RunEvent): The run's final event.
+
+        Returns:
+            str: The textfile content.
+        """
+        lines: List[str] = []
+        self._family(
+            lines,
+            "run_seconds",
+            "gauge",
+            "Wall time of the last run.",
+            [("", {}, run.seconds)],
+        )
+        self._family(
+            lines,
+            "notebooks",
+            "gauge",
+            "Notebooks checked in the last run.",
+            [
+                ("", {"result": "valid"}, run.checked - run.invalid),
+                ("", {"result": "invalid"}, run.invalid),
+            ],
+        )
+        self._family(
+            lines,
+            "read_bytes",
+            "gauge",
+            "Bytes of notebooks read in the last run.",
+            [("", {}, run.bytes)],
+        )
+        self._family(
+            lines,
+            "phase_seconds",
+            "gauge",
+            "Time spent in each phase in the last run.",
+            [
+                ("", {"phase": phase}, seconds)
+                for phase, seconds in sorted(run.phase_seconds.items())
+            ],
+        )
+        self._family(
+            lines,
+            "notebook_bytes",
+            "histogram",
+            "Size of the notebooks read.",
+            self.notebook_bytes.samples(),
+        )
+        self._family(
+            lines,
+            "notebook_seconds",
+            "histogram",
+            "Time taken per notebook.",
+            self.notebook_seconds.samples(),
+        )
+        return "\n".join(lines) + "\n"
+
+    def _family(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        lines: List[str],
+        name: str,
+        metric_type: str,
+        help_text: str,
+        samples: Sequence[Tuple[str, Dict[str, str], float]],
+    ) -> None:
+        metric = f"{METRIC_PREFIX}_{name}"
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {metric_type}")
+        for suffix, labels, value in samples:
+            labels = {**self.labels, **labels}
+            label_text = ",".join(
+                f'{key}="{_escape_label(str(label))}"' for key, label in labels.items()
+            )
+            if label_text:
+                label_text = f"{{{label_text}}}"
+            lines.append(f"{metric}{suffix}{label_text} {_format_number(value)}")
+
+
+class ChromeTraceExporter:  # pylint: disable=too-few-public-methods
+    """Streams a run's events to a Chrome trace file.
+
+    Each notebook is a span on the ``notebooks`` lane, with its size and verdict
+    as arguments, and the time spent in each phase on it is a span on that
+    phase's lane, starting when the phase was first entered for the notebook.
+
+    Args:
+        path (str): File to write, conventionally ending in ``.json``.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._stream: Optional[TextIO] = None
+        self._lanes: Dict[str, int] = {}
+
+    def __call__(self, event: Event) -> None:
+        if isinstance(event, PhaseEvent):
+            self._span(
+                event.phase,
+                event.path or "(run)",
+                event.start,
+                event.seconds,
+                {"bytes": event.bytes} if event.bytes else {},
+            )
+        elif isinstance(event, NotebookEvent):
+            self._span(
+                "notebooks",
+                event.path,
+                event.start,
+                event.seconds,
+                {"bytes": event.bytes, "valid": event.valid},
+            )
+        elif isinstance(event, RunEvent):
+            self._span(
+                "run",
+                "nbcheck",
+                0.0,
+                event.seconds,
+                {"checked": event.checked, "invalid": event.invalid},
+            )
+            self._close()
+
+    def _write(self, record: Dict) -> None:
+        if self._stream is None:
+            self._stream = _temporary_file(self.path)
+            separator = "[\n"
+        else:
+            separator = ",\n"
+        try:
+            self._stream.write(separator + json.dumps(record))
+        except BaseException:
+            # Such as a full disk: give up on the trace rather than leave it behind.
+            _discard(self._stream)
+            self._stream = None
+            self._lanes = {}
+            raise
+
+    def _lane(self, name: str) -> int:
+        lane = self._lanes.get(name)
+        if lane is None:
+            lane = self._lanes[name] = len(self._lanes) + 1
+            self._write(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": 1,
+                    "tid": lane,
+                    "args": {"name": name},
+                }
+            )
+        return lane
+
+    def _span(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self, lane: str, name: str, start: float, seconds: float, args: Dict
+    ) -> None:
+        self._write(
+            {
+                "name": name,
+                "ph": "X",
+                "pid": 1,
+                "tid": self._lane(lane),
+                "ts": round(start * 1e6, 3),
+                "dur": round(seconds * 1e6, 3),
+                "args": args,
+            }
+        )
+
+    def _close(self) -> None:
+        stream, self._stream = self._stream, None
+        self._lanes = {}
+        _publish(stream, self.path, "\n]\n")
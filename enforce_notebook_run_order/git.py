@@ -0,0 +1,383 @@
+"""Checks only the notebooks changed in git, reading them from the object store.
+
+Instead of walking the working tree, git is asked which ``.ipynb`` files are
+staged (or changed since a given ref), and their blobs are streamed through a
+single ``git cat-file --batch`` process. This checks exactly what gets committed,
+not the working-tree copy, and a typical commit only touches a handful of blobs.
+
+``audit_notebooks`` does the same for a range of history: every notebook blob a
+commit in the range added or modified is checked, each distinct blob once, so
+a notebook left untouched across a hundred commits costs one check. Nothing is
+checked out and no network access is needed.
+"""
+
+import os
+import subprocess
+import threading
+from contextlib import closing
+from typing import (
+    BinaryIO,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from . import json_backends, stats, streaming
+from .enforce_notebook_run_order import (
+    READ_ERRORS,
+    NotebookCodeCellNotRunError,
+    NotebookRunOrderError,
+    check_notebook_run_order,
+    report_notebook,
+    until_invalid,
+    verdict_result,
+)
+from .execution_profile import ExecutionProfile
+from .results import CheckResult, NotebookResult, read_error
+
+# Modes git uses for regular files; symlinks and submodules are not notebooks.
+_FILE_MODES = ("100644", "100755")
+
+
+class GitError(Exception):
+    """Raised when git fails or the working directory is not inside a repository"""
+
+
+class ChangedNotebook(NamedTuple):
+    """A notebook changed in git, and the blob holding its new content."""
+
+    path: str
+    blob: str
+
+
+# Length commits are abbreviated to in the names of audited notebooks.
+COMMIT_ABBREV = 12
+
+
+class NotebookRevision(NamedTuple):
+    """A notebook as a commit left it, and the blob holding that content."""
+
+    commit: str
+    path: str
+    blob: str
+
+    @property
+    def name(self) -> str:
+        """``<commit>:<path>``, with the commit abbreviated, as git names it."""
+        return f"{self.commit[:COMMIT_ABBREV]}:{self.path}"
+
+
+def _run_git(*args: str, stdin: Optional[bytes] = None) -> bytes:
+    try:
+        completed = subprocess.run(
+            ["git", *args], input=stdin, capture_output=True, check=False
+        )
+    except OSError as error:
+        raise GitError(f"Could not run git: {error}") from error
+    if completed.returncode != 0:
+        raise GitError(completed.stderr.decode(errors="replace").strip())
+    return completed.stdout
+
+
+def changed_notebooks(
+    paths: Sequence[str] = (), staged: bool = False, since: Optional[str] = None
+) -> List[ChangedNotebook]:
+    """Lists the notebooks that are staged, or changed since a ref.
+
+    Paths are relative to the current directory, and only changes below it
+    are listed, the same as when walking ``.``.
+
+    Args:
+        paths (Sequence[str]): Restrict the listing to these files or directories.
+        staged (bool): List notebooks staged in the index, with their staged blobs.
+        since (Optional[str]): List notebooks changed between the merge base of this
+            ref and ``HEAD``, with their blobs at ``HEAD``.
+
+    Returns:
+        List[ChangedNotebook]: Added or modified notebooks, in path order.
+
+    Raises:
+        GitError: If git fails, for example outside a repository or on an unknown ref.
+        ValueError: If not exactly one of ``staged`` and ``since`` is given.
+    """
+    if staged == (since is not None):
+        raise ValueError("Specify exactly one of staged or since.")
+    revisions = ["--cached"] if staged else [f"{since}...HEAD"]
+    output = _run_git(
+        "diff",
+        "--raw",
+        "-z",
+        "--no-abbrev",
+        "--no-renames",
+        "--relative",
+        "--diff-filter=d",
+        *revisions,
+        "--",
+        *paths,
+    )
+    # Records are ":<old mode> <new mode> <old blob> <new blob> <status>\0<path>\0"
+    fields = output.split(b"\0")
+    notebooks = []
+    for header, path in zip(fields[::2], fields[1::2]):
+        _, new_mode, _, blob, _ = header.decode().split(" ")
+        path = os.fsdecode(path)
+        if new_mode in _FILE_MODES and path.endswith(".ipynb"):
+            notebooks.append(ChangedNotebook(path, blob))
+    return notebooks
+
+
+def notebook_revisions(
+    rev_range: str, paths: Sequence[str] = ()
+) -> List[NotebookRevision]:
+    """Lists every notebook added or modified by the commits in a range.
+
+    Merge commits are compared with each of their parents, so content first
+    committed in a merge, such as a resolved conflict, is listed too.
+
+    Args:
+        rev_range (str): Commits to list, in any form ``git rev-list`` accepts,
+            such as ``v1.0..v2.0``.
+        paths (Sequence[str]): Restrict the listing to these files or directories.
+
+    Returns:
+        List[NotebookRevision]: The notebooks each commit left changed, oldest
+        commit first, in path order within a commit. Paths are relative to the
+        top of the repository.
+
+    Raises:
+        GitError: If git fails, for example outside a repository or on an unknown
+            revision.
+    """
+    commits = _run_git("rev-list", "--reverse", rev_range, "--").split()
+    if not commits:
+        return []
+    output = _run_git(
+        "diff-tree",
+        "--stdin",
+        "-r",
+        "-z",
+        "--raw",
+        "--no-abbrev",
+        "--no-renames",
+        "--diff-filter=d",
+        "-m",
+        "--root",
+        "--",
+        *(paths or ["*.ipynb"]),
+        stdin=b"\n".join(commits) + b"\n",
+    )
+    # Each commit is "<commit>[ (from <parent>)]\0", followed by its changes as
+    # ":<old mode> <new mode> <old blob> <new blob> <status>\0<path>\0". A
+    # merge commit appears once per parent.
+    revisions: Dict[Tuple[str, str], NotebookRevision] = {}
+    fields = iter(output.split(b"\0"))
+    commit = ""
+    for field in fields:
+        if field.startswith(b":"):
+            _, new_mode, _, blob, _ = field.decode().split(" ")
+            path = os.fsdecode(next(fields))
+            if new_mode in _FILE_MODES and path.endswith(".ipynb"):
+                revisions.setdefault(
+                    (commit, path), NotebookRevision(commit, path, blob)
+                )
+        elif field:
+            commit = field.split()[0].decode()
+    return list(revisions.values())
+
+
+class _BlobReader:
+    """File-like view of one blob in the ``cat-file`` output stream."""
+
+    def __init__(self, stream: BinaryIO, size: int):
+        self.size = size
+        self._stream = stream
+        self._remaining = size
+
+    def read(self, size: int = -1) -> bytes:
+        """Reads up to ``size`` bytes of the blob."""
+        if size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._stream.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def drain(self) -> None:
+        """Skips whatever the reader of the blob didn't consume."""
+        while self._remaining and self.read(streaming.CHUNK_SIZE):
+            pass
+
+
+def iter_blobs(blobs: Iterable[str]) -> Iterator[Tuple[str, BinaryIO]]:
+    """Streams blob contents through a single ``git cat-file --batch`` process.
+
+    Each yielded reader is only valid until the next item is requested; anything
+    left unread is skipped.
+
+    Args:
+        blobs (Iterable[str]): Full object names of the blobs to read.
+
+    Yields:
+        Tuple[str, BinaryIO]: Object name and a file-like reader of its content,
+        whose ``size`` is the size of the blob.
+
+    Raises:
+        GitError: If a blob is missing from the object store.
+    """
+    blobs = list(blobs)
+    if not blobs:
+        return
+    with subprocess.Popen(
+        ["git", "cat-file", "--batch"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    ) as process:
+        # Requests are written from a separate thread so that a full stdout pipe
+        # can never block us while we are still writing stdin.
+        def write_requests():
+            try:
+                process.stdin.write("".join(f"{blob}\n" for blob in blobs).encode())
+            except BrokenPipeError:
+                pass
+            finally:
+                process.stdin.close()
+
+        writer = threading.Thread(target=write_requests, daemon=True)
+        writer.start()
+        try:
+            for _ in blobs:
+                header = process.stdout.readline().split()
+                if len(header) != 3:
+                    raise GitError(
+                        f"Could not read {b' '.join(header).decode()} from git."
+                    )
+                reader = _BlobReader(process.stdout, int(header[2]))
+                yield header[0].decode(), reader
+                reader.drain()
+                process.stdout.read(1)  # newline after each blob
+        finally:
+            process.stdout.close()
+            writer.join()
+
+
+def check_changed_notebooks(
+    notebooks: Sequence[ChangedNotebook], fail_fast: bool = False
+) -> List[NotebookResult]:
+    """Checks and reports changed notebooks from their blobs.
+
+    Args:
+        notebooks (Sequence[ChangedNotebook]): Notebooks listed by ``changed_notebooks``.
+        fail_fast (bool): Stop after the first invalid notebook.
+
+    Returns:
+        List[NotebookResult]: The verdict for every checked notebook.
+    """
+    return _report(iter_changed_notebooks(notebooks), fail_fast)
+
+
+def iter_changed_notebooks(
+    notebooks: Sequence[ChangedNotebook],
+) -> Iterator[CheckResult]:
+    """Checks changed notebooks from their blobs, yielding each verdict in order.
+
+    Args:
+        notebooks (Sequence[ChangedNotebook]): Notebooks listed by ``changed_notebooks``.
+
+    Yields:
+        CheckResult: The verdict for every notebook.
+
+    Raises:
+        GitError: If git fails part way through.
+    """
+    with closing(iter_blobs(notebook.blob for notebook in notebooks)) as blobs:
+        for notebook, (_, blob) in zip(notebooks, blobs):
+            yield verdict_result(notebook.path, _check_blob(blob))
+
+
+def _report(results: Iterator[CheckResult], fail_fast: bool) -> List[NotebookResult]:
+    reported = []
+    with closing(until_invalid(results) if fail_fast else results) as checked:
+        for result in checked:
+            reported.append(NotebookResult(result.path, result.error))
+            report_notebook(*reported[-1])
+    return reported
+
+
+def _check_blob(blob: _BlobReader) -> Optional[str]:
+    """Checks a notebook blob, returning the run order problem if there is one.
+
+    Like notebook files, blobs up to ``json_backends.STREAM_MIN_SIZE`` are
+    decoded whole with the current JSON backend, and larger ones streamed.
+    A blob that isn't a valid notebook, such as one committed with merge
+    conflict markers, is reported as such rather than raising.
+    """
+    backend = json_backends.current()
+    try:
+        if (
+            backend != json_backends.STREAM
+            and blob.size <= json_backends.STREAM_MIN_SIZE
+        ):
+            code_cells = _decode_blob(blob.read(), backend)
+        else:
+            code_cells = stats.timed_iter("parse", streaming.read_code_cells(blob))
+        check_notebook_run_order(code_cells)
+    except (NotebookCodeCellNotRunError, NotebookRunOrderError) as error:
+        return str(error)
+    except READ_ERRORS as error:
+        return read_error(error)
+    return None
+
+
+@stats.timed("parse")
+def _decode_blob(data: bytes, backend: str) -> ExecutionProfile:
+    return ExecutionProfile.from_cells(json_backends.decode_code_cells(data, backend))
+
+
+def audit_notebooks(
+    revisions: Sequence[NotebookRevision], fail_fast: bool = False
+) -> List[NotebookResult]:
+    """Checks and reports notebook revisions, reading each distinct blob once.
+
+    Args:
+        revisions (Sequence[NotebookRevision]): Revisions listed by
+            ``notebook_revisions``.
+        fail_fast (bool): Stop after the first invalid revision.
+
+    Returns:
+        List[NotebookResult]: The verdict for every checked revision, see
+        ``iter_revisions``.
+    """
+    return _report(iter_revisions(revisions), fail_fast)
+
+
+def iter_revisions(revisions: Sequence[NotebookRevision]) -> Iterator[CheckResult]:
+    """Checks notebook revisions, reading each distinct blob once.
+
+    Blobs are streamed through a single ``git cat-file --batch`` process in the
+    order their revisions are yielded, so reporting can start straight away.
+
+    Args:
+        revisions (Sequence[NotebookRevision]): Revisions listed by
+            ``notebook_revisions``.
+
+    Yields:
+        CheckResult: The verdict for every revision, named ``<commit>:<path>``.
+        Blobs that are not valid notebooks, such as ones committed with merge
+        conflict markers, are unreadable.
+
+    Raises:
+        GitError: If git fails part way through.
+    """
+    verdicts: Dict[str, Optional[str]] = {}
+    distinct = dict.fromkeys(revision.blob for revision in revisions)
+    with closing(iter_blobs(distinct)) as blobs:
+        for revision in revisions:
+            if revision.blob not in verdicts:
+                # One blob per distinct revision, so there is always another.
+                name, blob = next(blobs)  # pylint: disable=stop-iteration-return
+                verdicts[name] = _check_blob(blob)
+            yield verdict_result(revision.name, verdicts[revision.blob])
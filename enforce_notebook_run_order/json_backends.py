@@ -0,0 +1,251 @@
+"""Decodes whole notebooks with the fastest JSON library available.
+
+Notebooks are decoded whole, by default with the standard library, which is
+much faster than the incremental reader in ``streaming`` on all but very large
+files. Notebooks over ``STREAM_MIN_SIZE``, or over ``limits.Limits.max_file_size``
+if that is smaller, are scanned by the incremental reader whatever the backend,
+which never holds more than a chunk of a notebook in memory; ``stream`` scans
+every notebook that way. The backends are:
+
+- ``msgspec``: decodes straight into a minimal typed struct holding only the
+  cell type, execution count and source of each cell, so outputs are validated
+  but never built into Python objects.
+- ``orjson``: decodes the whole notebook into dictionaries.
+- ``json``: the standard library decoder, always available.
+
+``auto`` picks the first of these that is installed. Files are read as bytes,
+and large ones are memory-mapped rather than copied when the backend can decode
+from a buffer. ``msgspec`` and ``orjson`` are optional, and only imported once a
+notebook is decoded with them.
+"""
+
+import functools
+import json
+import mmap
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from . import stats
+
+STREAM = "stream"
+AUTO = "auto"
+# In order of preference for ``auto``.
+BACKENDS = ("msgspec", "orjson", "json")
+# Always available, and already imported, so it costs nothing at startup.
+DEFAULT = "json"
+
+# Below about this size, decoding a notebook whole is faster than streaming it;
+# above it, streaming keeps memory use bounded.
+STREAM_MIN_SIZE = 20 << 20
+
+# Smaller files are read into memory, which is cheaper than mapping them.
+MMAP_MIN_BYTES = 1 << 20
+
+# Backends that decode from any buffer, such as a memory map, without a copy.
+_BUFFER_BACKENDS = ("msgspec", "orjson")
+
+# Set per thread and per asyncio task, so checks embedded in a service can use
+# different backends at once.
+_active_backend: ContextVar[str] = ContextVar("json_backend", default=DEFAULT)
+
+Buffer = Union[bytes, memoryview]
+
+
+@functools.lru_cache(maxsize=None)
+def _is_installed(backend: str) -> bool:
+    if backend == "json":
+        return True
+    try:
+        __import__(backend)
+    except ImportError:
+        return False
+    return True
+
+
+def available_backends() -> List[str]:
+    """Lists the installed backends, in order of preference.
+
+    Returns:
+        List[str]: Names of the installed backends; ``json`` is always last.
+    """
+    return [backend for backend in BACKENDS if _is_installed(backend)]
+
+
+def resolve_backend(name: str) -> str:
+    """Converts a ``--json-backend`` value into the backend to check with.
+
+    Args:
+        name (str): ``stream``, ``auto``, or one of ``BACKENDS``.
+
+    Returns:
+        str: ``stream``, or the name of an installed backend.
+
+    Raises:
+        ValueError: If the backend is unknown or not installed.
+    """
+    if name == STREAM:
+        return name
+    if name == AUTO:
+        return available_backends()[0]
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown JSON backend {name!r}.")
+    if not _is_installed(name):
+        raise ValueError(f"JSON backend {name!r} is not installed.")
+    return name
+
+
+def current() -> str:
+    """Returns the backend notebooks are currently checked with."""
+    return _active_backend.get()
+
+
+@contextmanager
+def using(backend: str) -> Iterator[str]:
+    """Checks notebooks with a backend until the block exits.
+
+    Only checks on this thread, or asyncio task, use it; threads started in
+    the block keep the default backend.
+
+    Args:
+        backend (str): ``stream``, ``auto``, or one of ``BACKENDS``.
+
+    Yields:
+        str: The backend, with ``auto`` resolved.
+
+    Raises:
+        ValueError: If the backend is unknown or not installed.
+    """
+    resolved = resolve_backend(backend)
+    token = _active_backend.set(resolved)
+    try:
+        yield resolved
+    finally:
+        _active_backend.reset(token)
+
+
+@contextmanager
+def read_notebook(notebook_path: str, backend: str = "json") -> Iterator[Buffer]:
+    """Reads a notebook file whole, memory-mapping it if it is large.
+
+    Args:
+        notebook_path (str): Path to the notebook file.
+        backend (str): Backend the content will be decoded with. Files are only
+            mapped for backends that decode from a buffer.
+
+    Yields:
+        Buffer: The file content, only valid until the block exits.
+    """
+    with open(notebook_path, "rb") as notebook_file:
+        size = os.fstat(notebook_file.fileno()).st_size
+        if backend not in _BUFFER_BACKENDS or size < MMAP_MIN_BYTES:
+            yield stats.timed("read")(notebook_file.read)()
+            return
+        with mmap.mmap(notebook_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                yield view
+
+
+@stats.timed("parse")
+def decode(data: Buffer, backend: str = AUTO) -> Dict:
+    """Decodes a whole notebook into dictionaries.
+
+    Args:
+        data (Buffer): The notebook JSON.
+        backend (str): ``auto`` or one of ``BACKENDS``.
+
+    Returns:
+        Dict: Notebook data in dictionary format.
+
+    Raises:
+        ValueError: If the notebook is not valid JSON, or the backend is unknown
+            or not installed.
+    """
+    return _decode(data, resolve_backend(backend))
+
+
+@stats.timed("parse")
+def decode_code_cells(
+    data: Buffer, backend: str = AUTO
+) -> List[Tuple[Optional[int], bool]]:
+    """Decodes only what the run order check needs from a whole notebook.
+
+    Every backend reads notebooks as ``streaming`` does: a missing
+    ``execution_count`` means the cell was not run, a missing ``source`` means
+    it is empty, a cell without ``cell_type`` is not a code cell, and
+    ``"cells": null`` is no cell list.
+
+    Args:
+        data (Buffer): The notebook JSON.
+        backend (str): ``auto`` or one of ``BACKENDS``.
+
+    Returns:
+        List[Tuple[Optional[int], bool]]: The execution count of each code cell
+        and whether it has any source, in notebook order.
+
+    Raises:
+        KeyError: If the notebook has no ``cells`` list.
+        ValueError: If the notebook is not valid JSON, or the backend is unknown
+            or not installed.
+    """
+    backend = resolve_backend(backend)
+    if backend == "msgspec":
+        notebook = _msgspec_notebook_decoder().decode(data)
+        if notebook.cells is None:
+            raise KeyError("cells")
+        return [
+            (cell.execution_count, len(cell.source) > 0)
+            for cell in notebook.cells
+            if cell.cell_type == "code"
+        ]
+    cells = _decode(data, backend).get("cells")
+    if cells is None:
+        raise KeyError("cells")
+    return [
+        (cell.get("execution_count"), len(cell.get("source", "")) > 0)
+        for cell in cells
+        if cell.get("cell_type") == "code"
+    ]
+
+
+def _decode(data: Buffer, backend: str) -> Dict:
+    if backend == "msgspec":
+        return _msgspec().json.decode(data)
+    if backend == "orjson":
+        return _orjson().loads(data)  # pylint: disable=no-member
+    if backend == "json":
+        return json.loads(data)
+    raise ValueError(f"JSON backend {backend!r} can't decode whole notebooks.")
+
+
+def _orjson():
+    import orjson  # pylint: disable=import-outside-toplevel,import-error
+
+    return orjson
+
+
+def _msgspec():
+    import msgspec  # pylint: disable=import-outside-toplevel,import-error
+
+    return msgspec
+
+
+@functools.lru_cache(maxsize=None)
+def _msgspec_notebook_decoder():
+    """Builds the msgspec decoder of the fields the run order check reads."""
+    msgspec = _msgspec()
+
+    class Cell(msgspec.Struct):  # pylint: disable=too-few-public-methods
+        """A notebook cell; every other field is skipped."""
+
+        cell_type: Optional[str] = None
+        execution_count: Optional[int] = None
+        source: Union[str, List[str]] = ""
+
+    class Notebook(msgspec.Struct):  # pylint: disable=too-few-public-methods
+        """A notebook's cells; metadata is skipped."""
+
+        cells: Optional[List[Cell]] = None
+
+    return msgspec.json.Decoder(Notebook)
@@ -0,0 +1,207 @@
+"""Jupyter server extension that checks notebooks as they are saved.
+
+The check runs on the notebook model the server already holds in memory, from a
+pre-save hook of the contents manager, so nothing is read back from disk or
+parsed again. The hook only hands the model to a background thread and returns,
+so saving is never slowed down, however large the notebook. The check itself
+reads just the execution count and source of each code cell, and verdicts are
+cached by a hash of those, so re-saving a notebook after editing outputs,
+metadata or markdown costs no more than the hash.
+
+The latest verdict for each notebook is served as JSON at
+``GET {base_url}/enforce-notebook-run-order/verdict?path=<notebook path>``,
+with ``status`` one of the ``results`` statuses, or ``pending`` while the check
+is running. Enable the extension with::
+
+    jupyter server extension enable enforce_notebook_run_order.jupyter
+
+``jupyter_server`` is only imported when the extension is loaded.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from .api import check_notebook_data
+from .execution_profile import ExecutionProfile
+from .results import CheckResult
+
+ROUTE = "enforce-notebook-run-order/verdict"
+PENDING = "pending"
+
+# Verdicts kept for content that is no longer the latest of any notebook.
+CACHE_SIZE = 1024
+
+
+def profile_hash(profile: ExecutionProfile) -> str:
+    """Hashes everything the run order check depends on in a notebook.
+
+    Args:
+        profile (ExecutionProfile): The notebook's execution profile.
+
+    Returns:
+        str: A digest that only changes when the verdict might.
+    """
+    digest = hashlib.blake2b(profile.counts.tobytes(), digest_size=16)
+    digest.update(profile.has_source)
+    return digest.hexdigest()
+
+
+class SaveChecker:
+    """Checks notebook models as they are saved, keeping the latest verdicts.
+
+    Args:
+        executor (Optional[concurrent.futures.Executor]): Where checks run.
+            Defaults to a single background thread, so the checks of one
+            notebook finish in the order it was saved.
+        cache_size (int): Number of verdicts cached by content hash.
+    """
+
+    def __init__(self, executor=None, cache_size: int = CACHE_SIZE):
+        if executor is None:
+            # pylint: disable-next=import-outside-toplevel
+            from concurrent.futures import ThreadPoolExecutor
+
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="nbcheck")
+        self.executor = executor
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, CheckResult]" = OrderedDict()
+        # Number of saves of each notebook, and the verdict of the latest one
+        # once it is ready.
+        self._saves: Dict[str, int] = {}
+        self._verdicts: Dict[str, Tuple[Optional[str], CheckResult]] = {}
+        self._lock = threading.Lock()
+
+    def pre_save_hook(self, model: Dict, path: str, **_kwargs) -> None:
+        """Contents manager pre-save hook: starts checking a saved notebook.
+
+        Returns straight away; the check runs on the executor.
+
+        Args:
+            model (Dict): The model being saved. Only notebooks are checked.
+            path (str): API path of the notebook, relative to the server root.
+        """
+        content = model.get("content")
+        if model.get("type") != "notebook" or not isinstance(content, dict):
+            return
+        path = path.strip("/")
+        with self._lock:
+            self._saves[path] = save = self._saves.get(path, 0) + 1
+            self._verdicts.pop(path, None)
+        # The contents manager copies the content before writing it, and never
+        # changes the model itself, so it is safe to read from another thread.
+        self.executor.submit(self.check, path, content, save)
+
+    def check(
+        self, path: str, content: Dict, save: Optional[int] = None
+    ) -> CheckResult:
+        """Checks a notebook's content and records the verdict for its path.
+
+        Args:
+            path (str): API path of the notebook.
+            content (Dict): Notebook data in dictionary format.
+            save (Optional[int]): Which save of the notebook this is. The
+                verdict is only recorded if the notebook wasn't saved again since.
+
+        Returns:
+            CheckResult: The verdict.
+        """
+        try:
+            profile = ExecutionProfile.from_notebook(content)
+        except (KeyError, TypeError, AttributeError):
+            digest = None
+            result = check_notebook_data(path, content)
+        else:
+            digest = profile_hash(profile)
+            result = self._cached(digest, path, profile)
+        with self._lock:
+            if save is None or save == self._saves.get(path):
+                self._saves.setdefault(path, 0)
+                self._verdicts[path] = (digest, result)
+        return result
+
+    def _cached(self, digest: str, path: str, profile: ExecutionProfile) -> CheckResult:
+        with self._lock:
+            cached = self._cache.get(digest)
+            if cached is not None:
+                self._cache.move_to_end(digest)
+                return cached._replace(path=path)
+        result = check_notebook_data(path, profile)
+        with self._lock:
+            self._cache[digest] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def verdict(self, path: str) -> Optional[Dict]:
+        """Returns the latest verdict for a notebook, as served over REST.
+
+        Args:
+            path (str): API path of the notebook.
+
+        Returns:
+            Optional[Dict]: The ``CheckResult`` fields, ``valid`` and ``hash``;
+            only ``path`` and ``status`` while the check is pending; or None if
+            the notebook was not saved since the server started.
+        """
+        path = path.strip("/")
+        with self._lock:
+            if path not in self._saves:
+                return None
+            if path not in self._verdicts:
+                return {"path": path, "status": PENDING}
+            digest, result = self._verdicts[path]
+        return {**result._asdict(), "valid": result.valid, "hash": digest}
+
+    def close(self) -> None:
+        """Stops the executor, dropping checks that haven't started."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _verdict_handler():
+    """Builds the REST handler; ``jupyter_server`` is only importable here."""
+    # pylint: disable=import-outside-toplevel,import-error
+    import tornado.web
+    from jupyter_server.base.handlers import APIHandler
+
+    class VerdictHandler(APIHandler):  # pylint: disable=abstract-method
+        """Serves the latest verdict for the notebook named by ``path``."""
+
+        def initialize(self, checker: SaveChecker) -> None:
+            """Sets the checker holding the verdicts."""
+            self.checker = checker  # pylint: disable=attribute-defined-outside-init
+
+        @tornado.web.authenticated
+        def get(self) -> None:
+            """Writes the verdict, or 404 if the notebook was not saved yet."""
+            verdict = self.checker.verdict(self.get_query_argument("path"))
+            if verdict is None:
+                raise tornado.web.HTTPError(404, "No verdict for this notebook yet.")
+            self.finish(verdict)
+
+    return VerdictHandler
+
+
+def _jupyter_server_extension_points():
+    return [{"module": "enforce_notebook_run_order.jupyter"}]
+
+
+def _load_jupyter_server_extension(serverapp) -> None:
+    """Registers the pre-save hook and the verdict endpoint with a server."""
+    # pylint: disable-next=import-outside-toplevel,import-error
+    from jupyter_server.utils import url_path_join
+
+    checker = SaveChecker()
+    serverapp.contents_manager.register_pre_save_hook(checker.pre_save_hook)
+    web_app = serverapp.web_app
+    route = url_path_join(web_app.settings["base_url"], ROUTE)
+    web_app.add_handlers(".*$", [(route, _verdict_handler(), {"checker": checker})])
+    web_app.settings["enforce_notebook_run_order_checker"] = checker
+    serverapp.log.info("enforce-notebook-run-order: checking notebooks on save")
+
+
+def _unload_jupyter_server_extension(serverapp) -> None:
+    checker = serverapp.web_app.settings.pop("enforce_notebook_run_order_checker", None)
+    if checker is not None:
+        checker.close()
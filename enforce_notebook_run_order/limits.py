@@ -0,0 +1,252 @@
+"""Guards that keep one pathological notebook from stalling or sinking a run.
+
+- ``max_file_size``: notebook files larger than this are not decoded whole.
+  Depending on ``oversized`` they are checked with the incremental reader in
+  ``streaming``, whatever the JSON backend, and never read ahead into memory;
+  left out of the run like an excluded file; or reported as not checked.
+- ``timeout``: a notebook still being read after this many seconds is reported
+  as not checked. The deadline is checked between the chunks the incremental
+  reader reads, so it only applies to streamed notebooks: those over
+  ``json_backends.STREAM_MIN_SIZE`` or ``max_file_size``, or every notebook
+  with the ``stream`` backend. Smaller notebooks are decoded whole, which a
+  deadline can't interrupt, so they have none. With several jobs, a batch of
+  notebooks gets ``timeout`` seconds per notebook, after which its worker is
+  killed, so not even a decode that hangs can stall the run; see ``parallel``.
+- ``max_worker_memory``: a worker process whose peak memory use grows past
+  this is replaced once its current batch is done; see ``parallel``.
+
+Notebooks that break a limit are reported as invalid, with an error starting
+with ``NOT_CHECKED``, and their verdicts are not cached, since they depend on the
+limits rather than on the notebook.
+"""
+
+import os
+import re
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import BinaryIO, Iterable, Iterator, NamedTuple, Optional
+
+STREAM = "stream"
+SKIP = "skip"
+ERROR = "error"
+OVERSIZED_ACTIONS = (STREAM, SKIP, ERROR)
+
+NOT_CHECKED = "Not checked: "
+OUT_OF_MEMORY = NOT_CHECKED + "the check ran out of memory."
+WORKER_CRASHED = NOT_CHECKED + "the worker process checking it crashed."
+
+
+def worker_timed_out(timeout: float) -> str:
+    """Returns the error for a notebook whose worker was killed after ``timeout``."""
+    return (
+        f"{NOT_CHECKED}the worker process checking it took longer than "
+        f"{timeout:g} seconds."
+    )
+
+
+_UNITS = {"": 1, "k": 1 << 10, "m": 1 << 20, "g": 1 << 30, "t": 1 << 40}
+_SIZE_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*([kmgt]?)(?:i?b)?", re.IGNORECASE)
+
+
+class ResourceLimitError(Exception):
+    """Raised when a notebook is not checked because it breaks a limit"""
+
+
+class NotebookTooLargeError(ResourceLimitError):
+    """Raised when a notebook file is larger than ``max_file_size``"""
+
+
+class NotebookTimeoutError(ResourceLimitError):
+    """Raised when reading a notebook takes longer than ``timeout``"""
+
+
+class Limits(NamedTuple):
+    """Resource limits for checking notebooks.
+
+    Attributes:
+        max_file_size (Optional[int]): Size in bytes above which notebook
+            files are handled according to ``oversized``; None for no limit.
+        oversized (str): ``STREAM``, ``SKIP`` or ``ERROR``.
+        timeout (Optional[float]): Seconds a streamed notebook may take to
+            read.
+        max_worker_memory (Optional[int]): Peak memory use in bytes above which
+            a worker process is replaced.
+    """
+
+    max_file_size: Optional[int] = None
+    oversized: str = STREAM
+    timeout: Optional[float] = None
+    max_worker_memory: Optional[int] = None
+
+    def is_oversized(self, size: int) -> bool:
+        """Whether a notebook of this many bytes is over ``max_file_size``."""
+        return self.max_file_size is not None and size > self.max_file_size
+
+    def too_large_error(self, size: int) -> NotebookTooLargeError:
+        """Builds the error for a notebook over ``max_file_size``.
+
+        Args:
+            size (int): Size of the notebook file in bytes.
+
+        Returns:
+            NotebookTooLargeError: The error.
+        """
+        return NotebookTooLargeError(
+            f"{NOT_CHECKED}the file is {format_size(size)}, over the limit of "
+            f"{format_size(self.max_file_size)}."
+        )
+
+
+# Set per thread and per asyncio task, like ``json_backends.current``.
+_active_limits: ContextVar[Limits] = ContextVar("limits", default=Limits())
+
+
+def current() -> Limits:
+    """Returns the limits notebooks are currently checked with."""
+    return _active_limits.get()
+
+
+@contextmanager
+def using(limits: Limits) -> Iterator[Limits]:
+    """Checks notebooks with these limits until the block exits.
+
+    Only checks on this thread, or asyncio task, use them; threads started in
+    the block keep the default limits.
+
+    Args:
+        limits (Limits): The limits.
+
+    Yields:
+        Limits: The limits.
+    """
+    token = _active_limits.set(limits)
+    try:
+        yield limits
+    finally:
+        _active_limits.reset(token)
+
+
+def parse_size(text: str) -> int:
+    """Converts a size such as ``500M`` or ``2GiB`` into bytes.
+
+    Args:
+        text (str): A number of bytes, optionally followed by ``K``, ``M``, ``G``
+            or ``T`` for binary multiples, and ``B`` or ``iB``.
+
+    Returns:
+        int: The size in bytes.
+
+    Raises:
+        ValueError: If the text is not a size.
+    """
+    match = _SIZE_PATTERN.fullmatch(text.strip())
+    if match is None:
+        raise ValueError(f"Not a size: {text!r}.")
+    number, unit = match.groups()
+    return int(float(number) * _UNITS[unit.lower()])
+
+
+def format_size(size: int) -> str:
+    """Formats a number of bytes for messages, such as ``3.2 GiB``.
+
+    Args:
+        size (int): Number of bytes.
+
+    Returns:
+        str: The size with a binary unit.
+    """
+    for unit in ("TiB", "GiB", "MiB", "KiB"):
+        multiple = _UNITS[unit[0].lower()]
+        if size >= multiple:
+            return f"{size / multiple:.1f} {unit}"
+    return f"{size} bytes"
+
+
+def is_limit_error(error: Optional[str]) -> bool:
+    """Whether a verdict's error says the notebook broke a limit.
+
+    Args:
+        error (Optional[str]): The error of a ``NotebookResult``.
+
+    Returns:
+        bool: True if the notebook was not checked.
+    """
+    return error is not None and error.startswith(NOT_CHECKED)
+
+
+def file_size(notebook_path: str) -> int:
+    """Returns the size of a notebook file, or 0 if it can't be read."""
+    try:
+        return os.path.getsize(notebook_path)
+    except OSError:
+        return 0
+
+
+def skip_oversized(notebook_paths: Iterable[str]) -> Iterator[str]:
+    """Leaves out notebooks over ``max_file_size`` if they are to be skipped.
+
+    Args:
+        notebook_paths (Iterable[str]): Paths to the notebook files.
+
+    Yields:
+        str: The paths of the notebooks to check, in order.
+    """
+    limits = current()
+    if limits.max_file_size is None or limits.oversized != SKIP:
+        yield from notebook_paths
+        return
+    for notebook_path in notebook_paths:
+        if not limits.is_oversized(file_size(notebook_path)):
+            yield notebook_path
+
+
+class _DeadlineReader:  # pylint: disable=too-few-public-methods
+    """Wraps a stream, raising ``NotebookTimeoutError`` once time is up."""
+
+    def __init__(self, stream: BinaryIO, timeout: float):
+        self._stream = stream
+        self._timeout = timeout
+        self._deadline = time.monotonic() + timeout
+
+    def read(self, size: int = -1) -> bytes:
+        """Reads from the stream, unless the deadline has passed."""
+        if time.monotonic() > self._deadline:
+            raise NotebookTimeoutError(
+                f"{NOT_CHECKED}reading the notebook took longer than "
+                f"{self._timeout:g} seconds."
+            )
+        return self._stream.read(size)
+
+
+def with_deadline(stream: BinaryIO) -> BinaryIO:
+    """Makes reading a notebook fail once it has taken longer than ``timeout``.
+
+    Args:
+        stream (BinaryIO): The open notebook.
+
+    Returns:
+        BinaryIO: ``stream`` itself if there is no timeout, or a reader whose
+        ``read`` raises ``NotebookTimeoutError`` after the deadline.
+    """
+    timeout = current().timeout
+    if timeout is None:
+        return stream
+    return _DeadlineReader(stream, timeout)
+
+
+def peak_memory() -> Optional[int]:
+    """Returns the peak memory use of this process in bytes.
+
+    Returns:
+        Optional[int]: The peak resident set size, or None on platforms without
+        the ``resource`` module, such as Windows.
+    """
+    try:
+        import resource  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in kilobytes on Linux, and in bytes on macOS.
+    return peak if sys.platform == "darwin" else peak * 1024
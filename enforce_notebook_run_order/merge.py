@@ -0,0 +1,73 @@
+"""Combines the results of several runs, such as the shards of a CI job.
+
+Each run writes its verdicts with ``--format jsonl``; ``merge_results`` reads
+them back so they can be reported once, in any format, with a single summary and
+exit status. A result file without a summary record is rejected, since the run
+that wrote it did not finish and notebooks may be missing from it.
+"""
+
+import json
+from typing import Dict, Iterable, List, TextIO
+
+from .results import NotebookResult
+
+
+def read_results(stream: TextIO, name: str = "<stream>") -> List[NotebookResult]:
+    """Reads the verdicts written by a run with ``--format jsonl``.
+
+    Args:
+        stream (TextIO): The JSON Lines output of the run.
+        name (str): Name of the stream, for error messages.
+
+    Returns:
+        List[NotebookResult]: The verdict for every notebook, in the order they
+        were reported.
+
+    Raises:
+        ValueError: If a line is not a JSON Lines record, or there is no summary.
+    """
+    results = []
+    finished = False
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            if record["type"] == "summary":
+                finished = True
+            elif record["type"] == "notebook":
+                results.append(NotebookResult(record["path"], record["error"]))
+        except (ValueError, KeyError, TypeError) as error:
+            raise ValueError(
+                f"{name}:{line_number}: not a JSON Lines result record: {error}"
+            ) from error
+    if not finished:
+        raise ValueError(
+            f"{name} has no summary record; the run that wrote it did not finish."
+        )
+    return results
+
+
+def merge_results(result_paths: Iterable[str]) -> List[NotebookResult]:
+    """Reads and combines the results of several runs.
+
+    Args:
+        result_paths (Iterable[str]): Files written with ``--format jsonl``.
+
+    Returns:
+        List[NotebookResult]: The verdict for every notebook, sorted by path. A
+        notebook reported by more than one run appears once, invalid if any
+        run found it invalid.
+
+    Raises:
+        OSError: If a file can't be read.
+        ValueError: If a file is not a complete JSON Lines result file.
+    """
+    merged: Dict[str, NotebookResult] = {}
+    for result_path in result_paths:
+        with open(result_path, encoding="utf-8") as result_file:
+            for result in read_results(result_file, result_path):
+                previous = merged.get(result.path)
+                if previous is None or previous.valid:
+                    merged[result.path] = result
+    return [merged[path] for path in sorted(merged)]
@@ -0,0 +1,430 @@
+"""Checks many notebooks at once across a pool of worker processes.
+
+Notebooks are grouped into batches so that small files don't pay a round-trip to
+a worker each, and the largest batches are submitted first so that one giant
+notebook found late in the walk can't set the total runtime. Verdicts are always
+reported in the order the notebooks were given, regardless of which worker
+finishes first.
+
+Batches are handed to the pool a few at a time rather than all at once, so the
+pool can be replaced part way through: when a worker grows past
+``limits.Limits.max_worker_memory``, and when a worker dies, say killed by the
+OOM killer, which takes the whole pool down with it. The notebooks of batches
+lost in a crash are retried one at a time, each alone in the pool, so a notebook
+that crashes a worker again is reported as not checked, and only that one.
+
+With a ``limits.Limits.timeout``, each batch must finish within ``timeout``
+seconds per notebook. When it doesn't, the pool is killed and replaced, the
+notebooks of the late batch are retried alone like those of a crash, and the
+other batches that were running are started again.
+
+With a verdict cache, the parent only looks up notebooks whose size and mtime
+are unchanged, which costs a ``stat`` each. The workers hash the content they
+read for the check and hand the hash back to be stored with the verdict, so
+every other notebook is read once, in a worker.
+"""
+
+import os
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import Container, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from . import json_backends, limits, stats
+from .cache import data_digest
+from .enforce_notebook_run_order import (
+    READ_ERRORS,
+    VERDICT_ERRORS,
+    check_notebook_file,
+    is_cacheable,
+    read_unless_oversized,
+    report_notebook,
+    verdict_result,
+)
+from .results import CheckResult, NotebookResult, read_error
+
+# A batch is closed once it holds this many notebooks or this many bytes.
+BATCH_MAX_NOTEBOOKS = 64
+BATCH_MAX_BYTES = 4 * 1024 * 1024
+
+
+def resolve_jobs(jobs: str) -> int:
+    """Converts a ``--jobs`` value into a number of worker processes.
+
+    Args:
+        jobs (str): A positive integer, or ``auto`` for one worker per CPU core.
+
+    Returns:
+        int: Number of worker processes to use.
+
+    Raises:
+        ValueError: If ``jobs`` is neither ``auto`` nor a positive integer.
+    """
+    if jobs == "auto":
+        return os.cpu_count() or 1
+    count = int(jobs)
+    if count < 1:
+        raise ValueError(f"Number of jobs must be at least 1, got {count}.")
+    return count
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def make_batches(
+    notebook_paths: Sequence[str], skip: Container[int] = ()
+) -> List[List[Tuple[int, str]]]:
+    """Groups notebooks into batches, largest notebooks first.
+
+    Args:
+        notebook_paths (Sequence[str]): Paths to the notebook files.
+        skip (Container[int]): Indices of notebooks to leave out.
+
+    Returns:
+        List[List[Tuple[int, str]]]: Batches of ``(index, path)`` pairs, where
+        ``index`` is the position of the path in ``notebook_paths``.
+    """
+    sized = sorted(
+        (
+            (_file_size(path), index, path)
+            for index, path in enumerate(notebook_paths)
+            if index not in skip
+        ),
+        reverse=True,
+    )
+    batches = []
+    batch = []
+    batch_bytes = 0
+    for size, index, path in sized:
+        if batch and (
+            len(batch) >= BATCH_MAX_NOTEBOOKS or batch_bytes + size > BATCH_MAX_BYTES
+        ):
+            batches.append(batch)
+            batch = []
+            batch_bytes = 0
+        batch.append((index, path))
+        batch_bytes += size
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _check_batch(
+    batch: List[Tuple[int, str]],
+    collect_stats: bool = False,
+    json_backend: str = json_backends.DEFAULT,
+    with_digests: bool = False,
+) -> Tuple[
+    List[Tuple[int, Optional[str]]], Optional[stats.StatsCollector], Dict[int, str]
+]:
+    """Worker entry point: checks a batch of notebooks without printing.
+
+    Notebooks are decoded with ``json_backend``, the parent's backend. Returns
+    the verdicts, with ``collect_stats`` the worker's stats for the batch, to be
+    merged into the parent's, and with ``with_digests`` the ``cache.data_digest``
+    of each notebook read whole.
+    """
+    collector = stats.StatsCollector() if collect_stats else None
+    verdicts = []
+    digests = {}
+    with (
+        stats.collecting(collector) if collector else nullcontext()
+    ), json_backends.using(json_backend):
+        for index, path in batch:
+            try:
+                data = read_unless_oversized(path) if with_digests else None
+                if data is not None:
+                    digests[index] = data_digest(data)
+                check_notebook_file(path, data)
+            except VERDICT_ERRORS as error:
+                verdicts.append((index, str(error)))
+            except READ_ERRORS as error:
+                verdicts.append((index, read_error(error)))
+            except MemoryError:
+                verdicts.append((index, limits.OUT_OF_MEMORY))
+            else:
+                verdicts.append((index, None))
+    return verdicts, collector, digests
+
+
+Verdicts = List[Tuple[int, Optional[str]]]
+
+# Verdicts, stats and digests of a batch, as returned by ``_check_batch``.
+BatchResult = Tuple[Verdicts, Optional[stats.StatsCollector], Dict[int, str]]
+
+
+def _run_batch(
+    batch: List[Tuple[int, str]],
+    collect_stats: bool,
+    json_backend: str,
+    resource_limits: limits.Limits,
+    with_digests: bool,
+) -> Tuple[BatchResult, bool]:
+    """Worker entry point: ``_check_batch`` under the parent's limits.
+
+    Also returns whether the worker should be replaced, because it ran out of
+    memory or its peak memory use is over ``max_worker_memory``.
+    """
+    with limits.using(resource_limits):
+        batch_result = _check_batch(batch, collect_stats, json_backend, with_digests)
+    verdicts = batch_result[0]
+    worn_out = any(error == limits.OUT_OF_MEMORY for _, error in verdicts)
+    if resource_limits.max_worker_memory is not None:
+        peak = limits.peak_memory()
+        worn_out = worn_out or (
+            peak is not None and peak > resource_limits.max_worker_memory
+        )
+    return batch_result, worn_out
+
+
+class _WorkerPool:
+    """Process pool that is replaced when a worker wears out, crashes or hangs.
+
+    Args:
+        jobs (int): Number of worker processes.
+        batches (List[List[Tuple[int, str]]]): Batches to check, in order.
+        collect_stats (bool): Collect stats in the workers.
+        with_digests (bool): Hash the notebooks in the workers, for the cache.
+    """
+
+    def __init__(
+        self,
+        jobs: int,
+        batches: List[List[Tuple[int, str]]],
+        collect_stats: bool,
+        with_digests: bool = False,
+    ):
+        self.jobs = jobs
+        self._batches: Deque[List[Tuple[int, str]]] = deque(batches)
+        # Notebooks of batches lost in a crash, to retry one at a time.
+        self._suspects: Deque[Tuple[int, str]] = deque()
+        # Each running batch, whether it runs alone, the pool it runs in and
+        # its deadline.
+        self._running: Dict = {}
+        self._args = (
+            collect_stats,
+            json_backends.current(),
+            limits.current(),
+            with_digests,
+        )
+        self._timeout = limits.current().timeout
+        self._executor = self._new_executor()
+
+    def _new_executor(self):
+        # pylint: disable-next=import-outside-toplevel
+        from concurrent.futures import ProcessPoolExecutor
+
+        return ProcessPoolExecutor(max_workers=self.jobs)
+
+    def _start(self, batch: List[Tuple[int, str]], alone: bool) -> None:
+        future = self._executor.submit(_run_batch, batch, *self._args)
+        deadline = None
+        if self._timeout is not None:
+            deadline = time.monotonic() + self._timeout * len(batch)
+        self._running[future] = (batch, alone, self._executor, deadline)
+
+    def _submit(self) -> None:
+        # With a timeout, batches are only submitted when a worker is free to
+        # start them, so their deadlines don't run while they wait in the queue.
+        window = 2 * self.jobs if self._timeout is None else self.jobs
+        while self._batches and len(self._running) < window:
+            self._start(self._batches.popleft(), False)
+        if self._suspects and not self._running:
+            self._start([self._suspects.popleft()], True)
+
+    def _time_left(self) -> Optional[float]:
+        deadlines = [entry[3] for entry in self._running.values() if entry[3]]
+        if not deadlines:
+            return None
+        return max(0.0, min(deadlines) - time.monotonic())
+
+    def wait(self) -> List[BatchResult]:
+        """Waits for at least one batch to finish.
+
+        Returns:
+            List[BatchResult]: The verdicts, stats and digests of each finished
+            batch; empty once every batch is done.
+        """
+        # pylint: disable-next=import-outside-toplevel
+        from concurrent.futures import FIRST_COMPLETED, wait
+        from concurrent.futures.process import (  # pylint: disable=import-outside-toplevel
+            BrokenProcessPool,
+        )
+
+        finished = []
+        while not finished:
+            self._submit()
+            if not self._running:
+                break
+            done, _ = wait(
+                self._running, timeout=self._time_left(), return_when=FIRST_COMPLETED
+            )
+            if not done:
+                finished.extend(self._kill_late_batches())
+                continue
+            replace = False
+            for future in done:
+                batch, alone, executor, _ = self._running.pop(future)
+                try:
+                    batch_result, worn_out = future.result()
+                except BrokenProcessPool:
+                    worn_out = True
+                    if alone:
+                        batch_result = (
+                            [(index, limits.WORKER_CRASHED) for index, _ in batch],
+                            None,
+                            {},
+                        )
+                    else:
+                        self._suspects.extend(batch)
+                        batch_result = None
+                # A pool that was already replaced is not replaced again.
+                replace = replace or (worn_out and executor is self._executor)
+                if batch_result is not None:
+                    finished.append(batch_result)
+            if replace:
+                # Running batches finish in the old workers, which then exit.
+                self._executor.shutdown(wait=False)
+                self._executor = self._new_executor()
+        return finished
+
+    def _kill_late_batches(self) -> List[BatchResult]:
+        """Kills the pools running batches past their deadline.
+
+        Returns:
+            List[BatchResult]: The verdicts of late notebooks that ran alone,
+            which are reported as not checked.
+        """
+        now = time.monotonic()
+        late = {
+            future
+            for future, (_, _, _, deadline) in self._running.items()
+            if deadline is not None and deadline <= now and not future.done()
+        }
+        finished = []
+        doomed = {self._running[future][2] for future in late}
+        for future in list(self._running):
+            batch, alone, executor, _ = self._running[future]
+            if executor not in doomed:
+                continue
+            del self._running[future]
+            if future not in late:
+                # Lost to someone else's timeout: start it again as it was.
+                if alone:
+                    self._suspects.appendleft(batch[0])
+                else:
+                    self._batches.appendleft(batch)
+            elif alone:
+                error = limits.worker_timed_out(self._timeout)
+                finished.append(([(index, error) for index, _ in batch], None, {}))
+            else:
+                self._suspects.extend(batch)
+        for executor in doomed:
+            _kill(executor)
+        if self._executor in doomed:
+            self._executor = self._new_executor()
+        return finished
+
+    def close(self) -> None:
+        """Stops the workers, dropping batches that haven't started."""
+        self._batches.clear()
+        self._suspects.clear()
+        self._executor.shutdown(wait=not self._running, cancel_futures=True)
+
+
+def _kill(executor) -> None:
+    """Terminates the workers of a process pool, which can be stuck."""
+    # ProcessPoolExecutor has no public way to stop a busy worker before
+    # Python 3.14's terminate_workers().
+    # pylint: disable-next=protected-access
+    for process in list((executor._processes or {}).values()):
+        process.terminate()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def check_notebooks_parallel(
+    notebook_paths: Sequence[str], jobs: int, fail_fast: bool = False, cache=None
+) -> List[NotebookResult]:
+    """Checks notebooks in worker processes and reports them in the given order.
+
+    Args:
+        notebook_paths (Sequence[str]): Paths to the notebook files.
+        jobs (int): Number of worker processes.
+        fail_fast (bool): Cancel outstanding work after the first invalid notebook.
+        cache (Optional[cache.ResultCache]): Cache of verdicts from previous runs.
+
+    Returns:
+        List[NotebookResult]: The verdict for every checked notebook, in the given
+        order. With ``fail_fast``, notebooks that were cancelled are left out.
+    """
+    results = []
+    for result in iter_notebooks_parallel(notebook_paths, jobs, fail_fast, cache):
+        results.append(NotebookResult(result.path, result.error))
+        report_notebook(*results[-1])
+    return results
+
+
+def iter_notebooks_parallel(  # pylint: disable=too-many-locals,too-many-branches
+    notebook_paths: Sequence[str], jobs: int, fail_fast: bool = False, cache=None
+) -> Iterator[CheckResult]:
+    """Checks notebooks in worker processes, yielding verdicts in the given order.
+
+    Closing the generator early stops the workers.
+
+    Args:
+        notebook_paths (Sequence[str]): Paths to the notebook files. Those over
+            the size limit are left out if ``limits`` says to skip them.
+        jobs (int): Number of worker processes.
+        fail_fast (bool): Cancel outstanding work after the first invalid
+            notebook, still yielding the verdicts that had come in.
+        cache (Optional[cache.ResultCache]): Cache of verdicts from previous runs.
+            Only notebooks whose size or mtime changed are sent to the workers.
+
+    Yields:
+        CheckResult: The verdict for every checked notebook, in the given order.
+        The offending cell is left out, as workers only hand back the error.
+    """
+    notebook_paths = list(limits.skip_oversized(notebook_paths))
+    verdicts = {}
+    collector = stats.current()
+    if cache is not None:
+        for index, path in enumerate(notebook_paths):
+            cached = cache.get_unchanged(path)
+            if cached is not None:
+                verdicts[index] = cached.error
+    next_to_report = 0
+    all_valid = all(error is None for error in verdicts.values())
+    batches = []
+    if all_valid or not fail_fast:
+        batches = make_batches(notebook_paths, skip=verdicts)
+    pool = _WorkerPool(jobs, batches, collector is not None, cache is not None)
+    try:
+        while True:
+            # Yield the longest finished prefix so output order is deterministic.
+            while next_to_report in verdicts:
+                yield verdict_result(
+                    notebook_paths[next_to_report], verdicts.pop(next_to_report)
+                )
+                next_to_report += 1
+            if fail_fast and not all_valid:
+                break
+            finished = pool.wait()
+            if not finished:
+                break
+            for batch_verdicts, batch_stats, digests in finished:
+                if batch_stats is not None:
+                    collector.merge(batch_stats)
+                for index, error in batch_verdicts:
+                    verdicts[index] = error
+                    all_valid = all_valid and error is None
+                    if cache is not None and is_cacheable(error):
+                        cache.put(notebook_paths[index], error, digests.get(index))
+    finally:
+        pool.close()
+    # After a fail-fast stop, yield whatever finished, still in order.
+    for index in sorted(verdicts):
+        yield verdict_result(notebook_paths[index], verdicts[index])
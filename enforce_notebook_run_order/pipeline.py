@@ -0,0 +1,160 @@
+"""Reads notebooks ahead in background threads while earlier ones are checked.
+
+On network filesystems most of a run is spent waiting on ``open`` and ``read``,
+one notebook at a time. ``prefetch_notebooks`` keeps several reads in flight on
+a thread pool, so the latency of each is hidden behind the others and behind
+the checks running on the main thread. Notebooks are still yielded in order.
+
+Read-ahead is bounded twice: at most ``depth`` notebooks are read ahead, and no
+further reads start while ``max_bytes`` of notebooks are being read or waiting
+to be checked, so a slow check never causes the corpus to pile up in memory.
+The size of each notebook is reserved when its read starts, going by a
+``stat`` also run on the thread pool, and released when it is yielded.
+Notebooks larger than ``max_file_size`` are not read ahead at all, and are left
+to be streamed from disk when they are checked. Notebooks that can't be read
+are yielded without content too, and read again when checked, so the error is
+reported like it would be without read-ahead.
+"""
+
+import os
+from collections import deque
+from typing import Deque, Iterable, Iterator, Optional, Tuple
+
+DEFAULT_DEPTH = 16
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def read_notebook_bytes(notebook_path: str) -> bytes:
+    """Reads a notebook file whole.
+
+    Args:
+        notebook_path (str): Path to the notebook file.
+
+    Returns:
+        bytes: The file content.
+    """
+    with open(notebook_path, "rb") as notebook_file:
+        return notebook_file.read()
+
+
+def _file_size(notebook_path: str) -> int:
+    try:
+        return os.path.getsize(notebook_path)
+    except OSError:
+        # The read fails too, and reports the error in turn.
+        return 0
+
+
+def _read_unless_unreadable(notebook_path: str) -> Optional[bytes]:
+    try:
+        return read_notebook_bytes(notebook_path)
+    except OSError:
+        # Read again when the notebook is checked, which reports the error.
+        return None
+
+
+class _ReadAhead:  # pylint: disable=too-few-public-methods
+    """A notebook being read ahead: first its size, then its content.
+
+    Attributes:
+        notebook_path (str): Path to the notebook file.
+        size (Future): Its size, from a ``stat`` on the thread pool.
+        content (Optional[Future]): Its content, once the read has started and
+            unless the notebook is over ``max_file_size``.
+        started (bool): Whether it was decided to read it or not.
+        reserved (int): Bytes reserved for the read.
+    """
+
+    def __init__(self, notebook_path: str, size):
+        self.notebook_path = notebook_path
+        self.size = size
+        self.content = None
+        self.started = False
+        self.reserved = 0
+
+    def start(self, executor, max_file_size: Optional[int]) -> int:
+        """Starts reading the notebook unless it is over ``max_file_size``.
+
+        Waits for its size, if it isn't known yet.
+
+        Args:
+            executor (ThreadPoolExecutor): The pool to read on.
+            max_file_size (Optional[int]): Size above which it is not read.
+
+        Returns:
+            int: The bytes reserved for the read.
+        """
+        size = self.size.result()
+        self.started = True
+        if max_file_size is not None and size > max_file_size:
+            return 0
+        self.content = executor.submit(_read_unless_unreadable, self.notebook_path)
+        self.reserved = size
+        return size
+
+
+def prefetch_notebooks(
+    notebook_paths: Iterable[str],
+    depth: int = DEFAULT_DEPTH,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    max_file_size: Optional[int] = None,
+) -> Iterator[Tuple[str, Optional[bytes]]]:
+    """Yields the content of notebooks, reading the next ones in the background.
+
+    Args:
+        notebook_paths (Iterable[str]): Paths to the notebook files. Consumed
+            lazily, ``depth`` paths ahead of the notebook being yielded.
+        depth (int): Maximum number of notebooks read ahead.
+        max_bytes (int): Size of the notebooks being read or waiting to be
+            yielded above which no further reads are started.
+        max_file_size (Optional[int]): Size above which notebooks are not read.
+
+    Yields:
+        Tuple[str, Optional[bytes]]: Path and content of each notebook, in
+        order. The content is None for notebooks over ``max_file_size``, and
+        for those that couldn't be read, so that checking them reads them again
+        and reports the error.
+
+    Raises:
+        ValueError: If ``depth`` is less than 1.
+    """
+    # Imported here to keep the thread pool out of the startup of normal runs.
+    from concurrent.futures import (  # pylint: disable=import-outside-toplevel
+        ThreadPoolExecutor,
+    )
+
+    if depth < 1:
+        raise ValueError("depth must be at least 1")
+    paths = iter(notebook_paths)
+    executor = ThreadPoolExecutor(max_workers=depth)
+    pending: Deque[_ReadAhead] = deque()
+    reserved = 0
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < depth:
+                notebook_path = next(paths, None)
+                if notebook_path is None:
+                    exhausted = True
+                    break
+                size = executor.submit(_file_size, notebook_path)
+                pending.append(_ReadAhead(notebook_path, size))
+            if not pending:
+                return
+            for read_ahead in pending:
+                if reserved >= max_bytes:
+                    break
+                if not read_ahead.started and read_ahead.size.done():
+                    reserved += read_ahead.start(executor, max_file_size)
+            read_ahead = pending.popleft()
+            if not read_ahead.started:
+                # Needed next, so read even while over max_bytes.
+                reserved += read_ahead.start(executor, max_file_size)
+            reserved -= read_ahead.reserved
+            content = read_ahead.content
+            yield read_ahead.notebook_path, (
+                None if content is None else content.result()
+            )
+    finally:
+        # Reads not yet started are dropped if the consumer stops early.
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,385 @@
+"""Writes notebook verdicts and the run summary in one of several output formats.
+
+``rich`` prints styled, colored verdicts to the terminal. ``rich`` itself is only
+imported once something is printed in that format, and ``auto``, the default on
+the command line, picks ``plain`` when output is not a terminal, as under
+pre-commit or in CI, so those runs never import it. The other formats skip
+markup rendering entirely and write through an in-memory buffer that is flushed
+in large chunks, which matters when tens of thousands of notebooks are checked:
+
+- ``plain``: the same verdicts as ``rich``, without color or emoji.
+- ``jsonl``: one JSON object per notebook, then one for the summary.
+- ``junit``: a JUnit XML report with one test case per notebook, for CI systems.
+- ``sarif``: a SARIF 2.1.0 log with one result per invalid notebook, for code
+  scanning dashboards.
+
+With ``quiet``, valid notebooks are left out of every format, and the summary is
+only written when a notebook is invalid.
+"""
+
+import json
+import os
+import sys
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Type
+
+from . import stats
+from .results import NotebookResult, RunSummary, summarize
+
+# Buffered output is written out once it grows past this many characters.
+BUFFER_SIZE = 1 << 16
+
+TOOL_NAME = "enforce-notebook-run-order"
+TOOL_URI = "https://github.com/cmhac/enforce-notebook-run-order"
+
+
+class Reporter:
+    """Base class of the output formats.
+
+    Output is collected in a buffer and written to the stream in large chunks.
+    Subclasses override ``write_notebook`` and ``write_summary``, or collect
+    results and write them all from ``close``.
+
+    Args:
+        stream (Optional[TextIO]): Stream to write to. Defaults to whatever
+            ``sys.stdout`` is when the buffer is flushed.
+        quiet (bool): Only report invalid notebooks.
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, quiet: bool = False):
+        self.quiet = quiet
+        self._stream = stream
+        self._buffer: List[str] = []
+        self._buffered = 0
+
+    def write(self, text: str) -> None:
+        """Adds text to the buffer, flushing it once it is large enough.
+
+        Args:
+            text (str): Text to write.
+        """
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= BUFFER_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes out the buffer."""
+        if self._buffer:
+            stream = self._stream or sys.stdout
+            stream.write("".join(self._buffer))
+            stream.flush()
+            self._buffer = []
+            self._buffered = 0
+
+    def notebook(self, result: NotebookResult) -> None:
+        """Reports the verdict for a single notebook.
+
+        Args:
+            result (NotebookResult): The verdict.
+        """
+        if not (self.quiet and result.valid):
+            self.write_notebook(result)
+
+    def summary(self, results: Iterable[NotebookResult]) -> None:
+        """Reports the counts of valid and invalid notebooks after a run.
+
+        Args:
+            results (Iterable[NotebookResult]): Results of every notebook checked.
+        """
+        self._summary(summarize(results))
+
+    def report(self, results: Iterable[NotebookResult]) -> RunSummary:
+        """Reports each verdict as it arrives, then the summary.
+
+        Only the paths of invalid notebooks are kept, so a stream of any length,
+        such as one from ``api.iter_check``, can be reported. When ``stats`` are
+        being collected, reporting is timed and each notebook's ``events`` end
+        once it is reported.
+
+        Args:
+            results (Iterable[NotebookResult]): Results of every notebook checked.
+
+        Returns:
+            RunSummary: Number of notebooks checked and paths of the invalid ones.
+        """
+        collector = stats.current()
+        write_notebook = stats.timed("report")(self.notebook)
+        checked = 0
+        invalid_paths = []
+        for result in results:
+            write_notebook(result)
+            if collector is not None:
+                collector.notebook_done(result.path, result.valid)
+            checked += 1
+            if not result.valid:
+                invalid_paths.append(result.path)
+        summary = RunSummary(checked, invalid_paths)
+        stats.timed("report")(self._summary)(summary)
+        return summary
+
+    def _summary(self, summary: RunSummary) -> None:
+        if not (self.quiet and summary.invalid == 0):
+            self.write_summary(summary)
+
+    def write_notebook(self, result: NotebookResult) -> None:
+        """Formats the verdict for a single notebook."""
+
+    def write_summary(self, summary: RunSummary) -> None:
+        """Formats the summary of a run."""
+
+    def close(self) -> None:
+        """Finishes the report and writes out anything still buffered."""
+        self.flush()
+
+
+class RichReporter(Reporter):
+    """Styled, colored verdicts for the terminal, printed as they come."""
+
+    def __init__(self, stream: Optional[TextIO] = None, quiet: bool = False):
+        super().__init__(stream, quiet)
+        self._console = None
+
+    @property
+    def console(self):
+        """The ``rich`` console verdicts are printed on, created on first use."""
+        if self._console is None:
+            # pylint: disable=import-outside-toplevel
+            from rich.console import Console
+
+            self._console = Console(file=self._stream)
+        return self._console
+
+    def write_notebook(self, result: NotebookResult) -> None:
+        if result.valid:
+            # Print success with styling
+            self.console.print(f"✅ [bold green]VALID:[/bold green] {result.path}")
+        else:
+            # Print error with styling
+            self.console.print(f"\n❌ [bold red]INVALID:[/bold red] {result.path}")
+            self.console.print(f"[yellow]Error:[/yellow] {result.error}\n", style="dim")
+
+    def write_summary(self, summary: RunSummary) -> None:
+        self.console.print(
+            f"\nChecked {summary.checked} notebook(s): "
+            f"[bold green]{summary.valid} valid[/bold green], "
+            f"[bold red]{summary.invalid} invalid[/bold red]."
+        )
+        for path in summary.invalid_paths:
+            self.console.print(f"  ❌ {path}")
+
+
+class PlainReporter(Reporter):
+    """The same verdicts as ``RichReporter``, as unstyled text."""
+
+    def write_notebook(self, result: NotebookResult) -> None:
+        if result.valid:
+            self.write(f"VALID: {result.path}\n")
+        else:
+            self.write(f"\nINVALID: {result.path}\nError: {result.error}\n\n")
+
+    def write_summary(self, summary: RunSummary) -> None:
+        self.write(
+            f"\nChecked {summary.checked} notebook(s): "
+            f"{summary.valid} valid, {summary.invalid} invalid.\n"
+        )
+        for path in summary.invalid_paths:
+            self.write(f"  {path}\n")
+
+
+class JsonLinesReporter(Reporter):
+    """One JSON object per line: a ``notebook`` record per notebook, then a ``summary``."""
+
+    def write_notebook(self, result: NotebookResult) -> None:
+        record = {
+            "type": "notebook",
+            "path": result.path,
+            "valid": result.valid,
+            "error": result.error,
+        }
+        self.write(json.dumps(record) + "\n")
+
+    def write_summary(self, summary: RunSummary) -> None:
+        record = {
+            "type": "summary",
+            "checked": summary.checked,
+            "valid": summary.valid,
+            "invalid": summary.invalid,
+            "invalid_paths": summary.invalid_paths,
+        }
+        self.write(json.dumps(record) + "\n")
+
+
+class JUnitReporter(Reporter):
+    """A JUnit XML report with one test case per notebook, written on ``close``."""
+
+    def __init__(self, stream: Optional[TextIO] = None, quiet: bool = False):
+        super().__init__(stream, quiet)
+        self._results: List[NotebookResult] = []
+
+    def write_notebook(self, result: NotebookResult) -> None:
+        self._results.append(result)
+
+    def close(self) -> None:
+        # pylint: disable=import-outside-toplevel
+        import xml.etree.ElementTree as ET
+
+        failures = sum(not result.valid for result in self._results)
+        attributes = {"tests": str(len(self._results)), "failures": str(failures)}
+        testsuites = ET.Element("testsuites", name=TOOL_NAME, **attributes)
+        testsuite = ET.SubElement(testsuites, "testsuite", name=TOOL_NAME, **attributes)
+        for result in self._results:
+            testcase = ET.SubElement(
+                testsuite,
+                "testcase",
+                classname=TOOL_NAME,
+                name=result.path,
+                file=result.path,
+            )
+            if not result.valid:
+                failure = ET.SubElement(
+                    testcase,
+                    "failure",
+                    type="NotebookRunOrderError",
+                    message=result.error.split("\n", 1)[0],
+                )
+                failure.text = result.error
+        self.write('<?xml version="1.0" encoding="utf-8"?>\n')
+        self.write(ET.tostring(testsuites, encoding="unicode") + "\n")
+        super().close()
+
+
+class SarifReporter(Reporter):
+    """A SARIF 2.1.0 log with one result per invalid notebook, written on ``close``."""
+
+    RULE_ID = "notebook-run-order"
+
+    def __init__(self, stream: Optional[TextIO] = None, quiet: bool = False):
+        super().__init__(stream, quiet)
+        self._results: List[Dict] = []
+
+    def write_notebook(self, result: NotebookResult) -> None:
+        if result.valid:
+            return
+        self._results.append(
+            {
+                "ruleId": self.RULE_ID,
+                "level": "error",
+                "message": {"text": result.error},
+                "locations": [
+                    {
+                        "physicalLocation": {
+                            "artifactLocation": {
+                                "uri": result.path.replace(os.sep, "/")
+                            }
+                        }
+                    }
+                ],
+            }
+        )
+
+    def close(self) -> None:
+        log = {
+            "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
+            "version": "2.1.0",
+            "runs": [
+                {
+                    "tool": {
+                        "driver": {
+                            "name": TOOL_NAME,
+                            "informationUri": TOOL_URI,
+                            "rules": [
+                                {
+                                    "id": self.RULE_ID,
+                                    "shortDescription": {
+                                        "text": "Notebook cells must be run in order"
+                                    },
+                                    "help": {
+                                        "text": "Restart the notebook kernel and "
+                                        "run all cells sequentially."
+                                    },
+                                }
+                            ],
+                        }
+                    },
+                    "results": self._results,
+                }
+            ],
+        }
+        self.write(json.dumps(log, indent=2) + "\n")
+        super().close()
+
+
+REPORTERS: Dict[str, Type[Reporter]] = {
+    "rich": RichReporter,
+    "plain": PlainReporter,
+    "jsonl": JsonLinesReporter,
+    "junit": JUnitReporter,
+    "sarif": SarifReporter,
+}
+
+_active_reporter: Reporter = RichReporter()
+
+
+def make_reporter(
+    output_format: str, stream: Optional[TextIO] = None, quiet: bool = False
+) -> Reporter:
+    """Creates the reporter for an output format.
+
+    Args:
+        output_format (str): One of the keys of ``REPORTERS``, or ``auto`` for
+            ``rich`` when the stream is a terminal and ``plain`` otherwise.
+        stream (Optional[TextIO]): Stream to write to, ``sys.stdout`` by default.
+        quiet (bool): Only report invalid notebooks.
+
+    Returns:
+        Reporter: The reporter.
+
+    Raises:
+        ValueError: If the output format is unknown.
+    """
+    if output_format == "auto":
+        output_format = "rich" if _isatty(stream or sys.stdout) else "plain"
+    try:
+        reporter_class = REPORTERS[output_format]
+    except KeyError as error:
+        raise ValueError(f"Unknown output format {output_format!r}.") from error
+    return reporter_class(stream, quiet)
+
+
+def _isatty(stream: TextIO) -> bool:
+    try:
+        return stream.isatty()
+    except (AttributeError, ValueError):
+        return False
+
+
+def get_reporter() -> Reporter:
+    """Returns the reporter verdicts are currently reported with."""
+    return _active_reporter
+
+
+@contextmanager
+def use_reporter(reporter: Reporter) -> Iterator[Reporter]:
+    """Reports verdicts with a reporter until the block exits, then closes it.
+
+    If the block raises, the reporter is only flushed, so an aborted run never
+    ends with what looks like a complete report.
+
+    Args:
+        reporter (Reporter): The reporter to use.
+
+    Yields:
+        Reporter: The same reporter.
+    """
+    global _active_reporter  # pylint: disable=global-statement
+    previous = _active_reporter
+    _active_reporter = reporter
+    try:
+        yield reporter
+    except BaseException:
+        _active_reporter = previous
+        reporter.flush()
+        raise
+    _active_reporter = previous
+    stats.timed("report")(reporter.close)()
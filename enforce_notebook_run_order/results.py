@@ -0,0 +1,119 @@
+"""Structured per-notebook results, and the summary printed after a run."""
+
+from typing import Iterable, List, NamedTuple, Optional
+
+
+class NotebookResult(NamedTuple):
+    """Verdict for a single notebook.
+
+    Attributes:
+        path (str): Path to the notebook file.
+        error (Optional[str]): Description of the run order problem, or None if
+            the notebook is valid.
+    """
+
+    path: str
+    error: Optional[str] = None
+
+    @property
+    def valid(self) -> bool:
+        """Whether the notebook was run in order."""
+        return self.error is None
+
+
+VALID = "valid"
+NOT_RUN = "not_run"
+OUT_OF_ORDER = "out_of_order"
+UNREADABLE = "unreadable"
+
+COULD_NOT_READ = "Could not read notebook: "
+
+
+def read_error(error: BaseException) -> str:
+    """Describes why a file could not be read as a notebook, for its verdict.
+
+    Args:
+        error (BaseException): The error raised while reading it.
+
+    Returns:
+        str: The verdict's error.
+    """
+    return f"{COULD_NOT_READ}{error!r}"
+
+
+def is_read_error(error: Optional[str]) -> bool:
+    """Whether a verdict's error says the file could not be read as a notebook.
+
+    Args:
+        error (Optional[str]): The error of a ``NotebookResult``.
+
+    Returns:
+        bool: True if the file was not checked.
+    """
+    return error is not None and error.startswith(COULD_NOT_READ)
+
+
+class CheckResult(NamedTuple):
+    """Detailed verdict for a single notebook, from ``api.iter_check``.
+
+    Has the same ``path``, ``error`` and ``valid`` as ``NotebookResult``, so
+    reporters accept either.
+
+    Attributes:
+        path (str): Path to the notebook file.
+        status (str): ``VALID``, ``NOT_RUN``, ``OUT_OF_ORDER``, or ``UNREADABLE``
+            if the file could not be read as a notebook.
+        cell_index (Optional[int]): Position of the offending cell among the
+            notebook's code cells.
+        execution_count (Optional[int]): Execution count of the offending cell.
+        previous_count (Optional[int]): Execution count of the code cell before it.
+        error (Optional[str]): Description of the problem, or None if the
+            notebook is valid.
+    """
+
+    path: str
+    status: str = VALID
+    cell_index: Optional[int] = None
+    execution_count: Optional[int] = None
+    previous_count: Optional[int] = None
+    error: Optional[str] = None
+
+    @property
+    def valid(self) -> bool:
+        """Whether the notebook was run in order."""
+        return self.status == VALID
+
+
+class RunSummary(NamedTuple):
+    """Counts of valid and invalid notebooks in a run."""
+
+    checked: int
+    invalid_paths: List[str]
+
+    @property
+    def invalid(self) -> int:
+        """Number of invalid notebooks."""
+        return len(self.invalid_paths)
+
+    @property
+    def valid(self) -> int:
+        """Number of valid notebooks."""
+        return self.checked - self.invalid
+
+
+def summarize(results: Iterable[NotebookResult]) -> RunSummary:
+    """Counts the valid and invalid notebooks in a set of results.
+
+    Args:
+        results (Iterable[NotebookResult]): Results of a run.
+
+    Returns:
+        RunSummary: Number of notebooks checked and paths of the invalid ones.
+    """
+    checked = 0
+    invalid_paths = []
+    for result in results:
+        checked += 1
+        if not result.valid:
+            invalid_paths.append(result.path)
+    return RunSummary(checked, invalid_paths)
@@ -0,0 +1,104 @@
+"""Splits the notebooks to check between several independent runs.
+
+With ``--shard i/N``, each run checks only the notebooks whose path, relative to
+the root of the repository, hashes to shard ``i`` of ``N``. The hash depends on
+nothing but the path, so runs on different CI nodes, in any checkout location,
+agree on the split without talking to each other: every notebook is checked by
+exactly one of the ``N`` runs. Their JSON Lines results are combined with
+``nbcheck merge``, see ``merge``.
+"""
+
+import os
+import zlib
+from typing import NamedTuple, Optional
+
+
+def find_root(start: str = ".") -> str:
+    """Finds the root of the git repository containing a directory.
+
+    Args:
+        start (str): Directory to search upwards from.
+
+    Returns:
+        str: Absolute path to the nearest directory holding ``.git``, or to
+        ``start`` itself if it is not inside a repository.
+    """
+    start = os.path.abspath(start)
+    directory = start
+    while True:
+        if os.path.exists(os.path.join(directory, ".git")):
+            return directory
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return start
+        directory = parent
+
+
+class Shard(NamedTuple):
+    """One of ``count`` disjoint parts of the notebooks to check.
+
+    Attributes:
+        index (int): Which part, from 1 to ``count``.
+        count (int): Number of parts.
+        root (str): Directory the hashed paths are relative to.
+    """
+
+    index: int
+    count: int
+    root: str = "."
+
+    @classmethod
+    def parse(cls, spec: str, root: Optional[str] = None) -> "Shard":
+        """Parses a ``--shard`` value.
+
+        Args:
+            spec (str): ``i/N``, for part ``i`` of ``N``, counting from 1.
+            root (Optional[str]): Directory paths are hashed relative to.
+                Defaults to the root of the current git repository.
+
+        Returns:
+            Shard: The shard.
+
+        Raises:
+            ValueError: If ``spec`` is not of the form ``i/N`` with
+                ``1 <= i <= N``.
+        """
+        index, separator, count = spec.partition("/")
+        try:
+            index, count = int(index), int(count)
+        except ValueError:
+            separator = ""
+        if not separator or not 1 <= index <= count:
+            raise ValueError(
+                f"Shard must be i/N with 1 <= i <= N, such as 1/4, got {spec!r}."
+            )
+        return cls(index, count, find_root() if root is None else root)
+
+    def key(self, path: str) -> str:
+        """Returns the name a path is hashed by: relative to ``root``, with ``/``.
+
+        Args:
+            path (str): Path to a notebook or archive.
+
+        Returns:
+            str: The same name for the same file in any checkout location.
+        """
+        try:
+            path = os.path.relpath(path, self.root)
+        except ValueError:
+            # On another drive than the root, on Windows.
+            path = os.path.abspath(path)
+        return path.replace(os.sep, "/")
+
+    def contains(self, path: str) -> bool:
+        """Returns True if a notebook is checked in this shard.
+
+        Args:
+            path (str): Path to a notebook or archive.
+
+        Returns:
+            bool: Whether the path hashes to this shard.
+        """
+        return zlib.crc32(self.key(path).encode("utf-8")) % self.count == (
+            self.index - 1
+        )
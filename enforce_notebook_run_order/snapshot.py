@@ -0,0 +1,191 @@
+"""Persistent snapshot of directory listings, so unchanged directories aren't listed.
+
+For each directory, the snapshot records its modification time, the notebooks
+in it and its subdirectories. Adding, removing or renaming an entry changes a
+directory's mtime, so a directory whose mtime still matches is not listed
+again: ``walk.NotebookWalker`` reuses the stored names, and a walk of an
+unchanged tree costs one ``stat`` per directory. Editing a notebook doesn't
+change its directory's mtime, which is what the verdict cache in ``cache`` is
+for.
+
+The names are stored before exclude patterns and shards are applied, so one
+snapshot serves every walker. Notebooks that are symlinks are stored without an
+inode and looked up again on each walk, since their target can change without
+the directory changing. Directories modified in the last ``RACY_SECONDS``
+are not stored, as a change in the same clock tick as the listing would go
+unnoticed.
+
+The snapshot is a JSON file per working directory, read on first use and
+replaced in one step when the snapshot is closed, so runs sharing it never see
+a half-written file.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+SNAPSHOT_DIRNAME = "walk-snapshots"
+
+# Bump whenever the stored listings change meaning.
+SNAPSHOT_FORMAT_VERSION = 1
+
+RACY_SECONDS = 2
+
+
+def snapshot_path(cache_dir: str) -> str:
+    """Returns the snapshot file for walks from the current directory.
+
+    Each working tree gets its own file, so a run never loads the listings of
+    other projects.
+
+    Args:
+        cache_dir (str): The cache directory, see ``cache.default_cache_dir``.
+
+    Returns:
+        str: Path to the snapshot file.
+    """
+    digest = hashlib.sha256(os.fsencode(os.getcwd())).hexdigest()
+    return os.path.join(cache_dir, SNAPSHOT_DIRNAME, f"{digest[:16]}.json")
+
+
+class DirectoryListing(NamedTuple):
+    """What a directory held when it was last listed.
+
+    Attributes:
+        mtime_ns (int): Modification time of the directory.
+        notebooks (List[Tuple[str, Optional[int]]]): Name and inode of each
+            ``.ipynb`` file, in name order. The inode is None for symlinks, and
+            on Windows, where listings carry no inode.
+        subdirectories (List[str]): Names of the subdirectories, in name order,
+            not counting symlinks to directories.
+    """
+
+    mtime_ns: int
+    notebooks: List[Tuple[str, Optional[int]]]
+    subdirectories: List[str]
+
+
+class DirectorySnapshot:
+    """On-disk snapshot of directory listings, keyed on absolute path.
+
+    Args:
+        path (str): File holding the snapshot. Its directory is created if
+            missing.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._listings: Optional[Dict[str, DirectoryListing]] = None
+        self._removed: Set[str] = set()
+        self._changed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _load(self) -> Dict[str, DirectoryListing]:
+        if self._listings is not None:
+            return self._listings
+        self._listings = {}
+        try:
+            with open(self.path, encoding="utf-8") as snapshot_file:
+                stored = json.load(snapshot_file)
+            if stored.get("version") == SNAPSHOT_FORMAT_VERSION:
+                self._listings = {
+                    directory: DirectoryListing(
+                        mtime_ns, [tuple(notebook) for notebook in notebooks], names
+                    )
+                    for directory, (mtime_ns, notebooks, names) in stored[
+                        "directories"
+                    ].items()
+                }
+        except (OSError, ValueError, TypeError, KeyError, AttributeError):
+            # A missing or broken snapshot only means listing everything again.
+            pass
+        return self._listings
+
+    def get(self, directory: str, mtime_ns: int) -> Optional[DirectoryListing]:
+        """Looks up the listing of a directory.
+
+        Args:
+            directory (str): Absolute path to the directory.
+            mtime_ns (int): Its current modification time.
+
+        Returns:
+            Optional[DirectoryListing]: The stored listing, or None if the
+            directory isn't in the snapshot or has changed since.
+        """
+        listing = self._load().get(directory)
+        if listing is None or listing.mtime_ns != mtime_ns:
+            return None
+        return listing
+
+    def put(self, directory: str, listing: DirectoryListing) -> None:
+        """Stores the listing of a directory that was just listed.
+
+        Args:
+            directory (str): Absolute path to the directory.
+            listing (DirectoryListing): What it holds.
+        """
+        listings = self._load()
+        previous = listings.pop(directory, None)
+        if previous is not None:
+            self._changed = True
+            # Forget what was below the subdirectories that are gone.
+            for name in set(previous.subdirectories) - set(listing.subdirectories):
+                self._removed.add(os.path.join(directory, name))
+        if time.time_ns() - listing.mtime_ns < RACY_SECONDS * 10**9:
+            return
+        listings[directory] = listing
+        self._changed = True
+
+    def save(self) -> None:
+        """Writes the snapshot if anything changed since it was read."""
+        if not self._changed:
+            return
+        listings = self._listings
+        if self._removed:
+            listings = {
+                directory: listing
+                for directory, listing in listings.items()
+                if not self._is_removed(directory)
+            }
+        stored = {
+            "version": SNAPSHOT_FORMAT_VERSION,
+            "directories": {
+                directory: [listing.mtime_ns, listing.notebooks, listing.subdirectories]
+                for directory, listing in listings.items()
+            },
+        }
+        try:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w", dir=directory, delete=False, encoding="utf-8", suffix=".tmp"
+            ) as temporary:
+                json.dump(stored, temporary, separators=(",", ":"))
+            os.replace(temporary.name, self.path)
+        except OSError:
+            # A read-only cache must never fail the check itself.
+            return
+        self._changed = False
+
+    def _is_removed(self, directory: str) -> bool:
+        path = directory
+        while True:
+            if path in self._removed:
+                return True
+            parent = os.path.dirname(path)
+            if parent == path:
+                return False
+            path = parent
+
+    def close(self) -> None:
+        """Writes the snapshot if anything changed."""
+        if self._listings is not None:
+            self.save()
@@ -0,0 +1,364 @@
+"""Per-phase timers and byte counters behind ``--stats``.
+
+Instrumented code reports to the active ``StatsCollector``, if there is one.
+Without one, which is the default, a timed function costs a single extra call
+and a check of a thread-local, and streams and iterators are passed through
+untouched. A collector is only active on the thread that started collecting,
+so checks running on other threads, such as those of ``api.iter_check``, are
+never counted towards it.
+
+Phases nest: time spent in an inner phase, such as reading the file while
+parsing it, counts towards the inner phase only, so the phases of a run add up
+to its wall time.
+"""
+
+import functools
+import heapq
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import (
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from .events import Event, Listener, NotebookEvent, PhaseEvent, RunEvent
+
+# Order phases are listed in by the report.
+PHASES = ("walk", "cache", "read", "parse", "check", "load", "report")
+
+T = TypeVar("T")
+
+
+class _ActiveCollector(threading.local):  # pylint: disable=too-few-public-methods
+    """The collector of the current thread."""
+
+    collector: Optional["StatsCollector"] = None
+
+
+_active = _ActiveCollector()
+
+
+class StatsCollector:  # pylint: disable=too-many-instance-attributes
+    """Collects phase timings, bytes read and the slowest and largest notebooks.
+
+    With listeners, it also reports the run as ``events``: time and bytes are
+    added up per phase until a notebook is reported with ``notebook_done``, then
+    passed on as events for that notebook.
+
+    Args:
+        top (int): Number of slowest and largest notebooks to keep.
+        listeners (Iterable[events.Listener]): Callables to pass events to.
+    """
+
+    def __init__(self, top: int = 10, listeners: Iterable[Listener] = ()):
+        self.top = top
+        self.listeners = list(listeners)
+        self.phase_seconds: Dict[str, float] = defaultdict(float)
+        self.bytes_read = 0
+        self.notebooks_read = 0
+        self.slowest: List[Tuple[float, str]] = []
+        self.largest: List[Tuple[int, str]] = []
+        self.started = time.perf_counter()
+        # Start time and time spent in nested phases, for each open phase.
+        self._open: List[List[float]] = []
+        self.notebooks_reported = 0
+        self.notebooks_invalid = 0
+        # Since the last notebook was reported: first start and time spent in
+        # each phase, and bytes read.
+        self._window_started = self.started
+        self._window: Dict[str, List[float]] = {}
+        self._window_bytes = 0
+
+    def start(self) -> None:
+        """Opens a phase; close it with ``stop``."""
+        self._open.append([time.perf_counter(), 0.0])
+
+    def stop(self, phase: str) -> float:
+        """Closes the innermost open phase and attributes its time to ``phase``.
+
+        Args:
+            phase (str): Name of the phase.
+
+        Returns:
+            float: Seconds since the phase was opened, nested phases included.
+        """
+        started, nested = self._open.pop()
+        elapsed = time.perf_counter() - started
+        self.phase_seconds[phase] += elapsed - nested
+        if self._open:
+            self._open[-1][1] += elapsed
+        if self.listeners:
+            self._window.setdefault(phase, [started, 0.0])[1] += elapsed - nested
+        return elapsed
+
+    def add_bytes(self, size: int) -> None:
+        """Counts bytes read from the notebook being checked.
+
+        Args:
+            size (int): Number of bytes.
+        """
+        self.bytes_read += size
+        self._window_bytes += size
+
+    def notebook_done(self, path: str, valid: bool) -> None:
+        """Records that a notebook was reported, passing its events to listeners.
+
+        Args:
+            path (str): Path to the notebook.
+            valid (bool): Whether it was run in order.
+        """
+        self.notebooks_reported += 1
+        self.notebooks_invalid += not valid
+        if not self.listeners:
+            return
+        size = self._window_bytes
+        self._emit_window(path)
+        now = time.perf_counter()
+        self._emit(
+            NotebookEvent(
+                path,
+                self._window_started - self.started,
+                now - self._window_started,
+                size,
+                valid,
+            )
+        )
+        self._window_started = now
+
+    def finish(self) -> None:
+        """Passes the time spent since the last notebook, then a ``RunEvent``."""
+        if not self.listeners:
+            return
+        self._emit_window(None)
+        self._emit(
+            RunEvent(
+                time.perf_counter() - self.started,
+                self.notebooks_reported,
+                self.notebooks_invalid,
+                self.bytes_read,
+                dict(self.phase_seconds),
+            )
+        )
+
+    def _emit_window(self, path: Optional[str]) -> None:
+        for phase in sorted(self._window, key=_phase_order):
+            started, seconds = self._window[phase]
+            size = self._window_bytes if phase == "read" else 0
+            self._emit(PhaseEvent(phase, path, started - self.started, seconds, size))
+        self._window = {}
+        self._window_bytes = 0
+
+    def _emit(self, event: Event) -> None:
+        for listener in self.listeners:
+            listener(event)
+
+    def add_notebook(self, path: str, seconds: float, size: int) -> None:
+        """Records how long a notebook took to check and how many bytes were read.
+
+        Args:
+            path (str): Path to the notebook.
+            seconds (float): Time taken to check it.
+            size (int): Bytes read from it.
+        """
+        self.notebooks_read += 1
+        self._keep_top(self.slowest, (seconds, path))
+        self._keep_top(self.largest, (size, path))
+
+    def _keep_top(self, heap: List, item: Tuple) -> None:
+        if len(heap) < self.top:
+            heapq.heappush(heap, item)
+        else:
+            heapq.heappushpop(heap, item)
+
+    def merge(self, other: "StatsCollector") -> None:
+        """Adds the counts of another collector, such as one from a worker process.
+
+        Args:
+            other (StatsCollector): The collector to merge in.
+        """
+        for phase, seconds in other.phase_seconds.items():
+            self.phase_seconds[phase] += seconds
+        self.bytes_read += other.bytes_read
+        self.notebooks_read += other.notebooks_read
+        for item in other.slowest:
+            self._keep_top(self.slowest, item)
+        for item in other.largest:
+            self._keep_top(self.largest, item)
+
+    def report(self, checked: int) -> str:
+        """Formats the phase breakdown, throughput and top notebooks.
+
+        Args:
+            checked (int): Number of notebooks checked, including cache hits.
+
+        Returns:
+            str: The report, one line per item.
+        """
+        wall = time.perf_counter() - self.started
+        megabytes = self.bytes_read / 1e6
+        lines = [
+            f"Checked {checked} notebook(s), read {megabytes:.1f} MB "
+            f"in {wall:.3f}s: {checked / wall:.0f} files/s, "
+            f"{megabytes / wall:.1f} MB/s",
+            "",
+            f"{'phase':<8}{'seconds':>10}{'share':>8}",
+        ]
+        accounted = 0.0
+        for phase in sorted(self.phase_seconds, key=_phase_order):
+            seconds = self.phase_seconds[phase]
+            accounted += seconds
+            lines.append(f"{phase:<8}{seconds:>10.3f}{seconds / wall:>8.1%}")
+        other = max(wall - accounted, 0.0)
+        lines.append(f"{'other':<8}{other:>10.3f}{other / wall:>8.1%}")
+        if self.slowest:
+            lines += ["", "Slowest notebooks:"]
+            lines += [
+                f"  {seconds:8.3f}s  {path}"
+                for seconds, path in sorted(self.slowest, reverse=True)
+            ]
+            lines += ["", "Largest notebooks:"]
+            lines += [
+                f"  {size / 1e6:8.1f} MB  {path}"
+                for size, path in sorted(self.largest, reverse=True)
+            ]
+        return "\n".join(lines)
+
+
+def _phase_order(phase: str) -> Tuple[int, str]:
+    return (PHASES.index(phase) if phase in PHASES else len(PHASES), phase)
+
+
+class _CountingReader:  # pylint: disable=too-few-public-methods
+    """Times reads from a binary stream under the ``read`` phase and counts bytes."""
+
+    def __init__(self, stream: BinaryIO, collector: StatsCollector):
+        self._stream = stream
+        self._collector = collector
+        self.size = 0
+
+    def read(self, size: int = -1) -> bytes:
+        """Reads from the wrapped stream."""
+        self._collector.start()
+        try:
+            data = self._stream.read(size)
+        finally:
+            self._collector.stop("read")
+        self.size += len(data)
+        self._collector.add_bytes(len(data))
+        return data
+
+
+def current() -> Optional[StatsCollector]:
+    """Returns the active collector, or None if stats are not being collected."""
+    return _active.collector
+
+
+@contextmanager
+def collecting(collector: StatsCollector) -> Iterator[StatsCollector]:
+    """Makes a collector the active one on this thread until the block exits,
+    then finishes it.
+
+    The collector is finished even if the block raises, so the listeners of an
+    aborted run still write out what it got through.
+
+    Args:
+        collector (StatsCollector): The collector.
+
+    Yields:
+        StatsCollector: The same collector.
+    """
+    previous = _active.collector
+    _active.collector = collector
+    try:
+        yield collector
+    finally:
+        _active.collector = previous
+        collector.finish()
+
+
+def timed(phase: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorates a function so that time spent in it counts towards a phase.
+
+    Args:
+        phase (str): Name of the phase.
+
+    Returns:
+        Callable: The decorator.
+    """
+
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            collector = _active.collector
+            if collector is None:
+                return func(*args, **kwargs)
+            collector.start()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                collector.stop(phase)
+
+        return wrapper
+
+    return decorator
+
+
+def timed_iter(phase: str, iterable: Iterable[T]) -> Iterable[T]:
+    """Counts time spent producing each item of an iterable towards a phase.
+
+    Args:
+        phase (str): Name of the phase.
+        iterable (Iterable[T]): The iterable, such as a lazy walk or parse.
+
+    Returns:
+        Iterable[T]: The same items; ``iterable`` itself if stats are off.
+    """
+    collector = _active.collector
+    if collector is None:
+        return iterable
+    return _timed_iter(phase, iter(iterable), collector)
+
+
+def _timed_iter(
+    phase: str, iterator: Iterator[T], collector: StatsCollector
+) -> Iterator[T]:
+    while True:
+        collector.start()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            collector.stop(phase)
+        yield item
+
+
+@contextmanager
+def measure_notebook(
+    path: str, stream: BinaryIO, collector: StatsCollector
+) -> Iterator[BinaryIO]:
+    """Records the time taken to check a notebook and the bytes read from it.
+
+    Args:
+        path (str): Path to the notebook.
+        stream (BinaryIO): The open notebook file.
+        collector (StatsCollector): Collector to record to.
+
+    Yields:
+        BinaryIO: A reader of ``stream`` that times reads and counts bytes.
+    """
+    reader = _CountingReader(stream, collector)
+    started = time.perf_counter()
+    try:
+        yield reader
+    finally:
+        collector.add_notebook(path, time.perf_counter() - started, reader.size)
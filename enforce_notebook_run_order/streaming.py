@@ -0,0 +1,303 @@
+"""Incremental notebook reader that only extracts what the run order check needs.
+
+``json.load`` builds every cell output (base64 images, HTML tables, streams) into
+Python objects before the check ever looks at the notebook. The reader in this
+module scans the raw bytes instead: it decodes ``cell_type``, ``execution_count``
+and whether ``source`` is empty, and skips every other value without building it.
+Memory use is bounded by the chunk size, no matter how large the notebook is.
+"""
+
+import json
+import re
+from typing import BinaryIO, Iterator, Optional
+
+from .utils import CodeCell
+
+CHUNK_SIZE = 1 << 16
+
+_NON_WHITESPACE = re.compile(rb"[^ \t\r\n]")
+_STRUCTURAL = re.compile(rb'["\[\]{}]')
+_SCALAR_END = re.compile(rb"[ \t\r\n,\]}]")
+_BACKSLASH = 0x5C
+
+
+class _JsonScanner:
+    """Pull-based scanner over a binary JSON stream.
+
+    Only the bytes of the value currently being decoded are kept in memory;
+    skipped values are discarded chunk by chunk.
+    """
+
+    def __init__(self, stream: BinaryIO, chunk_size: int = CHUNK_SIZE):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._buf = b""
+        self._pos = 0
+
+    def _fill(self) -> bool:
+        """Appends the next chunk to the unconsumed part of the buffer.
+
+        Returns:
+            bool: False if the stream is exhausted.
+        """
+        chunk = self._stream.read(self._chunk_size)
+        if not chunk:
+            return False
+        self._buf = self._buf[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def _fill_or_fail(self) -> None:
+        if not self._fill():
+            raise ValueError("Unexpected end of notebook JSON")
+
+    def peek(self) -> bytes:
+        """Returns the next non-whitespace byte without consuming it."""
+        while True:
+            match = _NON_WHITESPACE.search(self._buf, self._pos)
+            if match is not None:
+                self._pos = match.start()
+                return self._buf[self._pos : self._pos + 1]
+            self._buf = b""
+            self._pos = 0
+            self._fill_or_fail()
+
+    def expect(self, char: bytes) -> None:
+        """Consumes ``char``, failing if the next byte is anything else."""
+        found = self.peek()
+        if found != char:
+            raise ValueError(
+                f"Expected {char.decode()!r} in notebook JSON, found {found.decode()!r}"
+            )
+        self._pos += 1
+
+    def read_string(self) -> str:
+        """Decodes the string value at the current position."""
+        self.expect(b'"')
+        start = self._pos - 1
+        search = self._pos
+        while True:
+            end = self._buf.find(b'"', search)
+            if end == -1:
+                search = len(self._buf) - start
+                self._pos = start
+                self._fill_or_fail()
+                start = 0
+                continue
+            backslashes = 0
+            while self._buf[end - 1 - backslashes] == _BACKSLASH:
+                backslashes += 1
+            if backslashes % 2 == 0:
+                self._pos = end + 1
+                return json.loads(self._buf[start : end + 1])
+            search = end + 1
+
+    def read_scalar(self):
+        """Decodes the number, boolean or null at the current position."""
+        self.peek()
+        start = self._pos
+        while True:
+            match = _SCALAR_END.search(self._buf, start)
+            if match is not None:
+                end = match.start()
+                break
+            self._pos = start
+            if not self._fill():
+                end = len(self._buf)
+                break
+            start = 0
+        self._pos = end
+        return json.loads(self._buf[start:end])
+
+    def skip_string(self) -> bool:
+        """Skips the string at the current position without decoding it.
+
+        Returns:
+            bool: True if the string was non-empty.
+        """
+        self.expect(b'"')
+        if self.peek_raw() == b'"':
+            self._pos += 1
+            return False
+        search = self._pos
+        while True:
+            end = self._buf.find(b'"', search)
+            if end == -1:
+                # Keep only a trailing run of backslashes, which decides whether
+                # a quote at the start of the next chunk is escaped.
+                tail = len(self._buf) - len(self._buf.rstrip(b"\\"))
+                self._buf = self._buf[len(self._buf) - tail :]
+                self._pos = 0
+                self._fill_or_fail()
+                search = tail
+                continue
+            backslashes = 0
+            while end - 1 - backslashes >= 0 and (
+                self._buf[end - 1 - backslashes] == _BACKSLASH
+            ):
+                backslashes += 1
+            if backslashes % 2 == 0:
+                self._pos = end + 1
+                return True
+            search = end + 1
+
+    def peek_raw(self) -> bytes:
+        """Returns the next byte, whitespace included, without consuming it."""
+        while self._pos >= len(self._buf):
+            self._fill_or_fail()
+        return self._buf[self._pos : self._pos + 1]
+
+    def skip_container(self, depth: int = 0) -> None:
+        """Skips an object or array, including everything nested inside it.
+
+        Args:
+            depth (int): Number of brackets already consumed by the caller.
+        """
+        while True:
+            match = _STRUCTURAL.search(self._buf, self._pos)
+            if match is None:
+                # Nothing left in the buffer can open or close a container.
+                self._buf = b""
+                self._pos = 0
+                self._fill_or_fail()
+                continue
+            self._pos = match.start()
+            char = match.group()
+            if char == b'"':
+                self.skip_string()
+                continue
+            self._pos += 1
+            depth += 1 if char in b"[{" else -1
+            if depth == 0:
+                return
+
+    def skip_value(self) -> bool:
+        """Skips the value at the current position without building it.
+
+        Returns:
+            bool: True if the value was a non-empty string, array or object,
+            or a scalar.
+        """
+        char = self.peek()
+        if char == b'"':
+            return self.skip_string()
+        if char in (b"[", b"{"):
+            self._pos += 1
+            closing = b"]" if char == b"[" else b"}"
+            if self.peek() == closing:
+                self._pos += 1
+                return False
+            self.skip_container(depth=1)
+            return True
+        self.read_scalar()
+        return True
+
+    def iter_members(self) -> Iterator[str]:
+        """Yields the keys of the object at the current position.
+
+        The caller must consume the value of each key before advancing.
+        """
+        self.expect(b"{")
+        if self.peek() == b"}":
+            self._pos += 1
+            return
+        while True:
+            key = self.read_string()
+            self.expect(b":")
+            yield key
+            if self.peek() == b"}":
+                self._pos += 1
+                return
+            self.expect(b",")
+
+    def iter_items(self) -> Iterator[None]:
+        """Yields once per item of the array at the current position.
+
+        The caller must consume each item before advancing.
+        """
+        self.expect(b"[")
+        if self.peek() == b"]":
+            self._pos += 1
+            return
+        while True:
+            yield None
+            if self.peek() == b"]":
+                self._pos += 1
+                return
+            self.expect(b",")
+
+
+def _read_cell(scanner: _JsonScanner) -> Optional[CodeCell]:
+    """Reads one cell object, returning None if it is not a code cell."""
+    cell_type = None
+    execution_count = None
+    has_source = False
+    for key in scanner.iter_members():
+        if key == "cell_type" and scanner.peek() == b'"':
+            cell_type = scanner.read_string()
+        elif key == "execution_count" and scanner.peek() not in (b"[", b"{", b'"'):
+            execution_count = scanner.read_scalar()
+        elif key == "source":
+            has_source = scanner.skip_value()
+        else:
+            scanner.skip_value()
+    if cell_type != "code":
+        return None
+    return CodeCell(execution_count, has_source)
+
+
+def read_code_cells(
+    stream: BinaryIO, chunk_size: int = CHUNK_SIZE
+) -> Iterator[CodeCell]:
+    """Lazily yields the code cells of a notebook read from a binary stream.
+
+    Reading stops as soon as the caller stops iterating, so a check that fails
+    on an early cell never reads the rest of the notebook.
+
+    Args:
+        stream (BinaryIO): Binary file-like object positioned at the start of
+            the notebook JSON.
+        chunk_size (int): Number of bytes read from the stream at a time.
+
+    Yields:
+        CodeCell: Minimal record of each code cell, in notebook order.
+
+    Raises:
+        KeyError: If the notebook has no ``cells`` list.
+        ValueError: If the notebook is not valid JSON.
+    """
+    scanner = _JsonScanner(stream, chunk_size)
+    for key in scanner.iter_members():
+        if key != "cells":
+            scanner.skip_value()
+            continue
+        if scanner.peek() == b"n":
+            # "cells": null, which holds no more cells than a missing list.
+            scanner.skip_value()
+            break
+        for _ in scanner.iter_items():
+            if scanner.peek() != b"{":
+                scanner.skip_value()
+                continue
+            cell = _read_cell(scanner)
+            if cell is not None:
+                yield cell
+        # Metadata after the cell list is irrelevant to the check.
+        return
+    raise KeyError("cells")
+
+
+def iter_code_cells(
+    notebook_path: str, chunk_size: int = CHUNK_SIZE
+) -> Iterator[CodeCell]:
+    """Lazily yields the code cells of the notebook at the given path.
+
+    Args:
+        notebook_path (str): Path to the notebook file.
+        chunk_size (int): Number of bytes read from the file at a time.
+
+    Yields:
+        CodeCell: Minimal record of each code cell, in notebook order.
+    """
+    with open(notebook_path, "rb") as notebook_file:
+        yield from read_code_cells(notebook_file, chunk_size)
@@ -1,20 +1,41 @@
 """Contains shared functionality used across multiple modules"""
 
-import json
-from typing import Dict, List
+import os
+from typing import Dict, List, NamedTuple, Optional
+from . import json_backends, limits, stats
 
 
-def load_notebook_data(notebook_path: str) -> Dict:
+class CodeCell(NamedTuple):
+    """Minimal record of a code cell, holding only what the run order check reads."""
+
+    execution_count: Optional[int]
+    has_source: bool
+
+
+@stats.timed("load")
+def load_notebook_data(notebook_path: str, backend: str = json_backends.AUTO) -> Dict:
     """Loads the notebook data from the given path.
 
     Args:
         notebook_path (str): Path to the notebook file.
+        backend (str): JSON library to decode with, ``auto`` for the fastest
+            one installed; see ``json_backends``.
 
     Returns:
         Dict: Notebook data in dictionary format.
+
+    Raises:
+        limits.NotebookTooLargeError: If the file is over the size limit, see
+            ``limits``, since the whole notebook would have to be held in memory.
     """
-    with open(notebook_path, "r", encoding="UTF-8") as notebook_file:
-        notebook_data = json.load(notebook_file)
+    resource_limits = limits.current()
+    if resource_limits.max_file_size is not None:
+        size = os.path.getsize(notebook_path)
+        if resource_limits.is_oversized(size):
+            raise resource_limits.too_large_error(size)
+    backend = json_backends.resolve_backend(backend)
+    with json_backends.read_notebook(notebook_path, backend) as data:
+        notebook_data = json_backends.decode(data, backend)
     return notebook_data
 
 
@@ -32,3 +53,15 @@ def get_code_cells(notebook_data: Dict) -> List[Dict]:
         if cell["cell_type"] == "code":
             code_cells.append(cell)
     return code_cells
+
+
+def to_code_cell(cell: Dict) -> CodeCell:
+    """Reduces a full code cell dictionary to a ``CodeCell`` record.
+
+    Args:
+        cell (Dict): Code cell in dictionary format.
+
+    Returns:
+        CodeCell: The cell's execution count and whether it has any source.
+    """
+    return CodeCell(cell["execution_count"], len(cell["source"]) > 0)
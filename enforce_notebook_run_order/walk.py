@@ -0,0 +1,385 @@
+"""Finds notebooks under a path, pruning directories that never need checking.
+
+Excluded directories are pruned before they are listed, so nothing inside
+``.git``, ``.ipynb_checkpoints``, virtualenvs or build output is ever read. All
+exclude patterns are compiled once into a single matcher. Files reached more
+than once, through overlapping paths, hard links or symlinks, are only yielded
+the first time. With a ``snapshot.DirectorySnapshot``, directories that haven't
+changed since the last walk aren't listed at all.
+"""
+
+import fnmatch
+import os
+import re
+import subprocess
+import warnings
+from stat import S_ISREG
+from typing import Callable, Iterable, Iterator, Optional, Pattern, Set, Tuple
+
+from .shard import Shard
+from .snapshot import DirectoryListing, DirectorySnapshot
+
+DEFAULT_EXCLUDES = (
+    ".git",
+    ".hg",
+    ".svn",
+    ".ipynb_checkpoints",
+    "__pycache__",
+    ".mypy_cache",
+    ".pytest_cache",
+    ".ruff_cache",
+    ".tox",
+    ".nox",
+    ".venv",
+    "venv",
+    "node_modules",
+    "site-packages",
+    "build",
+    "dist",
+)
+
+
+def _compile(patterns: Iterable[str]) -> Optional[Pattern]:
+    patterns = list(patterns)
+    if not patterns:
+        return None
+    return re.compile("|".join(fnmatch.translate(pattern) for pattern in patterns))
+
+
+class PathMatcher:  # pylint: disable=too-few-public-methods
+    """Matches paths against a set of glob patterns.
+
+    Patterns without a ``/`` match a file or directory name anywhere in the
+    tree, like ``.venv`` or ``*-checkpoint.ipynb``. Patterns with a ``/`` match
+    the whole path relative to the current directory, like ``docs/generated/*``.
+
+    Args:
+        patterns (Iterable[str]): Glob patterns.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        patterns = [pattern.rstrip("/") for pattern in patterns]
+        self._name_pattern = _compile(p for p in patterns if "/" not in p)
+        self._path_pattern = _compile(p.lstrip("/") for p in patterns if "/" in p)
+
+    def matches(self, path: str) -> bool:
+        """Returns True if the path or its final component matches a pattern.
+
+        Args:
+            path (str): Path to a file or directory.
+
+        Returns:
+            bool: Whether the path is matched.
+        """
+        if self._name_pattern is not None:
+            if self._name_pattern.match(os.path.basename(path)):
+                return True
+        if self._path_pattern is not None:
+            if os.path.isabs(path):
+                path = os.path.relpath(path)
+            relative_path = os.path.normpath(path).replace(os.sep, "/")
+            if self._path_pattern.match(relative_path):
+                return True
+        return False
+
+
+def git_ignored_paths(directory: str) -> Set[str]:
+    """Returns the absolute paths git ignores under a directory.
+
+    Ignored directories are reported as a whole rather than file by file.
+
+    Args:
+        directory (str): Directory inside a git working tree.
+
+    Returns:
+        Set[str]: Absolute paths of ignored files and directories, empty if the
+        directory is not in a git working tree or git is not installed.
+    """
+    try:
+        completed = subprocess.run(
+            [
+                "git",
+                "ls-files",
+                "-z",
+                "--others",
+                "--ignored",
+                "--exclude-standard",
+                "--directory",
+            ],
+            cwd=directory,
+            capture_output=True,
+            check=False,
+        )
+    except OSError:
+        return set()
+    if completed.returncode != 0:
+        return set()
+    base = os.path.abspath(directory)
+    return {
+        os.path.normpath(os.path.join(base, os.fsdecode(path)))
+        for path in completed.stdout.split(b"\0")
+        if path
+    }
+
+
+class ExcludedPathWarning(UserWarning):
+    """Issued when a notebook named explicitly is not checked because it is excluded"""
+
+
+def _warn_excluded(path: str) -> None:
+    warnings.warn(
+        f"{path} is excluded and was not checked.", ExcludedPathWarning, stacklevel=4
+    )
+
+
+class NotebookWalker:  # pylint: disable=too-many-instance-attributes
+    """Finds notebooks under one or more paths.
+
+    A walker remembers every file it has yielded, so the same notebook is never
+    yielded twice, even across several calls to ``find``.
+
+    Args:
+        exclude (Iterable[str]): Glob patterns of files and directories to skip,
+            see ``PathMatcher``.
+        use_default_excludes (bool): Also skip ``DEFAULT_EXCLUDES``.
+        respect_gitignore (bool): Also skip whatever git ignores.
+        shard (Optional[shard.Shard]): Only yield the notebooks in this shard.
+        snapshot (Optional[snapshot.DirectorySnapshot]): Reuse the listings of
+            directories that haven't changed since a previous walk, and store
+            the listings of those that have.
+        on_excluded (Optional[Callable[[str], None]]): Called with each
+            notebook given to ``find`` by name that is left out because it is
+            excluded. By default a ``ExcludedPathWarning`` is issued.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        exclude: Iterable[str] = (),
+        use_default_excludes: bool = True,
+        respect_gitignore: bool = False,
+        shard: Optional[Shard] = None,
+        snapshot: Optional[DirectorySnapshot] = None,
+        on_excluded: Optional[Callable[[str], None]] = None,
+    ):
+        patterns = list(exclude)
+        # Default excludes only prune walks; notebooks named explicitly are
+        # only matched against the user's own patterns.
+        self.explicit_matcher = PathMatcher(patterns)
+        if use_default_excludes:
+            patterns.extend(DEFAULT_EXCLUDES)
+        self.matcher = PathMatcher(patterns)
+        self.on_excluded = on_excluded or _warn_excluded
+        self.respect_gitignore = respect_gitignore
+        self.shard = shard
+        self.snapshot = snapshot
+        self._ignored: Optional[Set[str]] = None
+        self._seen: Set[Tuple[int, int]] = set()
+
+    def is_excluded(self, path: str) -> bool:
+        """Returns True if the path matches an exclude pattern or is git-ignored.
+
+        Args:
+            path (str): Path to a file or directory.
+
+        Returns:
+            bool: Whether the path should be skipped.
+        """
+        return self.matcher.matches(path) or self._is_git_ignored(path)
+
+    def _is_git_ignored(self, path: str) -> bool:
+        if self.respect_gitignore:
+            if self._ignored is None:
+                self._ignored = git_ignored_paths(".")
+            if self._ignored and os.path.abspath(path) in self._ignored:
+                return True
+        return False
+
+    def in_shard(self, path: str) -> bool:
+        """Returns True if the walker's shard, if any, includes a notebook.
+
+        Args:
+            path (str): Path to a notebook or archive.
+
+        Returns:
+            bool: Whether the path should be checked in this run.
+        """
+        return self.shard is None or self.shard.contains(path)
+
+    def is_excluded_explicitly(self, path: str) -> bool:
+        """Returns True if a notebook named explicitly, not found by a walk, is excluded.
+
+        Only the user's exclude patterns and, if respected, ``.gitignore`` apply,
+        not ``DEFAULT_EXCLUDES``. They are matched against the notebook and the
+        directories it is in, up to the current directory, so directories above
+        the project, say a checkout under ``build/``, never exclude anything.
+
+        Args:
+            path (str): Path to a notebook file.
+
+        Returns:
+            bool: Whether the notebook should be skipped.
+        """
+        try:
+            relative_path = os.path.relpath(path)
+        except ValueError:
+            # On another drive than the current directory.
+            relative_path = os.path.basename(path)
+        if relative_path == os.pardir or relative_path.startswith(os.pardir + os.sep):
+            candidates = [path]
+        else:
+            candidates = []
+            while relative_path:
+                candidates.append(relative_path)
+                relative_path = os.path.dirname(relative_path)
+        return any(
+            self.explicit_matcher.matches(candidate) or self._is_git_ignored(candidate)
+            for candidate in candidates
+        )
+
+    def _first_visit(self, stat: os.stat_result) -> bool:
+        return self._first_visit_key((stat.st_dev, stat.st_ino))
+
+    def _first_visit_key(self, key: Tuple[int, int]) -> bool:
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        return True
+
+    def find(self, path: str) -> Iterator[str]:
+        """Yields the notebook files at a path, recursing into directories.
+
+        Within a directory, notebooks are yielded in name order before the
+        subdirectories are visited. A notebook file given directly is matched
+        with ``is_excluded_explicitly``, and ``on_excluded`` is told when it is
+        left out.
+
+        Args:
+            path (str): Path to a single ``.ipynb`` file or a directory.
+
+        Yields:
+            str: Path to each notebook file not seen before.
+
+        Raises:
+            ValueError: If the path is neither a directory nor a ``.ipynb`` file.
+        """
+        if os.path.isdir(path):
+            stat = os.stat(path)
+            if self._first_visit(stat):
+                yield from self._walk(path, stat)
+        elif path.endswith(".ipynb"):
+            if self.is_excluded_explicitly(path):
+                self.on_excluded(path)
+            elif self.in_shard(path) and self._first_visit(os.stat(path)):
+                yield path
+        else:
+            raise ValueError(
+                f"Cannot check file {path}. "
+                "Must be a path to a notebook file with the .ipynb extension, "
+                "or a directory."
+            )
+
+    def find_named(self, path: str) -> Iterator[str]:
+        """Yields a notebook named explicitly, unless it is excluded or outside the shard.
+
+        Unlike ``find``, the path need not exist, to be reported as unreadable,
+        and is yielded again each time it is named.
+
+        Args:
+            path (str): Path to a notebook file.
+
+        Yields:
+            str: The path, if it should be checked.
+        """
+        if self.is_excluded_explicitly(path):
+            self.on_excluded(path)
+        elif self.in_shard(path):
+            yield path
+
+    def _walk(self, top: str, top_stat: os.stat_result) -> Iterator[str]:
+        # Notebooks are identified by the inode from the directory listing and
+        # the device of their directory, so a walk costs one stat per directory
+        # rather than per file, which adds up on network filesystems.
+        key = os.path.abspath(top) if self.snapshot is not None else None
+        stack = [(top, key, top_stat.st_dev, top_stat.st_mtime_ns)]
+        while stack:
+            directory, key, device, mtime_ns = stack.pop()
+            listing = self._list(directory, key, mtime_ns)
+            if listing is None:
+                # Unreadable directories are skipped, as os.walk does.
+                continue
+            for name, inode in listing.notebooks:
+                path = os.path.join(directory, name)
+                if self.is_excluded(path) or not self.in_shard(path):
+                    continue
+                if inode is None:
+                    file_key = self._stat_file_key(path)
+                    if file_key is None:
+                        continue
+                else:
+                    file_key = (device, inode)
+                if self._first_visit_key(file_key):
+                    yield path
+            subdirectories = []
+            for name in listing.subdirectories:
+                path = os.path.join(directory, name)
+                if self.is_excluded(path):
+                    continue
+                try:
+                    # May be a mount point, on another device.
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if self._first_visit(stat):
+                    subdirectories.append(
+                        (
+                            path,
+                            key and os.path.join(key, name),
+                            stat.st_dev,
+                            stat.st_mtime_ns,
+                        )
+                    )
+            stack.extend(reversed(subdirectories))
+
+    def _list(
+        self, directory: str, key: Optional[str], mtime_ns: int
+    ) -> Optional[DirectoryListing]:
+        """Lists a directory, or reuses its listing from the snapshot."""
+        if key is not None:
+            listing = self.snapshot.get(key, mtime_ns)
+            if listing is not None:
+                return listing
+        try:
+            with os.scandir(directory) as scanner:
+                entries = sorted(scanner, key=lambda entry: entry.name)
+        except OSError:
+            return None
+        notebooks = []
+        subdirectories = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(entry.name)
+                elif entry.name.endswith(".ipynb"):
+                    if entry.is_symlink() or os.name == "nt":
+                        # Symlinks are identified by their target, and Windows
+                        # listings carry no inode.
+                        notebooks.append((entry.name, None))
+                    elif entry.is_file(follow_symlinks=False):
+                        notebooks.append((entry.name, entry.inode()))
+            except OSError:
+                continue
+        listing = DirectoryListing(mtime_ns, notebooks, subdirectories)
+        if key is not None:
+            self.snapshot.put(key, listing)
+        return listing
+
+    @staticmethod
+    def _stat_file_key(path: str) -> Optional[Tuple[int, int]]:
+        """Returns the device and inode of a notebook file, None if it isn't one."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if not S_ISREG(stat.st_mode):
+            return None
+        return (stat.st_dev, stat.st_ino)
@@ -0,0 +1,247 @@
+"""Re-checks notebooks as they are saved, reporting only changes in validity.
+
+The tree is walked once. After that, each poll stats the known notebooks and
+directories: a notebook whose size or mtime changed is re-checked, and a
+directory whose mtime changed, because a file in it was created, deleted or
+renamed, is listed again. Nothing else is read, and polling works on every
+filesystem, without inotify or similar.
+
+Jupyter autosaves write a notebook several times in quick succession, so a
+changed notebook is only checked once it has stopped changing for
+``DEBOUNCE_SECONDS``.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from . import reporters
+from .enforce_notebook_run_order import (
+    InvalidNotebookRunError,
+    process_path,
+    report_notebook,
+)
+from .results import NotebookResult
+from .walk import NotebookWalker
+
+POLL_INTERVAL_SECONDS = 0.5
+DEBOUNCE_SECONDS = 0.3
+
+
+def _stat_key(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+class TreeSnapshot:  # pylint: disable=too-few-public-methods
+    """Sizes and mtimes of the notebooks and directories under some paths.
+
+    Args:
+        paths (Iterable[str]): Notebook files and directories to watch.
+        walker (NotebookWalker): Walker holding the exclude patterns.
+
+    Raises:
+        ValueError: If a path is neither a directory nor a ``.ipynb`` file.
+    """
+
+    def __init__(self, paths: Iterable[str], walker: NotebookWalker):
+        self.walker = walker
+        self.notebooks: Dict[str, Tuple[int, int]] = {}
+        self.directories: Dict[str, int] = {}
+        # Notebooks named on the command line are watched even while missing.
+        self._explicit: Set[str] = set()
+        for path in paths:
+            if os.path.isdir(path):
+                self._scan(path, [])
+            elif not path.endswith(".ipynb"):
+                raise ValueError(
+                    f"Cannot watch file {path}. "
+                    "Must be a path to a notebook file with the .ipynb extension, "
+                    "or a directory."
+                )
+            elif walker.is_excluded_explicitly(path):
+                walker.on_excluded(path)
+            else:
+                self._explicit.add(path)
+                key = _stat_key(path)
+                if key is not None:
+                    self.notebooks[path] = key
+
+    def _scan(self, directory: str, found: List[str]) -> None:
+        """Records a directory and everything under it, adding new notebooks to ``found``."""
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+            with os.scandir(directory) as scanner:
+                entries = list(scanner)
+        except OSError:
+            return
+        self.directories[directory] = mtime
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.path not in self.directories and not (
+                        self.walker.is_excluded(entry.path)
+                    ):
+                        self._scan(entry.path, found)
+                elif entry.name.endswith(".ipynb") and entry.is_file():
+                    if entry.path not in self.notebooks and not (
+                        self.walker.is_excluded(entry.path)
+                    ):
+                        stat = entry.stat()
+                        self.notebooks[entry.path] = (stat.st_size, stat.st_mtime_ns)
+                        found.append(entry.path)
+            except OSError:
+                continue
+
+    def _forget(self, directory: str) -> List[str]:
+        """Drops a directory that disappeared, returning the notebooks under it."""
+        prefix = os.path.join(directory, "")
+        for path in [d for d in self.directories if d.startswith(prefix)]:
+            del self.directories[path]
+        self.directories.pop(directory, None)
+        removed = [path for path in self.notebooks if path.startswith(prefix)]
+        for path in removed:
+            del self.notebooks[path]
+        return removed
+
+    def poll(self) -> Tuple[List[str], List[str]]:
+        """Finds the notebooks created, modified or removed since the last poll.
+
+        Returns:
+            Tuple[List[str], List[str]]: Paths of the created or modified
+            notebooks, and of the removed ones.
+        """
+        changed: List[str] = []
+        removed: List[str] = []
+        for directory, mtime in list(self.directories.items()):
+            if directory not in self.directories:
+                continue  # forgotten along with a parent
+            key = _stat_key(directory)
+            if key is None:
+                removed += self._forget(directory)
+            elif key[1] != mtime:
+                # Listing the directory again picks up created and renamed
+                # entries; deleted ones are caught by the stat calls below.
+                self._scan(directory, changed)
+        for path in set(self.notebooks) | self._explicit:
+            key = _stat_key(path)
+            if key is None:
+                if self.notebooks.pop(path, None) is not None:
+                    removed.append(path)
+            elif key != self.notebooks.get(path):
+                self.notebooks[path] = key
+                changed.append(path)
+        return sorted(set(changed)), sorted(set(removed))
+
+
+class NotebookWatcher:
+    """Tracks the verdict of every watched notebook as the tree changes.
+
+    Args:
+        paths (Iterable[str]): Notebook files and directories to watch.
+        walker (NotebookWalker): Walker holding the exclude patterns.
+        debounce (float): Seconds a notebook must go unchanged before it is checked.
+    """
+
+    def __init__(
+        self,
+        paths: Iterable[str],
+        walker: NotebookWalker,
+        debounce: float = DEBOUNCE_SECONDS,
+    ):
+        self.snapshot = TreeSnapshot(paths, walker)
+        self.debounce = debounce
+        self.verdicts: Dict[str, Optional[str]] = {}
+        self._pending: Set[str] = set()
+        self._last_change = 0.0
+
+    def _check(self, notebook_paths: Iterable[str]) -> List[NotebookResult]:
+        results = []
+        # Verdicts are reported by the watcher, on transitions only. The
+        # snapshot already applied the exclude patterns.
+        with reporters.use_reporter(reporters.Reporter()):
+            for notebook_path in notebook_paths:
+                try:
+                    results += process_path(
+                        notebook_path,
+                        walker=NotebookWalker(use_default_excludes=False),
+                    )
+                except InvalidNotebookRunError as error:
+                    results += error.results
+                except (OSError, ValueError, KeyError):
+                    # Caught mid-save; the next write triggers another check.
+                    continue
+        return results
+
+    def check_all(self) -> List[NotebookResult]:
+        """Checks every watched notebook.
+
+        Returns:
+            List[NotebookResult]: The verdict for every notebook.
+        """
+        results = self._check(sorted(self.snapshot.notebooks))
+        self.verdicts = {result.path: result.error for result in results}
+        return results
+
+    def step(self, now: Optional[float] = None) -> List[NotebookResult]:
+        """Polls the tree once, checking notebooks that have settled.
+
+        Args:
+            now (Optional[float]): Current ``time.monotonic()``, for testing.
+
+        Returns:
+            List[NotebookResult]: Notebooks that became valid or invalid,
+            including new invalid notebooks.
+        """
+        now = time.monotonic() if now is None else now
+        changed, removed = self.snapshot.poll()
+        for path in removed:
+            self.verdicts.pop(path, None)
+            self._pending.discard(path)
+        if changed:
+            self._pending.update(changed)
+            self._last_change = now
+        if not self._pending or now - self._last_change < self.debounce:
+            return []
+        pending, self._pending = sorted(self._pending), set()
+        transitions = []
+        for result in self._check(pending):
+            previous = self.verdicts.get(result.path)
+            self.verdicts[result.path] = result.error
+            if (previous is None) != result.valid:
+                transitions.append(result)
+        return transitions
+
+
+def watch(
+    paths: Iterable[str],
+    walker: NotebookWalker,
+    interval: float = POLL_INTERVAL_SECONDS,
+    debounce: float = DEBOUNCE_SECONDS,
+    stop: Optional[threading.Event] = None,
+) -> None:
+    """Reports invalid notebooks, then reports each change in validity until stopped.
+
+    Args:
+        paths (Iterable[str]): Notebook files and directories to watch.
+        walker (NotebookWalker): Walker holding the exclude patterns.
+        interval (float): Seconds between polls.
+        debounce (float): Seconds a notebook must go unchanged before it is checked.
+        stop (Optional[threading.Event]): Stops watching once set. Without one,
+            watching continues until interrupted.
+    """
+    stop = stop or threading.Event()
+    watcher = NotebookWatcher(paths, walker, debounce)
+    reporter = reporters.get_reporter()
+    for result in watcher.check_all():
+        if not result.valid:
+            report_notebook(*result)
+    reporter.flush()
+    while not stop.wait(interval):
+        for result in watcher.step():
+            report_notebook(*result)
+        reporter.flush()
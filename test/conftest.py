@@ -3,6 +3,22 @@
 import pytest
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """Points the CLI's verdict cache at a fresh directory for every test."""
+    cache_dir = tmp_path / "nbcheck-cache"
+    monkeypatch.setenv("NBCHECK_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
+@pytest.fixture(autouse=True)
+def isolated_daemon_socket(tmp_path, monkeypatch):
+    """Points the CLI at a daemon socket no daemon listens on, unless a test starts one."""
+    socket_path = tmp_path / "nbcheck.sock"
+    monkeypatch.setenv("NBCHECK_SOCKET", str(socket_path))
+    return socket_path
+
+
 @pytest.fixture
 def valid_notebook_data():
     """Returns valid test notebook json with sequential execution counts."""
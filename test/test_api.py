@@ -0,0 +1,104 @@
+"""tests the api module"""
+
+import io
+import itertools
+import os
+from enforce_notebook_run_order import CheckResult, api, cache, iter_check, results
+from enforce_notebook_run_order.reporters import PlainReporter, get_reporter
+
+NOTEBOOKS_DIR = os.path.join("test", "test_data", "notebooks")
+VALID_NOTEBOOK = os.path.join(NOTEBOOKS_DIR, "python", "valid", "valid_notebook.ipynb")
+INVALID_NOTEBOOK = os.path.join(
+    NOTEBOOKS_DIR, "python", "invalid", "invalid_notebook.ipynb"
+)
+
+
+def test_check_notebook_describes_the_offending_cell():
+    """Tests that an invalid notebook's result names the cell and its counts"""
+    result = api.check_notebook(INVALID_NOTEBOOK)
+    assert result.status == results.OUT_OF_ORDER
+    assert not result.valid
+    assert result.cell_index is not None
+    assert result.execution_count != result.previous_count + 1
+    assert "not run sequentially" in result.error
+
+
+def test_check_notebook_valid():
+    """Tests that a valid notebook has no offending cell"""
+    assert api.check_notebook(VALID_NOTEBOOK) == CheckResult(VALID_NOTEBOOK)
+
+
+def test_check_notebook_captures_unreadable_files(tmp_path):
+    """Tests that broken and missing files are results, not exceptions"""
+    broken = tmp_path / "broken.ipynb"
+    broken.write_text("{", encoding="utf-8")
+    for path in (str(broken), str(tmp_path / "missing.ipynb")):
+        result = api.check_notebook(path)
+        assert result.status == results.UNREADABLE
+        assert result.error.startswith("Could not read notebook")
+
+
+def test_check_notebook_data(out_of_order_notebook_data):
+    """Tests that notebook data in memory is checked like a file"""
+    result = api.check_notebook_data("nb.ipynb", out_of_order_notebook_data)
+
+    assert result.status == results.OUT_OF_ORDER
+    assert (result.cell_index, result.execution_count) == (1, 3)
+
+
+def test_check_notebook_data_that_is_not_a_notebook():
+    """Tests that data without cells is unreadable, not an exception"""
+    result = api.check_notebook_data("nb.ipynb", {"metadata": {}})
+
+    assert result.status == results.UNREADABLE
+
+
+def test_iter_check_is_lazy_and_prints_nothing(capsys):
+    """Tests that results are yielded as paths are consumed, without output"""
+    paths = itertools.chain(
+        [VALID_NOTEBOOK, os.path.join(NOTEBOOKS_DIR, "python", "invalid")],
+        itertools.repeat(VALID_NOTEBOOK),
+    )
+    checked = list(itertools.islice(iter_check(paths), 5))
+    assert checked[0].valid
+    assert any(not result.valid for result in checked)
+    assert capsys.readouterr().out == ""
+
+
+def test_iter_check_reports_bad_paths():
+    """Tests that a path that isn't a notebook or directory yields a result"""
+    (result,) = iter_check(["README.md"])
+    assert result.status == results.UNREADABLE
+
+
+def test_iter_check_answers_from_the_cache_with_the_same_verdicts(tmp_path):
+    """Tests that cached verdicts keep the status and error of the first check"""
+    with cache.ResultCache(str(tmp_path)) as result_cache:
+        first = list(iter_check([NOTEBOOKS_DIR], cache=result_cache))
+    with cache.ResultCache(str(tmp_path)) as result_cache:
+        second = list(iter_check([NOTEBOOKS_DIR], cache=result_cache, prefetch=2))
+
+    assert {result.status for result in first} >= {results.VALID, results.OUT_OF_ORDER}
+    assert [(result.path, result.status, result.error) for result in second] == [
+        (result.path, result.status, result.error) for result in first
+    ]
+
+
+def test_iter_check_reports_missing_paths_as_unreadable(tmp_path):
+    """Tests that a path that doesn't exist yields an unreadable notebook"""
+    missing = str(tmp_path / "missing")
+    (result,) = iter_check([missing])
+    assert (result.path, result.status) == (missing, results.UNREADABLE)
+    assert results.is_read_error(result.error)
+
+
+def test_reporter_consumes_the_stream():
+    """Tests that any reporter can report a stream of results with a summary"""
+    stream = io.StringIO()
+    reporter = PlainReporter(stream)
+    summary = reporter.report(iter_check([VALID_NOTEBOOK, INVALID_NOTEBOOK]))
+    reporter.close()
+    assert (summary.checked, summary.invalid_paths) == (2, [INVALID_NOTEBOOK])
+    assert f"VALID: {VALID_NOTEBOOK}" in stream.getvalue()
+    assert "Checked 2 notebook(s): 1 valid, 1 invalid." in stream.getvalue()
+    assert get_reporter() is not reporter
@@ -0,0 +1,220 @@
+"""tests the archives module and checking notebooks inside archives"""
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import tarfile
+import zipfile
+import pytest
+from click.testing import CliRunner
+from enforce_notebook_run_order import archives, iter_check, results
+from enforce_notebook_run_order.cli import cli
+from enforce_notebook_run_order.enforce_notebook_run_order import (
+    InvalidNotebookRunError,
+    process_path,
+)
+from enforce_notebook_run_order.reporters import Reporter, use_reporter
+
+NOTEBOOKS_DIR = os.path.join("test", "test_data", "notebooks")
+VALID_NOTEBOOK = os.path.join(NOTEBOOKS_DIR, "python", "valid", "valid_notebook.ipynb")
+INVALID_NOTEBOOK = os.path.join(
+    NOTEBOOKS_DIR, "python", "invalid", "invalid_notebook.ipynb"
+)
+
+# pylint: disable=redefined-outer-name
+
+
+def read(path):
+    """Returns the bytes of a file."""
+    with open(path, "rb") as file:
+        return file.read()
+
+
+@pytest.fixture
+def members():
+    """Returns archive members: two notebooks, a compressed one and a non-notebook."""
+    return {
+        "bundle/valid.ipynb": read(VALID_NOTEBOOK),
+        "bundle/README.md": b"not a notebook",
+        "bundle/deep/invalid.ipynb": read(INVALID_NOTEBOOK),
+        "bundle/packed.ipynb.gz": gzip.compress(read(VALID_NOTEBOOK)),
+    }
+
+
+@pytest.fixture
+def zip_path(tmp_path, members):
+    """Writes the members to a zip archive."""
+    path = str(tmp_path / "bundle.zip")
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return path
+
+
+@pytest.fixture
+def tar_path(tmp_path, members):
+    """Writes the members to a gzipped tar archive."""
+    path = str(tmp_path / "bundle.tar.gz")
+    with tarfile.open(path, "w:gz") as archive:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return path
+
+
+@pytest.mark.parametrize("archive", ["zip_path", "tar_path"])
+def test_iter_notebook_streams_yields_only_notebooks(archive, request):
+    """Tests that only notebook members are yielded, decompressed"""
+    path = request.getfixturevalue(archive)
+    streams = {
+        name: stream.read() for name, stream in archives.iter_notebook_streams(path)
+    }
+    assert streams == {
+        f"{path}!/bundle/valid.ipynb": read(VALID_NOTEBOOK),
+        f"{path}!/bundle/deep/invalid.ipynb": read(INVALID_NOTEBOOK),
+        f"{path}!/bundle/packed.ipynb.gz": read(VALID_NOTEBOOK),
+    }
+
+
+@pytest.mark.parametrize(
+    "compress, suffix",
+    [
+        (gzip.compress, ".gz"),
+        (bz2.compress, ".bz2"),
+        (lzma.compress, ".xz"),
+    ],
+)
+def test_compressed_notebooks_are_checked(tmp_path, compress, suffix):
+    """Tests that a single compressed notebook is checked under its own path"""
+    path = str(tmp_path / f"invalid.ipynb{suffix}")
+    with open(path, "wb") as file:
+        file.write(compress(read(INVALID_NOTEBOOK)))
+    with use_reporter(Reporter()):
+        with pytest.raises(InvalidNotebookRunError) as error:
+            process_path(path)
+    assert [result.path for result in error.value.results] == [path]
+
+
+def test_process_path_reports_archive_members(zip_path):
+    """Tests that every notebook in an archive is checked and named archive!/member"""
+    with use_reporter(Reporter()):
+        with pytest.raises(InvalidNotebookRunError) as error:
+            process_path(zip_path)
+    assert [(result.path, result.valid) for result in error.value.results] == [
+        (f"{zip_path}!/bundle/valid.ipynb", True),
+        (f"{zip_path}!/bundle/deep/invalid.ipynb", False),
+        (f"{zip_path}!/bundle/packed.ipynb.gz", True),
+    ]
+    assert f"Notebook {zip_path}!/bundle/deep/invalid.ipynb" in str(error.value)
+
+
+def test_process_path_fail_fast_stops_inside_archive(tar_path):
+    """Tests that fail_fast stops at the first invalid member"""
+    with use_reporter(Reporter()):
+        with pytest.raises(InvalidNotebookRunError) as error:
+            process_path(tar_path, fail_fast=True)
+    assert len(error.value.results) == 2
+
+
+def test_corrupt_archive_raises_os_error(tmp_path):
+    """Tests that a corrupt archive is an OSError, not a crash in zipfile"""
+    path = tmp_path / "broken.zip"
+    path.write_bytes(b"not a zip")
+    with pytest.raises(OSError):
+        list(archives.iter_notebook_streams(str(path)))
+
+
+def test_iter_check_reads_archives(zip_path):
+    """Tests that the library API streams archive members too"""
+    checked = list(iter_check([zip_path]))
+    assert [result.status for result in checked] == [
+        results.VALID,
+        results.OUT_OF_ORDER,
+        results.VALID,
+    ]
+
+
+def test_cli_checks_archives_with_jobs(zip_path):
+    """Tests that archives are checked in-process alongside parallel checks"""
+    runner = CliRunner()
+    result = runner.invoke(
+        cli, ["--format", "plain", "-j", "2", VALID_NOTEBOOK, zip_path]
+    )
+    assert result.exit_code == 1
+    assert f"INVALID: {zip_path}!/bundle/deep/invalid.ipynb" in result.output
+    assert "Checked 4 notebook(s): 3 valid, 1 invalid." in result.output
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_cli_reports_corrupt_archives(tmp_path, jobs):
+    """Tests that a corrupt archive is reported as a failed result, not a crash"""
+    path = tmp_path / "broken.tar.gz"
+    path.write_bytes(b"not a tarball")
+    runner = CliRunner()
+    result = runner.invoke(
+        cli, ["--format", "plain", "-j", jobs, VALID_NOTEBOOK, str(path)]
+    )
+    assert result.exit_code == 1
+    assert f"INVALID: {path}" in result.output
+    assert "Could not read notebook" in result.output
+    assert "Checked 2 notebook(s): 1 valid, 1 invalid." in result.output
+
+
+def corrupt_xz(path):
+    """Writes a compressed notebook with a corrupt byte in the middle."""
+    data = bytearray(lzma.compress(read(VALID_NOTEBOOK)))
+    data[len(data) // 2] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+
+def truncated_xz(path):
+    """Writes a compressed notebook cut off halfway."""
+    data = lzma.compress(read(VALID_NOTEBOOK))
+    path.write_bytes(data[: len(data) // 2])
+
+
+def zip_with_bad_crc(path):
+    """Writes a zip archive whose member doesn't match its CRC."""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as archive:
+        archive.writestr("valid.ipynb", read(VALID_NOTEBOOK))
+    data = bytearray(path.read_bytes())
+    # The CRC-32 is at offset 16 of the member's central directory entry.
+    data[data.index(b"PK\x01\x02") + 16] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+
+def zip_with_corrupt_data(path):
+    """Writes a zip archive whose deflated member is corrupt."""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("valid.ipynb", read(VALID_NOTEBOOK))
+    data = bytearray(path.read_bytes())
+    # The compressed data follows the 30 byte local header and the name.
+    for index in range(45, 60):
+        data[index] ^= 0x55
+    path.write_bytes(bytes(data))
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+@pytest.mark.parametrize(
+    "name, write",
+    [
+        ("corrupt.ipynb.xz", corrupt_xz),
+        ("truncated.ipynb.xz", truncated_xz),
+        ("bad_crc.zip", zip_with_bad_crc),
+        ("corrupt_data.zip", zip_with_corrupt_data),
+    ],
+)
+def test_cli_reports_corrupt_members(tmp_path, name, write, jobs):
+    """Tests that corrupt compressed data is reported, not a crash of the run"""
+    path = tmp_path / name
+    write(path)
+    runner = CliRunner()
+    result = runner.invoke(
+        cli, ["--format", "plain", "-j", jobs, str(path), VALID_NOTEBOOK]
+    )
+    assert result.exit_code == 1
+    assert "Could not read notebook" in result.output
+    assert "Checked 2 notebook(s): 1 valid, 1 invalid." in result.output
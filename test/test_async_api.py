@@ -0,0 +1,133 @@
+"""tests the async_api module"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import pytest
+from enforce_notebook_run_order import api, async_api, json_backends, limits
+from enforce_notebook_run_order.results import OUT_OF_ORDER, UNREADABLE, VALID
+
+NOTEBOOKS_DIR = os.path.join("test", "test_data", "notebooks")
+VALID_NOTEBOOK = os.path.join(NOTEBOOKS_DIR, "python", "valid", "valid_notebook.ipynb")
+INVALID_NOTEBOOK = os.path.join(
+    NOTEBOOKS_DIR, "python", "invalid", "invalid_notebook.ipynb"
+)
+
+
+async def collect(results):
+    """Gathers the items of an async iterator into a list."""
+    return [result async for result in results]
+
+
+def test_check_paths_matches_iter_check():
+    """Tests that the async checks find the same verdicts as the sync API"""
+    paths = [NOTEBOOKS_DIR, "README.md"]
+
+    results = asyncio.run(collect(async_api.check_paths(paths, concurrency=3)))
+
+    assert sorted(results) == sorted(api.iter_check(paths))
+
+
+def test_check_paths_limits_concurrency(mocker):
+    """Tests that no more than ``concurrency`` checks run at once"""
+    lock = threading.Lock()
+    running = []
+    peak = []
+    check_notebook = api.check_notebook
+
+    def counting_check(notebook_path, data=None):
+        with lock:
+            running.append(notebook_path)
+            peak.append(len(running))
+        try:
+            threading.Event().wait(0.01)
+            return check_notebook(notebook_path, data)
+        finally:
+            with lock:
+                running.remove(notebook_path)
+
+    mocker.patch.object(api, "check_notebook", counting_check)
+    paths = [VALID_NOTEBOOK] * 12
+
+    results = asyncio.run(collect(async_api.check_paths(paths, concurrency=2)))
+
+    assert len(results) == 12
+    assert max(peak) == 2
+
+
+def test_check_paths_cancels_pending_checks(mocker):
+    """Tests that closing the iterator early cancels checks not yet started"""
+    checked = []
+    check_notebook = api.check_notebook
+
+    def recording_check(notebook_path, data=None):
+        checked.append(notebook_path)
+        return check_notebook(notebook_path, data)
+
+    mocker.patch.object(api, "check_notebook", recording_check)
+
+    async def first_result():
+        results = async_api.check_paths([VALID_NOTEBOOK] * 50, concurrency=4)
+        first = await results.__anext__()
+        await results.aclose()
+        return first
+
+    assert asyncio.run(first_result()).status == VALID
+    assert len(checked) < 50
+
+
+def test_check_paths_rejects_zero_concurrency():
+    """Tests that a concurrency below 1 is refused"""
+    with pytest.raises(ValueError):
+        asyncio.run(collect(async_api.check_paths([VALID_NOTEBOOK], concurrency=0)))
+
+
+def test_check_notebook_bytes():
+    """Tests checking notebook content without a file"""
+
+    async def check_both():
+        with open(INVALID_NOTEBOOK, "rb") as notebook_file:
+            data = notebook_file.read()
+        return await asyncio.gather(
+            async_api.check_notebook_bytes("upload.ipynb", data),
+            async_api.check_notebook_bytes("broken.ipynb", b"{"),
+        )
+
+    invalid, broken = asyncio.run(check_both())
+
+    assert (invalid.path, invalid.status) == ("upload.ipynb", OUT_OF_ORDER)
+    assert broken.status == UNREADABLE
+
+
+def test_check_paths_in_process_pool():
+    """Tests that notebooks can be parsed in worker processes"""
+
+    async def check_in_pool():
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            with json_backends.using("json"):
+                return await collect(
+                    async_api.check_paths(
+                        [VALID_NOTEBOOK, INVALID_NOTEBOOK], executor=executor
+                    )
+                )
+
+    results = asyncio.run(check_in_pool())
+
+    assert sorted(result.status for result in results) == [OUT_OF_ORDER, VALID]
+
+
+def test_run_applies_callers_settings():
+    """Tests that a check in another process runs with the caller's settings"""
+    seen = []
+
+    def check():
+        seen.append((json_backends.current(), limits.current()))
+        return []
+
+    resource_limits = limits.Limits(timeout=5)
+    # pylint: disable-next=protected-access
+    async_api._run(check, (), "json", resource_limits)
+
+    assert seen == [("json", resource_limits)]
+    assert limits.current() == limits.Limits()
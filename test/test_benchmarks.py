@@ -0,0 +1,106 @@
+"""tests the benchmark corpus generator and baseline comparison"""
+
+import os
+from click.testing import CliRunner
+from benchmarks import corpus, run
+from enforce_notebook_run_order.enforce_notebook_run_order import process_path
+
+
+def test_generate_corpus_writes_valid_notebooks(tmp_path):
+    """Tests that every generated corpus holds only valid notebooks"""
+    corpora = corpus.generate_corpus(str(tmp_path), scale=0.001)
+
+    assert set(corpora) == set(corpus.CORPORA)
+    for path in corpora.values():
+        results = process_path(path)
+        assert results
+        assert all(result.valid for result in results)
+
+
+def test_generate_corpus_reuses_existing_corpus(tmp_path, mocker):
+    """Tests that a corpus generated before at the same scale is not rewritten"""
+    corpus.generate_corpus(str(tmp_path), scale=0.001)
+    write_notebook = mocker.patch.object(corpus, "write_notebook")
+
+    corpus.generate_corpus(str(tmp_path), scale=0.001)
+
+    write_notebook.assert_not_called()
+
+
+def test_make_notebook_output_size():
+    """Tests that the requested volume of base64 output is generated"""
+    notebook = corpus.make_notebook(4, output_bytes=3 * 1024 * 1024)
+
+    images = [
+        output["data"]["image/png"]
+        for cell in notebook["cells"]
+        for output in cell.get("outputs", [])
+        if "data" in output
+    ]
+    assert sum(len(image) for image in images) == 3 * 1024 * 1024
+
+
+def test_compare_flags_slowdowns_and_memory_growth():
+    """Tests that only measurements beyond the allowed ratio are flagged"""
+    baseline = {
+        "fast": run.Measurement(1.0, 1000),
+        "slow": run.Measurement(1.0, 1000),
+        "hungry": run.Measurement(1.0, 1000),
+        "noisy": run.Measurement(0.0001, 1000),
+    }
+    results = {
+        "fast": run.Measurement(1.1, 1000),
+        "slow": run.Measurement(2.0, 1000),
+        "hungry": run.Measurement(1.0, 5000),
+        "noisy": run.Measurement(0.001, 1000),
+        "new": run.Measurement(9.0, 9000),
+    }
+
+    regressions = run.compare(results, baseline, max_slowdown=1.25)
+
+    assert len(regressions) == 2
+    assert regressions[0].startswith("slow:")
+    assert regressions[1].startswith("hungry: peak")
+
+
+def test_main_saves_and_compares_baseline(tmp_path):
+    """Tests a full benchmark run, saving a baseline and then comparing with it"""
+    baseline_path = str(tmp_path / "baseline.json")
+    args = [
+        "--scale",
+        "0.001",
+        "--corpus-dir",
+        str(tmp_path / "corpus"),
+        "--repeat",
+        "1",
+        "--baseline",
+        baseline_path,
+    ]
+    runner = CliRunner()
+
+    result = runner.invoke(run.main, [*args, "--save-baseline"])
+    assert result.exit_code == 0
+    assert os.path.exists(baseline_path)
+
+    result = runner.invoke(run.main, [*args, "--max-slowdown", "1000"])
+    assert result.exit_code == 0
+    assert "process_path[deep_tree]" in result.output
+    assert "No regressions" in result.output
+
+
+def test_compare_scales_times_by_the_reference():
+    """Tests that a machine that is slower across the board shows no regressions"""
+    baseline = {
+        run.REFERENCE: run.Measurement(1.0, 1000),
+        "same": run.Measurement(1.0, 1000),
+        "slower": run.Measurement(1.0, 1000),
+    }
+    results = {
+        run.REFERENCE: run.Measurement(3.0, 1000),
+        "same": run.Measurement(3.0, 1000),
+        "slower": run.Measurement(6.0, 1000),
+    }
+
+    regressions = run.compare(results, baseline, max_slowdown=1.25)
+
+    assert regressions == ["slower: 6.000s vs 3.000s (2.00x)"]
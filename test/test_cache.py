@@ -0,0 +1,160 @@
+"""tests the cache module"""
+
+import os
+import shutil
+import pytest
+from click.testing import CliRunner
+from enforce_notebook_run_order import cache, enforce_notebook_run_order
+from enforce_notebook_run_order.cli import cli
+
+VALID_NOTEBOOK = os.path.join(
+    "test", "test_data", "notebooks", "python", "valid", "valid_notebook.ipynb"
+)
+INVALID_NOTEBOOK = os.path.join(
+    "test", "test_data", "notebooks", "python", "invalid", "invalid_notebook.ipynb"
+)
+
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture
+def notebook_copy(tmp_path):
+    """Returns a path to a scratch copy of a valid notebook."""
+    path = tmp_path / "notebook.ipynb"
+    shutil.copyfile(VALID_NOTEBOOK, path)
+    return str(path)
+
+
+def test_cache_miss_then_hit(tmp_path, notebook_copy):
+    """Tests that a stored verdict is returned by a later cache instance"""
+    with cache.ResultCache(str(tmp_path / "cache")) as result_cache:
+        assert result_cache.get(notebook_copy) is None
+        result_cache.put(notebook_copy, "out of order")
+
+    with cache.ResultCache(str(tmp_path / "cache")) as result_cache:
+        assert result_cache.get(notebook_copy) == cache.CachedVerdict("out of order")
+
+
+def test_cache_touched_file_hits_by_content_hash(tmp_path, notebook_copy, mocker):
+    """Tests that a file with a new mtime but the same content is a hit"""
+    with cache.ResultCache(str(tmp_path / "cache")) as result_cache:
+        result_cache.get(notebook_copy)
+        result_cache.put(notebook_copy, None)
+    os.utime(notebook_copy, ns=(0, 0))
+
+    with cache.ResultCache(str(tmp_path / "cache")) as result_cache:
+        assert result_cache.get(notebook_copy) == cache.CachedVerdict(None)
+
+    # The new mtime was stored, so the next lookup doesn't hash the file.
+    mock_file_digest = mocker.patch.object(cache, "file_digest")
+    with cache.ResultCache(str(tmp_path / "cache")) as result_cache:
+        assert result_cache.get(notebook_copy) == cache.CachedVerdict(None)
+    mock_file_digest.assert_not_called()
+
+
+def test_cache_modified_file_misses(tmp_path, notebook_copy):
+    """Tests that changing a notebook's content invalidates its verdict"""
+    with cache.ResultCache(str(tmp_path / "cache")) as result_cache:
+        result_cache.get(notebook_copy)
+        result_cache.put(notebook_copy, None)
+    shutil.copyfile(INVALID_NOTEBOOK, notebook_copy)
+
+    with cache.ResultCache(str(tmp_path / "cache")) as result_cache:
+        assert result_cache.get(notebook_copy) is None
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path):
+    """Tests that the cache stays within its entry limit"""
+    paths = []
+    for index in range(10):
+        path = tmp_path / f"notebook_{index}.ipynb"
+        path.write_text(f'{{"cells": [], "index": {index}}}')
+        paths.append(str(path))
+
+    with cache.ResultCache(str(tmp_path / "cache"), max_entries=5) as result_cache:
+        for path in paths:
+            result_cache.put(path, None)
+
+    with cache.ResultCache(str(tmp_path / "cache"), max_entries=5) as result_cache:
+        hits = [path for path in paths if result_cache.get(path) is not None]
+    assert len(hits) <= 5
+
+
+def test_cache_unusable_directory_is_a_miss(tmp_path, notebook_copy):
+    """Tests that a cache that can't be opened never breaks the check"""
+    blocker = tmp_path / "not_a_directory"
+    blocker.write_text("")
+
+    with cache.ResultCache(str(blocker)) as result_cache:
+        assert result_cache.get(notebook_copy) is None
+        result_cache.put(notebook_copy, None)
+
+
+def test_process_path_with_cache_skips_unchanged_notebooks(tmp_path, mocker):
+    """Tests that process_path reports cached notebooks without checking them"""
+    with cache.ResultCache(str(tmp_path / "cache")) as result_cache:
+        with pytest.raises(enforce_notebook_run_order.InvalidNotebookRunError):
+            enforce_notebook_run_order.process_path(
+                INVALID_NOTEBOOK, cache=result_cache
+            )
+
+    mock_check_single_notebook = mocker.patch(
+        "enforce_notebook_run_order.enforce_notebook_run_order.check_single_notebook"
+    )
+    with cache.ResultCache(str(tmp_path / "cache")) as result_cache:
+        with pytest.raises(enforce_notebook_run_order.InvalidNotebookRunError) as error:
+            enforce_notebook_run_order.process_path(
+                INVALID_NOTEBOOK, cache=result_cache
+            )
+
+    mock_check_single_notebook.assert_not_called()
+    assert "not run sequentially" in str(error.value)
+
+
+def test_cli_reuses_cache_between_runs(mocker):
+    """Tests that a second CLI run answers from the cache, and --no-cache bypasses it"""
+    runner = CliRunner()
+    first = runner.invoke(cli, ["test/test_data/notebooks/python"])
+    mock_find_notebook_violation = mocker.patch(
+        "enforce_notebook_run_order.enforce_notebook_run_order.find_notebook_violation"
+    )
+
+    second = runner.invoke(cli, ["test/test_data/notebooks/python"])
+    assert second.exit_code == first.exit_code == 1
+    assert second.output == first.output
+    mock_find_notebook_violation.assert_not_called()
+
+    runner.invoke(cli, ["--no-cache", "test/test_data/notebooks/python"])
+    assert mock_find_notebook_violation.called
+
+
+def test_cache_miss_reads_the_notebook_once(tmp_path, notebook_copy, mocker):
+    """Tests that a changed notebook is hashed from the content read to check it"""
+    file_digest = mocker.spy(cache, "file_digest")
+    read = mocker.spy(enforce_notebook_run_order.pipeline, "read_notebook_bytes")
+
+    with cache.ResultCache(str(tmp_path / "cache")) as result_cache:
+        enforce_notebook_run_order.process_path(notebook_copy, cache=result_cache)
+    os.utime(notebook_copy, ns=(0, 0))
+    with cache.ResultCache(str(tmp_path / "cache")) as result_cache:
+        enforce_notebook_run_order.process_path(notebook_copy, cache=result_cache)
+
+    file_digest.assert_not_called()
+    assert read.call_count == 2
+    with cache.ResultCache(str(tmp_path / "cache")) as result_cache:
+        assert result_cache.get_unchanged(notebook_copy) == cache.CachedVerdict(None)
+
+
+def test_parallel_check_hashes_in_the_workers(tmp_path, mocker):
+    """Tests that with --jobs the parent only stats notebooks, and stores worker hashes"""
+    file_digest = mocker.spy(cache, "file_digest")
+    notebooks_dir = os.path.dirname(VALID_NOTEBOOK)
+    runner = CliRunner()
+    args = ["--cache-dir", str(tmp_path / "cache"), "-j", "2", notebooks_dir]
+
+    first = runner.invoke(cli, args)
+    file_digest.assert_not_called()
+    with cache.ResultCache(str(tmp_path / "cache")) as result_cache:
+        assert result_cache.get_unchanged(VALID_NOTEBOOK) is not None
+        assert result_cache.get(VALID_NOTEBOOK) == cache.CachedVerdict(None)
+    assert runner.invoke(cli, args).output == first.output
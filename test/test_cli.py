@@ -1,8 +1,15 @@
 """tests the CLI module"""
 
+import json
+import os
+import pytest
 from click.testing import CliRunner
+from enforce_notebook_run_order import json_backends
 from enforce_notebook_run_order.cli import cli
 
+VALID_NOTEBOOK = "test/test_data/notebooks/python/valid/valid_notebook.ipynb"
+INVALID_NOTEBOOK = "test/test_data/notebooks/python/invalid/invalid_notebook.ipynb"
+
 # pylint: disable=redefined-outer-name
 
 
@@ -47,39 +54,45 @@ def test_cli_no_args_searches_current_directory(mocker):
     """
     Tests that the CLI searches the entire current directory if no paths are specified.
     """
-    mock_process_path = mocker.patch("enforce_notebook_run_order.cli.process_path")
+    mock_iter_check = mocker.patch("enforce_notebook_run_order.cli.iter_check")
 
     runner = CliRunner()
     result = runner.invoke(cli)
 
-    # The process_path function should be called once, with the current directory as its argument
-    mock_process_path.assert_called_once_with(".")
+    # The iter_check function should be called once, with the current directory as its path
+    mock_iter_check.assert_called_once_with(
+        (".",),
+        walker=mocker.ANY,
+        cache=mocker.ANY,
+        prefetch=0,
+        prefetch_bytes=mocker.ANY,
+    )
 
     assert result.exit_code == 0
 
 
-def test_cli_no_args_delegates_to_process_path_with_dot(mocker):
+def test_cli_no_args_delegates_to_iter_check_with_dot(mocker):
     """
-    Tests that process_path is called with "." when no paths are specified.
+    Tests that iter_check is called with "." when no paths are specified.
     This verifies the recursion starts from the current directory.
     """
-    mock_process_path = mocker.patch("enforce_notebook_run_order.cli.process_path")
+    mock_iter_check = mocker.patch("enforce_notebook_run_order.cli.iter_check")
 
     runner = CliRunner()
     result = runner.invoke(cli, [])
 
-    # Verify process_path was called exactly once with "."
-    mock_process_path.assert_called_once()
-    args, _ = mock_process_path.call_args
-    assert args[0] == "."
+    # Verify iter_check was called exactly once with "."
+    mock_iter_check.assert_called_once()
+    args, _ = mock_iter_check.call_args
+    assert list(args[0]) == ["."]
     assert result.exit_code == 0
 
 
-def test_cli_multiple_paths_delegates_to_process_path_for_each(mocker):
+def test_cli_multiple_paths_delegates_to_iter_check_with_each(mocker):
     """
-    Tests that process_path is called for each path argument provided.
+    Tests that iter_check is given every path argument provided.
     """
-    mock_process_path = mocker.patch("enforce_notebook_run_order.cli.process_path")
+    mock_iter_check = mocker.patch("enforce_notebook_run_order.cli.iter_check")
 
     test_path_1 = "test/test_data/notebooks/python/valid"
     test_path_2 = "test/test_data/notebooks/python/invalid"
@@ -87,41 +100,32 @@ def test_cli_multiple_paths_delegates_to_process_path_for_each(mocker):
     runner = CliRunner()
     result = runner.invoke(cli, [test_path_1, test_path_2])
 
-    # Verify process_path was called twice, once for each path
-    assert mock_process_path.call_count == 2
-    calls = [call[0][0] for call in mock_process_path.call_args_list]
-    assert test_path_1 in calls
-    assert test_path_2 in calls
+    # Verify iter_check was called once, with both paths
+    assert mock_iter_check.call_count == 1
+    paths = list(mock_iter_check.call_args[0][0])
+    assert test_path_1 in paths
+    assert test_path_2 in paths
     assert result.exit_code == 0
 
 
-def test_cli_no_args_delegates_to_process_path_with_current_dir(mocker):
+def test_cli_no_args_delegates_to_iter_check_with_current_dir(mocker):
     """
-    Tests that calling CLI with no paths delegates to process_path with
+    Tests that calling CLI with no paths delegates to iter_check with
     the current directory, enabling recursive scanning from root.
     """
-    mock_load_notebook_data = mocker.patch(
-        "enforce_notebook_run_order.utils.load_notebook_data"
-    )
-    mock_check_notebook_run_order = mocker.patch(
-        "enforce_notebook_run_order.enforce_notebook_run_order.check_notebook_run_order"
+    mock_find_violation = mocker.patch(
+        "enforce_notebook_run_order.enforce_notebook_run_order.find_violation",
+        return_value=None,
     )
 
-    # Return valid notebook data so process_path succeeds
-    mock_load_notebook_data.return_value = {
-        "cells": [
-            {"cell_type": "code", "execution_count": 1, "source": ["print('foo')"]}
-        ]
-    }
-
     runner = CliRunner()
     result = runner.invoke(cli, [])
 
     # Verify the chain of calls demonstrates recursion from current directory
     assert result.exit_code == 0
-    # Both check_notebook_run_order was called (proving notebooks were processed)
+    # Both find_violation was called (proving notebooks were processed)
     # and the process started from "." (which os.walk would handle recursively)
-    assert mock_check_notebook_run_order.called
+    assert mock_find_violation.called
 
 
 def test_cli_no_args_exits_with_error_on_invalid_notebook():
@@ -252,3 +256,314 @@ def test_cli_multiple_language_notebooks():
     assert result.exit_code == 0
     # Should see success messages for all three notebooks
     assert result.output.count("VALID") == 3
+
+
+def test_cli_jobs_directory_with_invalid_notebook():
+    """Tests that the CLI returns 1 in parallel mode when a notebook is invalid."""
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--jobs", "2", "test/test_data/notebooks"])
+
+    assert result.exit_code == 1
+    assert "INVALID" in result.output
+    assert "not run sequentially" in result.output
+
+
+def test_cli_jobs_valid_notebooks():
+    """Tests that the CLI returns 0 in parallel mode when every notebook is valid."""
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        [
+            "-j",
+            "auto",
+            "test/test_data/notebooks/python/valid",
+            "test/test_data/notebooks/r/valid",
+        ],
+    )
+
+    assert result.exit_code == 0
+    assert result.output.count("VALID") == 2
+
+
+def test_cli_jobs_rejects_invalid_value():
+    """Tests that the CLI rejects a job count that is not a positive integer."""
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--jobs", "0", "test/test_data/notebooks"])
+
+    assert result.exit_code == 2
+
+
+def test_cli_json_backend():
+    """Tests that notebooks are checked the same when decoded whole."""
+    runner = CliRunner()
+    result = runner.invoke(
+        cli, ["--no-cache", "--json-backend", "json", "test/test_data/notebooks"]
+    )
+
+    assert result.exit_code == 1
+    assert "not run sequentially" in result.output
+
+
+def test_cli_json_backend_not_installed(mocker):
+    """Tests that asking for a backend that is not installed is a usage error."""
+    mocker.patch.object(json_backends, "_is_installed", return_value=False)
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--json-backend", "orjson", "test/test_data"])
+
+    assert result.exit_code == 2
+    assert "not installed" in result.output
+
+
+def test_cli_shards_and_merge(tmp_path):
+    """Tests that shard results merge into the same verdicts as a single run."""
+    runner = CliRunner()
+    result_files = []
+    for index in (1, 2, 3):
+        result = runner.invoke(
+            cli,
+            [
+                "--no-cache",
+                "--shard",
+                f"{index}/3",
+                "--format",
+                "jsonl",
+                "test/test_data",
+            ],
+        )
+        result_file = tmp_path / f"shard-{index}.jsonl"
+        result_file.write_text(result.stdout, encoding="utf-8")
+        result_files.append(str(result_file))
+
+    merged = runner.invoke(cli, ["merge", "--format", "jsonl", *result_files])
+    single = runner.invoke(cli, ["--no-cache", "--format", "jsonl", "test/test_data"])
+
+    assert merged.exit_code == single.exit_code == 1
+    merged_lines = [json.loads(line) for line in merged.stdout.splitlines()]
+    single_lines = [json.loads(line) for line in single.stdout.splitlines()]
+    assert merged_lines[-1] == single_lines[-1]
+    assert sorted(merged_lines[:-1], key=lambda line: line["path"]) == sorted(
+        single_lines[:-1], key=lambda line: line["path"]
+    )
+
+
+def test_cli_merge_valid_results(tmp_path):
+    """Tests that merging only valid results exits with status 0."""
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--no-cache", "--format", "jsonl", VALID_NOTEBOOK])
+    result_file = tmp_path / "results.jsonl"
+    result_file.write_text(result.stdout, encoding="utf-8")
+
+    merged = runner.invoke(cli, ["merge", "--format", "plain", str(result_file)])
+
+    assert merged.exit_code == 0
+    assert "VALID" in merged.output
+
+
+def test_cli_merge_rejects_incomplete_results(tmp_path):
+    """Tests that results without a summary are an error, not a pass."""
+    result_file = tmp_path / "results.jsonl"
+    result_file.write_text("", encoding="utf-8")
+    runner = CliRunner()
+
+    result = runner.invoke(cli, ["merge", str(result_file)])
+
+    assert result.exit_code == 1
+    assert "did not finish" in result.output
+
+
+def test_cli_shard_rejects_invalid_value():
+    """Tests that a shard outside 1..N is a usage error."""
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--shard", "4/3", "test/test_data"])
+
+    assert result.exit_code == 2
+    assert "i/N" in result.output
+
+
+def test_cli_exclude_skips_matching_notebooks():
+    """Tests that --exclude skips notebooks, so an excluded invalid one doesn't fail."""
+    runner = CliRunner()
+    result = runner.invoke(
+        cli, ["--exclude", "invalid", "test/test_data/notebooks/python"]
+    )
+
+    assert result.exit_code == 0
+    assert "INVALID" not in result.output
+
+
+def test_cli_exclude_from_pyproject(tmp_path, monkeypatch):
+    """Tests that exclude patterns are read from pyproject.toml."""
+    notebooks_dir = os.path.abspath("test/test_data/notebooks/python")
+    (tmp_path / "pyproject.toml").write_text(
+        '[tool.enforce-notebook-run-order]\nexclude = ["invalid"]\n'
+    )
+    monkeypatch.chdir(tmp_path)
+
+    result = CliRunner().invoke(cli, [notebooks_dir])
+
+    assert result.exit_code == 0
+
+
+def test_cli_reports_every_invalid_notebook_with_summary():
+    """Tests that every invalid notebook is reported in one run, then summarized."""
+    runner = CliRunner()
+    result = runner.invoke(cli, ["test/test_data/notebooks"])
+
+    assert result.exit_code == 1
+    assert result.output.count("INVALID") == 4
+    assert "Checked 9 notebook(s): 5 valid, 4 invalid." in result.output
+
+
+def test_cli_fail_fast_stops_at_first_invalid_notebook():
+    """Tests that --fail-fast stops after the first invalid notebook."""
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--fail-fast", "test/test_data/notebooks"])
+
+    assert result.exit_code == 1
+    assert result.output.count("INVALID") == 1
+    assert "1 invalid." in result.output
+
+
+def test_cli_format_jsonl():
+    """Tests that --format jsonl writes one JSON record per notebook and a summary."""
+    runner = CliRunner()
+    result = runner.invoke(
+        cli, ["--format", "jsonl", "test/test_data/notebooks/python"]
+    )
+
+    records = [json.loads(line) for line in result.output.splitlines()]
+    assert result.exit_code == 1
+    assert [record["type"] for record in records] == ["notebook"] * 2 + ["summary"]
+    assert records[-1]["invalid"] == 1
+
+
+def test_cli_quiet_only_reports_invalid_notebooks():
+    """Tests that --quiet leaves valid notebooks out of the output."""
+    runner = CliRunner()
+    result = runner.invoke(
+        cli, ["--quiet", "--format", "plain", "test/test_data/notebooks/python"]
+    )
+
+    assert result.exit_code == 1
+    assert "INVALID: " in result.output
+    assert "\nVALID: " not in result.output and not result.output.startswith("VALID")
+
+    result = runner.invoke(cli, ["--quiet", "test/test_data/notebooks/python/valid"])
+
+    assert result.exit_code == 0
+    assert result.output == ""
+
+
+def test_cli_watch_cannot_be_combined_with_git_modes():
+    """Tests that --watch is rejected with --staged"""
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--watch", "--staged"])
+    assert result.exit_code == 2
+    assert "--watch cannot be used" in result.output
+
+
+def test_cli_watch_runs_until_interrupted(mocker):
+    """Tests that --watch hands the paths to the watcher and exits cleanly"""
+    watch_paths = mocker.patch(
+        "enforce_notebook_run_order.cli.watch_paths", side_effect=KeyboardInterrupt
+    )
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--watch", "--no-default-excludes", "test"])
+    assert result.exit_code == 0
+    assert watch_paths.call_args.args[0] == ("test",)
+
+
+def test_cli_prefetch_reports_every_notebook():
+    """Tests that --prefetch checks and reports the same notebooks in the same order"""
+    runner = CliRunner()
+    args = ["--format", "plain", "--no-cache", "test/test_data/notebooks/python"]
+    expected = runner.invoke(cli, args)
+    result = runner.invoke(cli, ["--prefetch", "4", *args])
+    assert result.exit_code == expected.exit_code == 1
+    assert result.output == expected.output
+
+
+def test_cli_prefetch_retries_reads_that_fail_in_the_background(mocker):
+    """Tests that a notebook the read-ahead can't read is read when checked"""
+    runner = CliRunner()
+    args = ["--format", "plain", "--no-cache", "test/test_data/notebooks/python"]
+    expected = runner.invoke(cli, args)
+    mocker.patch(
+        "enforce_notebook_run_order.pipeline.read_notebook_bytes",
+        side_effect=PermissionError("denied"),
+    )
+
+    result = runner.invoke(cli, ["--prefetch", "4", *args])
+
+    assert result.exit_code == expected.exit_code == 1
+    assert result.output == expected.output
+
+
+def test_cli_files_from_stdin_newline_separated():
+    """Tests that paths can be listed on stdin, one per line"""
+    runner = CliRunner()
+    listed = f"{VALID_NOTEBOOK}\r\n\n{INVALID_NOTEBOOK}\n"
+    result = runner.invoke(
+        cli, ["--format", "plain", "--files-from", "-"], input=listed.encode()
+    )
+    assert result.exit_code == 1
+    assert "Checked 2 notebook(s): 1 valid, 1 invalid." in result.output
+
+
+def test_cli_files_from_null_separated_with_arguments(tmp_path):
+    """Tests that NUL-separated lists, as from find -print0, add to the arguments"""
+    list_path = tmp_path / "paths"
+    list_path.write_bytes(f"{INVALID_NOTEBOOK}\0".encode())
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        ["--format", "plain", "-0", "--files-from", str(list_path), VALID_NOTEBOOK],
+    )
+    assert result.exit_code == 1
+    assert result.output.index(VALID_NOTEBOOK) < result.output.index(INVALID_NOTEBOOK)
+    assert "Checked 2 notebook(s): 1 valid, 1 invalid." in result.output
+
+
+def test_cli_files_from_empty_list_checks_nothing(mocker):
+    """Tests that an empty list doesn't fall back to the current directory"""
+    find_violation = mocker.patch(
+        "enforce_notebook_run_order.enforce_notebook_run_order.find_violation"
+    )
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--files-from", "-"], input=b"")
+    assert result.exit_code == 0
+    find_violation.assert_not_called()
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_cli_files_from_missing_path(jobs):
+    """Tests that a listed path that doesn't exist is reported, and the rest checked"""
+    runner = CliRunner()
+    listed = f"missing.ipynb\n{VALID_NOTEBOOK}\n".encode()
+    result = runner.invoke(
+        cli,
+        ["--format", "junit", "-j", jobs, "--files-from", "-"],
+        input=listed,
+    )
+    assert result.exit_code == 1
+    assert 'tests="2" failures="1"' in result.output
+    assert "missing.ipynb" in result.output
+    assert "FileNotFoundError" in result.output
+
+
+def test_cli_warns_about_excluded_notebooks(tmp_path, monkeypatch):
+    """Tests that named notebooks under build/ are checked, and excluded ones reported"""
+    build = tmp_path / "build"
+    build.mkdir()
+    notebook = build / "invalid_notebook.ipynb"
+    with open(INVALID_NOTEBOOK, "rb") as source:
+        notebook.write_bytes(source.read())
+    monkeypatch.chdir(tmp_path)
+
+    checked = CliRunner().invoke(cli, [str(notebook)])
+    excluded = CliRunner().invoke(cli, ["--exclude", "build", str(notebook)])
+
+    assert checked.exit_code == 1
+    assert "Checked 1 notebook(s)" in checked.output
+    assert excluded.exit_code == 0
+    assert f"Warning: {notebook} is excluded and was not checked." in excluded.output
@@ -0,0 +1,58 @@
+"""tests the config module"""
+
+import pytest
+from enforce_notebook_run_order import config
+
+
+def test_load_config_reads_tool_table(tmp_path, monkeypatch):
+    """Tests that settings are read from the nearest pyproject.toml"""
+    (tmp_path / "pyproject.toml").write_text(
+        '[tool.enforce-notebook-run-order]\nexclude = ["scratch"]\n'
+    )
+    subdirectory = tmp_path / "notebooks"
+    subdirectory.mkdir()
+    monkeypatch.chdir(subdirectory)
+
+    assert config.load_config() == {"exclude": ["scratch"]}
+
+
+def test_load_config_without_tool_table(tmp_path):
+    """Tests that a pyproject.toml without settings for this tool gives no settings"""
+    (tmp_path / "pyproject.toml").write_text("[tool.black]\nline-length = 88\n")
+
+    assert config.load_config(str(tmp_path)) == {}
+
+
+def test_load_config_invalid_toml_raises_config_error(tmp_path):
+    """Tests that an unparsable pyproject.toml raises ConfigError"""
+    (tmp_path / "pyproject.toml").write_text("[tool.enforce-notebook-run-order\n")
+
+    with pytest.raises(config.ConfigError):
+        config.load_config(str(tmp_path))
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        "[tool.enforce-notebook-run-order]",
+        '[ tool . "enforce-notebook-run-order" ]',
+        "[tool.enforce-notebook-run-order.nested]",
+    ],
+)
+def test_load_config_without_toml_parser_refuses_settings(tmp_path, mocker, header):
+    """Tests that settings aren't silently ignored when tomli is missing"""
+    mocker.patch.object(config, "tomllib", None)
+    (tmp_path / "pyproject.toml").write_text(f'{header}\nexclude = ["scratch"]\n')
+
+    with pytest.raises(config.ConfigError, match="tomli"):
+        config.load_config(str(tmp_path))
+
+
+def test_load_config_without_toml_parser_or_settings(tmp_path, mocker):
+    """Tests that a pyproject.toml without settings for this tool needs no parser"""
+    mocker.patch.object(config, "tomllib", None)
+    (tmp_path / "pyproject.toml").write_text(
+        "[tool.black]\n# see [tool.enforce-notebook-run-order] docs\n"
+    )
+
+    assert config.load_config(str(tmp_path)) == {}
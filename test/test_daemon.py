@@ -0,0 +1,212 @@
+"""tests the daemon and client modules"""
+
+import os
+import shutil
+import socket
+import threading
+import pytest
+from click.testing import CliRunner
+from enforce_notebook_run_order import client, daemon, limits
+from enforce_notebook_run_order.cli import cli
+
+NOTEBOOKS_DIR = os.path.join("test", "test_data", "notebooks")
+VALID_NOTEBOOK = os.path.join(NOTEBOOKS_DIR, "python", "valid", "valid_notebook.ipynb")
+INVALID_NOTEBOOK = os.path.join(
+    NOTEBOOKS_DIR, "python", "invalid", "invalid_notebook.ipynb"
+)
+
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture
+def running_daemon(isolated_daemon_socket):
+    """Runs a daemon on the test's socket in a background thread."""
+    server = daemon.DaemonServer(str(isolated_daemon_socket))
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def test_verdict_store_rechecks_only_changed_notebooks(tmp_path, mocker):
+    """Tests that verdicts are reused until the notebook's size or mtime changes"""
+    notebook_path = str(tmp_path / "notebook.ipynb")
+    shutil.copyfile(VALID_NOTEBOOK, notebook_path)
+    check_notebook_file = mocker.spy(daemon, "check_notebook_file")
+    store = daemon.VerdictStore()
+
+    assert store.check(notebook_path) is None
+    assert store.check(notebook_path) is None
+    assert check_notebook_file.call_count == 1
+
+    shutil.copyfile(INVALID_NOTEBOOK, notebook_path)
+    assert "not run sequentially" in store.check(notebook_path)
+    assert check_notebook_file.call_count == 2
+    assert len(store) == 1
+
+
+def test_verdict_store_forgets_least_recently_used_notebooks(tmp_path, mocker):
+    """Tests that the store keeps at most cache_size verdicts, dropping the oldest"""
+    paths = []
+    for name in "abc":
+        paths.append(str(tmp_path / f"{name}.ipynb"))
+        shutil.copyfile(VALID_NOTEBOOK, paths[-1])
+    check_notebook_file = mocker.spy(daemon, "check_notebook_file")
+    store = daemon.VerdictStore(cache_size=2)
+
+    for path in [paths[0], paths[1], paths[0], paths[2]]:
+        store.check(path)
+    assert len(store) == 2
+    assert check_notebook_file.call_count == 3
+
+    store.check(paths[0])
+    assert check_notebook_file.call_count == 3
+    store.check(paths[1])
+    assert check_notebook_file.call_count == 4
+
+
+def test_verdict_store_reports_limit_errors_as_verdicts(tmp_path):
+    """Tests that a notebook over a limit gets a verdict, which isn't kept"""
+    notebook_path = str(tmp_path / "notebook.ipynb")
+    shutil.copyfile(VALID_NOTEBOOK, notebook_path)
+    store = daemon.VerdictStore()
+
+    with limits.using(limits.Limits(max_file_size=10, oversized=limits.ERROR)):
+        verdict = store.check(notebook_path)
+
+    assert limits.is_limit_error(verdict)
+    assert len(store) == 0
+
+
+def test_client_gets_verdicts_from_daemon(running_daemon, isolated_daemon_socket):
+    """Tests that the client gets a verdict per notebook, in order"""
+    with client.connect(str(isolated_daemon_socket)) as daemon_client:
+        results = daemon_client.check_notebooks([VALID_NOTEBOOK, INVALID_NOTEBOOK])
+
+    assert [result.path for result in results] == [VALID_NOTEBOOK, INVALID_NOTEBOOK]
+    assert results[0].valid
+    assert "not run sequentially" in results[1].error
+    assert len(running_daemon.verdicts) == 2
+
+
+def test_client_fail_fast_stops_at_first_invalid_notebook(
+    running_daemon, isolated_daemon_socket
+):  # pylint: disable=unused-argument
+    """Tests that the daemon stops answering after an invalid notebook with fail_fast"""
+    with client.connect(str(isolated_daemon_socket)) as daemon_client:
+        results = daemon_client.check_notebooks(
+            [INVALID_NOTEBOOK, VALID_NOTEBOOK], fail_fast=True
+        )
+
+    assert [result.path for result in results] == [INVALID_NOTEBOOK]
+
+
+def test_client_falls_back_in_process_when_daemon_fails(mocker):
+    """Tests that notebooks the daemon didn't answer for are checked in-process"""
+
+    def failing_verdicts(*_args, **_kwargs):
+        yield 0, None
+        raise client.DaemonError("Lost the daemon")
+
+    daemon_client = client.DaemonClient(mocker.Mock())
+    mocker.patch.object(daemon_client, "verdicts", failing_verdicts)
+
+    results = daemon_client.check_notebooks(
+        [VALID_NOTEBOOK, INVALID_NOTEBOOK, VALID_NOTEBOOK]
+    )
+
+    assert [result.valid for result in results] == [True, False, True]
+
+
+def test_daemon_rejects_other_protocol_versions(running_daemon, isolated_daemon_socket):
+    """Tests that a client speaking another protocol version gets a failure"""
+    other_version = client.PROTOCOL_VERSION + 1
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(isolated_daemon_socket))
+        sock.sendall(f'{{"version": {other_version}, "paths": []}}\n'.encode())
+        response = sock.makefile("rb").readline()
+
+    assert b"failure" in response
+    assert len(running_daemon.verdicts) == 0
+
+
+def test_connect_without_daemon_returns_none(isolated_daemon_socket):
+    """Tests that connecting with no daemon listening returns None"""
+    assert client.connect(str(isolated_daemon_socket)) is None
+    isolated_daemon_socket.write_text("stale")
+    assert client.connect(str(isolated_daemon_socket)) is None
+
+
+def test_second_daemon_on_same_socket_fails(running_daemon, isolated_daemon_socket):
+    """Tests that a daemon won't take over the socket of a running one"""
+    with pytest.raises(client.DaemonError):
+        daemon.DaemonServer(str(isolated_daemon_socket))
+    assert running_daemon.verdicts is not None
+
+
+def test_stale_socket_is_replaced(isolated_daemon_socket):
+    """Tests that a socket file left behind by a dead daemon is replaced"""
+    isolated_daemon_socket.write_text("stale")
+
+    server = daemon.DaemonServer(str(isolated_daemon_socket))
+    server.server_close()
+
+    assert not isolated_daemon_socket.exists()
+
+
+def test_cli_forwards_to_running_daemon(running_daemon, mocker):
+    """Tests that the CLI asks the daemon instead of checking in-process"""
+    mock_iter_check = mocker.patch("enforce_notebook_run_order.cli.iter_check")
+
+    result = CliRunner().invoke(cli, [NOTEBOOKS_DIR])
+
+    assert result.exit_code == 1
+    assert result.output.count("INVALID") == 4
+    mock_iter_check.assert_not_called()
+    assert len(running_daemon.verdicts) == 9
+
+
+def test_cli_no_daemon_checks_in_process(running_daemon):
+    """Tests that --no-daemon bypasses a running daemon"""
+    result = CliRunner().invoke(cli, ["--no-daemon", VALID_NOTEBOOK])
+
+    assert result.exit_code == 0
+    assert len(running_daemon.verdicts) == 0
+
+
+def test_connect_refuses_sockets_others_can_write(
+    running_daemon, isolated_daemon_socket
+):
+    """Tests that the client won't talk to a socket others could have replaced"""
+    assert running_daemon.verdicts is not None
+    os.chmod(isolated_daemon_socket, 0o666)
+    assert client.connect(str(isolated_daemon_socket)) is None
+    os.chmod(isolated_daemon_socket, 0o600)
+    client.connect(str(isolated_daemon_socket)).close()
+
+
+def test_connect_refuses_sockets_of_other_users(
+    running_daemon, isolated_daemon_socket, mocker
+):
+    """Tests that the client won't talk to a daemon run by another user"""
+    assert running_daemon.verdicts is not None
+    mocker.patch("os.getuid", return_value=os.getuid() + 1)
+    assert client.connect(str(isolated_daemon_socket)) is None
+
+
+def test_default_socket_is_in_a_private_directory(tmp_path, monkeypatch):
+    """Tests that without XDG_RUNTIME_DIR the daemon makes a directory of its own"""
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setenv("TMPDIR", str(tmp_path))
+    socket_path = client.default_socket_path()
+
+    server = daemon.DaemonServer(socket_path)
+    server.server_close()
+
+    directory = os.path.dirname(socket_path)
+    assert os.path.dirname(directory) == str(tmp_path)
+    assert os.stat(directory).st_mode & 0o777 == 0o700
@@ -78,6 +78,42 @@ def test_process_path_directory_raises_error_when_notebooks_invalid():
         enforce_notebook_run_order.process_path(test_data_dir)
 
 
+def test_process_path_reports_every_invalid_notebook():
+    """Tests that process_path checks every notebook before raising, with all results."""
+    test_data_dir = os.path.join("test", "test_data", "notebooks")
+
+    with pytest.raises(enforce_notebook_run_order.InvalidNotebookRunError) as error:
+        enforce_notebook_run_order.process_path(test_data_dir)
+
+    invalid_paths = [result.path for result in error.value.results if not result.valid]
+    assert len(error.value.results) == 9
+    assert len(invalid_paths) == 4
+    assert all("invalid" in os.path.basename(path) for path in invalid_paths)
+    assert all(path in str(error.value) for path in invalid_paths)
+
+
+def test_process_path_fail_fast_stops_at_first_invalid_notebook():
+    """Tests that fail_fast stops checking after the first invalid notebook."""
+    test_data_dir = os.path.join("test", "test_data", "notebooks")
+
+    with pytest.raises(enforce_notebook_run_order.InvalidNotebookRunError) as error:
+        enforce_notebook_run_order.process_path(test_data_dir, fail_fast=True)
+
+    assert not error.value.results[-1].valid
+    assert all(result.valid for result in error.value.results[:-1])
+    assert len(error.value.results) < 9
+
+
+def test_process_path_returns_results_for_valid_notebooks():
+    """Tests that process_path returns a valid result for each valid notebook."""
+    test_data_dir = os.path.join("test", "test_data", "notebooks", "python", "valid")
+
+    results = enforce_notebook_run_order.process_path(test_data_dir)
+
+    assert len(results) == 1
+    assert results[0].valid
+
+
 def test_process_path_raises_error_for_non_ipynb_file():
     """Tests that process_path raises an error when given a file that is not an ipynb."""
     with pytest.raises(ValueError):
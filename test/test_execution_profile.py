@@ -0,0 +1,76 @@
+"""tests the execution_profile module"""
+
+import pickle
+import pytest
+from enforce_notebook_run_order import execution_profile
+from enforce_notebook_run_order.enforce_notebook_run_order import (
+    NotebookRunOrderError,
+    check_notebook_run_order,
+)
+from enforce_notebook_run_order.execution_profile import ExecutionProfile, Violation
+from enforce_notebook_run_order.utils import CodeCell
+
+
+def profile_of(*cells):
+    """Builds a profile from (execution_count, has_source) pairs."""
+    return ExecutionProfile.from_cells(CodeCell(*cell) for cell in cells)
+
+
+def test_from_notebook_keeps_only_code_cells(notebook_data_with_mixed_cells):
+    """Tests that markdown cells are left out of the profile"""
+    profile = ExecutionProfile.from_notebook(notebook_data_with_mixed_cells)
+    assert list(profile) == [CodeCell(1, True), CodeCell(2, True), CodeCell(3, True)]
+
+
+def test_from_notebook_matches_from_cells(empty_notebook_cells):
+    """Tests that both constructors record unrun and empty cells the same way"""
+    assert ExecutionProfile.from_notebook(empty_notebook_cells) == profile_of(
+        (1, False), (None, False), (None, False)
+    )
+
+
+def test_violations_lists_every_offending_cell():
+    """Tests that every violation is returned, not just the first"""
+    profile = profile_of((1, True), (3, True), (None, True), (4, False), (6, True))
+    assert profile.violations() == [
+        Violation(1, 3, 1),
+        Violation(2, None, 3),
+        Violation(4, 6, 4),
+    ]
+    assert profile.violations()[1].not_run
+
+
+def test_violations_empty_for_valid_notebook(valid_notebook_data):
+    """Tests that a notebook run in order has no violations"""
+    assert not ExecutionProfile.from_notebook(valid_notebook_data).violations()
+
+
+def test_unrun_empty_cell_breaks_the_sequence():
+    """Tests that a non-empty cell after an unrun empty cell is out of order"""
+    profile = profile_of((1, True), (None, False), (0, True))
+    assert profile.violations() == [Violation(2, 0, None)]
+    with pytest.raises(NotebookRunOrderError):
+        check_notebook_run_order(profile)
+
+
+def test_profile_pickles_compactly():
+    """Tests that a profile round-trips through pickle as its arrays"""
+    profile = profile_of(*((index, True) for index in range(1, 10_001)))
+    restored = pickle.loads(pickle.dumps(profile))
+    assert restored == profile
+    assert len(pickle.dumps(profile)) < 100_000
+
+
+def test_numpy_and_python_checks_agree(mocker):
+    """Tests that the vectorized check finds the same violations"""
+    numpy = pytest.importorskip("numpy")
+    mocker.patch.object(execution_profile, "_numpy", return_value=numpy)
+    cells = [(index + 1, index % 3 != 0) for index in range(5000)]
+    cells[10] = (None, True)
+    cells[11] = (None, False)
+    cells[2000] = (7, True)
+    profile = profile_of(*cells)
+    numpy_violations = profile.violations()
+    mocker.patch.object(execution_profile, "_numpy", return_value=None)
+    assert numpy_violations == profile.violations()
+    assert [violation.index for violation in numpy_violations] == [10, 2000]
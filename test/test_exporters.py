@@ -0,0 +1,181 @@
+"""tests the exporters module"""
+
+import json
+import os
+import pytest
+from click.testing import CliRunner
+from enforce_notebook_run_order.cli import cli
+from enforce_notebook_run_order.events import NotebookEvent, PhaseEvent, RunEvent
+from enforce_notebook_run_order.exporters import (
+    ChromeTraceExporter,
+    OpenMetricsExporter,
+)
+
+NOTEBOOKS_DIR = os.path.join("test", "test_data", "notebooks")
+
+EVENTS = [
+    PhaseEvent("read", "a.ipynb", 0.0, 0.002, 2048),
+    PhaseEvent("check", "a.ipynb", 0.002, 0.001),
+    NotebookEvent("a.ipynb", 0.0, 0.004, 2048, True),
+    PhaseEvent("read", "b.ipynb", 0.004, 0.5, 500_000),
+    NotebookEvent("b.ipynb", 0.004, 0.6, 500_000, False),
+    PhaseEvent("report", None, 0.604, 0.01),
+    RunEvent(0.62, 2, 1, 502_048, {"read": 0.502, "check": 0.001}),
+]
+
+
+def metric_samples(text):
+    """Returns the samples of a Prometheus textfile as a dictionary."""
+    samples = {}
+    for line in text.splitlines():
+        if not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_open_metrics_exporter(tmp_path):
+    """Tests that gauges and histograms are written when the run finishes"""
+    path = tmp_path / "nbcheck.prom"
+    exporter = OpenMetricsExporter(str(path), labels={"job": "ci"})
+
+    for event in EVENTS[:-1]:
+        exporter(event)
+    assert not path.exists()
+    exporter(EVENTS[-1])
+
+    text = path.read_text(encoding="utf-8")
+    assert "# TYPE nbcheck_notebook_bytes histogram" in text
+    samples = metric_samples(text)
+    assert samples['nbcheck_run_seconds{job="ci"}'] == 0.62
+    assert samples['nbcheck_notebooks{job="ci",result="valid"}'] == 1
+    assert samples['nbcheck_notebooks{job="ci",result="invalid"}'] == 1
+    assert samples['nbcheck_phase_seconds{job="ci",phase="read"}'] == 0.502
+    assert samples['nbcheck_notebook_bytes_bucket{job="ci",le="10000.0"}'] == 1
+    assert samples['nbcheck_notebook_bytes_bucket{job="ci",le="1000000.0"}'] == 2
+    assert samples['nbcheck_notebook_bytes_bucket{job="ci",le="+Inf"}'] == 2
+    assert samples['nbcheck_notebook_seconds_count{job="ci"}'] == 2
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_open_metrics_exporter_escapes_labels(tmp_path):
+    """Tests that label values are escaped"""
+    exporter = OpenMetricsExporter(str(tmp_path / "out.prom"), {"job": 'a"b\\c'})
+
+    text = exporter.render(RunEvent(1.0, 0, 0, 0, {}))
+
+    assert 'nbcheck_run_seconds{job="a\\"b\\\\c"} 1.0' in text
+
+
+def test_chrome_trace_exporter(tmp_path):
+    """Tests that spans are written on a lane per phase and one for notebooks"""
+    path = tmp_path / "trace.json"
+    exporter = ChromeTraceExporter(str(path))
+
+    for event in EVENTS:
+        exporter(event)
+
+    trace = json.loads(path.read_text(encoding="utf-8"))
+    lanes = {
+        record["args"]["name"]: record["tid"] for record in trace if record["ph"] == "M"
+    }
+    assert set(lanes) == {"read", "check", "notebooks", "report", "run"}
+    spans = [record for record in trace if record["ph"] == "X"]
+    assert len(spans) == len(EVENTS)
+    notebooks = [span for span in spans if span["tid"] == lanes["notebooks"]]
+    assert [span["name"] for span in notebooks] == ["a.ipynb", "b.ipynb"]
+    notebook = notebooks[1]
+    assert notebook["args"] == {"bytes": 500_000, "valid": False}
+    assert (notebook["ts"], notebook["dur"]) == (4000.0, 600000.0)
+    assert spans[-1]["name"] == "nbcheck"
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_cli_writes_metrics_and_trace(tmp_path):
+    """Tests that --metrics-file and --trace-file work without --stats"""
+    metrics_path = tmp_path / "nbcheck.prom"
+    trace_path = tmp_path / "trace.json"
+
+    result = CliRunner().invoke(
+        cli,
+        [
+            "--no-cache",
+            "--metrics-file",
+            str(metrics_path),
+            "--trace-file",
+            str(trace_path),
+            NOTEBOOKS_DIR,
+        ],
+    )
+
+    assert result.exit_code == 1
+    assert "files/s" not in result.output
+    samples = metric_samples(metrics_path.read_text(encoding="utf-8"))
+    assert samples['nbcheck_notebooks{result="invalid"}'] > 0
+    assert samples["nbcheck_read_bytes"] > 0
+    trace = json.loads(trace_path.read_text(encoding="utf-8"))
+    notebooks = [
+        record
+        for record in trace
+        if record["ph"] == "X" and record["name"].endswith(".ipynb")
+    ]
+    assert notebooks
+
+
+def test_exported_files_get_the_usual_permissions(tmp_path):
+    """Tests that files are readable as a new file would be, not private temporaries"""
+    umask = os.umask(0o022)
+    try:
+        for exporter, name in [
+            (OpenMetricsExporter, "out.prom"),
+            (ChromeTraceExporter, "trace.json"),
+        ]:
+            path = tmp_path / name
+            listener = exporter(str(path))
+            for event in EVENTS:
+                listener(event)
+            assert path.stat().st_mode & 0o777 == 0o644
+    finally:
+        os.umask(umask)
+
+
+def test_publishing_leaves_the_umask_alone(tmp_path, mocker):
+    """Tests that the umask, which other threads rely on, is never changed to read it"""
+    umask = mocker.spy(os, "umask")
+    exporter = OpenMetricsExporter(str(tmp_path / "out.prom"))
+
+    for event in EVENTS:
+        exporter(event)
+
+    assert (tmp_path / "out.prom").exists()
+    umask.assert_not_called()
+
+
+def test_failed_publish_leaves_no_temporary_file(tmp_path, mocker):
+    """Tests that the temporary file is removed if it can't be moved into place"""
+    mocker.patch("os.replace", side_effect=OSError("read-only"))
+    exporter = ChromeTraceExporter(str(tmp_path / "trace.json"))
+
+    with pytest.raises(OSError):
+        for event in EVENTS:
+            exporter(event)
+
+    assert not list(tmp_path.iterdir())
+
+
+def test_aborted_run_still_writes_metrics(tmp_path):
+    """Tests that a run that fails part way through still finishes its exporters"""
+    metrics_path = tmp_path / "nbcheck.prom"
+    notebook = os.path.join(NOTEBOOKS_DIR, "python", "valid", "valid_notebook.ipynb")
+    listed = f"{notebook}\nREADME.md\n"
+
+    result = CliRunner().invoke(
+        cli,
+        ["--no-cache", "--metrics-file", str(metrics_path), "--files-from", "-"],
+        input=listed.encode(),
+    )
+
+    assert result.exception is not None
+    samples = metric_samples(metrics_path.read_text(encoding="utf-8"))
+    assert samples['nbcheck_notebooks{result="valid"}'] == 1
+    assert list(tmp_path.iterdir()) == [metrics_path]
@@ -0,0 +1,246 @@
+"""tests the git module"""
+
+import os
+import shutil
+import subprocess
+import pytest
+from click.testing import CliRunner
+from enforce_notebook_run_order import git, json_backends, streaming
+from enforce_notebook_run_order.cli import cli
+
+NOTEBOOKS_DIR = os.path.abspath(os.path.join("test", "test_data", "notebooks"))
+VALID_NOTEBOOK = os.path.join(NOTEBOOKS_DIR, "python", "valid", "valid_notebook.ipynb")
+INVALID_NOTEBOOK = os.path.join(
+    NOTEBOOKS_DIR, "python", "invalid", "invalid_notebook.ipynb"
+)
+
+# pylint: disable=redefined-outer-name
+
+
+def _git(*args):
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        check=True,
+        capture_output=True,
+    )
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    """Creates a git repository with one committed valid notebook and chdirs into it."""
+    monkeypatch.chdir(tmp_path)
+    _git("init", "-q")
+    shutil.copyfile(VALID_NOTEBOOK, "committed.ipynb")
+    _git("add", "committed.ipynb")
+    _git("commit", "-q", "-m", "initial")
+    return tmp_path
+
+
+def test_changed_notebooks_staged_lists_only_staged_notebooks(repo):
+    """Tests that only staged notebooks are listed, with their staged blobs"""
+    shutil.copyfile(INVALID_NOTEBOOK, repo / "staged.ipynb")
+    shutil.copyfile(INVALID_NOTEBOOK, repo / "unstaged.ipynb")
+    (repo / "notes.txt").write_text("not a notebook")
+    _git("add", "staged.ipynb", "notes.txt")
+
+    notebooks = git.changed_notebooks(staged=True)
+
+    assert [notebook.path for notebook in notebooks] == ["staged.ipynb"]
+    assert len(notebooks[0].blob) == 40
+
+
+def test_check_changed_notebooks_reads_staged_content(repo):
+    """Tests that the staged blob is checked rather than the working-tree file"""
+    shutil.copyfile(INVALID_NOTEBOOK, repo / "committed.ipynb")
+    _git("add", "committed.ipynb")
+    # Fixing the working-tree copy without staging it must not hide the problem.
+    shutil.copyfile(VALID_NOTEBOOK, repo / "committed.ipynb")
+
+    results = git.check_changed_notebooks(git.changed_notebooks(staged=True))
+
+    assert [result.valid for result in results] == [False]
+
+
+def test_changed_notebooks_since_ref(repo):
+    """Tests that notebooks committed after a ref are listed"""
+    shutil.copyfile(VALID_NOTEBOOK, repo / "added.ipynb")
+    _git("add", "added.ipynb")
+    _git("commit", "-q", "-m", "add notebook")
+
+    notebooks = git.changed_notebooks(since="HEAD~1")
+
+    assert [notebook.path for notebook in notebooks] == ["added.ipynb"]
+    assert all(result.valid for result in git.check_changed_notebooks(notebooks))
+
+
+@pytest.mark.parametrize(
+    "backend, stream_min_size, streamed",
+    [("json", 1 << 20, False), ("json", 100, True), ("stream", 1 << 20, True)],
+)
+def test_check_changed_notebooks_decodes_small_blobs_whole(
+    repo, mocker, backend, stream_min_size, streamed
+):  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    """Tests that blobs are routed by size like files, with the current backend"""
+    shutil.copyfile(INVALID_NOTEBOOK, repo / "committed.ipynb")
+    _git("add", "committed.ipynb")
+    mocker.patch.object(json_backends, "STREAM_MIN_SIZE", stream_min_size)
+    decode = mocker.spy(json_backends, "decode_code_cells")
+    stream = mocker.spy(streaming, "read_code_cells")
+
+    with json_backends.using(backend):
+        results = git.check_changed_notebooks(git.changed_notebooks(staged=True))
+
+    assert [result.valid for result in results] == [False]
+    assert "not run sequentially" in results[0].error
+    assert (decode.call_count, stream.call_count) == ((0, 1) if streamed else (1, 0))
+    if not streamed:
+        assert decode.call_args.args[1] == backend
+
+
+@pytest.mark.skipif(os.name == "nt", reason="file names are Unicode on Windows")
+def test_changed_notebooks_keeps_undecodable_file_names(repo):
+    """Tests that a name that isn't UTF-8 is listed as the file system names it"""
+    name = os.fsdecode(b"caf\xe9.ipynb")
+    shutil.copyfile(VALID_NOTEBOOK, repo / name)
+    _git("add", name)
+    _git("commit", "-q", "-m", "add notebook")
+
+    notebooks = git.changed_notebooks(since="HEAD~1")
+    revisions = git.notebook_revisions("HEAD~1..HEAD")
+
+    assert [notebook.path for notebook in notebooks] == [name]
+    assert [revision.path for revision in revisions] == [name]
+    assert os.path.exists(notebooks[0].path)
+
+
+def test_iter_blobs_streams_blobs_in_order(repo):
+    """Tests that blobs come back in request order, even when partially read"""
+    for index in range(3):
+        (repo / f"notebook_{index}.ipynb").write_text("x" * 100_000 + str(index))
+        _git("add", f"notebook_{index}.ipynb")
+    notebooks = git.changed_notebooks(staged=True)
+
+    tails = []
+    for _, blob in git.iter_blobs(notebook.blob for notebook in notebooks):
+        blob.read(10)
+        tails.append(blob.read()[-1:])
+
+    assert tails == [b"0", b"1", b"2"]
+
+
+def test_changed_notebooks_outside_repository_raises_git_error(tmp_path, monkeypatch):
+    """Tests that using git mode outside a repository raises GitError"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(tmp_path.parent))
+
+    with pytest.raises(git.GitError):
+        git.changed_notebooks(staged=True)
+
+
+def test_cli_staged(repo):
+    """Tests the CLI exit code and output in --staged mode"""
+    runner = CliRunner()
+    assert runner.invoke(cli, ["--staged"]).exit_code == 0
+
+    shutil.copyfile(INVALID_NOTEBOOK, repo / "staged.ipynb")
+    _git("add", "staged.ipynb")
+    result = runner.invoke(cli, ["--staged"])
+
+    assert result.exit_code == 1
+    assert "INVALID" in result.output
+    assert "staged.ipynb" in result.output
+
+
+def test_cli_staged_and_since_are_exclusive(repo):  # pylint: disable=unused-argument
+    """Tests that --staged and --since cannot be combined"""
+    result = CliRunner().invoke(cli, ["--staged", "--since", "HEAD"])
+
+    assert result.exit_code == 2
+
+
+@pytest.fixture
+def history(repo):
+    """Adds commits to the repository: an invalid notebook, a copy, then a fix."""
+    shutil.copyfile(INVALID_NOTEBOOK, repo / "broken.ipynb")
+    shutil.copyfile(VALID_NOTEBOOK, repo / "copy.ipynb")
+    (repo / "notes.txt").write_text("not a notebook")
+    _git("add", "broken.ipynb", "copy.ipynb", "notes.txt")
+    _git("commit", "-q", "-m", "add notebooks")
+    shutil.copyfile(VALID_NOTEBOOK, repo / "broken.ipynb")
+    _git("add", "broken.ipynb")
+    _git("commit", "-q", "-m", "fix notebook")
+    return repo
+
+
+def _commit(rev):
+    return subprocess.run(
+        ["git", "rev-parse", rev], check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+def test_notebook_revisions_lists_changes_per_commit(
+    history,
+):  # pylint: disable=unused-argument
+    """Tests that each notebook a commit added or modified is listed"""
+    revisions = git.notebook_revisions("HEAD~2..HEAD")
+
+    assert [(revision.commit, revision.path) for revision in revisions] == [
+        (_commit("HEAD~1"), "broken.ipynb"),
+        (_commit("HEAD~1"), "copy.ipynb"),
+        (_commit("HEAD"), "broken.ipynb"),
+    ]
+    assert revisions[0].name == f"{_commit('HEAD~1')[:12]}:broken.ipynb"
+    assert [revision.path for revision in git.notebook_revisions("HEAD")] == [
+        "committed.ipynb",
+        "broken.ipynb",
+        "copy.ipynb",
+        "broken.ipynb",
+    ]
+
+
+def test_audit_notebooks_checks_each_blob_once(
+    history, mocker
+):  # pylint: disable=unused-argument
+    """Tests that identical content is read once and reported per revision"""
+    iter_blobs = mocker.spy(git, "iter_blobs")
+    revisions = git.notebook_revisions("HEAD")
+
+    results = git.audit_notebooks(revisions)
+
+    assert [result.path for result in results] == [
+        revision.name for revision in revisions
+    ]
+    assert [result.valid for result in results] == [True, False, True, True]
+    assert len(list(iter_blobs.call_args.args[0])) == 2
+
+
+def test_audit_notebooks_reports_unreadable_blobs(repo):
+    """Tests that a blob that isn't a notebook is invalid, not fatal"""
+    (repo / "conflict.ipynb").write_text('<<<<<<< HEAD\n{"cells": []}\n')
+    _git("add", "conflict.ipynb")
+    _git("commit", "-q", "-m", "commit a conflict")
+
+    results = git.audit_notebooks(git.notebook_revisions("HEAD~1..HEAD"))
+
+    assert len(results) == 1
+    assert results[0].error.startswith("Could not read notebook")
+
+
+def test_cli_audit(history):  # pylint: disable=unused-argument
+    """Tests the audit subcommand's exit code and output"""
+    runner = CliRunner()
+    assert runner.invoke(cli, ["audit", "HEAD~1..HEAD"]).exit_code == 0
+
+    result = runner.invoke(cli, ["audit", "-q", "HEAD~2..HEAD", "broken.ipynb"])
+
+    assert result.exit_code == 1
+    assert f"{_commit('HEAD~1')[:12]}:broken.ipynb" in result.output
+    assert "copy.ipynb" not in result.output
+
+
+def test_cli_audit_unknown_revision(repo):  # pylint: disable=unused-argument
+    """Tests that an unknown revision is a clean error"""
+    result = CliRunner().invoke(cli, ["audit", "no-such-tag..HEAD"])
+
+    assert result.exit_code == 1
+    assert "Error:" in result.output
@@ -0,0 +1,226 @@
+"""tests the json_backends module"""
+
+import io
+import json
+import threading
+import pytest
+from enforce_notebook_run_order import (
+    enforce_notebook_run_order,
+    json_backends,
+    limits,
+    streaming,
+    utils,
+)
+from enforce_notebook_run_order.execution_profile import ExecutionProfile
+from enforce_notebook_run_order.reporters import Reporter, use_reporter
+
+VALID_NOTEBOOK = "test/test_data/notebooks/python/valid/valid_notebook.ipynb"
+INVALID_NOTEBOOK = "test/test_data/notebooks/python/invalid/invalid_notebook.ipynb"
+
+NOTEBOOK = {
+    "cells": [
+        {"cell_type": "markdown", "source": "# Title"},
+        {"cell_type": "code", "execution_count": 1, "source": ["x = 1"]},
+        {"cell_type": "code", "execution_count": None, "source": []},
+        {
+            "cell_type": "code",
+            "execution_count": 3,
+            "source": "y = 2",
+            "outputs": [{"output_type": "stream", "text": ["y"]}],
+        },
+    ],
+    "metadata": {},
+}
+
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture(params=json_backends.BACKENDS)
+def backend(request):
+    """Each JSON backend, skipping those that are not installed"""
+    if request.param != "json":
+        pytest.importorskip(request.param)
+    return request.param
+
+
+def test_decode_code_cells(backend):
+    """Tests that every backend extracts the same code cells"""
+    data = json.dumps(NOTEBOOK).encode()
+    assert json_backends.decode_code_cells(data, backend) == [
+        (1, True),
+        (None, False),
+        (3, True),
+    ]
+
+
+def test_decode_code_cells_without_cells(backend):
+    """Tests that a notebook without cells raises KeyError"""
+    with pytest.raises(KeyError):
+        json_backends.decode_code_cells(b'{"metadata": {}}', backend)
+
+
+def test_decode_invalid_json(backend):
+    """Tests that invalid JSON raises ValueError"""
+    with pytest.raises(ValueError):
+        json_backends.decode_code_cells(b'{"cells": [', backend)
+
+
+def test_decode(backend):
+    """Tests that every backend decodes the whole notebook"""
+    assert json_backends.decode(json.dumps(NOTEBOOK).encode(), backend) == NOTEBOOK
+
+
+def test_read_notebook_maps_large_files(tmp_path, mocker, backend):
+    """Tests that large files are mapped for backends that decode from buffers"""
+    mocker.patch.object(json_backends, "MMAP_MIN_BYTES", 1)
+    path = tmp_path / "notebook.ipynb"
+    path.write_bytes(json.dumps(NOTEBOOK).encode())
+
+    with json_backends.read_notebook(str(path), backend) as data:
+        assert isinstance(data, bytes) == (backend == "json")
+        assert json_backends.decode_code_cells(data, backend)[0] == (1, True)
+
+
+def test_resolve_backend_auto_prefers_compiled_libraries(mocker):
+    """Tests that auto picks the first installed backend"""
+    mocker.patch.object(
+        json_backends, "_is_installed", side_effect=lambda name: name != "msgspec"
+    )
+    assert json_backends.resolve_backend("auto") == "orjson"
+
+
+def test_resolve_backend_falls_back_to_json(mocker):
+    """Tests that auto uses the standard library when nothing else is installed"""
+    mocker.patch.object(
+        json_backends, "_is_installed", side_effect=lambda name: name == "json"
+    )
+    assert json_backends.resolve_backend("auto") == "json"
+
+
+def test_resolve_backend_not_installed(mocker):
+    """Tests that asking for a backend that is not installed fails"""
+    mocker.patch.object(json_backends, "_is_installed", return_value=False)
+    with pytest.raises(ValueError, match="not installed"):
+        json_backends.resolve_backend("orjson")
+
+
+def test_resolve_backend_unknown():
+    """Tests that an unknown backend fails"""
+    with pytest.raises(ValueError, match="Unknown"):
+        json_backends.resolve_backend("simdjson")
+
+
+def test_using_restores_previous_backend():
+    """Tests that the backend is only active inside the block"""
+    with json_backends.using("json") as backend:
+        assert backend == json_backends.current() == "json"
+    assert json_backends.current() == json_backends.DEFAULT
+
+
+def test_check_notebook_file_with_backend(backend):
+    """Tests that notebook files are checked with the active backend"""
+    with json_backends.using(backend):
+        enforce_notebook_run_order.check_notebook_file(VALID_NOTEBOOK)
+        with pytest.raises(enforce_notebook_run_order.NotebookRunOrderError):
+            enforce_notebook_run_order.check_notebook_file(INVALID_NOTEBOOK)
+
+
+def test_check_notebooks_prefetched_with_backend(backend):
+    """Tests that read-ahead notebooks are decoded with the active backend"""
+    with json_backends.using(backend), use_reporter(Reporter()):
+        with pytest.raises(enforce_notebook_run_order.InvalidNotebookRunError) as error:
+            enforce_notebook_run_order.check_notebooks(
+                [VALID_NOTEBOOK, INVALID_NOTEBOOK], prefetch=2
+            )
+    assert [result.valid for result in error.value.results] == [True, False]
+
+
+def test_load_notebook_data_with_backend(backend):
+    """Tests that every backend loads the same notebook data"""
+    assert utils.load_notebook_data(VALID_NOTEBOOK, backend) == (
+        utils.load_notebook_data(VALID_NOTEBOOK, "json")
+    )
+
+
+def test_notebooks_are_decoded_whole_below_the_stream_size(mocker):
+    """Tests that only notebooks over STREAM_MIN_SIZE or max_file_size are streamed"""
+    decode = mocker.spy(json_backends, "decode_code_cells")
+    stream = mocker.spy(enforce_notebook_run_order.streaming, "iter_code_cells")
+
+    enforce_notebook_run_order.check_notebook_file(VALID_NOTEBOOK)
+    with limits.using(limits.Limits(max_file_size=100)):
+        enforce_notebook_run_order.check_notebook_file(VALID_NOTEBOOK)
+    mocker.patch.object(json_backends, "STREAM_MIN_SIZE", 100)
+    enforce_notebook_run_order.check_notebook_file(VALID_NOTEBOOK)
+
+    assert decode.call_count == 1
+    assert stream.call_count == 2
+
+
+def test_large_notebooks_are_loaded_without_a_size_limit(mocker):
+    """Tests that notebooks over STREAM_MIN_SIZE are not refused by default"""
+    mocker.patch.object(json_backends, "STREAM_MIN_SIZE", 100)
+
+    assert limits.current().max_file_size is None
+    assert utils.load_notebook_data(VALID_NOTEBOOK)["cells"]
+
+
+@pytest.mark.parametrize(
+    "cells, expected",
+    [
+        ([{"cell_type": "code", "source": "x = 1"}], [(None, True)]),
+        ([{"cell_type": "code", "execution_count": 1}], [(1, False)]),
+        ([{"execution_count": 1, "source": "# Title"}], []),
+    ],
+    ids=["missing execution_count", "missing source", "missing cell_type"],
+)
+@pytest.mark.parametrize("reader", [*json_backends.BACKENDS, json_backends.STREAM])
+def test_every_backend_reads_missing_fields_alike(reader, cells, expected):
+    """Tests that the verdict doesn't depend on the backend when fields are missing"""
+    if reader not in ("json", json_backends.STREAM):
+        pytest.importorskip(reader)
+    data = json.dumps({"cells": cells}).encode()
+    if reader == json_backends.STREAM:
+        code_cells = list(streaming.read_code_cells(io.BytesIO(data)))
+    else:
+        code_cells = json_backends.decode_code_cells(data, reader)
+    assert [tuple(cell) for cell in code_cells] == expected
+    assert list(ExecutionProfile.from_notebook(json.loads(data))) == expected
+
+
+@pytest.mark.parametrize("reader", [*json_backends.BACKENDS, json_backends.STREAM])
+def test_every_backend_treats_null_cells_as_missing(reader):
+    """Tests that "cells": null raises KeyError with every backend"""
+    if reader not in ("json", json_backends.STREAM):
+        pytest.importorskip(reader)
+    data = b'{"cells": null, "metadata": {}}'
+    with pytest.raises(KeyError):
+        if reader == json_backends.STREAM:
+            list(streaming.read_code_cells(io.BytesIO(data)))
+        else:
+            json_backends.decode_code_cells(data, reader)
+    with pytest.raises(KeyError):
+        ExecutionProfile.from_notebook(json.loads(data))
+
+
+def test_using_only_affects_the_calling_thread():
+    """Tests that threads checking with different backends don't see each other's"""
+    both_set = threading.Barrier(2)
+    seen = {}
+
+    def check_with(backend):
+        with json_backends.using(backend):
+            both_set.wait()
+            seen[backend] = json_backends.current()
+
+    threads = [
+        threading.Thread(target=check_with, args=(backend,))
+        for backend in ("stream", "json")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert seen == {"stream": "stream", "json": "json"}
+    assert json_backends.current() == json_backends.DEFAULT
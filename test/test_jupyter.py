@@ -0,0 +1,219 @@
+"""tests the Jupyter server extension"""
+
+import json
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import pytest
+from enforce_notebook_run_order import jupyter
+from enforce_notebook_run_order.results import OUT_OF_ORDER, UNREADABLE, VALID
+
+TOKEN = "nbcheck-test-token"
+
+# pylint: disable=redefined-outer-name
+
+
+class BlockingExecutor:  # pylint: disable=too-few-public-methods
+    """Runs submitted checks in a thread once ``release`` is set."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.threads = []
+
+    def submit(self, func, *args):
+        """Starts ``func`` in a thread that waits for ``release``."""
+
+        def run():
+            self.release.wait(5)
+            func(*args)
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        self.threads.append(thread)
+
+    def finish(self):
+        """Lets every submitted check run and waits for them."""
+        self.release.set()
+        for thread in self.threads:
+            thread.join()
+
+
+@pytest.fixture
+def checker():
+    """A save checker whose checks only run once released."""
+    checker = jupyter.SaveChecker(executor=BlockingExecutor())
+    yield checker
+    checker.executor.finish()
+
+
+def notebook_model(content):
+    """Wraps notebook content in a contents manager model."""
+    return {"type": "notebook", "format": "json", "content": content}
+
+
+def test_pre_save_hook_checks_in_background(checker, valid_notebook_data):
+    """Tests that saving returns before the check, which reports pending"""
+    checker.pre_save_hook(notebook_model(valid_notebook_data), "/dir/nb.ipynb")
+
+    assert checker.verdict("dir/nb.ipynb") == {
+        "path": "dir/nb.ipynb",
+        "status": jupyter.PENDING,
+    }
+    checker.executor.finish()
+    verdict = checker.verdict("dir/nb.ipynb")
+    assert verdict["status"] == VALID
+    assert verdict["valid"] is True
+    assert verdict["hash"]
+
+
+def test_verdict_of_invalid_notebook(checker, out_of_order_notebook_data):
+    """Tests that the offending cell is reported"""
+    checker.pre_save_hook(notebook_model(out_of_order_notebook_data), "nb.ipynb")
+    checker.executor.finish()
+
+    verdict = checker.verdict("nb.ipynb")
+    assert verdict["status"] == OUT_OF_ORDER
+    assert verdict["cell_index"] == 1
+    assert verdict["valid"] is False
+
+
+def test_verdict_of_unsaved_notebook(checker):
+    """Tests that there is no verdict for a notebook never saved"""
+    assert checker.verdict("nb.ipynb") is None
+
+
+def test_pre_save_hook_ignores_other_files(checker):
+    """Tests that files and directories are not checked"""
+    checker.pre_save_hook({"type": "file", "content": "text"}, "notes.txt")
+
+    assert checker.verdict("notes.txt") is None
+    assert not checker.executor.threads
+
+
+def test_only_latest_save_is_recorded(checker, valid_notebook_data):
+    """Tests that a check finishing after a newer save doesn't overwrite it"""
+    checker.pre_save_hook(notebook_model(valid_notebook_data), "nb.ipynb")
+    checker.pre_save_hook(notebook_model(valid_notebook_data), "nb.ipynb")
+    checker.check("nb.ipynb", {"cells": []}, save=1)
+
+    assert checker.verdict("nb.ipynb")["status"] == jupyter.PENDING
+
+
+def test_verdicts_are_cached_by_hash(checker, mocker, valid_notebook_data):
+    """Tests that content with the same execution profile is checked once"""
+    check = mocker.spy(jupyter, "check_notebook_data")
+    edited = {
+        "cells": valid_notebook_data["cells"]
+        + [{"cell_type": "markdown", "source": "# Notes"}],
+        "metadata": {"edited": True},
+    }
+
+    first = checker.check("a.ipynb", valid_notebook_data)
+    second = checker.check("b.ipynb", edited)
+
+    assert check.call_count == 1
+    assert second == first._replace(path="b.ipynb")
+
+
+def test_unreadable_content(checker):
+    """Tests that content that isn't a notebook is reported as unreadable"""
+    result = checker.check("nb.ipynb", {"metadata": {}})
+
+    assert result.status == UNREADABLE
+
+
+def free_port():
+    """Returns a TCP port nothing is listening on."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def request(url, method="GET", body=None):
+    """Sends an authenticated request to the server and decodes the reply."""
+    data = None if body is None else json.dumps(body).encode()
+    req = urllib.request.Request(
+        url,
+        data=data,
+        method=method,
+        headers={"Authorization": f"token {TOKEN}"},
+    )
+    with urllib.request.urlopen(req, timeout=10) as response:
+        return json.loads(response.read() or b"null")
+
+
+@pytest.fixture
+def jupyter_server(tmp_path):
+    """Runs a local Jupyter server with the extension enabled."""
+    pytest.importorskip("jupyter_server")
+    port = free_port()
+    process = subprocess.Popen(  # pylint: disable=consider-using-with
+        [
+            sys.executable,
+            "-m",
+            "jupyter_server",
+            f"--port={port}",
+            "--ip=127.0.0.1",
+            "--no-browser",
+            "--allow-root",
+            f"--ServerApp.root_dir={tmp_path}",
+            f"--IdentityProvider.token={TOKEN}",
+            "--ServerApp.jpserver_extensions="
+            "{'enforce_notebook_run_order.jupyter': True}",
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                request(f"{url}/api/status")
+                break
+            except (urllib.error.URLError, ConnectionError):
+                if time.monotonic() > deadline or process.poll() is not None:
+                    pytest.fail("Jupyter server did not start")
+                time.sleep(0.1)
+        yield url
+    finally:
+        process.terminate()
+        process.wait(10)
+
+
+def wait_for_verdict(url, path):
+    """Polls the verdict endpoint until the check has finished."""
+    deadline = time.monotonic() + 10
+    while True:
+        verdict = request(f"{url}/{jupyter.ROUTE}?path={path}")
+        if verdict["status"] != jupyter.PENDING or time.monotonic() > deadline:
+            return verdict
+        time.sleep(0.05)
+
+
+def test_server_checks_saved_notebooks(
+    jupyter_server, valid_notebook_data, out_of_order_notebook_data
+):
+    """Tests the extension end to end: save over REST, then read the verdict"""
+    for name, content in (
+        ("valid.ipynb", valid_notebook_data),
+        ("invalid.ipynb", out_of_order_notebook_data),
+    ):
+        content = {**content, "metadata": {}, "nbformat": 4, "nbformat_minor": 5}
+        for cell in content["cells"]:
+            cell.update(metadata={}, outputs=[])
+        request(
+            f"{jupyter_server}/api/contents/{name}",
+            method="PUT",
+            body=notebook_model(content),
+        )
+
+    assert wait_for_verdict(jupyter_server, "valid.ipynb")["status"] == VALID
+    assert wait_for_verdict(jupyter_server, "invalid.ipynb")["status"] == OUT_OF_ORDER
+    with pytest.raises(urllib.error.HTTPError) as error:
+        request(f"{jupyter_server}/{jupyter.ROUTE}?path=never-saved.ipynb")
+    assert error.value.code == 404
@@ -0,0 +1,283 @@
+"""tests the limits module"""
+
+import io
+import itertools
+import os
+import threading
+import time
+import pytest
+from click.testing import CliRunner
+from enforce_notebook_run_order import (
+    api,
+    enforce_notebook_run_order,
+    json_backends,
+    limits,
+    parallel,
+    utils,
+)
+from enforce_notebook_run_order.cache import ResultCache
+from enforce_notebook_run_order.cli import cli
+from enforce_notebook_run_order.results import UNREADABLE, is_read_error
+
+NOTEBOOKS_DIR = os.path.join("test", "test_data", "notebooks")
+VALID_NOTEBOOK = os.path.join(NOTEBOOKS_DIR, "python", "valid", "valid_notebook.ipynb")
+INVALID_NOTEBOOK = os.path.join(
+    NOTEBOOKS_DIR, "python", "invalid", "invalid_notebook.ipynb"
+)
+
+# Smaller than every test notebook.
+TINY = limits.Limits(max_file_size=100)
+
+
+@pytest.mark.parametrize(
+    "text, size",
+    [("1024", 1024), ("10K", 10240), ("1.5m", 3 << 19), ("2GiB", 2 << 30)],
+)
+def test_parse_size(text, size):
+    """Tests that sizes are read with binary multiples"""
+    assert limits.parse_size(text) == size
+
+
+@pytest.mark.parametrize("text", ["", "big", "10X", "-1M"])
+def test_parse_size_rejects_other_text(text):
+    """Tests that anything but a size raises ValueError"""
+    with pytest.raises(ValueError):
+        limits.parse_size(text)
+
+
+def test_format_size():
+    """Tests that sizes are shown in the largest unit they reach"""
+    assert limits.format_size(512) == "512 bytes"
+    assert limits.format_size(3 << 29) == "1.5 GiB"
+
+
+def test_oversized_notebooks_are_streamed(mocker):
+    """Tests that oversized notebooks bypass whole-file decoding"""
+    decode = mocker.spy(json_backends, "decode_code_cells")
+
+    with json_backends.using("json"), limits.using(TINY):
+        enforce_notebook_run_order.check_notebook_file(VALID_NOTEBOOK)
+        with pytest.raises(enforce_notebook_run_order.NotebookRunOrderError):
+            enforce_notebook_run_order.check_notebook_file(INVALID_NOTEBOOK)
+
+    decode.assert_not_called()
+
+
+def test_oversized_notebooks_are_reported_as_not_checked(mocker):
+    """Tests that with ERROR, oversized notebooks are invalid and not read"""
+    read = mocker.patch("builtins.open", side_effect=AssertionError("read"))
+
+    with limits.using(TINY._replace(oversized=limits.ERROR)):
+        with pytest.raises(enforce_notebook_run_order.InvalidNotebookRunError) as error:
+            enforce_notebook_run_order.check_single_notebook(VALID_NOTEBOOK)
+
+    read.assert_not_called()
+    result = error.value.results[0]
+    assert limits.is_limit_error(result.error)
+    assert "over the limit of 100 bytes" in result.error
+
+
+def test_oversized_notebooks_can_be_skipped():
+    """Tests that with SKIP, oversized notebooks are left out of the run"""
+    with limits.using(TINY._replace(oversized=limits.SKIP)):
+        results = enforce_notebook_run_order.process_path(NOTEBOOKS_DIR)
+        api_results = list(api.iter_check([NOTEBOOKS_DIR, VALID_NOTEBOOK]))
+
+    assert not results
+    assert not api_results
+
+
+def test_limit_errors_are_not_cached(mocker):
+    """Tests that a verdict that depends on the limits is not cached"""
+    cache = mocker.Mock()
+    cache.get.return_value = None
+
+    with limits.using(TINY._replace(oversized=limits.ERROR)):
+        with pytest.raises(enforce_notebook_run_order.InvalidNotebookRunError):
+            enforce_notebook_run_order.check_notebooks([VALID_NOTEBOOK], cache)
+
+    cache.put.assert_not_called()
+
+
+def test_load_notebook_data_refuses_oversized_notebooks():
+    """Tests that whole notebooks over the limit are not loaded"""
+    with limits.using(TINY), pytest.raises(limits.NotebookTooLargeError):
+        utils.load_notebook_data(VALID_NOTEBOOK)
+
+
+def test_deadline_reader_times_out(mocker):
+    """Tests that reads fail once the timeout has passed"""
+    clock = mocker.patch.object(limits.time, "monotonic", return_value=100.0)
+    with limits.using(limits.Limits(timeout=5)):
+        reader = limits.with_deadline(io.BytesIO(b"0123456789"))
+
+    assert reader.read(4) == b"0123"
+    clock.return_value = 106.0
+    with pytest.raises(limits.NotebookTimeoutError, match="longer than 5 seconds"):
+        reader.read(4)
+
+
+def test_no_deadline_without_timeout():
+    """Tests that streams are left alone without a timeout"""
+    stream = io.BytesIO()
+
+    assert limits.with_deadline(stream) is stream
+
+
+def test_timeout_reports_notebook_as_not_checked(mocker):
+    """Tests that a notebook taking too long to read is reported, not raised"""
+    mocker.patch.object(limits.time, "monotonic", side_effect=itertools.count(step=10))
+
+    with json_backends.using("stream"), limits.using(limits.Limits(timeout=1)):
+        result = api.check_notebook(VALID_NOTEBOOK)
+
+    assert result.status == UNREADABLE
+    assert limits.is_limit_error(result.error)
+
+
+def test_worn_out_workers_are_replaced(mocker):
+    """Tests that the pool is replaced when workers go over the memory ceiling"""
+    mocker.patch.object(parallel, "BATCH_MAX_NOTEBOOKS", 1)
+    # pylint: disable-next=protected-access
+    new_executor = mocker.spy(parallel._WorkerPool, "_new_executor")
+    notebook_paths = [VALID_NOTEBOOK] * 4
+
+    with limits.using(limits.Limits(max_worker_memory=1)):
+        results = parallel.check_notebooks_parallel(notebook_paths, jobs=2)
+
+    assert [result.valid for result in results] == [True] * 4
+    assert new_executor.call_count > 1
+
+
+def hang_on_invalid(path, _data=None):
+    """Stands in for check_notebook_file, never finishing one notebook."""
+    if path == INVALID_NOTEBOOK:
+        time.sleep(60)
+
+
+def test_hung_worker_only_fails_its_notebook(mocker):
+    """Tests that a worker stuck past the timeout is killed and its notebook reported"""
+    mocker.patch.object(parallel, "BATCH_MAX_NOTEBOOKS", 2)
+    mocker.patch.object(parallel, "check_notebook_file", hang_on_invalid)
+    notebook_paths = [VALID_NOTEBOOK] * 3 + [INVALID_NOTEBOOK] + [VALID_NOTEBOOK] * 3
+    started = time.monotonic()
+
+    with limits.using(limits.Limits(timeout=0.5)):
+        results = parallel.check_notebooks_parallel(notebook_paths, jobs=2)
+
+    assert time.monotonic() - started < 30
+    assert [result.error for result in results] == [None] * 3 + [
+        limits.worker_timed_out(0.5)
+    ] + [None] * 3
+
+
+def crash_on_invalid(path, _data=None):
+    """Stands in for check_notebook_file, killing the worker on one notebook."""
+    if path == INVALID_NOTEBOOK:
+        os._exit(1)
+
+
+def test_crashed_worker_only_fails_its_notebook(mocker):
+    """Tests that a notebook that kills its worker doesn't take the run down"""
+    mocker.patch.object(parallel, "BATCH_MAX_NOTEBOOKS", 2)
+    mocker.patch.object(parallel, "check_notebook_file", crash_on_invalid)
+    notebook_paths = [VALID_NOTEBOOK] * 3 + [INVALID_NOTEBOOK] + [VALID_NOTEBOOK] * 3
+
+    results = parallel.check_notebooks_parallel(notebook_paths, jobs=2)
+
+    assert [result.error for result in results] == [None] * 3 + [
+        limits.WORKER_CRASHED
+    ] + [None] * 3
+
+
+@pytest.mark.parametrize(
+    "oversized, expected", [("stream", "invalid"), ("error", "Not checked")]
+)
+def test_cli_max_file_size(oversized, expected):
+    """Tests --max-file-size with --oversized"""
+    result = CliRunner().invoke(
+        cli,
+        ["--max-file-size", "100", "--oversized", oversized, INVALID_NOTEBOOK],
+    )
+
+    assert result.exit_code == 1
+    assert expected in result.output
+
+
+def test_cli_max_file_size_none_turns_the_limit_off():
+    """Tests that --max-file-size none checks notebooks of any size"""
+    result = CliRunner().invoke(
+        cli,
+        ["--max-file-size", "100", "--max-file-size", "none", "--oversized", "error"]
+        + [INVALID_NOTEBOOK],
+    )
+
+    assert result.exit_code == 1
+    assert "Not checked" not in result.output
+
+
+def test_cli_rejects_invalid_size():
+    """Tests that --max-file-size must be a size"""
+    result = CliRunner().invoke(cli, ["--max-file-size", "huge", VALID_NOTEBOOK])
+
+    assert result.exit_code == 2
+    assert "must be a size" in result.output
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+@pytest.mark.parametrize("json_backend", ["stream", "json"])
+def test_unreadable_notebooks_are_reported(tmp_path, jobs, json_backend):
+    """Tests that notebooks that aren't valid notebook JSON don't end the run"""
+    (tmp_path / "null_cells.ipynb").write_text('{"cells": null}', encoding="utf-8")
+    (tmp_path / "not_json.ipynb").write_bytes(b"\xff{")
+    deep_outputs = "[" * 100_000 + "]" * 100_000
+    (tmp_path / "deep.ipynb").write_text(
+        '{"cells": [{"cell_type": "code", "execution_count": 1, "source": ["x"], '
+        f'"outputs": [{deep_outputs}]}}]}}',
+        encoding="utf-8",
+    )
+
+    result = CliRunner().invoke(
+        cli, ["-j", jobs, "--json-backend", json_backend, str(tmp_path)]
+    )
+
+    assert result.exception is None or isinstance(result.exception, SystemExit)
+    assert result.exit_code == 1
+    assert "Checked 3 notebook(s)" in result.output
+    assert "Could not read notebook" in result.output
+
+
+def test_unreadable_notebooks_are_not_cached(tmp_path):
+    """Tests that a notebook that could not be read is read again next time"""
+    notebook_path = tmp_path / "broken.ipynb"
+    notebook_path.write_text('{"cells": null}', encoding="utf-8")
+    cache = ResultCache(str(tmp_path / "cache"))
+
+    with pytest.raises(enforce_notebook_run_order.InvalidNotebookRunError) as error:
+        enforce_notebook_run_order.check_notebooks([str(notebook_path)], cache)
+    cache.close()
+
+    assert is_read_error(error.value.results[0].error)
+    assert ResultCache(str(tmp_path / "cache")).get(str(notebook_path)) is None
+
+
+def test_using_only_affects_the_calling_thread():
+    """Tests that limits set on one thread don't apply to checks on another"""
+    limits_set = threading.Event()
+    checked = threading.Event()
+    seen = []
+
+    def check_in_background():
+        limits_set.wait()
+        seen.append(api.check_notebook(VALID_NOTEBOOK))
+        checked.set()
+
+    thread = threading.Thread(target=check_in_background)
+    thread.start()
+    with limits.using(TINY._replace(oversized=limits.ERROR)):
+        limits_set.set()
+        checked.wait()
+        assert api.check_notebook(VALID_NOTEBOOK).status == UNREADABLE
+    thread.join()
+
+    assert seen[0].valid
@@ -0,0 +1,70 @@
+"""tests the merge module"""
+
+import io
+import json
+import pytest
+from enforce_notebook_run_order.merge import merge_results, read_results
+from enforce_notebook_run_order.results import NotebookResult
+
+
+def result_file(tmp_path, name, results, finished=True):
+    """Writes results as the JSON Lines reporter does and returns the path"""
+    lines = [
+        json.dumps(
+            {"type": "notebook", "path": path, "valid": error is None, "error": error}
+        )
+        for path, error in results
+    ]
+    if finished:
+        lines.append(json.dumps({"type": "summary", "checked": len(results)}))
+    path = tmp_path / name
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_read_results():
+    """Tests that notebook records are read and the summary is skipped"""
+    stream = io.StringIO(
+        '{"type": "notebook", "path": "a.ipynb", "valid": true, "error": null}\n'
+        "\n"
+        '{"type": "summary", "checked": 1}\n'
+    )
+
+    assert read_results(stream) == [NotebookResult("a.ipynb")]
+
+
+def test_read_results_requires_summary():
+    """Tests that the output of an unfinished run is rejected"""
+    stream = io.StringIO(
+        '{"type": "notebook", "path": "a.ipynb", "valid": true, "error": null}\n'
+    )
+
+    with pytest.raises(ValueError, match="did not finish"):
+        read_results(stream, "shard-1.jsonl")
+
+
+def test_read_results_rejects_other_output():
+    """Tests that output in another format is rejected with its line number"""
+    with pytest.raises(ValueError, match="shard-1.jsonl:1"):
+        read_results(io.StringIO("✅ VALID: a.ipynb\n"), "shard-1.jsonl")
+
+
+def test_merge_results_sorts_by_path(tmp_path):
+    """Tests that results from every file are combined in path order"""
+    first = result_file(tmp_path, "1.jsonl", [("b.ipynb", None), ("d.ipynb", "bad")])
+    second = result_file(tmp_path, "2.jsonl", [("a.ipynb", None), ("c.ipynb", None)])
+
+    assert merge_results([first, second]) == [
+        NotebookResult("a.ipynb"),
+        NotebookResult("b.ipynb"),
+        NotebookResult("c.ipynb"),
+        NotebookResult("d.ipynb", "bad"),
+    ]
+
+
+def test_merge_results_keeps_invalid_duplicates(tmp_path):
+    """Tests that a notebook found invalid by any run stays invalid"""
+    first = result_file(tmp_path, "1.jsonl", [("a.ipynb", "bad")])
+    second = result_file(tmp_path, "2.jsonl", [("a.ipynb", None)])
+
+    assert merge_results([first, second]) == [NotebookResult("a.ipynb", "bad")]
@@ -0,0 +1,106 @@
+"""tests the parallel module"""
+
+import os
+import pytest
+from enforce_notebook_run_order import (
+    enforce_notebook_run_order,
+    json_backends,
+    parallel,
+)
+
+NOTEBOOKS_DIR = os.path.join("test", "test_data", "notebooks")
+
+
+def test_resolve_jobs_auto_uses_cpu_count(mocker):
+    """Tests that 'auto' resolves to the number of CPU cores"""
+    mocker.patch("os.cpu_count", return_value=32)
+
+    assert parallel.resolve_jobs("auto") == 32
+
+
+@pytest.mark.parametrize("jobs", ["0", "-2", "many"])
+def test_resolve_jobs_rejects_invalid_values(jobs):
+    """Tests that non-positive or non-numeric job counts raise ValueError"""
+    with pytest.raises(ValueError):
+        parallel.resolve_jobs(jobs)
+
+
+def test_make_batches_schedules_largest_notebooks_first(tmp_path, mocker):
+    """Tests that batches are ordered by notebook size and respect the byte limit"""
+    mocker.patch.object(parallel, "BATCH_MAX_BYTES", 100)
+    sizes = {"small.ipynb": 10, "huge.ipynb": 500, "medium.ipynb": 60}
+    paths = []
+    for name, size in sizes.items():
+        path = tmp_path / name
+        path.write_bytes(b" " * size)
+        paths.append(str(path))
+
+    batches = parallel.make_batches(paths)
+
+    assert batches == [[(1, paths[1])], [(2, paths[2]), (0, paths[0])]]
+
+
+def test_check_notebooks_parallel_reports_in_walk_order(mocker):
+    """Tests that verdicts are reported in input order, whatever the schedule"""
+    mock_report_notebook = mocker.patch(
+        "enforce_notebook_run_order.parallel.report_notebook"
+    )
+    notebook_paths = list(enforce_notebook_run_order.find_notebooks(NOTEBOOKS_DIR))
+
+    results = parallel.check_notebooks_parallel(notebook_paths, jobs=2)
+
+    assert [result.path for result in results] == notebook_paths
+    assert not all(result.valid for result in results)
+    reported = [call.args[0] for call in mock_report_notebook.call_args_list]
+    assert reported == notebook_paths
+    errors = {
+        call.args[0]: call.args[1] for call in mock_report_notebook.call_args_list
+    }
+    assert all((errors[path] is None) == ("invalid" not in path) for path in errors)
+
+
+def test_check_notebooks_parallel_valid_notebooks():
+    """Tests that a set of valid notebooks is reported as valid"""
+    notebook_paths = list(
+        enforce_notebook_run_order.find_notebooks(
+            os.path.join(NOTEBOOKS_DIR, "python", "valid")
+        )
+    )
+
+    results = parallel.check_notebooks_parallel(notebook_paths, jobs=2)
+
+    assert len(results) == len(notebook_paths)
+    assert all(result.valid for result in results)
+
+
+def test_check_notebooks_parallel_fail_fast_stops_early(mocker):
+    """Tests that fail-fast mode stops before checking every notebook"""
+    mocker.patch.object(parallel, "BATCH_MAX_NOTEBOOKS", 1)
+    mock_report_notebook = mocker.patch(
+        "enforce_notebook_run_order.parallel.report_notebook"
+    )
+    invalid_path = os.path.join(
+        NOTEBOOKS_DIR, "python", "invalid", "invalid_notebook.ipynb"
+    )
+    valid_path = os.path.join(NOTEBOOKS_DIR, "python", "valid", "valid_notebook.ipynb")
+    notebook_paths = [invalid_path] + [valid_path] * 200
+
+    results = parallel.check_notebooks_parallel(notebook_paths, jobs=2, fail_fast=True)
+
+    assert not results[0].valid
+    assert len(results) < len(notebook_paths)
+    assert mock_report_notebook.call_count < len(notebook_paths)
+
+
+def test_check_batch_uses_json_backend(mocker):
+    """Tests that workers decode notebooks with the backend they are given"""
+    decode = mocker.spy(json_backends, "decode_code_cells")
+    notebooks = list(enforce_notebook_run_order.find_notebooks(NOTEBOOKS_DIR))
+
+    verdicts, _, _ = parallel._check_batch(  # pylint: disable=protected-access
+        list(enumerate(notebooks)), json_backend="json"
+    )
+
+    assert decode.call_count == len(notebooks)
+    assert any(error is not None for _, error in verdicts)
+    assert json_backends.current() == json_backends.DEFAULT
@@ -0,0 +1,136 @@
+"""tests the pipeline module"""
+
+import threading
+import time
+import pytest
+from enforce_notebook_run_order import enforce_notebook_run_order, pipeline
+from enforce_notebook_run_order.reporters import Reporter, use_reporter
+from enforce_notebook_run_order.results import is_read_error
+
+VALID_NOTEBOOK = "test/test_data/notebooks/python/valid/valid_notebook.ipynb"
+INVALID_NOTEBOOK = "test/test_data/notebooks/python/invalid/invalid_notebook.ipynb"
+
+
+def make_files(tmp_path, count, size=10):
+    """Writes ``count`` files of ``size`` bytes and returns their paths."""
+    paths = []
+    for index in range(count):
+        path = tmp_path / f"{index}.ipynb"
+        path.write_bytes(bytes([index % 256]) * size)
+        paths.append(str(path))
+    return paths
+
+
+def test_prefetch_yields_contents_in_order(tmp_path):
+    """Tests that notebooks come back in order, with their content"""
+    paths = make_files(tmp_path, 20)
+    results = list(pipeline.prefetch_notebooks(paths, depth=4))
+    assert [path for path, _ in results] == paths
+    assert [data for _, data in results] == [bytes([i]) * 10 for i in range(20)]
+
+
+def consuming(paths, consumed):
+    """Yields paths, recording each one as it is consumed."""
+    for path in paths:
+        consumed.append(path)
+        yield path
+
+
+def test_prefetch_reads_at_most_depth_ahead(tmp_path):
+    """Tests that only ``depth`` paths are consumed ahead of the consumer"""
+    consumed = []
+    prefetched = pipeline.prefetch_notebooks(
+        consuming(make_files(tmp_path, 10), consumed), depth=3
+    )
+    next(prefetched)
+    assert len(consumed) == 3
+    next(prefetched)
+    assert len(consumed) == 4
+    prefetched.close()
+
+
+def test_prefetch_stops_reading_ahead_over_max_bytes(tmp_path, mocker):
+    """Tests that no reads start while enough notebooks are being read or waiting"""
+    released = threading.Event()
+    original = pipeline.read_notebook_bytes
+    started = []
+
+    def slow_read(path):
+        started.append(path)
+        released.wait()
+        return original(path)
+
+    mocker.patch.object(pipeline, "read_notebook_bytes", side_effect=slow_read)
+    paths = make_files(tmp_path, 20, size=100)
+    prefetched = pipeline.prefetch_notebooks(paths, depth=8, max_bytes=150)
+    threading.Timer(0.1, released.set).start()
+    next(prefetched)
+    # Nothing had been read yet, but the sizes of the reads in flight count.
+    assert len(started) == 2
+    time.sleep(0.2)  # let the reads in flight finish
+    next(prefetched)
+    time.sleep(0.1)  # let the read just started reach the pool
+    assert len(started) == 3
+    assert [path for path, _ in prefetched] == paths[2:]
+
+
+def test_prefetch_yields_unreadable_notebooks_without_content(tmp_path):
+    """Tests that a notebook that can't be read is left to be read when checked"""
+    paths = make_files(tmp_path, 2)
+    missing = str(tmp_path / "missing.ipynb")
+
+    prefetched = list(pipeline.prefetch_notebooks([paths[0], missing, paths[1]]))
+
+    assert prefetched == [
+        (paths[0], bytes(10)),
+        (missing, None),
+        (paths[1], bytes([1]) * 10),
+    ]
+
+
+def test_prefetch_leaves_oversized_notebooks_unread(tmp_path):
+    """Tests that notebooks over max_file_size are yielded without content"""
+    small = make_files(tmp_path, 1, size=10)[0]
+    large = str(tmp_path / "large.ipynb")
+    with open(large, "wb") as large_file:
+        large_file.write(b" " * 1000)
+
+    prefetched = list(pipeline.prefetch_notebooks([large, small], max_file_size=100))
+
+    assert prefetched == [(large, None), (small, bytes(10))]
+
+
+def test_prefetch_rejects_zero_depth():
+    """Tests that a depth below 1 is refused"""
+    with pytest.raises(ValueError):
+        list(pipeline.prefetch_notebooks([], depth=0))
+
+
+def test_check_notebooks_with_prefetch_matches_without():
+    """Tests that prefetching doesn't change verdicts"""
+    paths = [VALID_NOTEBOOK, INVALID_NOTEBOOK, VALID_NOTEBOOK]
+    with use_reporter(Reporter()):
+        with pytest.raises(enforce_notebook_run_order.InvalidNotebookRunError) as plain:
+            enforce_notebook_run_order.check_notebooks(paths)
+        with pytest.raises(
+            enforce_notebook_run_order.InvalidNotebookRunError
+        ) as prefetched:
+            enforce_notebook_run_order.check_notebooks(paths, prefetch=2)
+    assert prefetched.value.results == plain.value.results
+
+
+def test_check_notebooks_with_prefetch_reports_unreadable_notebooks(tmp_path):
+    """Tests that an unreadable notebook is reported, not raised, with prefetching"""
+    unreadable = tmp_path / "unreadable.ipynb"
+    unreadable.mkdir()
+    paths = [VALID_NOTEBOOK, str(unreadable), VALID_NOTEBOOK]
+    with use_reporter(Reporter()):
+        with pytest.raises(enforce_notebook_run_order.InvalidNotebookRunError) as plain:
+            enforce_notebook_run_order.check_notebooks(paths)
+        with pytest.raises(
+            enforce_notebook_run_order.InvalidNotebookRunError
+        ) as prefetched:
+            enforce_notebook_run_order.check_notebooks(paths, prefetch=2)
+
+    assert prefetched.value.results == plain.value.results
+    assert is_read_error(prefetched.value.results[1].error)
@@ -0,0 +1,152 @@
+"""tests the reporters module"""
+
+import io
+import json
+import xml.etree.ElementTree as ET
+import pytest
+from enforce_notebook_run_order import reporters
+from enforce_notebook_run_order.results import NotebookResult
+
+RESULTS = (
+    NotebookResult("valid.ipynb"),
+    NotebookResult("sub/invalid.ipynb", "Cells were not run sequentially.\n\nFix it."),
+)
+
+
+def _report(output_format, quiet=False, results=RESULTS):
+    stream = io.StringIO()
+    reporter = reporters.make_reporter(output_format, stream, quiet=quiet)
+    for result in results:
+        reporter.notebook(result)
+    reporter.summary(results)
+    reporter.close()
+    return stream.getvalue()
+
+
+def test_plain_reporter():
+    """Tests that plain output has the verdicts and summary without markup"""
+    output = _report("plain")
+
+    assert "VALID: valid.ipynb\n" in output
+    assert "INVALID: sub/invalid.ipynb\nError: Cells were not run" in output
+    assert "Checked 2 notebook(s): 1 valid, 1 invalid." in output
+    assert "[" not in output
+
+
+def test_jsonl_reporter():
+    """Tests that JSON Lines output has a record per notebook, then a summary"""
+    records = [json.loads(line) for line in _report("jsonl").splitlines()]
+
+    assert records[0] == {
+        "type": "notebook",
+        "path": "valid.ipynb",
+        "valid": True,
+        "error": None,
+    }
+    assert records[1]["valid"] is False
+    assert records[1]["error"].startswith("Cells were not run")
+    assert records[2] == {
+        "type": "summary",
+        "checked": 2,
+        "valid": 1,
+        "invalid": 1,
+        "invalid_paths": ["sub/invalid.ipynb"],
+    }
+
+
+def test_junit_reporter():
+    """Tests that JUnit output has a test case per notebook and a failure per invalid one"""
+    testsuites = ET.fromstring(_report("junit").split("\n", 1)[1])
+
+    assert testsuites.get("tests") == "2"
+    assert testsuites.get("failures") == "1"
+    testcases = testsuites.findall("testsuite/testcase")
+    assert [testcase.get("name") for testcase in testcases] == [
+        "valid.ipynb",
+        "sub/invalid.ipynb",
+    ]
+    assert testcases[0].find("failure") is None
+    failure = testcases[1].find("failure")
+    assert failure.get("message") == "Cells were not run sequentially."
+    assert failure.text.endswith("Fix it.")
+
+
+def test_sarif_reporter():
+    """Tests that SARIF output has a result per invalid notebook"""
+    log = json.loads(_report("sarif"))
+
+    assert log["version"] == "2.1.0"
+    (run,) = log["runs"]
+    assert run["tool"]["driver"]["name"] == "enforce-notebook-run-order"
+    (result,) = run["results"]
+    assert result["ruleId"] == run["tool"]["driver"]["rules"][0]["id"]
+    location = result["locations"][0]["physicalLocation"]["artifactLocation"]
+    assert location["uri"] == "sub/invalid.ipynb"
+
+
+@pytest.mark.parametrize("output_format", ["plain", "jsonl", "junit"])
+def test_quiet_leaves_out_valid_notebooks(output_format):
+    """Tests that quiet mode only reports invalid notebooks"""
+    output = _report(output_format, quiet=True)
+
+    assert "sub/invalid.ipynb" in output
+    assert "valid.ipynb" not in output.replace("sub/invalid.ipynb", "")
+
+
+def test_quiet_with_only_valid_notebooks_writes_nothing():
+    """Tests that quiet mode writes no summary when every notebook is valid"""
+    assert _report("plain", quiet=True, results=RESULTS[:1]) == ""
+
+
+def test_reporter_buffers_output(mocker):
+    """Tests that output is held back until the buffer is full or closed"""
+    mocker.patch.object(reporters, "BUFFER_SIZE", 100)
+    stream = io.StringIO()
+    reporter = reporters.make_reporter("plain", stream)
+
+    reporter.notebook(NotebookResult("a.ipynb"))
+    assert stream.getvalue() == ""
+
+    for _ in range(10):
+        reporter.notebook(NotebookResult("a.ipynb"))
+    assert stream.getvalue() != ""
+
+    reporter.close()
+    assert stream.getvalue().count("VALID: a.ipynb") == 11
+
+
+def test_use_reporter_restores_previous_reporter():
+    """Tests that use_reporter swaps the active reporter in and closes it"""
+    previous = reporters.get_reporter()
+    stream = io.StringIO()
+
+    with reporters.use_reporter(reporters.make_reporter("plain", stream)) as reporter:
+        assert reporters.get_reporter() is reporter
+        reporter.notebook(NotebookResult("a.ipynb"))
+
+    assert reporters.get_reporter() is previous
+    assert stream.getvalue() == "VALID: a.ipynb\n"
+
+
+@pytest.mark.parametrize(
+    "output_format, expected",
+    [("plain", "VALID: a.ipynb\n"), ("junit", ""), ("sarif", "")],
+)
+def test_use_reporter_leaves_aborted_reports_unfinished(output_format, expected):
+    """Tests that a block that raises gets no closing document, only what was written"""
+    previous = reporters.get_reporter()
+    stream = io.StringIO()
+
+    with pytest.raises(RuntimeError):
+        with reporters.use_reporter(reporters.make_reporter(output_format, stream)):
+            reporters.get_reporter().notebook(NotebookResult("a.ipynb"))
+            raise RuntimeError
+
+    assert reporters.get_reporter() is previous
+    assert stream.getvalue() == expected
+
+
+def test_make_reporter_unknown_format():
+    """Tests that an unknown output format raises ValueError"""
+    with pytest.raises(ValueError):
+        reporters.make_reporter("html")
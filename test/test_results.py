@@ -0,0 +1,33 @@
+"""tests the results module"""
+
+from enforce_notebook_run_order.results import NotebookResult, summarize
+
+
+def test_notebook_result_valid():
+    """Tests that a result is valid only without an error"""
+    assert NotebookResult("a.ipynb").valid
+    assert not NotebookResult("b.ipynb", "Cells were not run sequentially").valid
+
+
+def test_summarize_counts_valid_and_invalid_notebooks():
+    """Tests that summarize counts results and lists invalid paths in order"""
+    summary = summarize(
+        [
+            NotebookResult("a.ipynb"),
+            NotebookResult("b.ipynb", "error"),
+            NotebookResult("c.ipynb"),
+            NotebookResult("d.ipynb", "error"),
+        ]
+    )
+
+    assert summary.checked == 4
+    assert summary.valid == 2
+    assert summary.invalid == 2
+    assert summary.invalid_paths == ["b.ipynb", "d.ipynb"]
+
+
+def test_summarize_empty():
+    """Tests that summarizing no results gives zero counts"""
+    summary = summarize([])
+
+    assert (summary.checked, summary.valid, summary.invalid) == (0, 0, 0)
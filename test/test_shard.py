@@ -0,0 +1,60 @@
+"""tests the shard module"""
+
+import os
+import pytest
+from enforce_notebook_run_order.shard import Shard, find_root
+from enforce_notebook_run_order.walk import NotebookWalker
+
+NOTEBOOKS_DIR = os.path.join("test", "test_data", "notebooks")
+
+
+def test_parse():
+    """Tests that i/N is parsed, with paths relative to the repository root"""
+    shard = Shard.parse("2/4")
+
+    assert (shard.index, shard.count) == (2, 4)
+    assert shard.root == os.path.abspath(".")
+
+
+@pytest.mark.parametrize("spec", ["0/4", "5/4", "1", "a/b", "1/0", "/"])
+def test_parse_rejects_invalid_specs(spec):
+    """Tests that a shard outside 1..N, or not of the form i/N, is rejected"""
+    with pytest.raises(ValueError, match="i/N"):
+        Shard.parse(spec)
+
+
+def test_find_root(tmp_path):
+    """Tests that the nearest directory holding .git is the root"""
+    (tmp_path / ".git").mkdir()
+    nested = tmp_path / "a" / "b"
+    nested.mkdir(parents=True)
+
+    assert find_root(str(nested)) == str(tmp_path)
+
+
+def test_key_is_relative_to_root(tmp_path):
+    """Tests that the same file in two checkouts hashes the same"""
+    first = Shard(1, 2, str(tmp_path / "one"))
+    second = Shard(1, 2, str(tmp_path / "two"))
+
+    assert first.key(str(tmp_path / "one" / "a" / "x.ipynb")) == "a/x.ipynb"
+    assert second.key(str(tmp_path / "two" / "a" / "x.ipynb")) == "a/x.ipynb"
+
+
+def test_shards_cover_every_notebook_once():
+    """Tests that the shards split the notebooks without overlap or gaps"""
+    everything = sorted(NotebookWalker().find(NOTEBOOKS_DIR))
+    shards = [
+        sorted(NotebookWalker(shard=Shard(index, 3)).find(NOTEBOOKS_DIR))
+        for index in range(1, 4)
+    ]
+
+    assert sorted(path for shard in shards for path in shard) == everything
+
+
+def test_walker_filters_single_files():
+    """Tests that a notebook named directly is skipped outside its shard"""
+    path = os.path.join(NOTEBOOKS_DIR, "python", "valid", "valid_notebook.ipynb")
+    found = [list(NotebookWalker(shard=Shard(index, 2)).find(path)) for index in (1, 2)]
+
+    assert sorted(found, key=len) == [[], [path]]
@@ -0,0 +1,133 @@
+"""tests the snapshot module"""
+
+import json
+import os
+import time
+import pytest
+from click.testing import CliRunner
+from enforce_notebook_run_order import snapshot, walk
+from enforce_notebook_run_order.cli import cli
+
+# pylint: disable=redefined-outer-name
+
+HOUR = 3600
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    """Creates a project tree whose directories were last changed an hour ago."""
+    project = tmp_path / "project"
+    monkeypatch.chdir(tmp_path)
+    for path in [
+        "project/analysis.ipynb",
+        "project/reports/summary.ipynb",
+        "project/reports/2024/q1.ipynb",
+        "project/docs/readme.md",
+    ]:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="UTF-8") as file:
+            file.write("{}")
+    age_directories(project)
+    return project
+
+
+def age_directories(top):
+    """Sets the mtime of every directory under top an hour back."""
+    past = time.time() - HOUR
+    for directory, _, _ in os.walk(top):
+        os.utime(directory, (past, past))
+
+
+def walk_with_snapshot(snapshot_file, top="project"):
+    """Walks top with a snapshot stored in snapshot_file, as a run would."""
+    with snapshot.DirectorySnapshot(str(snapshot_file)) as directory_snapshot:
+        return list(walk.NotebookWalker(snapshot=directory_snapshot).find(top))
+
+
+def test_unchanged_directories_are_not_listed_again(tree, mocker):
+    """Tests that a second walk reuses the listings of unchanged directories"""
+    snapshot_file = tree.parent / "snapshot.json"
+    found = walk_with_snapshot(snapshot_file)
+    scandir = mocker.spy(os, "scandir")
+
+    assert walk_with_snapshot(snapshot_file) == found
+    scandir.assert_not_called()
+    assert found == list(walk.NotebookWalker().find("project"))
+
+
+def test_changed_directories_are_listed_again(tree, mocker):
+    """Tests that only directories whose mtime changed are listed again"""
+    snapshot_file = tree.parent / "snapshot.json"
+    walk_with_snapshot(snapshot_file)
+    (tree / "reports" / "2024" / "q2.ipynb").write_text("{}", encoding="UTF-8")
+    scandir = mocker.spy(os, "scandir")
+
+    found = walk_with_snapshot(snapshot_file)
+
+    assert os.path.join("project", "reports", "2024", "q2.ipynb") in found
+    assert [call.args[0] for call in scandir.call_args_list] == [
+        os.path.join("project", "reports", "2024")
+    ]
+
+
+def test_recently_changed_directories_are_not_stored(tree):
+    """Tests that a directory changed within RACY_SECONDS is listed next time"""
+    snapshot_file = tree.parent / "snapshot.json"
+    os.utime(tree / "reports")
+
+    walk_with_snapshot(snapshot_file)
+
+    stored = json.loads(snapshot_file.read_text(encoding="utf-8"))["directories"]
+    assert str(tree) in stored
+    assert str(tree / "reports") not in stored
+
+
+def test_removed_directories_are_forgotten(tree):
+    """Tests that listings below a removed directory are dropped from the snapshot"""
+    snapshot_file = tree.parent / "snapshot.json"
+    walk_with_snapshot(snapshot_file)
+    (tree / "reports" / "2024" / "q1.ipynb").unlink()
+    (tree / "reports" / "2024").rmdir()
+    age_directories(tree)
+
+    found = walk_with_snapshot(snapshot_file)
+
+    assert os.path.join("project", "reports", "2024", "q1.ipynb") not in found
+    stored = json.loads(snapshot_file.read_text(encoding="utf-8"))["directories"]
+    assert set(stored) == {str(tree), str(tree / "reports"), str(tree / "docs")}
+
+
+def test_symlinked_notebooks_are_looked_up_each_walk(tree):
+    """Tests that a symlinked notebook whose target is gone is no longer yielded"""
+    snapshot_file = tree.parent / "snapshot.json"
+    target = tree.parent / "shared.ipynb"
+    target.write_text("{}", encoding="UTF-8")
+    os.symlink(target, tree / "docs" / "shared.ipynb")
+    age_directories(tree)
+    shared = os.path.join("project", "docs", "shared.ipynb")
+
+    assert shared in walk_with_snapshot(snapshot_file)
+    target.unlink()
+    assert shared not in walk_with_snapshot(snapshot_file)
+
+
+def test_broken_snapshot_is_ignored(tree):
+    """Tests that an unreadable snapshot only means listing everything again"""
+    snapshot_file = tree.parent / "snapshot.json"
+    snapshot_file.write_text('{"version": 1, "directories": [', encoding="utf-8")
+
+    assert len(walk_with_snapshot(snapshot_file)) == 3
+    assert json.loads(snapshot_file.read_text(encoding="utf-8"))["directories"]
+
+
+def test_cli_keeps_a_snapshot_per_working_directory(tree, isolated_cache_dir):
+    """Tests that the CLI stores a snapshot unless --no-cache is given"""
+    snapshot_dir = isolated_cache_dir / snapshot.SNAPSHOT_DIRNAME
+
+    CliRunner().invoke(cli, ["--no-cache", str(tree)])
+    assert not snapshot_dir.exists()
+    CliRunner().invoke(cli, [str(tree)])
+
+    assert [path.name for path in snapshot_dir.iterdir()] == [
+        os.path.basename(snapshot.snapshot_path(str(isolated_cache_dir)))
+    ]
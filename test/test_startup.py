@@ -0,0 +1,84 @@
+"""tests that slow imports stay out of the startup path, as used by pre-commit"""
+
+import functools
+import subprocess
+import sys
+import textwrap
+
+# Modules that must only be imported when the features that need them are used.
+LAZY_MODULES = (
+    "rich",
+    "concurrent.futures",
+    "xml.etree.ElementTree",
+    "tarfile",
+    "zipfile",
+    "gzip",
+    "cProfile",
+    "socketserver",
+    "orjson",
+    "msgspec",
+)
+
+
+def _modules_loaded_by(script):
+    # Modules the interpreter loads before running anything, say from a .pth
+    # file in site-packages, are not the package's doing.
+    return _lazy_modules_loaded_by(script) - _lazy_modules_loaded_by("")
+
+
+@functools.lru_cache(maxsize=None)
+def _lazy_modules_loaded_by(script):
+    script = textwrap.dedent(script) + textwrap.dedent(
+        f"""
+        import sys
+        print(",".join(m for m in {LAZY_MODULES!r} if m in sys.modules))
+        """
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    )
+    loaded = completed.stdout.splitlines()[-1]
+    return set(loaded.split(",")) - {""}
+
+
+def test_import_package_is_lightweight():
+    """Tests that importing the package loads neither rich nor click"""
+    loaded = _modules_loaded_by(
+        """
+        import enforce_notebook_run_order
+        import sys
+        assert "click" not in sys.modules
+        """
+    )
+
+    assert not loaded
+
+
+def test_cli_valid_notebooks_without_terminal_skips_slow_imports():
+    """Tests that a hook-style run on valid notebooks never imports rich"""
+    loaded = _modules_loaded_by(
+        """
+        from enforce_notebook_run_order.cli import cli
+        try:
+            cli(["test/test_data/notebooks/python/valid"])
+        except SystemExit as error:
+            assert error.code == 0, error.code
+        """
+    )
+
+    assert not loaded
+
+
+def test_rich_format_imports_rich_on_first_use():
+    """Tests that rich is still imported when styled output is asked for"""
+    loaded = _modules_loaded_by(
+        """
+        from enforce_notebook_run_order.cli import cli
+        try:
+            cli(["--format", "rich", "test/test_data/notebooks/python/valid"])
+        except SystemExit:
+            pass
+        """
+    )
+
+    assert loaded == {"rich"}
@@ -0,0 +1,166 @@
+"""tests the stats module"""
+
+import os
+import pstats
+import threading
+from click.testing import CliRunner
+from enforce_notebook_run_order import enforce_notebook_run_order, iter_check, stats
+from enforce_notebook_run_order.events import NotebookEvent, PhaseEvent, RunEvent
+from enforce_notebook_run_order.cli import cli
+
+NOTEBOOKS_DIR = os.path.join("test", "test_data", "notebooks")
+VALID_NOTEBOOK = os.path.join(NOTEBOOKS_DIR, "python", "valid", "valid_notebook.ipynb")
+
+
+def test_instrumentation_is_inert_without_collector():
+    """Tests that iterables pass through untouched when stats are off"""
+    items = [1, 2, 3]
+
+    assert stats.current() is None
+    assert stats.timed_iter("walk", items) is items
+    assert stats.timed("check")(sum)(items) == 6
+
+
+def test_nested_phases_count_exclusive_time(mocker):
+    """Tests that time in a nested phase is not counted towards the outer one"""
+    clock = iter([0.0, 1.0, 3.0, 10.0])
+    mocker.patch.object(stats.time, "perf_counter", lambda: next(clock))
+    collector = stats.StatsCollector()
+
+    collector.start()  # parse, at 1.0
+    collector.start()  # read, at 3.0
+    collector.stop("read")  # at 10.0
+    mocker.patch.object(stats.time, "perf_counter", lambda: 12.0)
+    collector.stop("parse")
+
+    assert collector.phase_seconds == {"read": 7.0, "parse": 4.0}
+
+
+def test_collector_records_check_of_a_notebook_file():
+    """Tests that checking a file records its phases, bytes and duration"""
+    with stats.collecting(stats.StatsCollector()) as collector:
+        enforce_notebook_run_order.check_notebook_file(VALID_NOTEBOOK)
+
+    assert stats.current() is None
+    assert collector.bytes_read == os.path.getsize(VALID_NOTEBOOK)
+    assert collector.notebooks_read == 1
+    assert {"read", "parse", "check"} <= set(collector.phase_seconds)
+    assert collector.largest == [(os.path.getsize(VALID_NOTEBOOK), VALID_NOTEBOOK)]
+
+
+def test_collector_ignores_checks_on_other_threads():
+    """Tests that iter_check on another thread is not counted by this thread's stats"""
+    checked = []
+    with stats.collecting(stats.StatsCollector()) as collector:
+        thread = threading.Thread(
+            target=lambda: checked.extend(iter_check([VALID_NOTEBOOK]))
+        )
+        thread.start()
+        thread.join()
+
+    assert [result.valid for result in checked] == [True]
+    assert collector.notebooks_read == 0
+    assert not collector.phase_seconds
+
+
+def test_collector_keeps_top_notebooks_and_merges():
+    """Tests that only the slowest and largest notebooks are kept, across merges"""
+    collector = stats.StatsCollector(top=2)
+    worker = stats.StatsCollector(top=2)
+    collector.add_notebook("a.ipynb", 1.0, 10)
+    collector.add_notebook("b.ipynb", 3.0, 5)
+    worker.add_notebook("c.ipynb", 2.0, 50)
+    worker.phase_seconds["parse"] = 1.5
+    worker.bytes_read = 65
+
+    collector.merge(worker)
+
+    assert collector.notebooks_read == 3
+    assert collector.bytes_read == 65
+    assert collector.phase_seconds["parse"] == 1.5
+    assert sorted(collector.slowest, reverse=True) == [
+        (3.0, "b.ipynb"),
+        (2.0, "c.ipynb"),
+    ]
+    assert sorted(collector.largest, reverse=True) == [
+        (50, "c.ipynb"),
+        (10, "a.ipynb"),
+    ]
+    report = collector.report(checked=3)
+    assert "Slowest notebooks:" in report
+    assert report.index("b.ipynb") < report.index("c.ipynb")
+
+
+def test_collector_passes_events_per_notebook():
+    """Tests that listeners get each notebook's phases, then the notebook"""
+    events = []
+    with stats.collecting(stats.StatsCollector(listeners=[events.append])):
+        enforce_notebook_run_order.process_path(VALID_NOTEBOOK)
+
+    size = os.path.getsize(VALID_NOTEBOOK)
+    notebook_index = next(
+        i for i, event in enumerate(events) if isinstance(event, NotebookEvent)
+    )
+    phases = events[:notebook_index]
+    assert all(isinstance(event, PhaseEvent) for event in phases)
+    assert {"walk", "read", "parse", "check", "report"} <= {
+        event.phase for event in phases
+    }
+    assert {event.path for event in phases} == {VALID_NOTEBOOK}
+    assert [event.bytes for event in phases if event.phase == "read"] == [size]
+    notebook = events[notebook_index]
+    assert (notebook.path, notebook.bytes, notebook.valid) == (
+        VALID_NOTEBOOK,
+        size,
+        True,
+    )
+    assert notebook.seconds >= sum(event.seconds for event in phases)
+    run = events[-1]
+    assert isinstance(run, RunEvent)
+    assert (run.checked, run.invalid, run.bytes) == (1, 0, size)
+    assert run.phase_seconds["read"] == sum(
+        event.seconds for event in phases if event.phase == "read"
+    )
+
+
+def test_collector_without_listeners_keeps_no_events():
+    """Tests that no per-notebook window is kept without listeners"""
+    collector = stats.StatsCollector()
+    collector.start()
+    collector.stop("read")
+    collector.notebook_done("a.ipynb", valid=False)
+
+    assert not collector._window  # pylint: disable=protected-access
+    assert collector.notebooks_invalid == 1
+
+
+def test_cli_stats_prints_phase_breakdown():
+    """Tests that --stats prints a phase breakdown and throughput"""
+    result = CliRunner().invoke(cli, ["--stats", "--no-cache", NOTEBOOKS_DIR])
+
+    assert result.exit_code == 1
+    assert "files/s" in result.output
+    for phase in ("walk", "parse", "check", "report", "other"):
+        assert f"\n{phase} " in result.output
+    assert "Largest notebooks:" in result.output
+
+
+def test_cli_stats_with_jobs_merges_worker_stats():
+    """Tests that --stats includes the parsing done in worker processes"""
+    result = CliRunner().invoke(
+        cli, ["--stats", "--no-cache", "--jobs", "2", NOTEBOOKS_DIR]
+    )
+
+    assert "\nparse " in result.output
+    assert "Slowest notebooks:" in result.output
+
+
+def test_cli_profile_writes_pstats(tmp_path):
+    """Tests that --profile writes a cProfile dump readable by pstats"""
+    profile_path = tmp_path / "out.pstats"
+
+    result = CliRunner().invoke(cli, ["--profile", str(profile_path), VALID_NOTEBOOK])
+
+    assert result.exit_code == 0
+    profile = pstats.Stats(str(profile_path))
+    assert any(function_name == "iter_check" for _, _, function_name in profile.stats)
@@ -0,0 +1,109 @@
+"""tests the streaming module"""
+
+import glob
+import io
+import json
+import os
+import pytest
+from enforce_notebook_run_order import enforce_notebook_run_order, streaming, utils
+
+
+class CountingStream(io.BytesIO):
+    """BytesIO that records how many bytes were read from it."""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+def _encode(notebook_data):
+    return json.dumps(notebook_data, indent=1).encode("utf-8")
+
+
+@pytest.mark.parametrize(
+    "notebook_path",
+    sorted(
+        glob.glob(os.path.join("test", "test_data", "**", "*.ipynb"), recursive=True)
+    ),
+)
+@pytest.mark.parametrize("chunk_size", [1, 7, streaming.CHUNK_SIZE])
+def test_read_code_cells_matches_json_load(notebook_path, chunk_size):
+    """Tests that the streamed cells match the cells of the fully parsed notebook"""
+    expected = [
+        utils.to_code_cell(cell)
+        for cell in utils.get_code_cells(utils.load_notebook_data(notebook_path))
+    ]
+
+    assert list(streaming.iter_code_cells(notebook_path, chunk_size)) == expected
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 64])
+def test_read_code_cells_skips_outputs_and_escapes(chunk_size):
+    """Tests that outputs with escaped quotes and nested JSON are skipped correctly"""
+    notebook_data = {
+        "cells": [
+            {"cell_type": "markdown", "source": 'say "hi" \\', "attachments": {}},
+            {
+                "cell_type": "code",
+                "execution_count": 1,
+                "outputs": [
+                    {"data": {"image/png": "A" * 500, "text/html": ['<a href="x">\\"']}}
+                ],
+                "source": "x = 1",
+            },
+            {"source": [], "execution_count": None, "cell_type": "code"},
+            {"cell_type": "code", "execution_count": 2, "source": ""},
+        ],
+        "metadata": {"kernelspec": {"name": "python3"}},
+    }
+    stream = io.BytesIO(_encode(notebook_data))
+
+    assert list(streaming.read_code_cells(stream, chunk_size)) == [
+        utils.CodeCell(1, True),
+        utils.CodeCell(None, False),
+        utils.CodeCell(2, False),
+    ]
+
+
+def test_check_stops_reading_at_first_violation():
+    """Tests that the check stops reading once it finds an out-of-order cell"""
+    large_output = [{"data": {"image/png": "A" * 1_000_000}}]
+    notebook_data = {
+        "cells": [
+            {"cell_type": "code", "execution_count": 2, "source": "x", "outputs": []}
+        ]
+        + [
+            {
+                "cell_type": "code",
+                "execution_count": i,
+                "source": "x",
+                "outputs": large_output,
+            }
+            for i in range(3, 10)
+        ]
+    }
+    stream = CountingStream(_encode(notebook_data))
+
+    with pytest.raises(enforce_notebook_run_order.NotebookRunOrderError):
+        enforce_notebook_run_order.check_notebook_run_order(
+            streaming.read_code_cells(stream, chunk_size=4096)
+        )
+
+    assert stream.bytes_read < 2 * 4096
+
+
+def test_read_code_cells_missing_cells_raises_key_error():
+    """Tests that a notebook without a cells list raises KeyError"""
+    with pytest.raises(KeyError):
+        list(streaming.read_code_cells(io.BytesIO(b'{"metadata": {}}')))
+
+
+def test_read_code_cells_truncated_notebook_raises_value_error():
+    """Tests that a truncated notebook raises ValueError"""
+    with pytest.raises(ValueError):
+        list(streaming.read_code_cells(io.BytesIO(b'{"cells": [{"cell_type": "co')))
@@ -0,0 +1,123 @@
+"""tests the walk module"""
+
+import os
+import subprocess
+import pytest
+from enforce_notebook_run_order import walk
+
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    """Creates a small project tree with notebooks in prunable places."""
+    monkeypatch.chdir(tmp_path)
+    for path in [
+        "analysis.ipynb",
+        "notes.txt",
+        "reports/summary.ipynb",
+        "reports/.ipynb_checkpoints/summary-checkpoint.ipynb",
+        ".venv/lib/example.ipynb",
+        "node_modules/pkg/demo.ipynb",
+        "docs/generated/api.ipynb",
+    ]:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="UTF-8") as file:
+            file.write("{}")
+    return tmp_path
+
+
+def test_walker_prunes_default_excludes(tree):  # pylint: disable=unused-argument
+    """Tests that checkpoints, virtualenvs and node_modules are skipped"""
+    found = list(walk.NotebookWalker().find("."))
+
+    assert found == [
+        os.path.join(".", "analysis.ipynb"),
+        os.path.join(".", "docs", "generated", "api.ipynb"),
+        os.path.join(".", "reports", "summary.ipynb"),
+    ]
+
+
+def test_walker_does_not_list_pruned_directories(tree, mocker):
+    """Tests that excluded directories are never listed"""
+    scandir = mocker.spy(os, "scandir")
+
+    list(walk.NotebookWalker().find("."))
+
+    listed = {os.path.abspath(call.args[0]) for call in scandir.call_args_list}
+    assert str(tree / ".venv") not in listed
+    assert str(tree / "reports" / ".ipynb_checkpoints") not in listed
+
+
+def test_walker_exclude_name_and_path_globs(tree):  # pylint: disable=unused-argument
+    """Tests that name globs match anywhere and path globs match from the root"""
+    walker = walk.NotebookWalker(exclude=["summary*", "docs/generated"])
+
+    assert list(walker.find(".")) == [os.path.join(".", "analysis.ipynb")]
+
+
+def test_walker_without_default_excludes(tree):  # pylint: disable=unused-argument
+    """Tests that default excludes can be turned off"""
+    found = list(walk.NotebookWalker(use_default_excludes=False).find("."))
+
+    assert len(found) == 6
+
+
+def test_walker_dedupes_overlapping_paths_and_links(tree):
+    """Tests that each notebook is yielded once across paths, hard links and symlinks"""
+    os.link(tree / "analysis.ipynb", tree / "hardlink.ipynb")
+    os.symlink(tree / "analysis.ipynb", tree / "reports" / "symlink.ipynb")
+    walker = walk.NotebookWalker()
+
+    found = [
+        *walker.find("."),
+        *walker.find("reports"),
+        *walker.find(os.path.join("reports", "summary.ipynb")),
+    ]
+
+    assert len(found) == 3
+    assert len({os.path.realpath(path) for path in found}) == 3
+
+
+def test_walker_explicit_notebook_respects_excludes(
+    tree,
+):  # pylint: disable=unused-argument
+    """Tests that notebook paths given directly are skipped, with a warning, when excluded"""
+    path = os.path.join("reports", ".ipynb_checkpoints", "summary-checkpoint.ipynb")
+    excluded = []
+    walker = walk.NotebookWalker(exclude=["reports"], on_excluded=excluded.append)
+
+    assert not list(walker.find(path))
+    assert excluded == [path]
+    with pytest.warns(walk.ExcludedPathWarning):
+        assert not list(walk.NotebookWalker(exclude=["*-checkpoint.ipynb"]).find(path))
+
+
+def test_walker_explicit_notebook_ignores_default_excludes(tree, monkeypatch):
+    """Tests that default excludes and directories above cwd never skip named notebooks"""
+    checkpoint = os.path.join(
+        "reports", ".ipynb_checkpoints", "summary-checkpoint.ipynb"
+    )
+    assert list(walk.NotebookWalker().find(checkpoint)) == [checkpoint]
+
+    project = tree / "docs" / "generated"
+    monkeypatch.chdir(project)
+    notebook = str(project / "api.ipynb")
+    walker = walk.NotebookWalker(exclude=["docs", "generated"])
+
+    assert list(walker.find(notebook)) == [notebook]
+
+
+def test_walker_rejects_non_notebook_file(tree):  # pylint: disable=unused-argument
+    """Tests that a path that is neither a directory nor a notebook raises ValueError"""
+    with pytest.raises(ValueError):
+        list(walk.NotebookWalker().find("notes.txt"))
+
+
+def test_walker_respects_gitignore(tree):
+    """Tests that git-ignored directories are skipped when requested"""
+    subprocess.run(["git", "init", "-q"], check=True)
+    (tree / ".gitignore").write_text("reports/\n")
+
+    assert len(list(walk.NotebookWalker(respect_gitignore=True).find("."))) == 2
+    assert len(list(walk.NotebookWalker().find("."))) == 3
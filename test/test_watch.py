@@ -0,0 +1,175 @@
+"""tests the watch module"""
+
+import io
+import os
+import shutil
+import threading
+import time
+import pytest
+from enforce_notebook_run_order import watch
+from enforce_notebook_run_order.reporters import PlainReporter, use_reporter
+from enforce_notebook_run_order.walk import NotebookWalker
+
+NOTEBOOKS_DIR = os.path.join("test", "test_data", "notebooks")
+VALID_NOTEBOOK = os.path.join(NOTEBOOKS_DIR, "python", "valid", "valid_notebook.ipynb")
+INVALID_NOTEBOOK = os.path.join(
+    NOTEBOOKS_DIR, "python", "invalid", "invalid_notebook.ipynb"
+)
+
+# pylint: disable=redefined-outer-name
+
+
+def save(source: str, destination: str, mtime_ns: int = 10**18) -> None:
+    """Copies a notebook with a distinct mtime, as a save would."""
+    shutil.copyfile(source, destination)
+    os.utime(destination, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def watched_dir(tmp_path):
+    """Returns a directory with a valid and an invalid notebook."""
+    save(VALID_NOTEBOOK, str(tmp_path / "valid.ipynb"))
+    (tmp_path / "sub").mkdir()
+    save(INVALID_NOTEBOOK, str(tmp_path / "sub" / "invalid.ipynb"))
+    return tmp_path
+
+
+def test_snapshot_finds_created_modified_and_removed_notebooks(watched_dir):
+    """Tests that polling reports what changed since the last poll"""
+    snapshot = watch.TreeSnapshot([str(watched_dir)], NotebookWalker())
+    assert len(snapshot.notebooks) == 2
+    assert snapshot.poll() == ([], [])
+
+    save(VALID_NOTEBOOK, str(watched_dir / "valid.ipynb"), 2 * 10**18)
+    (watched_dir / "new").mkdir()
+    save(VALID_NOTEBOOK, str(watched_dir / "new" / "created.ipynb"))
+    os.remove(watched_dir / "sub" / "invalid.ipynb")
+
+    changed, removed = snapshot.poll()
+    assert changed == [
+        str(watched_dir / "new" / "created.ipynb"),
+        str(watched_dir / "valid.ipynb"),
+    ]
+    assert removed == [str(watched_dir / "sub" / "invalid.ipynb")]
+    assert snapshot.poll() == ([], [])
+
+
+def test_snapshot_follows_renames_and_removed_directories(watched_dir):
+    """Tests that a rename is a removal and a creation"""
+    snapshot = watch.TreeSnapshot([str(watched_dir)], NotebookWalker())
+    os.rename(watched_dir / "valid.ipynb", watched_dir / "renamed.ipynb")
+    shutil.rmtree(watched_dir / "sub")
+
+    changed, removed = snapshot.poll()
+    assert changed == [str(watched_dir / "renamed.ipynb")]
+    assert removed == [
+        str(watched_dir / "sub" / "invalid.ipynb"),
+        str(watched_dir / "valid.ipynb"),
+    ]
+
+
+def test_snapshot_skips_excluded_paths(watched_dir):
+    """Tests that the walker's exclude patterns apply to created notebooks too"""
+    snapshot = watch.TreeSnapshot([str(watched_dir)], NotebookWalker(exclude=["sub"]))
+    assert list(snapshot.notebooks) == [str(watched_dir / "valid.ipynb")]
+
+    save(INVALID_NOTEBOOK, str(watched_dir / "sub" / "other.ipynb"))
+    assert snapshot.poll() == ([], [])
+
+
+def test_snapshot_rejects_non_notebook_files(tmp_path):
+    """Tests that only notebooks and directories can be watched"""
+    (tmp_path / "notes.txt").write_text("", encoding="utf-8")
+    with pytest.raises(ValueError):
+        watch.TreeSnapshot([str(tmp_path / "notes.txt")], NotebookWalker())
+
+
+def test_watcher_reports_only_transitions(watched_dir):
+    """Tests that a notebook is reported when it becomes invalid and when it is fixed"""
+    notebook_path = str(watched_dir / "valid.ipynb")
+    watcher = watch.NotebookWatcher([str(watched_dir)], NotebookWalker(), debounce=0)
+    results = watcher.check_all()
+    assert [result.valid for result in results] == [False, True]
+
+    save(VALID_NOTEBOOK, notebook_path, 2 * 10**18)
+    assert not watcher.step(now=1.0)
+
+    save(INVALID_NOTEBOOK, notebook_path, 3 * 10**18)
+    (transition,) = watcher.step(now=2.0)
+    assert transition.path == notebook_path
+    assert not transition.valid
+
+    save(VALID_NOTEBOOK, notebook_path, 4 * 10**18)
+    (transition,) = watcher.step(now=3.0)
+    assert transition.valid
+
+
+def test_watcher_reports_new_invalid_notebooks(watched_dir):
+    """Tests that a created notebook is reported only if it is invalid"""
+    watcher = watch.NotebookWatcher([str(watched_dir)], NotebookWalker(), debounce=0)
+    watcher.check_all()
+
+    save(VALID_NOTEBOOK, str(watched_dir / "new_valid.ipynb"))
+    save(INVALID_NOTEBOOK, str(watched_dir / "new_invalid.ipynb"))
+
+    (transition,) = watcher.step(now=1.0)
+    assert transition.path == str(watched_dir / "new_invalid.ipynb")
+
+
+def test_watcher_debounces_bursts_of_saves(watched_dir, mocker):
+    """Tests that a notebook is checked once it stops changing"""
+    notebook_path = str(watched_dir / "valid.ipynb")
+    watcher = watch.NotebookWatcher([str(watched_dir)], NotebookWalker(), debounce=1)
+    watcher.check_all()
+    process_path = mocker.spy(watch, "process_path")
+
+    save(INVALID_NOTEBOOK, notebook_path, 2 * 10**18)
+    assert not watcher.step(now=10.0)
+    save(INVALID_NOTEBOOK, notebook_path, 3 * 10**18)
+    assert not watcher.step(now=10.5)
+    assert not watcher.step(now=11.0)
+    assert process_path.call_count == 0
+
+    (transition,) = watcher.step(now=11.5)
+    assert not transition.valid
+    assert process_path.call_count == 1
+
+
+def wait_for(condition, timeout: float = 10.0) -> None:
+    """Waits until a condition holds, failing the test after a timeout."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_watch_prints_invalid_notebooks_then_transitions(watched_dir):
+    """Tests that watching reports the initial invalid notebooks and each transition"""
+    invalid_path = str(watched_dir / "sub" / "invalid.ipynb")
+    stream = io.StringIO()
+    stop = threading.Event()
+
+    def run():
+        with use_reporter(PlainReporter(stream)):
+            watch.watch(
+                [str(watched_dir)],
+                NotebookWalker(),
+                interval=0.01,
+                debounce=0,
+                stop=stop,
+            )
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    try:
+        wait_for(lambda: "INVALID" in stream.getvalue())
+        save(VALID_NOTEBOOK, invalid_path, 2 * 10**18)
+        wait_for(lambda: "\nVALID" in stream.getvalue())
+    finally:
+        stop.set()
+        thread.join()
+
+    output = stream.getvalue()
+    assert output.startswith(f"\nINVALID: {invalid_path}\n")
+    assert output.endswith(f"\n\nVALID: {invalid_path}\n")
+    assert str(watched_dir / "valid.ipynb") not in output